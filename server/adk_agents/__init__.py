@@ -1,24 +1,36 @@
 """
 Google ADK-based agent implementation for Smart Invoice Scheduler
+
+Exports are resolved on first access so that importing a submodule (for
+example ``adk_agents.adk_integration_service`` from the routers) does not pull
+in the ADK and cloud SDKs at application startup.
 """
 
-from .base_adk_agent import BaseADKAgent
-from .contract_processing_adk_agent import ContractProcessingADKAgent
-# from .validation_adk_agent import ValidationADKAgent
-from .correction_adk_agent import CorrectionADKAgent
-from .invoice_generator_adk_agent import InvoiceGeneratorADKAgent
-from .ui_generation_adk_agent import UIGenerationADKAgent
-# from .schedule_retrieval_adk_agent import ScheduleRetrievalADKAgent
-
-from .orchestrator_adk_workflow import InvoiceProcessingADKWorkflow
-
-__all__ = [
-    "BaseADKAgent",
-    "ContractProcessingADKAgent", 
-    # "ValidationADKAgent",
-    "CorrectionADKAgent",
-    "InvoiceGeneratorADKAgent",
-    "UIGenerationADKAgent",
-    # "ScheduleRetrievalADKAgent",  # Temporarily commented
-    "InvoiceProcessingADKWorkflow"
-]
\ No newline at end of file
+import importlib
+
+_EXPORTS = {
+    "BaseADKAgent": ".base_adk_agent",
+    "ContractProcessingADKAgent": ".contract_processing_adk_agent",
+    # "ValidationADKAgent": ".validation_adk_agent",
+    "CorrectionADKAgent": ".correction_adk_agent",
+    "InvoiceGeneratorADKAgent": ".invoice_generator_adk_agent",
+    "UIGenerationADKAgent": ".ui_generation_adk_agent",
+    # "ScheduleRetrievalADKAgent": ".schedule_retrieval_adk_agent",  # Temporarily commented
+    "InvoiceProcessingADKWorkflow": ".orchestrator_adk_workflow",
+    "WorkflowState": ".workflow_state",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -7,10 +7,13 @@ and the new Google ADK workflow system.
 
 from typing import Dict, Any, Optional
 import logging
+import os
 from datetime import datetime
 
 from .orchestrator_adk_workflow import create_adk_workflow, InvoiceProcessingADKWorkflow
+from .workflow_state import WorkflowState
 from schemas.workflow_schemas import WorkflowRequest, WorkflowResponse, WorkflowStatus, ProcessingStatus
+from services.review_queue_service import get_review_queue_service, is_paused_for_review
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +24,19 @@ class ADKIntegrationService:
     """
     
     def __init__(self):
-        self.adk_workflow: InvoiceProcessingADKWorkflow = create_adk_workflow()
+        self._adk_workflow: Optional[InvoiceProcessingADKWorkflow] = None
         self.active_workflows: Dict[str, Dict[str, Any]] = {}
+        # Paused workflows go to the review queue's storage instead of staying in active_workflows
+        self.hibernate_paused = os.getenv("REVIEW_QUEUE_HIBERNATE", "true").lower() == "true"
         self.logger = logging.getLogger(__name__)
     
+    @property
+    def adk_workflow(self) -> InvoiceProcessingADKWorkflow:
+        """ADK workflow, created on first use"""
+        if self._adk_workflow is None:
+            self._adk_workflow = create_adk_workflow()
+        return self._adk_workflow
+    
     async def start_adk_workflow(
         self,
         request: WorkflowRequest
@@ -54,11 +66,8 @@ class ADKIntegrationService:
             workflow_id = workflow_result["workflow_id"]
             
             # Store workflow state for monitoring
-            self.active_workflows[workflow_id] = {
-                "state": workflow_result,
-                "created_at": datetime.now().isoformat(),
-                "request": request.model_dump()
-            }
+            self.register_workflow(workflow_result, request.model_dump())
+            await self.hibernate_if_paused(workflow_id)
             
             # Create response
             response = WorkflowResponse(
@@ -79,6 +88,77 @@ class ADKIntegrationService:
             self.logger.error(f"❌ Failed to start ADK workflow: {str(e)}")
             raise e
     
+    def register_workflow(self, workflow_state: Dict[str, Any], request_data: Dict[str, Any]) -> None:
+        """
+        Track a workflow so the status, resume and human input endpoints can find it
+        
+        Args:
+            workflow_state: State returned by execute_workflow
+            request_data: Request that started the workflow
+        """
+        self.active_workflows[workflow_state["workflow_id"]] = {
+            "state": workflow_state,
+            "created_at": datetime.now().isoformat(),
+            "request": request_data
+        }
+    
+    async def hibernate_if_paused(self, workflow_id: str) -> bool:
+        """
+        Move a workflow waiting for human input from memory to the review queue
+        
+        Returns:
+            True if the workflow was hibernated
+        """
+        workflow_info = self.active_workflows.get(workflow_id)
+        if not (self.hibernate_paused and workflow_info and is_paused_for_review(workflow_info["state"])):
+            return False
+        try:
+            await get_review_queue_service().hibernate(workflow_info["state"], workflow_info.get("request"))
+        except Exception as e:
+            # Keep serving it from memory rather than losing the paused state
+            self.logger.warning(f"⚠️ Could not hibernate workflow {workflow_id}, keeping it in memory: {str(e)}")
+            return False
+        self.active_workflows.pop(workflow_id, None)
+        return True
+    
+    async def get_workflow_info(self, workflow_id: str, wake: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Workflow entry from memory, or from the review queue if it is hibernated
+        
+        Args:
+            workflow_id: Workflow identifier
+            wake: Claim a hibernated workflow back into active_workflows (to resume,
+                correct or cancel it); otherwise the stored snapshot is only read
+        """
+        workflow_info = self.active_workflows.get(workflow_id)
+        if workflow_info or not self.hibernate_paused:
+            return workflow_info
+        
+        review_queue = get_review_queue_service()
+        try:
+            record = await (review_queue.claim(workflow_id) if wake else review_queue.load(workflow_id))
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not read hibernated workflow {workflow_id}: {str(e)}")
+            return None
+        if not record:
+            return None
+        
+        workflow_info = {
+            "state": WorkflowState.from_dict(record["state"]),
+            "created_at": record.get("hibernated_at"),
+            "request": record.get("request") or {},
+            "hibernated_at": record.get("hibernated_at")
+        }
+        if wake:
+            # The stored record is gone now; keep an untouched copy to put back if a resume fails
+            blobs: Dict[str, bytes] = {}
+            workflow_info["paused_state"] = WorkflowState.from_snapshot(
+                workflow_info["state"].to_snapshot(blobs), blobs
+            )
+            self.active_workflows[workflow_id] = workflow_info
+            self.logger.info(f"⏰ Woke hibernated workflow {workflow_id}")
+        return workflow_info
+    
     async def get_adk_workflow_status(self, workflow_id: str) -> WorkflowStatus:
         """
         Get the current status of an ADK workflow
@@ -90,7 +170,7 @@ class ADKIntegrationService:
             WorkflowStatus with detailed information
         """
         
-        workflow_info = self.active_workflows.get(workflow_id)
+        workflow_info = await self.get_workflow_info(workflow_id)
         if not workflow_info:
             self.logger.warning(f"❌ Workflow {workflow_id} not found in active_workflows. Available: {list(self.active_workflows.keys())}")
             return WorkflowStatus(
@@ -152,7 +232,7 @@ class ADKIntegrationService:
         
         self.logger.info(f"🔄 Resuming ADK workflow - ID: {workflow_id}")
         
-        workflow_info = self.active_workflows.get(workflow_id)
+        workflow_info = await self.get_workflow_info(workflow_id, wake=True)
         if not workflow_info:
             raise ValueError(f"Workflow {workflow_id} not found")
         
@@ -167,6 +247,7 @@ class ADKIntegrationService:
         # Update stored state
         workflow_info["state"] = updated_state
         workflow_info["last_resumed_at"] = datetime.now().isoformat()
+        await self.hibernate_if_paused(workflow_id)
         
         self.logger.info(f"✅ ADK workflow resumed - ID: {workflow_id}")
         return updated_state
@@ -273,7 +354,7 @@ class ADKIntegrationService:
             Cancellation result
         """
         
-        workflow_info = self.active_workflows.get(workflow_id)
+        workflow_info = await self.get_workflow_info(workflow_id, wake=True)
         if not workflow_info:
             return {
                 "error": "Workflow not found",
@@ -304,7 +385,7 @@ class ADKIntegrationService:
         Returns:
             Complete workflow state dictionary or None if not found
         """
-        workflow_info = self.active_workflows.get(workflow_id)
+        workflow_info = await self.get_workflow_info(workflow_id)
         if not workflow_info:
             return None
         
@@ -328,22 +409,70 @@ class ADKIntegrationService:
         self.logger.info(f"🔄 Resuming ADK workflow after human input - ID: {workflow_id}")
         
         # Get current workflow state
-        workflow_state = await self.get_workflow_state(workflow_id)
-        if not workflow_state:
+        workflow_info = await self.get_workflow_info(workflow_id, wake=True)
+        if not workflow_info:
             raise ValueError(f"Workflow {workflow_id} not found")
         
         # Resume workflow using the ADK workflow system
-        updated_state = await self.adk_workflow.resume_workflow(
-            workflow_state=workflow_state,
-            human_input_data=human_input_data
-        )
+        try:
+            updated_state = await self.adk_workflow.resume_workflow(
+                workflow_state=workflow_info["state"],
+                human_input_data=human_input_data
+            )
+        except Exception:
+            await self._requeue_after_failed_resume(workflow_id, workflow_info)
+            raise
         
-        # Update stored workflow state
-        self.active_workflows[workflow_id]["state"] = updated_state
-        self.active_workflows[workflow_id]["last_resumed_at"] = datetime.now().isoformat()
+        # Update stored workflow state; hibernate again if it still needs input
+        workflow_info.pop("paused_state", None)
+        workflow_info["state"] = updated_state
+        workflow_info["last_resumed_at"] = datetime.now().isoformat()
+        await self.hibernate_if_paused(workflow_id)
         
         self.logger.info(f"✅ ADK workflow resumed after human input - ID: {workflow_id}")
         return updated_state
+    
+    async def _requeue_after_failed_resume(self, workflow_id: str, workflow_info: Dict[str, Any]) -> None:
+        """Put a workflow woken from the review queue back there, as it was, after its resume raised"""
+        paused_state = workflow_info.pop("paused_state", None)
+        if paused_state is None:
+            return
+        workflow_info["state"] = paused_state
+        if await self.hibernate_if_paused(workflow_id):
+            self.logger.warning(f"⚠️ Resume of workflow {workflow_id} failed - returned it to the review queue")
+    
+    async def resume_from_review(
+        self,
+        workflow_id: str,
+        field_values: Dict[str, Any],
+        user_notes: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Resume a workflow with answers submitted through the review queue
+        
+        Args:
+            workflow_id: Workflow identifier
+            field_values: Answered fields (dotted paths) and their values
+            user_notes: Reviewer notes
+            
+        Returns:
+            Updated workflow state
+        """
+        workflow_info = await self.get_workflow_info(workflow_id, wake=True)
+        if not workflow_info:
+            raise ValueError(f"Workflow {workflow_id} is not waiting for review")
+        
+        workflow_state = workflow_info["state"]
+        workflow_state["awaiting_human_input"] = False
+        workflow_state["workflow_paused"] = False
+        workflow_state["human_input_completed"] = True
+        workflow_state.pop("pause_reason", None)
+        
+        return await self.resume_workflow_after_human_input(workflow_id, {
+            "field_values": field_values,
+            "user_notes": user_notes,
+            "input_type": "structured"
+        })
 
 
 # Global ADK integration service instance
@@ -5,7 +5,8 @@ Converts the custom BaseAgent to Google ADK pattern
 """
 
 from abc import abstractmethod
-from typing import Dict, Any, Optional, AsyncGenerator
+from typing import Dict, Any, Optional, AsyncGenerator, ClassVar
+import asyncio
 import logging
 import time
 from datetime import datetime
@@ -24,6 +25,9 @@ class SimpleEvent:
         self.timestamp = datetime.now().isoformat()
 
 from schemas.workflow_schemas import AgentType, ProcessingStatus
+from utils.tracing import get_tracer, SpanKind
+from utils.resilience import RetryPolicy, is_transient_error, retries_exhausted
+from .workflow_state import WorkflowState
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +36,9 @@ class BaseADKAgent(BaseAgent):
     """Base class for all ADK agents in the Smart Invoice Scheduler workflow"""
     agent_type: Optional[AgentType] = None
     max_retries: Optional[int] = None
+    # Agents with non-idempotent side effects (DB inserts, scheduler jobs) opt out of re-runs
+    retry_on_transient_errors: ClassVar[bool] = True
+    _retry_policy: ClassVar[RetryPolicy] = RetryPolicy(base_delay=1.0, max_delay=10.0)
     _logger: logging.Logger = PrivateAttr()
     
     def __init__(
@@ -53,70 +60,107 @@ class BaseADKAgent(BaseAgent):
     
     async def _run_async_impl(self, context: InvocationContext) -> AsyncGenerator[SimpleEvent, None]:
         """ADK-required async implementation with error handling and timing"""
-        start_time = time.time()
-        self.logger.info(f"🚀 Starting ADK {self.agent_type.value} execution")
+        workflow_id = (context.state or {}).get("workflow_id")
+        with get_tracer().span(
+            self.agent_type.value,
+            SpanKind.AGENT,
+            {"agent.name": self.name, "workflow.id": workflow_id or ""}
+        ) as span:
+            start_time = time.time()
+            self.logger.info(f"🚀 Starting ADK {self.agent_type.value} execution")
         
-        try:
-            # Get current state from context
-            state = context.state or {}
+            try:
+                # Get current state from context
+                state = context.state or {}
             
-            # Update state to show current agent
-            state["current_agent"] = self.agent_type.value
-            state["last_updated_at"] = datetime.now().isoformat()
+                # Update state to show current agent
+                state["current_agent"] = self.agent_type.value
+                state["last_updated_at"] = datetime.now().isoformat()
             
-            # Execute the agent-specific logic
-            async for event in self.process_adk(state, context):
-                yield event
+                # Execute the agent-specific logic, re-running it on transient dependency failures
+                # as long as it has not delivered a result yet
+                attempt = 0
+                while True:
+                    delivered_result = False
+                    try:
+                        async for event in self.process_adk(state, context):
+                            if (getattr(event, "data", None) or {}).get("status") == "success":
+                                delivered_result = True
+                            yield event
+                        break
+                    except Exception as e:
+                        attempt += 1
+                        # Errors that already went through a resilient call's retries are not retried again
+                        if (not self.retry_on_transient_errors or delivered_result
+                                or attempt > (self.max_retries or 0)
+                                or not is_transient_error(e) or retries_exhausted(e)):
+                            raise
+                        delay = self._retry_policy.delay_for(attempt)
+                        self.logger.warning(f"🔁 ADK {self.agent_type.value} transient failure ({type(e).__name__}: {e}) - retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                        state.setdefault("agent_retries", []).append({
+                            "agent": self.agent_type.value,
+                            "attempt": attempt,
+                            "error": str(e),
+                            "timestamp": datetime.now().isoformat()
+                        })
+                        span.set_attribute("retries", attempt)
+                        yield self.create_progress_event(
+                            f"🔁 Transient error in {self.agent_type.value}, retrying ({attempt}/{self.max_retries})",
+                            0.0,
+                            {"retry_attempt": attempt, "retry_delay": delay}
+                        )
+                        await asyncio.sleep(delay)
             
-            # Calculate execution time
-            execution_time = time.time() - start_time
+                # Calculate execution time
+                execution_time = time.time() - start_time
             
-            # Log success and yield final event
-            self.logger.info(f"✅ ADK {self.agent_type.value} completed in {execution_time:.2f}s")
+                # Log success and yield final event
+                self.logger.info(f"✅ ADK {self.agent_type.value} completed in {execution_time:.2f}s")
             
-            yield SimpleEvent(
-                author=self.name,
-                content=f"Agent {self.agent_type.value} completed successfully",
-                data={
-                    "execution_time": execution_time,
-                    "status": "success",
-                    "agent_type": self.agent_type.value
-                }
-            )
+                yield SimpleEvent(
+                    author=self.name,
+                    content=f"Agent {self.agent_type.value} completed successfully",
+                    data={
+                        "execution_time": execution_time,
+                        "status": "success",
+                        "agent_type": self.agent_type.value
+                    }
+                )
             
-        except Exception as e:
-            execution_time = time.time() - start_time
-            self.logger.error(f"❌ ADK {self.agent_type.value} failed after {execution_time:.2f}s: {str(e)}")
+            except Exception as e:
+                execution_time = time.time() - start_time
+                span.record_error(e)
+                self.logger.error(f"❌ ADK {self.agent_type.value} failed after {execution_time:.2f}s: {str(e)}")
             
-            # Add error to state
-            state = context.state or {}
-            error_info = {
-                "agent": self.agent_type.value,
-                "error": str(e),
-                "timestamp": datetime.now().isoformat(),
-                "execution_time": execution_time
-            }
+                # Add error to state
+                state = context.state or {}
+                error_info = {
+                    "agent": self.agent_type.value,
+                    "error": str(e),
+                    "timestamp": datetime.now().isoformat(),
+                    "execution_time": execution_time
+                }
             
-            if "errors" not in state:
-                state["errors"] = []
-            state["errors"].append(error_info)
+                if "errors" not in state:
+                    state["errors"] = []
+                state["errors"].append(error_info)
             
-            # Update status
-            state["processing_status"] = ProcessingStatus.FAILED.value
+                # Update status
+                state["processing_status"] = ProcessingStatus.FAILED.value
             
-            # Update context state
-            context.state.update(state)
+                # Update context state
+                context.state.update(state)
             
-            yield SimpleEvent(
-                author=self.name,
-                content=f"Agent {self.agent_type.value} failed: {str(e)}",
-                data={
-                    "execution_time": execution_time,
-                    "status": "failed",
-                    "error": str(e),
-                    "agent_type": self.agent_type.value
-                }
-            )
+                yield SimpleEvent(
+                    author=self.name,
+                    content=f"Agent {self.agent_type.value} failed: {str(e)}",
+                    data={
+                        "execution_time": execution_time,
+                        "status": "failed",
+                        "error": str(e),
+                        "agent_type": self.agent_type.value
+                    }
+                )
     
     @abstractmethod
     async def process_adk(self, state: Dict[str, Any], context: InvocationContext) -> AsyncGenerator[SimpleEvent, None]:
@@ -202,6 +246,12 @@ class BaseADKAgent(BaseAgent):
             new_data: New invoice data to store
             source_agent: Name of agent providing the data
         """
+        if isinstance(state, WorkflowState):
+            # Delta-encoded history and lazy legacy views - no per-key copies
+            state.record_invoice_data(new_data, source_agent or self.name, datetime.now().isoformat())
+            self.logger.info(f"📝 Updated invoice data - Version: {state['data_version']}, Source: {source_agent or self.name}")
+            return
+        
         # Archive current data to history
         if state.get("current_invoice_data"):
             history_entry = {
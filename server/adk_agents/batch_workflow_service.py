@@ -0,0 +1,320 @@
+"""
+Batch ADK Workflow Service
+
+Runs the ADK invoice workflow for a whole portfolio of contracts submitted in
+one request. Workflows run as tasks on the service's event loop, at most
+``max_concurrency`` at a time, inside a shared batching scope, so embedding
+requests from different contracts are coalesced and Gemini calls share one
+concurrency budget. The agents run blocking SDK calls and PDF parsing in
+worker threads. Every workflow is registered with the ADK integration
+service, so the single-workflow endpoints (status, trace, human input,
+resume) keep working for batch members. Members that pause for human input
+are hibernated to the review queue as soon as they finish.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from .adk_integration_service import get_adk_integration_service, ADKIntegrationService
+from schemas.workflow_schemas import ProcessingStatus
+from utils.batching import shared_batching, batching_stats
+from services.review_queue_service import get_review_queue_service
+
+logger = logging.getLogger(__name__)
+
+# Workflow statuses after which a batch item no longer occupies a worker
+_TERMINAL_STATUSES = {
+    ProcessingStatus.SUCCESS.value,
+    ProcessingStatus.COMPLETED.value,
+    ProcessingStatus.FAILED.value,
+    ProcessingStatus.NEEDS_HUMAN_INPUT.value,
+    "cancelled",
+}
+
+
+class BatchWorkflowService:
+    """
+    Service for running many ADK workflows as one batch
+    """
+
+    def __init__(self, adk_service: Optional[ADKIntegrationService] = None):
+        self._adk_service = adk_service
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.default_concurrency = int(os.getenv("BATCH_WORKFLOW_CONCURRENCY", "8"))
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def adk_service(self) -> ADKIntegrationService:
+        if self._adk_service is None:
+            self._adk_service = get_adk_integration_service()
+        return self._adk_service
+
+    async def start_batch(
+        self,
+        user_id: str,
+        contracts: List[Dict[str, Any]],
+        max_attempts: int = 3,
+        options: Optional[Dict[str, Any]] = None,
+        max_concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue a batch of contracts and start processing it in the background
+
+        Args:
+            user_id: Owner of every workflow in the batch
+            contracts: One dict per contract with ``contract_name`` and exactly one
+                source: ``contract_file`` (uploaded bytes), ``gcs_path``,
+                ``drive_file_id`` or ``contract_path`` (already processed contract)
+            max_attempts: Maximum retry attempts per workflow
+            options: Workflow options shared by every contract
+            max_concurrency: Workflows processed at the same time
+
+        Returns:
+            Batch summary with the workflow ID assigned to each contract
+        """
+        if not contracts:
+            raise ValueError("A batch needs at least one contract")
+
+        batch_id = str(uuid.uuid4())
+        concurrency = max(1, min(max_concurrency or self.default_concurrency, len(contracts)))
+        items = []
+        for contract in contracts:
+            if not contract.get("contract_name"):
+                raise ValueError("Every batch contract needs a contract_name")
+            items.append({
+                "workflow_id": str(uuid.uuid4()),
+                "contract_name": contract["contract_name"],
+                "source": self._source_type(contract),
+                "status": "queued",
+                "error": None,
+                "started_at": None,
+                "finished_at": None,
+                "_contract": contract,
+            })
+
+        batch = {
+            "batch_id": batch_id,
+            "user_id": user_id,
+            "items": items,
+            "max_attempts": max_attempts,
+            "options": {**(options or {}), "adk_enabled": True, "workflow_type": "adk", "batch_id": batch_id},
+            "max_concurrency": concurrency,
+            "created_at": datetime.now().isoformat(),
+            "started_monotonic": time.monotonic(),
+            "finished_monotonic": None,
+            "finished_at": None,
+        }
+        self.batches[batch_id] = batch
+        batch["task"] = asyncio.create_task(self._run_batch(batch))
+
+        self.logger.info(f"📦 Batch {batch_id} queued - User: {user_id}, Contracts: {len(items)}, Concurrency: {concurrency}")
+        return self.get_batch_status(batch_id)
+
+    @staticmethod
+    def _source_type(contract: Dict[str, Any]) -> str:
+        sources = [key for key in ("contract_file", "gcs_path", "drive_file_id", "contract_path") if contract.get(key)]
+        if len(sources) != 1:
+            raise ValueError(
+                f"Contract '{contract.get('contract_name')}' needs exactly one of "
+                f"contract_file, gcs_path, drive_file_id or contract_path"
+            )
+        return sources[0]
+
+    async def _run_batch(self, batch: Dict[str, Any]) -> None:
+        # Workflows run as tasks on this loop, so pooled DB connections stay on the loop that opened them
+        semaphore = asyncio.Semaphore(batch["max_concurrency"])
+        try:
+            # Build the agents once up front instead of racing to build them in every task
+            await asyncio.to_thread(self.adk_service.adk_workflow.warm_up)
+            # Only this batch's tasks (and the threads they start) share embedding batches and the Gemini cap
+            with shared_batching():
+                await asyncio.gather(*(
+                    self._run_and_hibernate(semaphore, batch, item)
+                    for item in batch["items"]
+                ))
+        finally:
+            batch["finished_monotonic"] = time.monotonic()
+            batch["finished_at"] = datetime.now().isoformat()
+            self.logger.info(f"🏁 Batch {batch['batch_id']} finished - {self._status_counts(batch)}")
+
+    async def _run_and_hibernate(self, semaphore: asyncio.Semaphore, batch: Dict[str, Any], item: Dict[str, Any]) -> None:
+        async with semaphore:
+            await self._run_item(batch, item)
+        await self.adk_service.hibernate_if_paused(item["workflow_id"])
+
+    async def _run_item(self, batch: Dict[str, Any], item: Dict[str, Any]) -> None:
+        """Run one workflow to completion or pause"""
+        item["status"] = ProcessingStatus.IN_PROGRESS.value
+        item["started_at"] = datetime.now().isoformat()
+        contract = item.pop("_contract")
+        try:
+            contract_file, options = await self._resolve_source(contract, batch["options"])
+            workflow_state = await self.adk_service.adk_workflow.execute_workflow(
+                user_id=batch["user_id"],
+                contract_file=contract_file,
+                contract_name=item["contract_name"],
+                max_attempts=batch["max_attempts"],
+                options=options,
+                workflow_id=item["workflow_id"]
+            )
+            self.adk_service.register_workflow(workflow_state, {
+                "user_id": batch["user_id"],
+                "contract_name": item["contract_name"],
+                "max_attempts": batch["max_attempts"],
+                "options": options,
+                "batch_id": batch["batch_id"],
+            })
+            item["status"] = workflow_state.get("processing_status")
+        except Exception as e:
+            self.logger.error(f"❌ Batch {batch['batch_id']}: workflow for '{item['contract_name']}' failed: {str(e)}")
+            item["status"] = ProcessingStatus.FAILED.value
+            item["error"] = str(e)
+        finally:
+            item["finished_at"] = datetime.now().isoformat()
+
+    @staticmethod
+    async def _resolve_source(contract: Dict[str, Any], base_options: Dict[str, Any]):
+        """Map a batch contract entry to the (contract_file, options) pair execute_workflow expects"""
+        options = dict(base_options)
+        if contract.get("contract_file"):
+            return contract["contract_file"], options
+        if contract.get("gcs_path"):
+            from services.gcp_storage_service import get_gcp_storage_service
+            storage = get_gcp_storage_service()
+            path = contract["gcs_path"]
+            if path.startswith("gs://"):
+                path = path[len("gs://"):].split("/", 1)[-1]
+            content = await asyncio.to_thread(storage.download_file, path)
+            if content is None:
+                raise ValueError(f"Contract not found in GCS: {contract['gcs_path']}")
+            return content, options
+        if contract.get("drive_file_id"):
+            options.update({"existing_contract": True, "contract_path": f"gdrive://{contract['drive_file_id']}"})
+            return None, options
+        options.update({"existing_contract": True, "contract_path": contract["contract_path"]})
+        return None, options
+
+    def _live_status(self, item: Dict[str, Any]) -> str:
+        """Item status, following the registered workflow after it has been resumed"""
+        workflow_info = self.adk_service.active_workflows.get(item["workflow_id"])
+        if workflow_info and item["status"] in _TERMINAL_STATUSES and not item["error"]:
+            return workflow_info["state"].get("processing_status") or item["status"]
+        return item["status"]
+
+    def _status_counts(self, batch: Dict[str, Any]) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for item in batch["items"]:
+            status = self._live_status(item)
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def get_batch_owner(self, batch_id: str) -> Optional[str]:
+        """User who started the batch, or None if the batch is unknown"""
+        batch = self.batches.get(batch_id)
+        return batch["user_id"] if batch else None
+
+    def get_batch_status(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Progress and throughput for a batch
+
+        Returns:
+            Batch summary or None if the batch is unknown
+        """
+        batch = self.batches.get(batch_id)
+        if not batch:
+            return None
+
+        items = [
+            {
+                "workflow_id": item["workflow_id"],
+                "contract_name": item["contract_name"],
+                "source": item["source"],
+                "status": self._live_status(item),
+                "error": item["error"],
+                "started_at": item["started_at"],
+                "finished_at": item["finished_at"],
+            }
+            for item in batch["items"]
+        ]
+        total = len(items)
+        processed = sum(1 for item in batch["items"] if item["finished_at"])
+        counts: Dict[str, int] = {}
+        for item in items:
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        awaiting_review = counts.get(ProcessingStatus.NEEDS_HUMAN_INPUT.value, 0)
+
+        end = batch["finished_monotonic"] or time.monotonic()
+        elapsed = max(end - batch["started_monotonic"], 1e-6)
+        rate = processed / elapsed
+        if batch["finished_at"] is None:
+            status = "running"
+        elif awaiting_review:
+            status = ProcessingStatus.NEEDS_HUMAN_INPUT.value
+        else:
+            status = "completed"
+
+        return {
+            "batch_id": batch_id,
+            "user_id": batch["user_id"],
+            "status": status,
+            "total_contracts": total,
+            "processed": processed,
+            "progress_percentage": round(processed / total * 100, 1),
+            "status_counts": counts,
+            "awaiting_review": awaiting_review,
+            "elapsed_seconds": round(elapsed, 2),
+            "throughput_per_minute": round(rate * 60, 2),
+            "estimated_seconds_remaining": round((total - processed) / rate, 1) if rate and processed < total else (0.0 if processed == total else None),
+            "max_concurrency": batch["max_concurrency"],
+            "shared_batching": batching_stats(),
+            "created_at": batch["created_at"],
+            "finished_at": batch["finished_at"],
+            "workflows": items,
+        }
+
+    async def get_review_queue(self, batch_id: str, group_by: str = "field_name") -> Optional[Dict[str, Any]]:
+        """
+        The review queue restricted to the batch's workflows
+
+        Pending field requests are grouped across workflows so a reviewer can
+        see, for example, every contract missing ``client.email`` at once.
+        """
+        batch = self.batches.get(batch_id)
+        if not batch:
+            return None
+
+        workflow_ids = [item["workflow_id"] for item in batch["items"]]
+        queue = await get_review_queue_service().get_queue(group_by=group_by, workflow_ids=workflow_ids)
+        return {"batch_id": batch_id, **queue}
+
+    def list_batches(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        batches = []
+        for batch_id, batch in self.batches.items():
+            if user_id and batch["user_id"] != user_id:
+                continue
+            summary = self.get_batch_status(batch_id)
+            summary.pop("workflows")
+            batches.append(summary)
+        return {"batches": batches, "total_count": len(batches)}
+
+
+# Global batch workflow service instance
+_batch_service: Optional[BatchWorkflowService] = None
+
+
+def get_batch_workflow_service() -> BatchWorkflowService:
+    """
+    Get the global batch workflow service instance
+
+    Returns:
+        BatchWorkflowService instance
+    """
+    global _batch_service
+    if _batch_service is None:
+        _batch_service = BatchWorkflowService()
+    return _batch_service
@@ -5,8 +5,8 @@ Converts the legacy ContractProcessingAgent to Google ADK pattern. This agent is
 """
 
 # Standard library imports
+import asyncio
 import logging
-import time
 import os
 from datetime import datetime
 from typing import Dict, Any, AsyncGenerator
@@ -142,8 +142,11 @@ class ContractProcessingADKAgent(BaseADKAgent):
         yield self.create_progress_event(f'🔍 Step 2: Extracting structured data for workflow {workflow_id}', 70.0)
         
         try:
-            time.sleep(2)  # Allow time for Pinecone indexing to settle
-            rag_response = self._rag_service.generate_invoice_data(user_id=user_id, contract_name=contract_name)
+            await asyncio.sleep(2)  # Allow time for Pinecone indexing to settle
+            # RAG runs blocking Pinecone/Gemini clients with retries - keep them off the event loop
+            rag_response = await asyncio.to_thread(
+                self._rag_service.generate_invoice_data, user_id=user_id, contract_name=contract_name
+            )
             yield self.create_progress_event("Structured data extracted successfully", 90.0, {"confidence": rag_response.confidence_score})
             
         except Exception as e:
@@ -162,6 +165,7 @@ class ContractProcessingADKAgent(BaseADKAgent):
         unified_data.metadata.workflow_id = workflow_id
         unified_data.metadata.user_id = user_id
         unified_data.metadata.confidence_score = rag_response.confidence_score
+        unified_data.metadata.extraction_signals = rag_response.confidence_signals
         
         unified_data_dict = unified_data.model_dump()
         unified_data_dict["raw_rag_response"] = rag_response.raw_response
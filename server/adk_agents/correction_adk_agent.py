@@ -4,7 +4,7 @@ Correction ADK Agent
 Converts the legacy CorrectionAgent to Google ADK pattern
 """
 
-from typing import Dict, Any, Optional, AsyncGenerator
+from typing import Dict, Any, Optional, AsyncGenerator, ClassVar
 import logging
 from datetime import datetime, timedelta
 from decimal import Decimal
@@ -18,9 +18,13 @@ from schemas.workflow_schemas import AgentType, ProcessingStatus
 from schemas.unified_invoice_schemas import UnifiedInvoiceData
 from services.database_service import get_database_service
 from services.contract_db_service import ContractDatabaseService
+from services.confidence_model import get_confidence_model
 
 logger = logging.getLogger(__name__)
 
+# Confidence floor for invoices a human has reviewed
+HUMAN_REVIEWED_CONFIDENCE = 0.95
+
 
 class CorrectionADKAgent(BaseADKAgent):
     """
@@ -34,6 +38,8 @@ class CorrectionADKAgent(BaseADKAgent):
     """
     _db_service = PrivateAttr()
     _contract_db_service = PrivateAttr()
+    # Saves the corrected invoice data - a blind re-run could save it twice
+    retry_on_transient_errors: ClassVar[bool] = False
     
     def __init__(self):
         super().__init__(
@@ -103,7 +109,7 @@ class CorrectionADKAgent(BaseADKAgent):
             # Ensure we have a UnifiedInvoiceData object
             from schemas.unified_invoice_schemas import UnifiedInvoiceData
             if isinstance(current_data, dict):
-                unified_invoice_data = UnifiedInvoiceData(**current_data)
+                unified_invoice_data = UnifiedInvoiceData.from_trusted(current_data)
             else:
                 unified_invoice_data = current_data
 
@@ -226,7 +232,7 @@ class CorrectionADKAgent(BaseADKAgent):
         if unified_data:
             yield self.create_progress_event("✅ Found unified_invoice_data", 0.0, {"debug": True})
             try:
-                yield self.create_progress_event("Found unified invoice data", 0.0, {"unified_invoice_data": UnifiedInvoiceData(**unified_data)})
+                yield self.create_progress_event("Found unified invoice data", 0.0, {"unified_invoice_data": UnifiedInvoiceData.from_trusted(unified_data)})
                 return
             except Exception as e:
                 yield self.create_progress_event(f"Failed to load unified invoice data: {str(e)}", 0.0, {"warning": True})
@@ -236,7 +242,7 @@ class CorrectionADKAgent(BaseADKAgent):
         if unified_final_data:
             yield self.create_progress_event("✅ Found unified_invoice_data_final", 0.0, {"debug": True})
             try:
-                yield self.create_progress_event("Found final unified invoice data", 0.0, {"unified_invoice_data": UnifiedInvoiceData(**unified_final_data)})
+                yield self.create_progress_event("Found final unified invoice data", 0.0, {"unified_invoice_data": UnifiedInvoiceData.from_trusted(unified_final_data)})
                 return
             except Exception as e:
                 yield self.create_progress_event(f"Failed to load final unified invoice data: {str(e)}", 0.0, {"warning": True})
@@ -366,23 +372,20 @@ class CorrectionADKAgent(BaseADKAgent):
             return due_date.strftime('%Y-%m-%d')
     
     def _calculate_confidence_score_unified(self, unified_data: UnifiedInvoiceData, state: Dict[str, Any]) -> float:
-        """Calculate confidence score for the corrected invoice using unified data"""
-        base_confidence = 0.7
-        
-        # Boost confidence if human input was provided
-        if state.get("human_input_resolved") or state.get("human_input_completed"):
-            base_confidence += 0.2
-        
-        # Boost confidence based on validation results
+        """Confidence for the corrected invoice from the confidence model, raised once a human reviewed it"""
         validation_results = state.get("validation_results", {})
-        if validation_results.get("is_valid"):
-            base_confidence += 0.1
+        features = dict(validation_results.get("confidence_features") or {})
+        if not features:
+            # Validation ran before confidence features were recorded
+            completeness_score = self._calculate_data_completeness_unified(unified_data)
+            features = {"required_completeness": completeness_score, "overall_completeness": completeness_score}
+        confidence = get_confidence_model().predict(features)
         
-        # Boost confidence based on data completeness in unified format
-        completeness_score = self._calculate_data_completeness_unified(unified_data)
-        base_confidence += completeness_score * 0.1
+        # Human-reviewed data is trusted regardless of the signals
+        if state.get("human_input_resolved") or state.get("human_input_completed"):
+            confidence = max(confidence, HUMAN_REVIEWED_CONFIDENCE)
         
-        return min(1.0, base_confidence)
+        return round(confidence, 4)
     
     def _calculate_quality_score_unified(self, unified_data: UnifiedInvoiceData, state: Dict[str, Any]) -> float:
         """Calculate quality score based on data completeness and accuracy using unified data"""
@@ -511,7 +514,8 @@ class CorrectionADKAgent(BaseADKAgent):
             saved_data = await self._contract_db_service.save_corrected_invoice_data(
                 contract_id=contract_id,
                 corrected_data=corrected_invoice_json,
-                corrected_by_human=human_corrected
+                corrected_by_human=human_corrected,
+                confidence_features=state.get("initial_confidence_features")
             )
             
             # Store the database ID in state for reference
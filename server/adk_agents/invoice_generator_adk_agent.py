@@ -4,7 +4,7 @@ Invoice Generator ADK Agent
 Converts the legacy InvoiceGeneratorAgent to Google ADK pattern
 """
 
-from typing import Dict, Any, AsyncGenerator, Optional
+from typing import Dict, Any, AsyncGenerator, Optional, ClassVar
 import logging
 import uuid
 import json
@@ -26,6 +26,8 @@ class InvoiceGeneratorADKAgent(BaseADKAgent):
     """ADK Agent responsible for creating invoice records in database, sending to frontend, and managing invoice lifecycle"""
     
     _db_service = PrivateAttr()
+    # Inserts invoice rows - a blind re-run could duplicate them
+    retry_on_transient_errors: ClassVar[bool] = False
     
     def __init__(self):
         super().__init__(
@@ -76,7 +78,7 @@ class InvoiceGeneratorADKAgent(BaseADKAgent):
 
             # Ensure we have UnifiedInvoiceData
             if isinstance(current_invoice_data, dict):
-                unified_invoice = UnifiedInvoiceData(**current_invoice_data)
+                unified_invoice = UnifiedInvoiceData.from_trusted(current_invoice_data)
             else:
                 unified_invoice = current_invoice_data
                 
@@ -6,6 +6,7 @@ It replaces the legacy orchestrator and provides a modern ADK-based approach.
 """
 
 from typing import Dict, Any, List, Optional
+from functools import cached_property
 import logging
 from datetime import datetime
 import uuid
@@ -14,13 +15,9 @@ import uuid
 # Removed InvocationContext import - using simpler approach
 # Using SimpleEvent from base_adk_agent instead of Google ADK Event
 
-from .contract_processing_adk_agent import ContractProcessingADKAgent
-from .validation_adk_agents import ValidationADKAgent
-from .correction_adk_agent import CorrectionADKAgent
-from .invoice_generator_adk_agent import InvoiceGeneratorADKAgent
-from .ui_generation_adk_agent import UIGenerationADKAgent
 from schemas.workflow_schemas import ProcessingStatus
-from .schedule_retrieval_adk_agent import ScheduleRetrievalADKAgent
+from .workflow_state import WorkflowState
+from utils.tracing import get_tracer, SpanKind
 
 logger = logging.getLogger(__name__)
 
@@ -40,17 +37,49 @@ class InvoiceProcessingADKWorkflow:
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        
-        # Initialize available ADK agents
-        self.contract_processing_agent = ContractProcessingADKAgent()
-        self.validation_agent = ValidationADKAgent()
-        self.correction_agent = CorrectionADKAgent()
-        self.invoice_generator_agent = InvoiceGeneratorADKAgent()
-        self.ui_generation_agent = UIGenerationADKAgent()
-        self.schedule_retrieval_agent = ScheduleRetrievalADKAgent()
-        
-        # Create the main ADK workflow
-        self.workflow = self._create_adk_workflow()
+    
+    # Agents (and the services they hold) are constructed on first use; their
+    # modules import the ADK and cloud SDKs, so the imports are deferred too.
+    
+    @cached_property
+    def contract_processing_agent(self):
+        from .contract_processing_adk_agent import ContractProcessingADKAgent
+        return ContractProcessingADKAgent()
+    
+    @cached_property
+    def validation_agent(self):
+        from .validation_adk_agents import ValidationADKAgent
+        return ValidationADKAgent()
+    
+    @cached_property
+    def correction_agent(self):
+        from .correction_adk_agent import CorrectionADKAgent
+        return CorrectionADKAgent()
+    
+    @cached_property
+    def invoice_generator_agent(self):
+        from .invoice_generator_adk_agent import InvoiceGeneratorADKAgent
+        return InvoiceGeneratorADKAgent()
+    
+    @cached_property
+    def ui_generation_agent(self):
+        from .ui_generation_adk_agent import UIGenerationADKAgent
+        return UIGenerationADKAgent()
+    
+    @cached_property
+    def schedule_retrieval_agent(self):
+        from .schedule_retrieval_adk_agent import ScheduleRetrievalADKAgent
+        return ScheduleRetrievalADKAgent()
+    
+    @cached_property
+    def workflow(self):
+        """Agents in execution order (constructed on first workflow run)"""
+        return self._create_adk_workflow()
+    
+    def warm_up(self) -> "InvoiceProcessingADKWorkflow":
+        """Construct every agent ahead of the first workflow run"""
+        self.workflow
+        return self
     
     def _create_adk_workflow(self):
         """
@@ -97,7 +126,7 @@ class InvoiceProcessingADKWorkflow:
         w_id = workflow_id if workflow_id else str(uuid.uuid4())
         now = datetime.now().isoformat()
         
-        initial_state = {
+        initial_state = WorkflowState({
             # Core workflow identifiers
             "workflow_id": w_id,
             "user_id": user_id,
@@ -139,143 +168,145 @@ class InvoiceProcessingADKWorkflow:
             "workflow_completed": False,
             "adk_workflow": True,
             "options": options or {}
-        }
+        })
         
         self.logger.info(f"🚀 Starting ADK workflow execution - ID: {w_id}, User: {user_id}, Contract: {contract_name}")
         
-        try:
-            # Create a simple context object with state
-            class SimpleContext:
-                def __init__(self, state):
-                    self.state = state
+        with get_tracer().workflow_span(w_id, "workflow", {"user.id": user_id, "contract.name": contract_name}):
+            try:
+                # Create a simple context object with state
+                class SimpleContext:
+                    def __init__(self, state):
+                        self.state = state
             
-            context = SimpleContext(initial_state)
+                context = SimpleContext(initial_state)
             
-            # Execute agents sequentially using the workflow list
-            final_events = []
-            validation_bypass = initial_state.get("options", {}).get("bypass_validation", False)
+                # Execute agents sequentially using the workflow list
+                final_events = []
+                validation_bypass = initial_state.get("options", {}).get("bypass_validation", False)
             
-            for i, agent in enumerate(self.workflow):
-                agent_name = agent.__class__.__name__
-                current_status = context.state.get('processing_status')
+                for i, agent in enumerate(self.workflow):
+                    agent_name = agent.__class__.__name__
+                    current_status = context.state.get('processing_status')
                 
-                # Check if we should skip this agent due to validation failure
-                if (agent_name == "ValidationADKAgent" and 
-                    current_status in [ProcessingStatus.FAILED.value, ProcessingStatus.NEEDS_HUMAN_INPUT.value] and
-                    not validation_bypass):
-                    self.logger.info(f"⏭️ Skipping {agent_name} due to previous failure and bypass disabled")
-                    continue
+                    # Check if we should skip this agent due to validation failure
+                    if (agent_name == "ValidationADKAgent" and 
+                        current_status in [ProcessingStatus.FAILED.value, ProcessingStatus.NEEDS_HUMAN_INPUT.value] and
+                        not validation_bypass):
+                        self.logger.info(f"⏭️ Skipping {agent_name} due to previous failure and bypass disabled")
+                        continue
                 
-                # For agents after validation, check if we should continue after validation failure
-                if (agent_name in ["CorrectionADKAgent", "InvoiceGeneratorADKAgent", "UIGenerationADKAgent", "ScheduleRetrievalADKAgent"] and
-                    validation_bypass and current_status in [ProcessingStatus.FAILED.value, ProcessingStatus.NEEDS_HUMAN_INPUT.value]):
-                    self.logger.info(f"✅ Running {agent_name} - validation bypass enabled")
-                    context.state["validation_bypassed"] = True
+                    # For agents after validation, check if we should continue after validation failure
+                    if (agent_name in ["CorrectionADKAgent", "InvoiceGeneratorADKAgent", "UIGenerationADKAgent", "ScheduleRetrievalADKAgent"] and
+                        validation_bypass and current_status in [ProcessingStatus.FAILED.value, ProcessingStatus.NEEDS_HUMAN_INPUT.value]):
+                        self.logger.info(f"✅ Running {agent_name} - validation bypass enabled")
+                        context.state["validation_bypassed"] = True
                 
-                async for event in agent._run_async_impl(context):
-                    final_events.append(event)
-                    self.logger.info(f"📋 ADK Event: {event.author} - {event.content}")
+                    async for event in agent._run_async_impl(context):
+                        final_events.append(event)
+                        self.logger.info(f"📋 ADK Event: {event.author} - {event.content}")
                 
-                # Update state from event data if provided
-                if hasattr(event, 'data') and event.data:
-                    event_data = event.data
-                    if isinstance(event_data, dict):
-                        # Update specific workflow tracking fields
-                        if 'status' in event_data:
-                            context.state['processing_status'] = event_data['status']
-                        if 'agent_type' in event_data:
-                            context.state['current_agent'] = event_data['agent_type']
-                        if 'workflow_completed' in event_data:
-                            context.state['workflow_completed'] = event_data['workflow_completed']
+                    # Update state from event data if provided
+                    if hasattr(event, 'data') and event.data:
+                        event_data = event.data
+                        if isinstance(event_data, dict):
+                            # Update specific workflow tracking fields
+                            if 'status' in event_data:
+                                context.state['processing_status'] = event_data['status']
+                            if 'agent_type' in event_data:
+                                context.state['current_agent'] = event_data['agent_type']
+                            if 'workflow_completed' in event_data:
+                                context.state['workflow_completed'] = event_data['workflow_completed']
                 
-                # Check if workflow should pause for human input (only if bypass is disabled)
-                current_status = context.state.get('processing_status')
-                if (current_status in [ProcessingStatus.NEEDS_HUMAN_INPUT.value, ProcessingStatus.FAILED.value] and 
-                    not validation_bypass and 
-                    agent_name == "ValidationADKAgent"):
-                    self.logger.info(f"⏸️ Workflow paused after {agent_name} for human input")
-                    break
+                    # Check if workflow should pause for human input (only if bypass is disabled)
+                    current_status = context.state.get('processing_status')
+                    if (current_status in [ProcessingStatus.NEEDS_HUMAN_INPUT.value, ProcessingStatus.FAILED.value] and 
+                        not validation_bypass and 
+                        agent_name == "ValidationADKAgent"):
+                        self.logger.info(f"⏸️ Workflow paused after {agent_name} for human input")
+                        break
             
-            # Get final state from context
-            final_state = context.state
-            final_state["last_updated_at"] = datetime.now().isoformat()
-            final_state["adk_events"] = [
-                {
-                    "author": event.author,
-                    "content": event.content,
-                    "data": event.data if hasattr(event, 'data') else None,
-                    "timestamp": datetime.now().isoformat()
-                }
-                for event in final_events
-            ]
+                # Get final state from context
+                final_state = context.state
+                final_state["last_updated_at"] = datetime.now().isoformat()
+                final_state["adk_events"] = [
+                    {
+                        "author": event.author,
+                        "content": event.content,
+                        "data": event.data if hasattr(event, 'data') else None,
+                        "timestamp": datetime.now().isoformat()
+                    }
+                    for event in final_events
+                ]
             
-            # Determine final status based on current state
-            current_status = final_state.get("processing_status")
-            workflow_paused = final_state.get("workflow_paused", False)
-            human_input_required = final_state.get("human_input_required", False)
+                # Determine final status based on current state
+                current_status = final_state.get("processing_status")
+                workflow_paused = final_state.get("workflow_paused", False)
+                human_input_required = final_state.get("human_input_required", False)
             
-            if human_input_required or workflow_paused or current_status in [
-                ProcessingStatus.NEEDS_HUMAN_INPUT.value, 
-                ProcessingStatus.PAUSED_FOR_HUMAN_INPUT.value,
-                ProcessingStatus.PAUSED_FOR_VALIDATION.value
-            ]:
-                # Workflow is paused for human input
-                final_state["processing_status"] = ProcessingStatus.NEEDS_HUMAN_INPUT.value
-                final_state["workflow_paused"] = True
-                final_state["workflow_completed"] = False
-                self.logger.info(f"⏸️ ADK workflow paused for human input - ID: {w_id}")
+                if human_input_required or workflow_paused or current_status in [
+                    ProcessingStatus.NEEDS_HUMAN_INPUT.value, 
+                    ProcessingStatus.PAUSED_FOR_HUMAN_INPUT.value,
+                    ProcessingStatus.PAUSED_FOR_VALIDATION.value
+                ]:
+                    # Workflow is paused for human input
+                    final_state["processing_status"] = ProcessingStatus.NEEDS_HUMAN_INPUT.value
+                    final_state["workflow_paused"] = True
+                    final_state["workflow_completed"] = False
+                    self.logger.info(f"⏸️ ADK workflow paused for human input - ID: {w_id}")
                 
-            elif final_state.get("schedule_retrieval_result", {}).get("scheduling_successful", False):
-                # Complete workflow - all agents including scheduling completed
-                final_state["processing_status"] = ProcessingStatus.SUCCESS.value
-                final_state["workflow_completed"] = True
-                final_state["workflow_paused"] = False
-                self.logger.info(f"✅ ADK workflow completed successfully - ID: {w_id}")
+                elif final_state.get("schedule_retrieval_result", {}).get("scheduling_successful", False):
+                    # Complete workflow - all agents including scheduling completed
+                    final_state["processing_status"] = ProcessingStatus.SUCCESS.value
+                    final_state["workflow_completed"] = True
+                    final_state["workflow_paused"] = False
+                    self.logger.info(f"✅ ADK workflow completed successfully - ID: {w_id}")
                 
-            elif final_state.get("invoice_generation_result", {}).get("generation_successful", False):
-                # Invoice generation completed but scheduling may not be needed
-                final_state["processing_status"] = ProcessingStatus.SUCCESS.value
-                final_state["workflow_completed"] = True
-                final_state["workflow_paused"] = False
-                self.logger.info(f"✅ ADK workflow completed with invoice generation - ID: {w_id}")
+                elif final_state.get("invoice_generation_result", {}).get("generation_successful", False):
+                    # Invoice generation completed but scheduling may not be needed
+                    final_state["processing_status"] = ProcessingStatus.SUCCESS.value
+                    final_state["workflow_completed"] = True
+                    final_state["workflow_paused"] = False
+                    self.logger.info(f"✅ ADK workflow completed with invoice generation - ID: {w_id}")
                 
-            elif current_status == ProcessingStatus.FAILED.value:
-                # Workflow failed
-                final_state["workflow_completed"] = True
-                final_state["workflow_failed"] = True
-                self.logger.info(f"❌ ADK workflow failed - ID: {w_id}")
+                elif current_status == ProcessingStatus.FAILED.value:
+                    # Workflow failed
+                    final_state["workflow_completed"] = True
+                    final_state["workflow_failed"] = True
+                    self.logger.info(f"❌ ADK workflow failed - ID: {w_id}")
                 
-            else:
-                # Default to in progress if not clearly completed or paused
-                final_state["processing_status"] = ProcessingStatus.IN_PROGRESS.value
-                final_state["workflow_completed"] = False
-                self.logger.info(f"🔄 ADK workflow in progress - ID: {w_id}, Status: {current_status}")
+                else:
+                    # Default to in progress if not clearly completed or paused
+                    final_state["processing_status"] = ProcessingStatus.IN_PROGRESS.value
+                    final_state["workflow_completed"] = False
+                    self.logger.info(f"🔄 ADK workflow in progress - ID: {w_id}, Status: {current_status}")
             
-            final_workflow_status = final_state.get("processing_status")
-            self.logger.info(f"📊 ADK workflow final status - ID: {w_id}, Status: {final_workflow_status}, Paused: {final_state.get('workflow_paused')}, Human Input Required: {final_state.get('human_input_required')}")
+                final_workflow_status = final_state.get("processing_status")
+                self.logger.info(f"📊 ADK workflow final status - ID: {w_id}, Status: {final_workflow_status}, Paused: {final_state.get('workflow_paused')}, Human Input Required: {final_state.get('human_input_required')}")
             
-            return final_state
+                return final_state
             
-        except Exception as e:
-            self.logger.error(f"❌ ADK workflow failed - ID: {w_id}: {str(e)}")
+            except Exception as e:
+                self.logger.error(f"❌ ADK workflow failed - ID: {w_id}: {str(e)}")
             
-            # Return error state
-            error_state = initial_state.copy()
-            error_state.update({
-                "processing_status": ProcessingStatus.FAILED.value,
-                "workflow_completed": True,
-                "workflow_failed": True,
-                "last_updated_at": datetime.now().isoformat(),
-                "errors": [
-                    {
-                        "agent": "adk_workflow",
-                        "error": str(e),
-                        "timestamp": datetime.now().isoformat()
-                    }
-                ]
-            })
+                # Return error state
+                error_state = initial_state.copy()
+                error_state.update({
+                    "processing_status": ProcessingStatus.FAILED.value,
+                    "workflow_completed": True,
+                    "workflow_failed": True,
+                    "last_updated_at": datetime.now().isoformat(),
+                    "errors": [
+                        {
+                            "agent": "adk_workflow",
+                            "error": str(e),
+                            "timestamp": datetime.now().isoformat()
+                        }
+                    ]
+                })
             
-            return error_state
+                return error_state
+    
     
     async def resume_workflow(
         self,
@@ -295,92 +326,102 @@ class InvoiceProcessingADKWorkflow:
         workflow_id = workflow_state.get("workflow_id")
         self.logger.info(f"🔄 Resuming ADK workflow - ID: {workflow_id}")
         
-        try:
-            # Create context from existing state
-            class SimpleContext:
-                def __init__(self, state):
-                    self.state = state
+        with get_tracer().workflow_span(workflow_id, "workflow_resume", {"user.id": workflow_state.get("user_id") or ""}):
+            try:
+                # Create context from existing state
+                class SimpleContext:
+                    def __init__(self, state):
+                        self.state = state
             
-            context = SimpleContext(workflow_state)
+                context = SimpleContext(workflow_state)
             
-            # If human input was provided, process it through validation agent
-            if human_input_data:
-                self.logger.info("📝 Processing human input data")
+                # If human input was provided, process it through validation agent
+                if human_input_data:
+                    self.logger.info("📝 Processing human input data")
                 
-                # Process human input through validation agent
-                async for event in self.validation_agent.handle_human_input_response(
-                    workflow_state, context, human_input_data
-                ):
-                    self.logger.info(f"📋 Human Input Event: {event.author} - {event.content}")
+                    # Process human input through validation agent
+                    with self._agent_span(self.validation_agent):
+                        async for event in self.validation_agent.handle_human_input_response(
+                            workflow_state, context, human_input_data
+                        ):
+                            self.logger.info(f"📋 Human Input Event: {event.author} - {event.content}")
                 
-                # Update state from context
-                workflow_state = context.state
+                    # Update state from context
+                    workflow_state = context.state
             
-            # Check if we need to continue the workflow
-            processing_status = workflow_state.get("processing_status")
-            validation_bypass = workflow_state.get("options", {}).get("bypass_validation", True)
+                # Check if we need to continue the workflow
+                processing_status = workflow_state.get("processing_status")
+                validation_bypass = workflow_state.get("options", {}).get("bypass_validation", True)
             
-            # Allow continuation even if validation failed (bypass enabled by default)
-            if ((processing_status == ProcessingStatus.SUCCESS.value or 
-                 (validation_bypass and processing_status in [ProcessingStatus.FAILED.value, ProcessingStatus.NEEDS_HUMAN_INPUT.value])) and 
-                not workflow_state.get("correction_completed")):
+                # Allow continuation even if validation failed (bypass enabled by default)
+                if ((processing_status == ProcessingStatus.SUCCESS.value or 
+                     (validation_bypass and processing_status in [ProcessingStatus.FAILED.value, ProcessingStatus.NEEDS_HUMAN_INPUT.value])) and 
+                    not workflow_state.get("correction_completed")):
                 
-                if validation_bypass and processing_status != ProcessingStatus.SUCCESS.value:
-                    self.logger.info("⚠️ Validation bypass enabled - continuing workflow despite validation issues")
-                    workflow_state["validation_bypassed"] = True
-                    workflow_state["bypass_reason"] = f"Continuing with status: {processing_status}"
+                    if validation_bypass and processing_status != ProcessingStatus.SUCCESS.value:
+                        self.logger.info("⚠️ Validation bypass enabled - continuing workflow despite validation issues")
+                        workflow_state["validation_bypassed"] = True
+                        workflow_state["bypass_reason"] = f"Continuing with status: {processing_status}"
                 
-                # Continue with correction agent
-                self.logger.info("➡️ Continuing workflow with correction agent")
-                async for event in self.correction_agent.process_adk(workflow_state, context):
-                    self.logger.info(f"📋 Correction Event: {event.author} - {event.content}")
+                    # Continue with correction agent
+                    self.logger.info("➡️ Continuing workflow with correction agent")
+                    with self._agent_span(self.correction_agent):
+                        async for event in self.correction_agent.process_adk(workflow_state, context):
+                            self.logger.info(f"📋 Correction Event: {event.author} - {event.content}")
                 
-                # Update final state
-                workflow_state = context.state
-                
-                # Continue with UI generation and schedule retrieval agents since validation is skipped
-                self.logger.info("🎨 Continuing with UI generation agent")
-                async for event in self.ui_generation_agent.process_adk(workflow_state, context):
-                    self.logger.info(f"📋 UI Generation Event: {event.author} - {event.content}")
+                    # Update final state
+                    workflow_state = context.state
                 
-                # Update final state
-                workflow_state = context.state
+                    # Continue with UI generation and schedule retrieval agents since validation is skipped
+                    self.logger.info("🎨 Continuing with UI generation agent")
+                    with self._agent_span(self.ui_generation_agent):
+                        async for event in self.ui_generation_agent.process_adk(workflow_state, context):
+                            self.logger.info(f"📋 UI Generation Event: {event.author} - {event.content}")
                 
-                # Continue with schedule retrieval agent (if available)
-                try:
-                    self.logger.info("🗓️ Continuing with Schedule Retrieval agent")
-                    async for event in self.schedule_retrieval_agent.process_adk(workflow_state, context):
-                        self.logger.info(f"📋 Schedule Retrieval Event: {event.author} - {event.content}")
+                    # Update final state
                     workflow_state = context.state
-                except Exception as e:
-                    # Non-fatal: log and continue
-                    self.logger.warning(f"⚠️ Schedule retrieval agent failed or unavailable: {e}")
                 
-                # Final state already updated from previous agent
+                    # Continue with schedule retrieval agent (if available)
+                    try:
+                        self.logger.info("🗓️ Continuing with Schedule Retrieval agent")
+                        with self._agent_span(self.schedule_retrieval_agent):
+                            async for event in self.schedule_retrieval_agent.process_adk(workflow_state, context):
+                                self.logger.info(f"📋 Schedule Retrieval Event: {event.author} - {event.content}")
+                        workflow_state = context.state
+                    except Exception as e:
+                        # Non-fatal: log and continue
+                        self.logger.warning(f"⚠️ Schedule retrieval agent failed or unavailable: {e}")
+                
+                    # Final state already updated from previous agent
             
-            workflow_state["last_updated_at"] = datetime.now().isoformat()
-            workflow_state["workflow_resumed"] = True
-            workflow_state["resume_timestamp"] = datetime.now().isoformat()
+                workflow_state["last_updated_at"] = datetime.now().isoformat()
+                workflow_state["workflow_resumed"] = True
+                workflow_state["resume_timestamp"] = datetime.now().isoformat()
             
-            self.logger.info(f"✅ ADK workflow resumed successfully - ID: {workflow_id}")
-            return workflow_state
+                self.logger.info(f"✅ ADK workflow resumed successfully - ID: {workflow_id}")
+                return workflow_state
             
-        except Exception as e:
-            self.logger.error(f"❌ Failed to resume ADK workflow - ID: {workflow_id}: {str(e)}")
+            except Exception as e:
+                self.logger.error(f"❌ Failed to resume ADK workflow - ID: {workflow_id}: {str(e)}")
             
-            # Add error to state
-            if "errors" not in workflow_state:
-                workflow_state["errors"] = []
-            workflow_state["errors"].append({
-                "agent": "adk_workflow_resume",
-                "error": str(e),
-                "timestamp": datetime.now().isoformat()
-            })
+                # Add error to state
+                if "errors" not in workflow_state:
+                    workflow_state["errors"] = []
+                workflow_state["errors"].append({
+                    "agent": "adk_workflow_resume",
+                    "error": str(e),
+                    "timestamp": datetime.now().isoformat()
+                })
             
-            workflow_state["processing_status"] = ProcessingStatus.FAILED.value
-            workflow_state["last_updated_at"] = datetime.now().isoformat()
+                workflow_state["processing_status"] = ProcessingStatus.FAILED.value
+                workflow_state["last_updated_at"] = datetime.now().isoformat()
             
-            return workflow_state
+                return workflow_state
+    
+    
+    def _agent_span(self, agent):
+        """Agent span for agents invoked directly via process_adk (resume path)"""
+        return get_tracer().span(agent.agent_type.value, SpanKind.AGENT, {"agent.name": agent.name, "resumed": True})
     
     def get_workflow_status(self, workflow_state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -4,7 +4,8 @@ Schedule Retrieval ADK Agent
 Retrieves invoice schedules from Pinecone using RAG and schedules invoices accordingly
 """
 
-from typing import Dict, Any, AsyncGenerator, Optional, List
+from typing import Dict, Any, AsyncGenerator, Optional, List, ClassVar
+import asyncio
 import logging
 from datetime import datetime, timedelta
 import json
@@ -27,6 +28,8 @@ class ScheduleRetrievalADKAgent(BaseADKAgent):
     
     _contract_rag_service = PrivateAttr()
     _cloud_scheduler_service = PrivateAttr()
+    # Creates Cloud Scheduler jobs - a blind re-run could duplicate them
+    retry_on_transient_errors: ClassVar[bool] = False
     
     def __init__(self):
         super().__init__(
@@ -98,7 +101,7 @@ class ScheduleRetrievalADKAgent(BaseADKAgent):
 
             # Ensure we have UnifiedInvoiceData
             if isinstance(current_invoice_data, dict):
-                unified_invoice = UnifiedInvoiceData(**current_invoice_data)
+                unified_invoice = UnifiedInvoiceData.from_trusted(current_invoice_data)
             else:
                 unified_invoice = current_invoice_data
 
@@ -124,7 +127,9 @@ class ScheduleRetrievalADKAgent(BaseADKAgent):
 
             # Query Pinecone using existing PineconeService
             pinecone_service = get_pinecone_service()
-            pinecone_result = pinecone_service.search_similar(
+            # Blocking client with hedged retries - keep it off the event loop
+            pinecone_result = await asyncio.to_thread(
+                pinecone_service.search_similar,
                 query_text=rag_query,
                 top_k=10,
                 filter_metadata={
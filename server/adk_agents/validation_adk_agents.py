@@ -129,6 +129,7 @@ class ValidationADKAgent(BaseADKAgent):
                             "message": issue.message,
                             "current_value": issue.current_value,
                             "suggested_value": issue.suggested_value,
+                            "suggestions": issue.suggestions,
                             "requires_human_input": issue.requires_human_input
                         } for issue in validation_result.issues
                     ],
@@ -353,28 +354,13 @@ class ValidationADKAgent(BaseADKAgent):
         """Update workflow state with validation results"""
 
         # Store validation results
-        state["validation_results"] = {
-            "is_valid": validation_result.is_valid,
-            "validation_score": validation_result.validation_score,
-            "confidence_score": validation_result.confidence_score,
-            "human_input_required": validation_result.human_input_required,
-            "issues_count": len(validation_result.issues),
-            "missing_required_fields_count": len(validation_result.missing_required_fields),
-            "validation_timestamp": validation_result.validation_timestamp,
-            "issues": [
-                {
-                    "field_name": issue.field_name,
-                    "issue_type": issue.issue_type,
-                    "severity": issue.severity.value if hasattr(issue.severity, 'value') else issue.severity,
-                    "message": issue.message,
-                    "current_value": issue.current_value,
-                    "suggested_value": issue.suggested_value,
-                    "requires_human_input": issue.requires_human_input
-                }
-                for issue in validation_result.issues
-            ],
-            "missing_required_fields": validation_result.missing_required_fields
-        }
+        state["validation_results"] = validation_result.to_state_dict()
+        if validation_result.rule_snapshot is not None:
+            # Lets corrections re-run only the rules that depend on the corrected fields
+            state["validation_rule_snapshot"] = validation_result.rule_snapshot
+        if validation_result.confidence_features and "initial_confidence_features" not in state:
+            # Features before any human correction, saved with the outcome to retrain the confidence model
+            state["initial_confidence_features"] = validation_result.confidence_features
 
         # Update overall workflow metrics
         state["confidence_level"] = validation_result.confidence_score
@@ -424,6 +410,7 @@ class ValidationADKAgent(BaseADKAgent):
                     "field_type": "validation_issue",
                     "current_value": issue.current_value,
                     "suggested_value": issue.suggested_value,
+                    "suggestions": issue.suggestions,
                     "description": issue.message,
                     "issue_type": issue.issue_type,
                     "severity": issue.severity.value if hasattr(issue.severity, 'value') else issue.severity,
@@ -512,7 +499,7 @@ class ValidationADKAgent(BaseADKAgent):
             # Get current unified invoice data
             current_unified_data = state.get("unified_invoice_data")
             if current_unified_data:
-                unified_invoice = UnifiedInvoiceData(**current_unified_data)
+                unified_invoice = UnifiedInvoiceData.from_trusted(current_unified_data)
             else:
                 # Fallback: convert from legacy format
                 unified_invoice = None
@@ -544,14 +531,16 @@ class ValidationADKAgent(BaseADKAgent):
 
             yield self.create_progress_event("Re-running validation on corrected data...", 70.0)
 
-            # Re-run validation on updated data
+            # Re-run the validation rules affected by the corrected fields
             user_id = state.get("user_id")
             contract_name = state.get("contract_name")
 
-            validation_result = self._validation_service.validate_unified_invoice_data(
+            validation_result = self._validation_service.revalidate_changed_fields(
                 invoice_data=corrected_unified_data,
                 user_id=user_id,
-                contract_name=contract_name
+                contract_name=contract_name,
+                changed_fields=list(field_values),
+                snapshot=state.get("validation_rule_snapshot")
             )
 
             # Update state with new validation results
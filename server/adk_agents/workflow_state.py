@@ -0,0 +1,490 @@
+"""
+Compact ADK workflow state
+
+The ADK workflow used to carry its state as a plain dict in which the same
+invoice was stored several times: ``current_invoice_data``, the legacy
+``unified_invoice_data`` / ``invoice_data`` copies and a full copy per entry in
+``invoice_data_history``. ``WorkflowState`` keeps the dict interface the agents
+and routes already use, but:
+
+- core workflow fields live in ``__slots__`` instead of a per-key hash entry
+- invoice history is stored as deltas between versions (with periodic full
+  keyframes) and materialized only when an entry is read
+- legacy invoice keys are lazy: their copy of ``current_invoice_data`` is only
+  made when one is first read, so an agent mutating one of them in place does
+  not change the others or the archived versions
+
+States and histories are not plain JSON types: export them with ``to_dict`` /
+``to_list``, pass ``json_default`` to ``json.dumps``, or rely on FastAPI's
+``jsonable_encoder``, for which encoders are registered below. For persistence
+(hibernated workflows) ``to_snapshot`` / ``from_snapshot`` round-trip the state
+with its types and its delta-encoded history intact.
+"""
+
+import copy
+from collections.abc import MutableMapping, Sequence
+from typing import Dict, Any, List, Optional, Iterator
+
+from utils.typed_json import TypedJSONCodec
+
+_MISSING = object()
+_DELETED = object()
+
+# Keys that used to receive a copy of the current invoice on every update
+LEGACY_INVOICE_VIEW_KEYS = ("unified_invoice_data", "invoice_data")
+
+# Marks (and versions) a dict written by ``WorkflowState.to_snapshot``
+SNAPSHOT_FORMAT_KEY = "snapshot_format"
+SNAPSHOT_FORMAT = 1
+
+
+class _Patch:
+    """Nested delta for a dict-valued field"""
+    __slots__ = ("delta",)
+
+    def __init__(self, delta: Dict[str, Any]):
+        self.delta = delta
+
+
+def diff_invoice_data(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compute a delta that turns ``old`` into ``new``
+
+    Unchanged values are omitted and changed values are referenced, not copied,
+    so consecutive versions share every untouched sub-structure.
+    """
+    delta: Dict[str, Any] = {}
+    for key, value in new.items():
+        previous = old.get(key, _MISSING)
+        if previous is value:
+            continue
+        if isinstance(previous, dict) and isinstance(value, dict):
+            nested = diff_invoice_data(previous, value)
+            if nested:
+                delta[key] = _Patch(nested)
+        elif previous is _MISSING or previous != value:
+            delta[key] = value
+    for key in old:
+        if key not in new:
+            delta[key] = _DELETED
+    return delta
+
+
+def apply_invoice_delta(base: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a delta produced by ``diff_invoice_data`` and return a new dict"""
+    result = dict(base)
+    for key, change in delta.items():
+        if change is _DELETED:
+            result.pop(key, None)
+        elif isinstance(change, _Patch):
+            nested_base = base.get(key)
+            result[key] = apply_invoice_delta(nested_base if isinstance(nested_base, dict) else {}, change.delta)
+        else:
+            result[key] = change
+    return result
+
+
+class _VersionEntry:
+    """One archived invoice version: either a full keyframe or a delta from the previous entry"""
+    __slots__ = ("data", "delta", "version", "source_agent", "timestamp", "replaced_by")
+
+    def __init__(self, data, delta, version, source_agent, timestamp, replaced_by):
+        self.data = data
+        self.delta = delta
+        self.version = version
+        self.source_agent = source_agent
+        self.timestamp = timestamp
+        self.replaced_by = replaced_by
+
+
+class InvoiceVersionHistory(Sequence):
+    """
+    Append-only invoice version history with structural sharing
+
+    Behaves like the old ``List[Dict]`` history (``len``, indexing, iteration,
+    ``append``) but each entry only stores what changed since the previous one.
+    A full keyframe is kept every ``keyframe_interval`` entries so materializing
+    any version applies a bounded number of deltas.
+    """
+
+    def __init__(self, entries: Optional[List[Dict[str, Any]]] = None, keyframe_interval: int = 8):
+        self._entries: List[_VersionEntry] = []
+        self._keyframe_interval = max(1, keyframe_interval)
+        self._tail: Any = None
+        for entry in entries or []:
+            self.append(entry)
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Archive a history entry (same shape as the legacy dict entries)"""
+        data = entry.get("data")
+        use_keyframe = (
+            not self._entries
+            or len(self._entries) % self._keyframe_interval == 0
+            or not isinstance(data, dict)
+            or not isinstance(self._tail, dict)
+        )
+        self._entries.append(_VersionEntry(
+            data=data if use_keyframe else None,
+            delta=None if use_keyframe else diff_invoice_data(self._tail, data),
+            version=entry.get("version"),
+            source_agent=entry.get("source_agent"),
+            timestamp=entry.get("timestamp"),
+            replaced_by=entry.get("replaced_by"),
+        ))
+        self._tail = data
+
+    def materialize(self, index: int) -> Any:
+        """Rebuild the invoice data stored at ``index``"""
+        if index < 0:
+            index += len(self._entries)
+        if not 0 <= index < len(self._entries):
+            raise IndexError("invoice history index out of range")
+        if index == len(self._entries) - 1:
+            return self._tail
+        return self._rebuild(index)
+
+    def _rebuild(self, index: int) -> Any:
+        keyframe = index
+        while self._entries[keyframe].delta is not None:
+            keyframe -= 1
+
+        data = self._entries[keyframe].data
+        for position in range(keyframe + 1, index + 1):
+            data = apply_invoice_delta(data, self._entries[position].delta)
+        return data
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._entries)))]
+        data = self.materialize(index)
+        entry = self._entries[index]
+        return {
+            "data": data,
+            "version": entry.version,
+            "source_agent": entry.source_agent,
+            "timestamp": entry.timestamp,
+            "replaced_by": entry.replaced_by,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Materialize every entry as a plain list of dicts"""
+        return [self[i] for i in range(len(self._entries))]
+
+    def to_snapshot(self, codec: TypedJSONCodec) -> Dict[str, Any]:
+        """Keyframes and deltas as they are stored, encoded with ``codec``"""
+        entries = []
+        for entry in self._entries:
+            keyframe = entry.delta is None
+            entries.append({
+                "keyframe": keyframe,
+                "data": codec.encode(entry.data if keyframe else entry.delta),
+                "version": codec.encode(entry.version),
+                "source_agent": entry.source_agent,
+                "timestamp": codec.encode(entry.timestamp),
+                "replaced_by": entry.replaced_by,
+            })
+        return {"keyframe_interval": self._keyframe_interval, "entries": entries}
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any], codec: TypedJSONCodec) -> "InvoiceVersionHistory":
+        """Rebuild a history written by ``to_snapshot`` without re-diffing it"""
+        history = cls(keyframe_interval=snapshot.get("keyframe_interval", 8))
+        for entry in snapshot.get("entries", []):
+            payload = codec.decode(entry["data"])
+            history._entries.append(_VersionEntry(
+                data=payload if entry["keyframe"] else None,
+                delta=None if entry["keyframe"] else payload,
+                version=codec.decode(entry.get("version")),
+                source_agent=entry.get("source_agent"),
+                timestamp=codec.decode(entry.get("timestamp")),
+                replaced_by=entry.get("replaced_by"),
+            ))
+        if history._entries:
+            history._tail = history._rebuild(len(history._entries) - 1)
+        return history
+
+    def __repr__(self) -> str:
+        return f"InvoiceVersionHistory(versions={len(self._entries)})"
+
+
+class WorkflowState(MutableMapping):
+    """
+    Typed, slot-based ADK workflow state with a dict-compatible interface
+
+    Agents keep using ``state["key"]``, ``state.get`` and ``state.update``.
+    Frequently used workflow fields are stored in slots; anything else lands in
+    an overflow dict.
+    """
+
+    _SLOT_FIELDS = (
+        "workflow_id",
+        "user_id",
+        "contract_file",
+        "contract_name",
+        "current_invoice_data",
+        "authoritative_source",
+        "data_version",
+        "processing_status",
+        "workflow_paused",
+        "human_input_required",
+        "correction_pending",
+        "attempt_count",
+        "max_attempts",
+        "errors",
+        "current_agent",
+        "started_at",
+        "last_updated_at",
+        "last_update_agent",
+        "workflow_completed",
+        "options",
+    )
+    __slots__ = _SLOT_FIELDS + ("_history", "_extra", "_legacy_views")
+
+    workflow_id: str
+    user_id: str
+    contract_file: Any
+    contract_name: str
+    current_invoice_data: Optional[Dict[str, Any]]
+    authoritative_source: Optional[str]
+    data_version: int
+    processing_status: str
+    workflow_paused: bool
+    human_input_required: bool
+    correction_pending: bool
+    attempt_count: int
+    max_attempts: int
+    errors: List[Dict[str, Any]]
+    current_agent: str
+    started_at: str
+    last_updated_at: str
+    last_update_agent: Optional[str]
+    workflow_completed: bool
+    options: Dict[str, Any]
+
+    _SLOT_SET = frozenset(_SLOT_FIELDS)
+
+    def __init__(self, initial: Optional[Dict[str, Any]] = None, **fields):
+        self._history = InvoiceVersionHistory()
+        self._extra: Dict[str, Any] = {}
+        self._legacy_views = set()
+        if initial:
+            self.update(initial)
+        if fields:
+            self.update(fields)
+
+    # --- Mapping protocol ---
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._SLOT_SET:
+            value = getattr(self, key, _MISSING)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        if key == "invoice_data_history":
+            return self._history
+        if key in self._legacy_views:
+            # Copied on first read, like the separate copies the workflow used to keep
+            self._legacy_views.discard(key)
+            current = getattr(self, "current_invoice_data", None)
+            self._extra[key] = current.copy() if isinstance(current, dict) else current
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self._SLOT_SET:
+            setattr(self, key, value)
+        elif key == "invoice_data_history":
+            self._history = value if isinstance(value, InvoiceVersionHistory) else InvoiceVersionHistory(value or [])
+        else:
+            self._legacy_views.discard(key)
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._SLOT_SET:
+            if getattr(self, key, _MISSING) is _MISSING:
+                raise KeyError(key)
+            delattr(self, key)
+        elif key == "invoice_data_history":
+            self._history = InvoiceVersionHistory()
+        elif key in self._legacy_views:
+            self._legacy_views.discard(key)
+        else:
+            del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._SLOT_FIELDS:
+            if getattr(self, key, _MISSING) is not _MISSING:
+                yield key
+        yield "invoice_data_history"
+        # A snapshot: reading a legacy key during iteration moves it into _extra
+        yield from list(self._extra)
+        for key in LEGACY_INVOICE_VIEW_KEYS:
+            if key in self._legacy_views:
+                yield key
+
+    def __len__(self) -> int:
+        slots = sum(1 for key in self._SLOT_FIELDS if getattr(self, key, _MISSING) is not _MISSING)
+        return slots + 1 + len(self._extra) + len(self._legacy_views)
+
+    def __contains__(self, key) -> bool:
+        if key in self._SLOT_SET:
+            return getattr(self, key, _MISSING) is not _MISSING
+        return key == "invoice_data_history" or key in self._extra or key in self._legacy_views
+
+    def update(self, other=(), **kwargs) -> None:
+        """Dict-style update; updating a state with itself is a no-op"""
+        if other is self:
+            other = ()
+        super().update(other, **kwargs)
+
+    def copy(self) -> "WorkflowState":
+        """Shallow copy (history is shared, like ``dict.copy`` shared the history list)"""
+        clone = WorkflowState()
+        for key in self._SLOT_FIELDS:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                setattr(clone, key, value)
+        clone._history = self._history
+        clone._extra = dict(self._extra)
+        clone._legacy_views = set(self._legacy_views)
+        return clone
+
+    def __repr__(self) -> str:
+        return (
+            f"WorkflowState(workflow_id={getattr(self, 'workflow_id', None)!r}, "
+            f"status={getattr(self, 'processing_status', None)!r}, "
+            f"data_version={getattr(self, 'data_version', 0)}, "
+            f"history={len(self._history)})"
+        )
+
+    # --- Invoice data versioning ---
+
+    def record_invoice_data(self, new_data: Optional[Dict[str, Any]], source_agent: str, timestamp: str) -> None:
+        """
+        Replace the current invoice data, archiving the previous version
+
+        The outgoing version is deep-copied into the history, so agents that
+        mutate the current data in place cannot rewrite archived versions; the
+        new data is shallow-copied and the legacy invoice keys copy it lazily.
+        """
+        current = getattr(self, "current_invoice_data", None)
+        if current:
+            self._history.append({
+                "data": copy.deepcopy(current),
+                "version": getattr(self, "data_version", 0),
+                "source_agent": getattr(self, "authoritative_source", None),
+                "timestamp": getattr(self, "last_updated_at", None),
+                "replaced_by": source_agent,
+            })
+
+        self.current_invoice_data = new_data.copy() if new_data else None
+        self.authoritative_source = source_agent
+        self.data_version = getattr(self, "data_version", 0) + 1
+        self.last_updated_at = timestamp
+        self.last_update_agent = source_agent
+
+        if new_data:
+            for key in LEGACY_INVOICE_VIEW_KEYS:
+                self._extra.pop(key, None)
+                self._legacy_views.add(key)
+
+    # --- Serialization ---
+
+    def to_dict(self, include_history: bool = True) -> Dict[str, Any]:
+        """
+        Export a plain dict
+
+        Legacy keys not read yet get their own copy of the current invoice. History is
+        materialized only when ``include_history`` is set; status and listing
+        endpoints do not need it.
+        """
+        result = {key: getattr(self, key) for key in self._SLOT_FIELDS if getattr(self, key, _MISSING) is not _MISSING}
+        result.update(self._extra)
+        current = getattr(self, "current_invoice_data", None)
+        for key in self._legacy_views:
+            result[key] = current.copy() if isinstance(current, dict) else current
+        if include_history:
+            result["invoice_data_history"] = self._history.to_list()
+        return result
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WorkflowState":
+        """Build a state from a plain dict (e.g. a state persisted by ``to_dict``)"""
+        if isinstance(data, cls):
+            return data
+        return cls(data)
+
+    def to_snapshot(self, blobs: Optional[Dict[str, bytes]] = None) -> Dict[str, Any]:
+        """
+        JSON-compatible snapshot for persistence
+
+        Values keep their types (``Decimal``, dates, ...) through typed
+        encoding, the invoice history stays delta-encoded and legacy invoice
+        keys stay lazy. Byte strings (the contract file) are stored by
+        reference: they are added to ``blobs`` (sha256 -> bytes), which the
+        caller persists next to the snapshot.
+        """
+        codec = _SnapshotCodec(blobs)
+        fields = {key: getattr(self, key) for key in self._SLOT_FIELDS if getattr(self, key, _MISSING) is not _MISSING}
+        fields.update(self._extra)
+        return {
+            SNAPSHOT_FORMAT_KEY: SNAPSHOT_FORMAT,
+            "fields": codec.encode(fields),
+            "legacy_views": sorted(self._legacy_views),
+            "history": self._history.to_snapshot(codec),
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any], blobs: Optional[Dict[str, bytes]] = None) -> "WorkflowState":
+        """Restore a state written by ``to_snapshot`` (plain ``to_dict`` exports are accepted too)"""
+        if isinstance(snapshot, cls):
+            return snapshot
+        if snapshot.get(SNAPSHOT_FORMAT_KEY) != SNAPSHOT_FORMAT:
+            return cls.from_dict(snapshot)
+        codec = _SnapshotCodec(blobs)
+        state = cls(codec.decode(snapshot["fields"]))
+        state._legacy_views = set(snapshot.get("legacy_views") or ())
+        state._history = InvoiceVersionHistory.from_snapshot(snapshot.get("history") or {}, codec)
+        return state
+
+
+class _SnapshotCodec(TypedJSONCodec):
+    """Typed codec that also encodes invoice history deltas"""
+
+    def encode_object(self, value: Any) -> Any:
+        if isinstance(value, _Patch):
+            return self._tagged("patch", self.encode(value.delta))
+        if value is _DELETED:
+            return self._tagged("deleted", None)
+        return super().encode_object(value)
+
+    def decode_tagged(self, tag: str, payload: Any) -> Any:
+        if tag == "patch":
+            return _Patch(self.decode(payload))
+        if tag == "deleted":
+            return _DELETED
+        return super().decode_tagged(tag, payload)
+
+
+def json_default(value: Any) -> Any:
+    """``default`` for ``json.dumps`` that exports workflow states and invoice histories"""
+    if isinstance(value, WorkflowState):
+        return value.to_dict()
+    if isinstance(value, InvoiceVersionHistory):
+        return value.to_list()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _register_json_encoders() -> None:
+    """Let FastAPI's ``jsonable_encoder`` (and so route responses) serialize states and histories"""
+    try:
+        from fastapi.encoders import ENCODERS_BY_TYPE, jsonable_encoder
+    except ImportError:  # without FastAPI states are exported with to_dict()
+        return
+    ENCODERS_BY_TYPE[WorkflowState] = lambda state: jsonable_encoder(state.to_dict())
+    ENCODERS_BY_TYPE[InvoiceVersionHistory] = lambda history: jsonable_encoder(history.to_list())
+
+
+_register_json_encoders()
@@ -1,5 +1,6 @@
 from fastapi import UploadFile, HTTPException, status
 from typing import Dict, Any, List, Optional
+import asyncio
 import logging
 from datetime import datetime
 import hashlib
@@ -101,7 +102,8 @@ class DocumentController:
             
             # Upload to GCP Storage
             logger.info(f"📤 Uploading to GCP Storage: {gcp_path}")
-            upload_result = self.storage_service.upload_file(
+            upload_result = await asyncio.to_thread(
+                self.storage_service.upload_file,
                 file_content=file_content,
                 destination_path=gcp_path,
                 content_type=file.content_type,
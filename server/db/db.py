@@ -1,5 +1,4 @@
 import os
-from pinecone import Pinecone
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
@@ -24,7 +23,8 @@ def get_pinecone_client():
             if not api_key:
                 raise ValueError("PINECONE_API_KEY environment variable is required")
             
-            # Initialize Pinecone
+            # Initialize Pinecone (SDK imported on first use to keep startup fast)
+            from pinecone import Pinecone
             pc = Pinecone(api_key=api_key)
             
             # Get the index
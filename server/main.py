@@ -3,6 +3,7 @@ Main FastAPI application entry point for Smart Invoice Scheduler
 """
 
 import logging
+import os
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -28,9 +29,27 @@ async def lifespan(app: FastAPI):
         logging.error("❌ Error loading routes: %s", exc)
         # Continue anyway - basic endpoints will still work
 
+    # Optional background warm-up of lazily created services (agents, SDK clients).
+    # STARTUP_WARMUP=true warms everything, or pass a comma-separated list of service names.
+    warmup = os.getenv("STARTUP_WARMUP", "").strip()
+    if warmup and warmup.lower() not in ("0", "false", "no"):
+        from utils.service_container import get_container  # pylint: disable=import-outside-toplevel
+        names = None if warmup.lower() in ("1", "true", "yes", "all") else [n.strip() for n in warmup.split(",") if n.strip()]
+        get_container().warm_up(names)
+        logging.info("🔥 Background service warm-up started")
+
+    # PDF render workers load fonts and stylesheets and lay out a warm-up page before the first request
+    if os.getenv("PDF_WARM_UP_ON_STARTUP", "true").lower() not in ("0", "false", "no"):
+        import importlib.util  # pylint: disable=import-outside-toplevel
+        if importlib.util.find_spec("weasyprint") is not None:
+            from services.pdf_render_pool import get_pdf_render_pool  # pylint: disable=import-outside-toplevel
+            get_pdf_render_pool().warm_up()
+
     yield
     # Shutdown
     logging.info("🛑 Smart Invoice Scheduler shutting down...")
+    from services.pdf_render_pool import shutdown_pdf_render_pool  # pylint: disable=import-outside-toplevel
+    shutdown_pdf_render_pool()
 
 
 # Create FastAPI application
@@ -0,0 +1,27 @@
+-- Migration: Add bulk validation result fields to extracted_invoice_data and invoices
+-- Date: 2026-10-18
+-- Description: Store the latest result of the bulk validation API on each row
+
+ALTER TABLE extracted_invoice_data
+ADD COLUMN IF NOT EXISTS validation_score DOUBLE PRECISION NULL,
+ADD COLUMN IF NOT EXISTS validation_results JSONB NULL,
+ADD COLUMN IF NOT EXISTS validated_at TIMESTAMPTZ NULL;
+
+ALTER TABLE invoices
+ADD COLUMN IF NOT EXISTS validation_score DOUBLE PRECISION NULL,
+ADD COLUMN IF NOT EXISTS validation_results JSONB NULL,
+ADD COLUMN IF NOT EXISTS validated_at TIMESTAMPTZ NULL;
+
+-- Keyset pagination of a user's rows by primary key
+CREATE INDEX IF NOT EXISTS idx_extracted_invoice_data_user_id_id
+ON extracted_invoice_data (user_id, id);
+
+CREATE INDEX IF NOT EXISTS idx_invoices_user_id_id
+ON invoices (user_id, id);
+
+-- Find rows that need attention after a re-validation
+CREATE INDEX IF NOT EXISTS idx_extracted_invoice_data_validation_score
+ON extracted_invoice_data (validation_score);
+
+COMMENT ON COLUMN extracted_invoice_data.validation_results IS 'JSONB summary (issues, missing fields) of the latest bulk validation';
+COMMENT ON COLUMN invoices.validation_results IS 'JSONB summary (issues, missing fields) of the latest bulk validation';
@@ -0,0 +1,14 @@
+-- Migration: Add confidence model features to extracted_invoice_data
+-- Date: 2026-10-18
+-- Description: Store the confidence model inputs of the first validation so the model
+-- can be retrained offline against corrected_by_human
+
+ALTER TABLE extracted_invoice_data
+ADD COLUMN IF NOT EXISTS confidence_features JSONB NULL;
+
+-- Training export reads labelled rows that have features
+CREATE INDEX IF NOT EXISTS idx_extracted_invoice_data_confidence_training
+ON extracted_invoice_data (correction_timestamp)
+WHERE confidence_features IS NOT NULL;
+
+COMMENT ON COLUMN extracted_invoice_data.confidence_features IS 'JSONB confidence model inputs (retrieval similarity, extraction agreement, completeness, issue counts) at first validation';
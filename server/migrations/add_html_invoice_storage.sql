@@ -0,0 +1,29 @@
+-- Migration: Stored HTML invoices served by /invoices/{uuid}/view
+-- Date: 2026-10-18
+-- Description: The view endpoint serves the stored HTML with one lookup by invoice_uuid,
+-- gzip-compressed when the client accepts it and with the content hash as ETag
+
+ALTER TABLE html_invoices
+ADD COLUMN IF NOT EXISTS html_gzip BYTEA NULL,
+ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64) NULL;
+
+-- One HTML invoice per invoice; regenerating an invoice replaces its row.
+-- Earlier regenerations inserted a new row each time: keep only the newest.
+DELETE FROM html_invoices
+WHERE id IN (
+    SELECT id FROM (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY invoice_uuid
+            ORDER BY COALESCE(updated_at, created_at) DESC NULLS LAST, created_at DESC NULLS LAST, id DESC
+        ) AS position
+        FROM html_invoices
+    ) ranked
+    WHERE position > 1
+);
+
+DROP INDEX IF EXISTS ix_html_invoices_invoice_uuid;
+CREATE UNIQUE INDEX IF NOT EXISTS ix_html_invoices_invoice_uuid
+ON html_invoices (invoice_uuid);
+
+COMMENT ON COLUMN html_invoices.html_gzip IS 'Gzip-compressed html_content, sent with Content-Encoding: gzip';
+COMMENT ON COLUMN html_invoices.content_hash IS 'SHA-256 of html_content, used as the view ETag';
@@ -0,0 +1,55 @@
+-- Migration: Persistent human-input review queue
+-- Date: 2026-10-18
+-- Description: Workflows paused for human input are hibernated here instead of being
+-- held in process memory, and their field requests are queued for bulk review
+
+CREATE TABLE IF NOT EXISTS hibernated_workflows (
+    workflow_id VARCHAR(100) PRIMARY KEY,
+    user_id VARCHAR NOT NULL,
+    contract_name VARCHAR(255) NULL,
+    processing_status VARCHAR(50) NULL,
+    state JSONB NOT NULL,
+    request JSONB NULL,
+    hibernated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_hibernated_workflows_user_id
+ON hibernated_workflows (user_id);
+
+CREATE TABLE IF NOT EXISTS review_queue_items (
+    id VARCHAR(255) PRIMARY KEY,
+    workflow_id VARCHAR(100) NOT NULL REFERENCES hibernated_workflows (workflow_id) ON DELETE CASCADE,
+    user_id VARCHAR NOT NULL,
+    contract_name VARCHAR(255) NULL,
+    field_name VARCHAR(255) NOT NULL,
+    field_type VARCHAR(50) NOT NULL DEFAULT 'text',
+    request_type VARCHAR(50) NULL,
+    severity VARCHAR(50) NULL,
+    description TEXT NULL,
+    current_value JSONB NULL,
+    suggested_value JSONB NULL,
+    suggestions JSONB NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Binary values referenced from hibernated states (the contract file), stored once per workflow
+CREATE TABLE IF NOT EXISTS hibernated_workflow_blobs (
+    workflow_id VARCHAR(100) NOT NULL REFERENCES hibernated_workflows (workflow_id) ON DELETE CASCADE,
+    ref VARCHAR(64) NOT NULL,
+    content BYTEA NOT NULL,
+    PRIMARY KEY (workflow_id, ref)
+);
+
+-- Reviewers list a user's queue grouped by field or field type
+CREATE INDEX IF NOT EXISTS idx_review_queue_items_user_field
+ON review_queue_items (user_id, field_name);
+
+CREATE INDEX IF NOT EXISTS idx_review_queue_items_user_type
+ON review_queue_items (user_id, field_type);
+
+CREATE INDEX IF NOT EXISTS idx_review_queue_items_workflow_id
+ON review_queue_items (workflow_id);
+
+COMMENT ON TABLE hibernated_workflows IS 'ADK workflow state snapshots paused for human input; deleted when the workflow is resumed';
+COMMENT ON TABLE hibernated_workflow_blobs IS 'Byte strings referenced by sha256 from hibernated workflow snapshots';
+COMMENT ON TABLE review_queue_items IS 'Pending human-input field requests of hibernated workflows';
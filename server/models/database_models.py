@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, Enum as SQLEnum, ForeignKey, Text, Float
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, Enum as SQLEnum, ForeignKey, Text, Float, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import JSON
@@ -347,6 +347,11 @@ class Invoice(Base):
     quality_score = Column(Float, nullable=True)
     human_reviewed = Column(Boolean, default=False)
     
+    # Latest bulk re-validation result
+    validation_score = Column(Float, nullable=True)
+    validation_results = Column(JSON, nullable=True)
+    validated_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -496,6 +501,12 @@ class ExtractedInvoiceData(Base):
     corrected_invoice_data = Column(JSON, nullable=True)  # Full corrected invoice data from correction agent
     correction_timestamp = Column(DateTime(timezone=True), nullable=True)
     corrected_by_human = Column(Boolean, nullable=False, default=False)
+    confidence_features = Column(JSON, nullable=True)  # Confidence model inputs at first validation
+    
+    # Latest bulk re-validation result
+    validation_score = Column(Float, nullable=True)  # 0.0 to 1.0
+    validation_results = Column(JSON, nullable=True)  # Issues and missing fields
+    validated_at = Column(DateTime(timezone=True), nullable=True)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -550,13 +561,15 @@ class HTMLInvoice(Base):
     __tablename__ = "html_invoices"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    invoice_uuid = Column(String(100), nullable=False, index=True)  # References the main invoice UUID
+    invoice_uuid = Column(String(100), nullable=False, unique=True, index=True)  # References the main invoice UUID
     invoice_number = Column(String(100), nullable=False, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     workflow_id = Column(String(100), nullable=False, index=True)
     
     # HTML content
     html_content = Column(Text, nullable=False)  # The complete HTML/CSS content
+    html_gzip = Column(LargeBinary, nullable=True)  # Gzip-compressed html_content, served as is
+    content_hash = Column(String(64), nullable=True)  # SHA-256 of html_content, the view ETag
     template_used = Column(String(255), nullable=False)  # Template file name used
     template_version = Column(String(50), nullable=False, default="1.0")
     
@@ -601,4 +614,55 @@ class HTMLInvoice(Base):
     
     def is_viewable(self) -> bool:
         """Check if invoice is available for viewing"""
-        return self.viewing_enabled and self.is_active and self.html_content is not None
\ No newline at end of file
+        return self.viewing_enabled and self.is_active and self.html_content is not None
+
+class HibernatedWorkflow(Base):
+    """Snapshot of an ADK workflow paused for human input, held in storage instead of memory"""
+    
+    __tablename__ = "hibernated_workflows"
+    
+    workflow_id = Column(String(100), primary_key=True)
+    user_id = Column(String, nullable=False, index=True)
+    contract_name = Column(String(255), nullable=True)
+    processing_status = Column(String(50), nullable=True)
+    
+    # Workflow state snapshot (WorkflowState.to_snapshot) and the request that started it (typed JSON)
+    state = Column(JSON, nullable=False)
+    request = Column(JSON, nullable=True)
+    
+    # Timestamps
+    hibernated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class HibernatedWorkflowBlob(Base):
+    """Binary value (the contract file) referenced from a hibernated workflow's state by its sha256"""
+    
+    __tablename__ = "hibernated_workflow_blobs"
+    
+    workflow_id = Column(String(100), ForeignKey("hibernated_workflows.workflow_id", ondelete="CASCADE"), primary_key=True)
+    ref = Column(String(64), primary_key=True)  # sha256 of the content
+    content = Column(LargeBinary, nullable=False)
+
+
+class ReviewQueueItem(Base):
+    """One field a paused workflow needs a human answer for"""
+    
+    __tablename__ = "review_queue_items"
+    
+    id = Column(String(255), primary_key=True)  # "<workflow_id>:<field_name>"
+    workflow_id = Column(String(100), ForeignKey("hibernated_workflows.workflow_id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(String, nullable=False, index=True)
+    contract_name = Column(String(255), nullable=True)
+    
+    # What is asked
+    field_name = Column(String(255), nullable=False, index=True)  # Dotted path, e.g. payment_terms.amount
+    field_type = Column(String(50), nullable=False, default="text")  # amount, email, date, ...
+    request_type = Column(String(50), nullable=True)  # missing, validation_issue
+    severity = Column(String(50), nullable=True)
+    description = Column(Text, nullable=True)
+    current_value = Column(JSON, nullable=True)
+    suggested_value = Column(JSON, nullable=True)
+    suggestions = Column(JSON, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,6 +1,5 @@
 from dotenv import load_dotenv
 from pathlib import Path
-from vertexai.generative_models import GenerativeModel
 import os
 
 env_path = Path(__file__).resolve().parent.parent / ".env"
@@ -8,6 +7,7 @@ load_dotenv(dotenv_path=env_path)
 
 def get_model_simple(model_name: str = "gemini-1.5-flash", temperature: float = 0.1, max_output_tokens: int = 4000):
     """Get Gemini model."""
+    from vertexai.generative_models import GenerativeModel  # deferred: vertexai is slow to import
     return GenerativeModel(
         model_name,
         generation_config={
@@ -3,7 +3,9 @@ import logging
 from typing import List, Dict, Any
 from pathlib import Path
 from dotenv import load_dotenv
-from vertexai.preview.language_models import TextEmbeddingModel
+from utils.tracing import trace_dependency
+from utils.resilience import resilient
+from utils.batching import get_embedding_batcher
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -32,6 +34,7 @@ class EmbeddingService:
 
             self.model_name = model_name
             try:
+                from vertexai.preview.language_models import TextEmbeddingModel  # deferred: vertexai is slow to import
                 self.model = TextEmbeddingModel.from_pretrained(self.model_name)
                 self.initialized = True
                 logger.info(f"✅ EmbeddingService initialized with model: {self.model_name}")
@@ -40,7 +43,13 @@ class EmbeddingService:
                 raise
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        """Embed a list of texts."""
+        """Embed a list of texts (coalesced with other workflows' requests during batch runs)."""
+        return get_embedding_batcher().submit(texts)
+
+    @resilient("embedding")
+    @trace_dependency("embedding")
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of texts with a single Vertex AI call."""
         try:
             embeddings = self.model.get_embeddings(texts)
             return [embedding.values for embedding in embeddings]
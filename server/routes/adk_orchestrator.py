@@ -6,21 +6,25 @@ FastAPI routes that integrate with Google ADK workflow system
 
 from fastapi import APIRouter, BackgroundTasks, Depends, Query, File, UploadFile, Form, HTTPException
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import logging
 import json
 from datetime import datetime
 
-from adk_agents.adk_integration_service import get_adk_integration_service
+from utils.service_container import lazy_service
 from schemas.workflow_schemas import WorkflowRequest, WorkflowResponse, WorkflowStatus
 from schemas.unified_invoice_schemas import UnifiedInvoiceData
 from middleware.auth import get_current_user
+from utils.tracing import get_tracer
+from utils.resilience import get_breaker_states
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Get ADK integration service instance
-adk_service = get_adk_integration_service()
+# ADK integration services (resolved on first use)
+adk_service = lazy_service("adk_integration")
+batch_service = lazy_service("batch_workflow")
+review_queue_service = lazy_service("review_queue")
 
 
 @router.post("/adk/workflow/invoice/start", response_model=WorkflowResponse)
@@ -122,6 +126,128 @@ async def start_adk_workflow_for_existing_contract(
     return await adk_service.start_adk_workflow(workflow_request)
 
 
+@router.post("/adk/workflow/batch/start")
+async def start_adk_batch_workflow(
+    user_id: str = Form(...),
+    contracts: Optional[str] = Form(default='[]'),
+    max_attempts: int = Form(3),
+    max_concurrency: Optional[int] = Form(None),
+    options: Optional[str] = Form(default='{}'),
+    contract_files: List[UploadFile] = File(default=[]),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    📦 Start ADK workflows for a portfolio of contracts in one submission
+    
+    Accepts uploaded PDFs (``contract_files``) and/or a JSON list of remote
+    contracts (``contracts``), each with a ``contract_name`` and one of
+    ``gcs_path``, ``drive_file_id`` or ``contract_path``.
+    
+    Features:
+    - Bounded parallel processing of every contract
+    - Embedding requests coalesced across contracts, shared Gemini concurrency budget
+    - One aggregated review queue for contracts that need human input
+    - Batch-level progress and throughput
+    """
+    try:
+        remote_contracts = json.loads(contracts or '[]')
+        options_dict = json.loads(options or '{}')
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON in batch request: {str(e)}")
+    if not isinstance(remote_contracts, list):
+        raise HTTPException(status_code=400, detail="contracts must be a JSON list")
+    
+    batch_contracts = list(remote_contracts)
+    for upload in contract_files:
+        batch_contracts.append({"contract_name": upload.filename, "contract_file": await upload.read()})
+    
+    # Ensure user can only start workflows for themselves (unless admin)
+    if not current_user.get("is_admin", False):
+        user_id = current_user["user_id"]
+    
+    logger.info(f"📦 ADK API: Starting batch workflow - User: {user_id}, Contracts: {len(batch_contracts)}")
+    
+    try:
+        return await batch_service.start_batch(
+            user_id=user_id,
+            contracts=batch_contracts,
+            max_attempts=max_attempts,
+            options=options_dict,
+            max_concurrency=max_concurrency
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _check_batch_access(batch_id: str, current_user: dict) -> str:
+    """Owner of the batch; only the owner or an admin may use it"""
+    owner = batch_service.get_batch_owner(batch_id)
+    if owner is None:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    if not current_user.get("is_admin", False) and owner != current_user["user_id"]:
+        raise HTTPException(status_code=403, detail="Access denied to this batch")
+    return owner
+
+
+@router.get("/adk/workflow/batch/{batch_id}/status")
+async def get_adk_batch_status(
+    batch_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    📊 Progress and throughput of a batch workflow
+    
+    Returns per-status counts, progress percentage, contracts per minute,
+    estimated time remaining, shared batching statistics and the status of
+    every workflow in the batch.
+    """
+    logger.info(f"📊 ADK API: Getting batch status - ID: {batch_id}, User: {current_user['user_id']}")
+    _check_batch_access(batch_id, current_user)
+    
+    status = batch_service.get_batch_status(batch_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    return status
+
+
+@router.get("/adk/workflow/batch/{batch_id}/review-queue")
+async def get_adk_batch_review_queue(
+    batch_id: str,
+    group_by: str = Query("field_name", description="field_name, field_type, user_id or workflow_id"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    🙋 Single review queue for every batch workflow waiting for human input
+    
+    Lists the pending field requests of the batch's workflows, grouped across
+    the batch.
+    """
+    logger.info(f"🙋 ADK API: Getting batch review queue - ID: {batch_id}, User: {current_user['user_id']}")
+    _check_batch_access(batch_id, current_user)
+    
+    try:
+        queue = await batch_service.get_review_queue(batch_id, group_by=group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if queue is None:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    return queue
+
+
+@router.get("/adk/workflows/batches")
+async def list_adk_batches(
+    user_id: Optional[str] = Query(None, description="Filter by user ID"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    📋 List batch workflows with their progress summaries
+    """
+    if not current_user.get("is_admin", False):
+        user_id = current_user["user_id"]
+    
+    return batch_service.list_batches(user_id)
+
+
 @router.get("/adk/workflow/{workflow_id}/status", response_model=WorkflowStatus)
 async def get_adk_workflow_status(
     workflow_id: str,
@@ -246,6 +372,45 @@ async def list_active_adk_workflows(
     return adk_service.list_adk_workflows(user_id)
 
 
+@router.get("/adk/workflow/{workflow_id}/trace")
+async def get_adk_workflow_trace(
+    workflow_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    🧭 Get the span tree recorded for an ADK workflow
+    
+    Returns nested spans for the workflow run(s), each agent and every traced
+    external call (PDF parsing, embeddings, Pinecone, Gemini, database, GCS)
+    with start/end timestamps and durations.
+    """
+    logger.info(f"🧭 ADK API: Getting workflow trace - ID: {workflow_id}, User: {current_user['user_id']}")
+    
+    trace = get_tracer().get_trace_tree(workflow_id)
+    if trace is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No trace recorded for ADK workflow {workflow_id}"
+        )
+    return trace
+
+
+@router.get("/adk/workflows/latency")
+async def get_adk_latency_breakdown(
+    window_seconds: Optional[float] = Query(None, gt=0, description="Sliding window in seconds (defaults to TRACE_WINDOW_SECONDS)"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    ⏱️ Latency breakdown per agent and per external dependency
+    
+    Returns count, p50/p95/p99, max and average duration in milliseconds over the
+    sliding window for every ADK agent and traced dependency.
+    """
+    logger.info(f"⏱️ ADK API: Latency breakdown requested - Window: {window_seconds or 'default'}")
+    
+    return get_tracer().latency_summary(window_seconds)
+
+
 @router.get("/adk/workflow/health")
 async def adk_workflow_health_check():
     """
@@ -256,17 +421,24 @@ async def adk_workflow_health_check():
     - System readiness
     - Available resources
     - ADK integration status
+    - Circuit breaker state per external dependency
     """
     logger.info("💚 ADK API: Health check requested")
     
     try:
         workflows = adk_service.list_adk_workflows()
         active_count = workflows["total_count"]
+        breakers = get_breaker_states()
+        open_breakers = [name for name, info in breakers.items() if info["state"] != "closed"]
         
         return {
-            "status": "healthy",
-            "message": "Google ADK agentic orchestrator is running",
+            "status": "degraded" if open_breakers else "healthy",
+            "message": (
+                f"Google ADK agentic orchestrator is running; degraded dependencies: {', '.join(open_breakers)}"
+                if open_breakers else "Google ADK agentic orchestrator is running"
+            ),
             "active_workflows": active_count,
+            "dependency_breakers": breakers,
             "system_ready": True,
             "version": "1.0.0-adk",
             "adk_enabled": True,
@@ -347,6 +519,26 @@ class ADKHumanInputResponse(BaseModel):
     workflow_resumed: bool = False
 
 
+class ADKBatchHumanInputRequest(BaseModel):
+    """Answers for several workflows of one batch review queue"""
+    answers: List[ADKHumanInputRequest]
+
+
+class ReviewQueueAnswer(BaseModel):
+    """Answer for one queued field request, or for every pending request of a field"""
+    item_id: Optional[str] = None
+    field_name: Optional[str] = None
+    workflow_ids: Optional[List[str]] = None
+    value: Any = None
+
+
+class ReviewQueueAnswersRequest(BaseModel):
+    """Bulk answers across workflows of the review queue"""
+    answers: List[ReviewQueueAnswer]
+    user_notes: Optional[str] = None
+    user_id: Optional[str] = None  # Admins only: answer another user's queue
+
+
 @router.post("/adk/workflow/human-input/submit", response_model=ADKHumanInputResponse)
 async def submit_adk_human_input(
     request: ADKHumanInputRequest,
@@ -413,6 +605,103 @@ async def submit_adk_human_input(
         )
 
 
+@router.post("/adk/workflow/batch/{batch_id}/human-input")
+async def submit_adk_batch_human_input(
+    batch_id: str,
+    request: ADKBatchHumanInputRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Submit review answers for many workflows of a batch and resume them
+    
+    The workflows are resumed concurrently; a failure on one workflow does not
+    stop the others. Only the batch owner or an admin may answer.
+    """
+    owner = _check_batch_access(batch_id, current_user)
+    queue = await batch_service.get_review_queue(batch_id, group_by="workflow_id")
+    if queue is None:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    pending = {group["key"] for group in queue["groups"]}
+    
+    logger.info(f"📝 ADK API: Receiving batch human input - Batch: {batch_id}, Answers: {len(request.answers)}")
+    
+    field_values = {}
+    rejected = []
+    for answer in request.answers:
+        if answer.workflow_id not in pending:
+            rejected.append({"workflow_id": answer.workflow_id, "success": False, "message": "Workflow is not waiting for review in this batch"})
+            continue
+        field_values.setdefault(answer.workflow_id, {}).update(answer.field_values)
+    
+    notes = "\n".join(answer.user_notes for answer in request.answers if answer.user_notes) or None
+    report = await review_queue_service.resume_workflows(field_values, notes, user_id=owner)
+    remaining = await batch_service.get_review_queue(batch_id)
+    
+    return {
+        "batch_id": batch_id,
+        "submitted": len(request.answers),
+        "resumed": report["resumed"],
+        "results": report["results"] + rejected,
+        "remaining_in_queue": remaining["pending_count"]
+    }
+
+
+@router.get("/adk/review-queue")
+async def get_review_queue(
+    group_by: str = Query("field_name", description="field_name, field_type, user_id or workflow_id"),
+    field_name: Optional[str] = Query(None, description="Only requests for this field"),
+    field_type: Optional[str] = Query(None, description="Only requests of this type (amount, email, date, ...)"),
+    user_id: Optional[str] = Query(None, description="Admins only: another user's queue"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    🙋 Pending human input requests across all paused workflows
+    
+    Paused workflows are hibernated to storage; their field requests are
+    listed here grouped by field, field type or user so a reviewer can answer
+    similar requests together.
+    """
+    if not current_user.get("is_admin", False):
+        user_id = current_user["user_id"]
+    
+    try:
+        return await review_queue_service.get_queue(
+            user_id=user_id, group_by=group_by, field_name=field_name, field_type=field_type
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/adk/review-queue/answers")
+async def submit_review_queue_answers(
+    request: ReviewQueueAnswersRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    📬 Answer many queued field requests at once and resume every affected workflow
+    
+    Each answer names one ``item_id`` or a ``field_name`` (optionally limited
+    to ``workflow_ids``) whose value applies to every pending request for that
+    field. Workflows that still need input afterwards go back to the queue.
+    """
+    # Answers only reach pending requests (and workflows) of this user
+    user_id = current_user["user_id"]
+    if current_user.get("is_admin", False):
+        user_id = request.user_id
+    
+    for answer in request.answers:
+        if not (answer.item_id or answer.field_name):
+            raise HTTPException(status_code=400, detail="Every answer needs an item_id or a field_name")
+    
+    logger.info(f"📬 ADK API: Review queue answers - User: {current_user['user_id']}, Answers: {len(request.answers)}")
+    
+    return await review_queue_service.submit_bulk_answers(
+        [answer.model_dump() for answer in request.answers],
+        user_id=user_id,
+        user_notes=request.user_notes
+    )
+
+
 @router.get("/adk/workflow/{workflow_id}/status")
 async def get_adk_workflow_status(
     workflow_id: str,
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
 from typing import List, Dict, Any
+import asyncio
 import logging
 from services.contract_processor import get_contract_processor
 from services.contract_rag_service import get_contract_rag_service
@@ -92,7 +93,8 @@ async def generate_invoice_data(
         
         # Generate invoice data using RAG
         contract_rag_service = get_contract_rag_service()
-        result = contract_rag_service.generate_invoice_data(
+        result = await asyncio.to_thread(
+            contract_rag_service.generate_invoice_data,
             user_id=request.user_id,
             contract_name=request.contract_name,
             query=request.query
@@ -189,7 +191,8 @@ async def process_and_generate_invoice(
         
         # Step 2: Generate invoice data
         contract_rag_service = get_contract_rag_service()
-        invoice_result = contract_rag_service.generate_invoice_data(
+        invoice_result = await asyncio.to_thread(
+            contract_rag_service.generate_invoice_data,
             user_id=user_id,
             contract_name=file.filename,
             query="Extract comprehensive invoice data including all parties, payment terms, services, and billing schedules"
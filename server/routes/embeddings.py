@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from services.pinecone_service import get_pinecone_service, PineconeService
+import asyncio
 import logging
 
 # Configure logging
@@ -141,7 +142,8 @@ async def search_similar_vectors(
     try:
         logger.info(f"Searching for similar vectors: {request.query_text[:50]}...")
         
-        result = pinecone_service.search_similar(
+        result = await asyncio.to_thread(
+            pinecone_service.search_similar,
             query_text=request.query_text,
             top_k=request.top_k,
             filter_metadata=request.filter_metadata
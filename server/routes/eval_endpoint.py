@@ -20,8 +20,7 @@ def datetime_serializer(obj):
 
 from schemas.workflow_schemas import WorkflowState
 from tests.contract_processing_evals import ContractProcessingEvaluator
-from adk_agents.contract_processing_adk_agent import ContractProcessingADKAgent
-from services.contract_rag_service import get_contract_rag_service
+from utils.service_container import lazy_service
 
 router = APIRouter(prefix="/eval", tags=["evaluation"])
 
@@ -30,9 +29,8 @@ class SingleContractTestRequest(BaseModel):
     contract_content: str
     expected_fields: Optional[Dict[str, Any]] = None
 
-# Initialize services
-contract_agent = ContractProcessingADKAgent()
-contract_rag_service = get_contract_rag_service()
+# Services are resolved on first use
+contract_rag_service = lazy_service("contract_rag")
 
 @router.post("/contract-processing/run-evals")
 async def run_contract_processing_evals():
@@ -165,7 +163,7 @@ async def extract_invoice_data(user_id: str, contract_name: str):
     """
     try:
         # Generate invoice data using existing RAG service
-        invoice_response = contract_rag_service.generate_invoice_data(user_id, contract_name)
+        invoice_response = await asyncio.to_thread(contract_rag_service.generate_invoice_data, user_id, contract_name)
         
         return {
             "status": "success",
@@ -8,6 +8,8 @@ import re
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
+from services.template_registry import TemplateRegistry
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/invoice-templates", tags=["invoice-templates"])
@@ -51,9 +53,11 @@ async def get_template_content(template_id: str):
         if not template:
             raise HTTPException(status_code=404, detail="Template not found")
         
-        # Read file content
-        with open(template.filePath, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # Content is held by the registry
+        entry = get_component_registry().get(Path(template.fileName).stem)
+        if entry is None:
+            raise FileNotFoundError(template.filePath)
+        content = entry.content
         
         return {
             "template": template,
@@ -65,53 +69,48 @@ async def get_template_content(template_id: str):
         logger.error(f"Error reading template content: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to read template content")
 
+# Index of the client invoice components, refreshed by mtime instead of re-read per request
+_component_registry = None
+
+
+def get_component_registry() -> TemplateRegistry:
+    global _component_registry
+    if _component_registry is None:
+        _component_registry = TemplateRegistry(
+            Path(__file__).parent.parent.parent / "client" / "src" / "components" / "invoices",
+            suffix=".tsx",
+            include=lambda name: 'invoice' in name.lower(),
+            metadata_parser=lambda path, content: {
+                **extract_metadata_from_content(content),
+                'componentName': extract_component_name(path.name, content),
+            },
+        )
+    return _component_registry
+
+
 async def scan_invoice_templates() -> List[DiscoveredTemplate]:
-    """Scan the client/src/components/invoices directory for invoice template files"""
+    """List the invoice template components in client/src/components/invoices"""
     try:
-        # Path to the client invoices components directory
-        invoices_dir = Path(__file__).parent.parent.parent / "client" / "src" / "components" / "invoices"
-        
-        if not invoices_dir.exists():
-            logger.warning(f"Invoices directory not found: {invoices_dir}")
+        registry = get_component_registry()
+        if not registry.directory.exists():
+            logger.warning(f"Invoices directory not found: {registry.directory}")
             return []
         
-        templates = []
-        
-        # Get all .tsx files that contain 'invoice' in the name
-        tsx_files = [f for f in invoices_dir.iterdir() 
-                    if f.is_file() and f.suffix == '.tsx' and 'invoice' in f.name.lower()]
-        
-        for file_path in tsx_files:
-            try:
-                # Get file stats
-                stat = file_path.stat()
-                
-                # Read file content to extract metadata
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Extract metadata
-                metadata = extract_metadata_from_content(content)
-                component_name = extract_component_name(file_path.name, content)
-                
-                template = DiscoveredTemplate(
-                    id=generate_id_from_filename(file_path.name),
-                    fileName=file_path.name,
-                    filePath=str(file_path),
-                    componentName=component_name,
-                    templateName=file_path.stem,
-                    fileSize=stat.st_size,
-                    lastModified=datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                    templateType=metadata.get('templateType', 'Invoice Template'),
-                    modelUsed=metadata.get('modelUsed', 'gemini-2.0-flash'),
-                    generatedBy=metadata.get('generatedBy', 'ui_invoice_generator')
-                )
-                
-                templates.append(template)
-                
-            except Exception as e:
-                logger.error(f"Error processing template file {file_path}: {str(e)}")
-                continue
+        templates = [
+            DiscoveredTemplate(
+                id=generate_id_from_filename(entry.file_name),
+                fileName=entry.file_name,
+                filePath=str(entry.path),
+                componentName=entry.metadata['componentName'],
+                templateName=entry.path.stem,
+                fileSize=entry.size,
+                lastModified=entry.modified_at_iso,
+                templateType=entry.metadata.get('templateType', 'Invoice Template'),
+                modelUsed=entry.metadata.get('modelUsed', 'gemini-2.0-flash'),
+                generatedBy=entry.metadata.get('generatedBy', 'ui_invoice_generator')
+            )
+            for entry in registry.list()
+        ]
         
         # Sort by last modified date (newest first)
         templates.sort(key=lambda x: x.lastModified, reverse=True)
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Response
+from fastapi import APIRouter, BackgroundTasks, UploadFile, File, HTTPException, Query, Request, Response
 from fastapi.responses import HTMLResponse
 from typing import List, Optional
 from datetime import datetime, timedelta
+import os
 from services.database_service import get_database_service
 from models.database_models import InvoiceStatus, HTMLInvoice
+from services.html_invoice_service import get_html_invoice_service
+from services.render_cache import etag_for, etag_matches
 
 router = APIRouter(prefix="/invoices", tags=["invoice management"])
 
@@ -242,117 +245,41 @@ async def get_adaptive_ui_designs(invoice_id: str):
 # HTML Invoice Viewing Endpoints
 
 @router.get("/{invoice_uuid}/view", response_class=HTMLResponse)
-async def view_html_invoice(invoice_uuid: str):
+async def view_html_invoice(invoice_uuid: str, request: Request, background_tasks: BackgroundTasks):
     """View the generated HTML invoice"""
     try:
-        db_service = get_database_service()
-        
-        # Get the HTML invoice from database
-        # For now, we'll mock this since database service needs to be implemented
-        # In a real implementation, you would:
-        # html_invoice = await db_service.get_html_invoice_by_uuid(invoice_uuid)
-        
-        # Mock HTML invoice for now
-        html_invoice = {
-            "invoice_uuid": invoice_uuid,
-            "invoice_number": f"INV-{invoice_uuid[:8].upper()}",
-            "html_content": f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>Invoice {invoice_uuid[:8].upper()}</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; color: #333; }}
-        .invoice-container {{ max-width: 800px; margin: 0 auto; border: 1px solid #ddd; padding: 20px; box-shadow: 0 0 10px rgba(0, 0, 0, 0.05); }}
-        .header {{ text-align: left; margin-bottom: 20px; }}
-        .header h1 {{ color: #0056b3; margin-bottom: 5px; }}
-        .invoice-meta {{ display: flex; justify-content: space-between; margin-bottom: 20px; }}
-        .addresses {{ display: flex; justify-content: space-between; margin-bottom: 20px; }}
-        .address-section {{ width: 48%; }}
-        .address-section h3 {{ margin-bottom: 5px; color: #0056b3; }}
-        table {{ width: 100%; border-collapse: collapse; margin-bottom: 20px; }}
-        th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-        th {{ background-color: #f2f2f2; color: #0056b3; }}
-        .totals {{ text-align: right; margin-bottom: 20px; }}
-        .footer {{ text-align: center; font-size: 0.8em; color: #777; border-top: 1px solid #ddd; padding-top: 10px; }}
-        .status {{ font-weight: bold; color: #007bff; }}
-    </style>
-</head>
-<body>
-    <div class="invoice-container">
-        <div class="header">
-            <h1>Smart Invoice Scheduler</h1>
-            <p>Generated HTML Invoice</p>
-        </div>
-        
-        <div class="invoice-meta">
-            <div>
-                <p>Invoice Number: INV-{invoice_uuid[:8].upper()}</p>
-                <p>Invoice Date: {datetime.now().strftime("%Y-%m-%d")}</p>
-                <p>Due Date: {(datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d")}</p>
-            </div>
-            <div>
-                <p>Status: <span class="status">Generated</span></p>
-            </div>
-        </div>
-        
-        <div class="addresses">
-            <div class="address-section">
-                <h3>Bill To:</h3>
-                <p>Client Name</p>
-                <p>Client Address</p>
-            </div>
-            <div class="address-section">
-                <h3>Bill From:</h3>
-                <p>Service Provider</p>
-                <p>Provider Address</p>
-            </div>
-        </div>
-        
-        <table>
-            <thead>
-                <tr>
-                    <th>Description</th>
-                    <th>Amount</th>
-                </tr>
-            </thead>
-            <tbody>
-                <tr>
-                    <td>Service Rendered</td>
-                    <td>$1,000.00</td>
-                </tr>
-            </tbody>
-        </table>
-        
-        <div class="totals">
-            <p>Total: $1,000.00</p>
-        </div>
-        
-        <div class="footer">
-            <p>Thank you for your business!</p>
-            <p>Generated by Smart Invoice Scheduler - UI Generation Agent</p>
-        </div>
-    </div>
-</body>
-</html>
-            """,
-            "viewing_enabled": True,
-            "is_active": True
-        }
+        # One indexed lookup; rendered (and stored) only if it was never generated
+        html_invoice = await get_html_invoice_service().get_for_view(invoice_uuid)
         
         # Check if invoice exists and is viewable
         if not html_invoice:
             raise HTTPException(status_code=404, detail="HTML invoice not found")
         
-        if not html_invoice.get("viewing_enabled") or not html_invoice.get("is_active"):
+        if not html_invoice.viewable:
             raise HTTPException(status_code=403, detail="Invoice viewing is disabled")
         
-        # Increment view count (in real implementation)
-        # await db_service.increment_html_invoice_view_count(invoice_uuid)
+        # Increment view count after the response is sent
+        if html_invoice.stored:
+            background_tasks.add_task(get_html_invoice_service().record_view, invoice_uuid)
         
-        # Return the HTML content directly
-        return HTMLResponse(content=html_invoice["html_content"])
+        etag = etag_for(html_invoice.content_hash)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"private, max-age={os.getenv('INVOICE_VIEW_CACHE_SECONDS', '60')}",
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        
+        # The stored gzip body is sent as is to clients that accept it
+        if "gzip" in request.headers.get("accept-encoding", "").lower():
+            return Response(
+                content=html_invoice.html_gzip,
+                media_type="text/html; charset=utf-8",
+                headers={**headers, "Content-Encoding": "gzip"}
+            )
+        
+        return HTMLResponse(content=html_invoice.html_content, headers=headers)
         
     except HTTPException:
         raise
@@ -5,13 +5,14 @@ API endpoints for testing and using natural language query processing
 for invoice field correction instead of structured forms.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
 import logging
 
 from services.natural_language_correction_service import get_natural_language_correction_service
 from schemas.unified_invoice_schemas import UnifiedInvoiceData
+from middleware.auth import get_current_user
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +24,9 @@ class NaturalLanguageQueryRequest(BaseModel):
     query: str
     missing_fields: Optional[List[str]] = ["client.name", "service_provider.name", "payment_terms.amount"]
     current_invoice_data: Optional[Dict[str, Any]] = None
+    session_token: Optional[str] = None
+    # Workflow the query corrects; sessions are only reused for the same user and workflow
+    workflow_id: Optional[str] = None
 
 
 class NaturalLanguageQueryResponse(BaseModel):
@@ -32,10 +36,15 @@ class NaturalLanguageQueryResponse(BaseModel):
     extracted_fields: Dict[str, Any]
     confidence: float
     message: str
+    extraction_method: Optional[str] = None
+    session_token: Optional[str] = None
 
 
 @router.post("/extract-fields", response_model=NaturalLanguageQueryResponse)
-async def extract_fields_from_query(request: NaturalLanguageQueryRequest):
+async def extract_fields_from_query(
+    request: NaturalLanguageQueryRequest,
+    current_user: dict = Depends(get_current_user)
+):
     """
     Extract invoice fields from natural language query
     
@@ -65,7 +74,10 @@ async def extract_fields_from_query(request: NaturalLanguageQueryRequest):
             query=request.query,
             current_invoice_data=current_data,
             missing_fields=request.missing_fields,
-            validation_issues=[]
+            validation_issues=[],
+            session_token=request.session_token,
+            user_id=current_user["user_id"],
+            workflow_id=request.workflow_id
         )
         
         return NaturalLanguageQueryResponse(
@@ -73,7 +85,9 @@ async def extract_fields_from_query(request: NaturalLanguageQueryRequest):
             query=request.query,
             extracted_fields=result.get("corrections", {}),
             confidence=result.get("extraction_confidence", 0.0),
-            message=f"Extracted {len(result.get('corrections', {}))} fields" if result.get("success") else result.get("error", "Extraction failed")
+            message=f"Extracted {len(result.get('corrections', {}))} fields" if result.get("success") else result.get("error", "Extraction failed"),
+            extraction_method=result.get("extraction_method"),
+            session_token=result.get("session_token")
         )
         
     except Exception as e:
@@ -82,9 +96,16 @@ async def extract_fields_from_query(request: NaturalLanguageQueryRequest):
 
 
 @router.post("/preview", response_model=NaturalLanguageQueryResponse)
-async def preview_extraction(request: NaturalLanguageQueryRequest):
+async def preview_extraction(
+    request: NaturalLanguageQueryRequest,
+    current_user: dict = Depends(get_current_user)
+):
     """
     Preview what would be extracted from a natural language query without applying changes
+    
+    Pass the returned session_token when applying the same query to the same
+    workflow_id (extract-fields or workflow resume) to reuse this extraction
+    instead of calling the LLM again.
     """
     try:
         nl_service = get_natural_language_correction_service()
@@ -100,14 +121,24 @@ async def preview_extraction(request: NaturalLanguageQueryRequest):
         )
         
         # Preview extraction
-        result = await nl_service.preview_corrections(request.query, current_data)
+        # Without explicit fields the preview covers every supported field
+        result = await nl_service.preview_corrections(
+            request.query,
+            current_data,
+            missing_fields=request.missing_fields if "missing_fields" in request.model_fields_set else None,
+            session_token=request.session_token,
+            user_id=current_user["user_id"],
+            workflow_id=request.workflow_id
+        )
         
         return NaturalLanguageQueryResponse(
             success=result.get("success", False),
             query=request.query,
             extracted_fields=result.get("extracted_fields", {}),
             confidence=result.get("confidence", 0.0),
-            message=f"Preview: Would extract {len(result.get('extracted_fields', {}))} fields"
+            message=f"Preview: Would extract {len(result.get('extracted_fields', {}))} fields",
+            extraction_method=result.get("extraction_method"),
+            session_token=result.get("session_token")
         )
         
     except Exception as e:
@@ -4,15 +4,15 @@ from typing import Optional, Dict, Any
 import logging
 import json
 from datetime import datetime
-from controller.orchestrator_controller import get_orchestrator_controller
+from utils.service_container import lazy_service
 from schemas.workflow_schemas import WorkflowRequest, WorkflowResponse, WorkflowStatus
 from middleware.auth import get_current_user
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Get controller instance
-orchestrator_controller = get_orchestrator_controller()
+# Controller instance (resolved on first use)
+orchestrator_controller = lazy_service("orchestrator_controller")
 
 @router.post("/workflow/invoice/start", response_model=WorkflowResponse)
 async def start_invoice_workflow(
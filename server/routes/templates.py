@@ -1,10 +1,13 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Literal, Optional, List
 import logging
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Response
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+from services.pdf_render_pool import PDFRenderQueueFull, PDFRenderTimeout
+from services.render_cache import etag_for, etag_matches
 from services.template_service import TemplateService
-from services.pdf_service import PDFService
+from utils.service_container import get_container, lazy_service
 from utils.html_sanitizer import HTMLSanitizer, TemplateValidator
 
 logger = logging.getLogger(__name__)
@@ -30,6 +33,7 @@ class PDFGenerationRequest(BaseModel):
 
 class BulkPDFRequest(BaseModel):
     invoices: List[Dict[str, Any]]
+    format: Literal["pdf", "zip"] = "pdf"
 
 class TemplateValidationResponse(BaseModel):
     valid: bool
@@ -46,17 +50,30 @@ class TemplateListResponse(BaseModel):
 # Initialize services
 template_service = TemplateService()
 
-# Initialize PDF service with error handling
-try:
-    pdf_service = PDFService()
-    PDF_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"PDF service not available: {str(e)}")
-    pdf_service = None
-    PDF_AVAILABLE = False
+# PDF service is created on first PDF request (WeasyPrint is slow to import)
+pdf_service = lazy_service("pdf")
+
+
+def _pdf_available() -> bool:
+    """True when WeasyPrint is installed and the PDF service could be created"""
+    return get_container().resolve("pdf") is not None
+
+
+def _pdf_pool_error(e: Exception) -> HTTPException:
+    """503 (retry later) when the render queue is full, 504 when rendering timed out"""
+    if isinstance(e, PDFRenderQueueFull):
+        return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return HTTPException(status_code=504, detail=str(e))
+
+
+def _not_modified(http_request: Request, key: Optional[str]) -> Optional[Response]:
+    """304 when the client already holds the artifact for this render key"""
+    if key and etag_matches(http_request.headers.get("if-none-match"), etag_for(key)):
+        return Response(status_code=304, headers={"ETag": etag_for(key)})
+    return None
 
 @router.post("/preview")
-async def generate_preview(request: PreviewRequest):
+async def generate_preview(request: PreviewRequest, http_request: Request):
     """Generate HTML preview of invoice template with data"""
     try:
         # Parse dates
@@ -69,6 +86,14 @@ async def generate_preview(request: PreviewRequest):
         if request.dueDate:
             due_date = datetime.fromisoformat(request.dueDate.replace('Z', '+00:00'))
         
+        key = template_service.render_key(
+            "html", request.templateId, request.invoiceData,
+            request.invoiceNumber, invoice_date, due_date, request.status
+        )
+        not_modified = _not_modified(http_request, key)
+        if not_modified:
+            return not_modified
+        
         # Generate preview
         rendered_html = await template_service.render_invoice_preview(
             template_id=request.templateId,
@@ -79,20 +104,23 @@ async def generate_preview(request: PreviewRequest):
             status=request.status
         )
         
-        return {
-            "html": rendered_html,
-            "templateId": request.templateId,
-            "status": "success"
-        }
+        return JSONResponse(
+            content={
+                "html": rendered_html,
+                "templateId": request.templateId,
+                "status": "success"
+            },
+            headers={"ETag": etag_for(key)} if key else None
+        )
         
     except Exception as e:
         logger.error(f"Error generating preview: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate preview: {str(e)}")
 
 @router.post("/generate-pdf")
-async def generate_pdf(request: PDFGenerationRequest):
+async def generate_pdf(request: PDFGenerationRequest, http_request: Request):
     """Generate PDF from invoice template and data"""
-    if not PDF_AVAILABLE:
+    if not _pdf_available():
         raise HTTPException(status_code=503, detail="PDF generation service is not available")
     
     try:
@@ -100,6 +128,14 @@ async def generate_pdf(request: PDFGenerationRequest):
         invoice_date = datetime.fromisoformat(request.invoiceDate.replace('Z', '+00:00'))
         due_date = datetime.fromisoformat(request.dueDate.replace('Z', '+00:00'))
         
+        key = template_service.render_key(
+            "pdf", request.templateId, request.invoiceData,
+            request.invoiceNumber, invoice_date, due_date, request.status
+        )
+        not_modified = _not_modified(http_request, key)
+        if not_modified:
+            return not_modified
+        
         # Generate PDF
         pdf_content = await pdf_service.generate_invoice_pdf(
             template_id=request.templateId,
@@ -115,10 +151,14 @@ async def generate_pdf(request: PDFGenerationRequest):
             content=pdf_content,
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f"attachment; filename=invoice-{request.invoiceNumber}.pdf"
+                "Content-Disposition": f"attachment; filename=invoice-{request.invoiceNumber}.pdf",
+                **({"ETag": etag_for(key)} if key else {})
             }
         )
         
+    except (PDFRenderQueueFull, PDFRenderTimeout) as e:
+        logger.warning(f"PDF render pool refused or timed out: {str(e)}")
+        raise _pdf_pool_error(e)
     except Exception as e:
         logger.error(f"Error generating PDF: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {str(e)}")
@@ -126,7 +166,7 @@ async def generate_pdf(request: PDFGenerationRequest):
 @router.post("/generate-bulk-pdf")
 async def generate_bulk_pdf(request: BulkPDFRequest):
     """Generate bulk PDF containing multiple invoices"""
-    if not PDF_AVAILABLE:
+    if not _pdf_available():
         raise HTTPException(status_code=503, detail="PDF generation service is not available")
     
     try:
@@ -142,17 +182,33 @@ async def generate_bulk_pdf(request: BulkPDFRequest):
                 'status': invoice.get('status', 'Pending')
             })
         
-        # Generate bulk PDF
-        pdf_content = await pdf_service.generate_bulk_invoices_pdf(processed_invoices)
+        batch_name = f"invoices-batch-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
         
-        return Response(
-            content=pdf_content,
+        # ZIP: one PDF per invoice, streamed as each one is rendered
+        if request.format == "zip":
+            return StreamingResponse(
+                pdf_service.stream_bulk_zip(processed_invoices),
+                media_type="application/zip",
+                headers={"Content-Disposition": f"attachment; filename={batch_name}.zip"}
+            )
+        
+        # Merged PDF: invoices are rendered in parallel, merged page-wise and streamed from a spool file
+        spool = await pdf_service.build_bulk_pdf(processed_invoices)
+        
+        def read_chunks():
+            with spool:
+                while chunk := spool.read(256 * 1024):
+                    yield chunk
+        
+        return StreamingResponse(
+            read_chunks(),
             media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=invoices-batch-{datetime.now().strftime('%Y%m%d-%H%M%S')}.pdf"
-            }
+            headers={"Content-Disposition": f"attachment; filename={batch_name}.pdf"}
         )
         
+    except (PDFRenderQueueFull, PDFRenderTimeout) as e:
+        logger.warning(f"PDF render pool refused or timed out: {str(e)}")
+        raise _pdf_pool_error(e)
     except Exception as e:
         logger.error(f"Error generating bulk PDF: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate bulk PDF: {str(e)}")
@@ -214,7 +270,7 @@ async def validate_template(template_id: str):
 @router.post("/{template_id}/preview-pdf")
 async def generate_preview_pdf(template_id: str):
     """Generate a preview PDF with sample data"""
-    if not PDF_AVAILABLE:
+    if not _pdf_available():
         raise HTTPException(status_code=503, detail="PDF generation service is not available")
     
     try:
@@ -228,6 +284,9 @@ async def generate_preview_pdf(template_id: str):
             }
         )
         
+    except (PDFRenderQueueFull, PDFRenderTimeout) as e:
+        logger.warning(f"PDF render pool refused or timed out: {str(e)}")
+        raise _pdf_pool_error(e)
     except Exception as e:
         logger.error(f"Error generating preview PDF: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate preview PDF: {str(e)}")
@@ -248,7 +307,7 @@ async def validate_html_content(request: Dict[str, str]):
         is_safe = TemplateValidator.is_template_safe(html_content)
         
         # Validate PDF compatibility
-        if PDF_AVAILABLE:
+        if _pdf_available():
             pdf_validation = pdf_service.validate_pdf_generation(html_content)
         else:
             pdf_validation = {
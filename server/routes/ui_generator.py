@@ -4,6 +4,7 @@ from datetime import datetime
 from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
 from services.template_service import TemplateService
+from services.template_selection import get_template_selector
 
 logger = logging.getLogger(__name__)
 
@@ -50,7 +51,7 @@ async def generate_ui_with_data(request: UIGenerationRequest):
     try:
         # Generate or select appropriate template based on data structure
         if request.template_type == "invoice":
-            template_id = await _select_best_invoice_template(request.data)
+            template_id = await _select_best_invoice_template(request.data, style=request.layout_preferences)
         else:
             # For other types, use a default template
             template_id = "default-modern"
@@ -367,15 +368,10 @@ async def get_supported_code_formats():
     }
 
 # Helper functions
-async def _select_best_invoice_template(data: Dict[str, Any]) -> str:
+async def _select_best_invoice_template(data: Dict[str, Any], style: Optional[str] = None) -> str:
     """Select the best template based on invoice data structure"""
-    # Analyze data to determine best template
-    if 'items' in data and len(data.get('items', [])) > 5:
-        return "detailed-invoice-template"
-    elif 'company' in data and 'client' in data:
-        return "professional-invoice-template"
-    else:
-        return "simple-invoice-template"
+    # Same selection as generated invoices, from the templates' precomputed features
+    return get_template_selector().select(data, style=style).id
 
 async def _select_best_template_for_data(data: Dict[str, Any]) -> str:
     """Select the best template based on general data structure"""
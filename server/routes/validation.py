@@ -2,19 +2,25 @@
 Validation API endpoints for human-in-the-loop workflow
 """
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any
 from pydantic import BaseModel, Field
 from services.orchestrator_service import get_orchestrator_service
+from services.bulk_validation_service import SOURCE_EXTRACTED, SOURCE_INVOICES
+from utils.service_container import lazy_service
 # from agents.correction_agent import CorrectionAgent  # TODO: Update to ADK agents
 # from agents.invoice_generator_agent import InvoiceGeneratorAgent  # TODO: Update to ADK agents
 # from agents.ui_invoice_generator_agent import UIInvoiceGeneratorAgent  # TODO: Update to ADK agents
 from middleware.auth import get_current_user
+import json
 import logging
 from datetime import datetime, timedelta
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/validation", tags=["validation"])
+bulk_validation_service = lazy_service("bulk_validation")
+validation_service = lazy_service("validation")
 
 # Define expected data structure models for clear documentation
 class PartyData(BaseModel):
@@ -65,6 +71,7 @@ class ResumeWorkflowRequest(BaseModel):
     workflow_id: str = Field(..., description="Workflow ID to resume")
     corrected_data: Optional[Dict[str, Any]] = Field(default=None, description="Human-corrected validation data (structured format)")
     natural_language_query: Optional[str] = Field(default=None, description="Natural language query to extract missing fields")
+    correction_session_token: Optional[str] = Field(default=None, description="Session token from a natural language preview of the same query for this workflow")
     user_notes: str = Field(default="", description="Optional notes from user")
 
 class ResumeWorkflowResponse(BaseModel):
@@ -90,6 +97,14 @@ class DirectSaveResponse(BaseModel):
     invoice_id: Optional[str] = None
     saved_at: str
 
+class BulkValidationRequest(BaseModel):
+    """Request to re-validate a user's stored invoice data in bulk"""
+    source: str = Field(default=SOURCE_EXTRACTED, description="Rows to validate: 'extracted_invoice_data' or 'invoices'")
+    user_id: Optional[str] = Field(default=None, description="Owner of the rows (admins only; defaults to the caller)")
+    page_size: int = Field(default=5000, ge=100, le=50000, description="Rows fetched, validated and written per page")
+    write_back: bool = Field(default=True, description="Store results in the rows' validation_* columns")
+    include_rows: bool = Field(default=False, description="Stream one event per invalid row in addition to page summaries")
+
 @router.get("/requirements/{workflow_id}", response_model=ValidationRequirementsResponse)
 async def get_validation_requirements(
     workflow_id: str,
@@ -114,7 +129,7 @@ async def get_validation_requirements(
             try:
                 from adk_agents.adk_integration_service import get_adk_integration_service
                 adk_service = get_adk_integration_service()
-                workflow_info = adk_service.active_workflows.get(workflow_id)
+                workflow_info = await adk_service.get_workflow_info(workflow_id)
                 logger.info(f"🔍 Checking ADK workflows for {workflow_id}, found: {workflow_info is not None}")
             except Exception as e:
                 logger.warning(f"⚠️ Could not check ADK workflows: {str(e)}")
@@ -262,7 +277,7 @@ async def resume_workflow_with_corrections(
             try:
                 from adk_agents.adk_integration_service import get_adk_integration_service
                 adk_service = get_adk_integration_service()
-                workflow_info = adk_service.active_workflows.get(request.workflow_id)
+                workflow_info = await adk_service.get_workflow_info(request.workflow_id, wake=True)
                 is_adk_workflow = True
                 logger.info(f"🔍 Using ADK workflow for resume: {request.workflow_id}")
             except Exception as e:
@@ -300,7 +315,7 @@ async def resume_workflow_with_corrections(
                 # Get current unified data or create minimal one
                 current_unified_data = workflow_state.get("unified_invoice_data")
                 if current_unified_data:
-                    current_data = UnifiedInvoiceData(**current_unified_data)
+                    current_data = UnifiedInvoiceData.from_trusted(current_unified_data)
                 else:
                     current_data = UnifiedInvoiceData(
                         client=None, service_provider=None, payment_terms=None,
@@ -316,7 +331,10 @@ async def resume_workflow_with_corrections(
                     query=natural_language_query,
                     current_invoice_data=current_data,
                     missing_fields=missing_fields,
-                    validation_issues=validation_issues
+                    validation_issues=validation_issues,
+                    session_token=request.correction_session_token,
+                    user_id=current_user["user_id"],
+                    workflow_id=request.workflow_id
                 )
                 
                 if extraction_result.get("success"):
@@ -345,10 +363,21 @@ async def resume_workflow_with_corrections(
         # Apply corrections to unified data if available
         if "unified_invoice_data" in workflow_state and corrections_to_apply:
             try:
-                unified_data = UnifiedInvoiceData(**workflow_state["unified_invoice_data"])
+                unified_data = UnifiedInvoiceData.from_trusted(workflow_state["unified_invoice_data"])
                 corrected_unified = unified_data.apply_manual_corrections(corrections_to_apply)
                 workflow_state["unified_invoice_data"] = corrected_unified.model_dump()
                 logger.info(f"✅ Applied corrections to unified invoice data")
+                
+                # Refresh validation results for the correction agent, re-running only the affected rules
+                validation_result = validation_service.revalidate_changed_fields(
+                    invoice_data=corrected_unified,
+                    user_id=workflow_state.get("user_id"),
+                    contract_name=workflow_state.get("contract_name"),
+                    changed_fields=list(corrections_to_apply),
+                    snapshot=workflow_state.get("validation_rule_snapshot")
+                )
+                workflow_state["validation_results"] = validation_result.to_state_dict()
+                workflow_state["validation_rule_snapshot"] = validation_result.rule_snapshot
             except Exception as e:
                 logger.error(f"❌ Failed to apply corrections to unified data: {e}")
         
@@ -442,10 +471,7 @@ async def resume_workflow_with_corrections(
                     human_input_data
                 )
                 
-                # Update stored state
-                adk_service.active_workflows[request.workflow_id]["state"] = final_state
-                adk_service.active_workflows[request.workflow_id]["last_resumed_at"] = datetime.now().isoformat()
-                
+                # The ADK service stores the final state (or hibernates it again if more input is needed)
                 return ResumeWorkflowResponse(
                     success=True,
                     message="ADK workflow resumed and completed successfully",
@@ -499,9 +525,15 @@ async def resume_workflow_with_corrections(
             workflow_state["error"] = str(agent_error)
             workflow_state["failed_at"] = datetime.now().isoformat()
             
-            # Update stored state based on workflow type
+            # Update stored state based on workflow type. A failed ADK resume of a hibernated
+            # workflow has already been returned to the review queue unchanged.
+            status = "FAILED"
             if is_adk_workflow:
-                adk_service.active_workflows[request.workflow_id]["state"] = workflow_state
+                if request.workflow_id in adk_service.active_workflows:
+                    adk_service.register_workflow(workflow_state, workflow_info.get("request") or {})
+                    await adk_service.hibernate_if_paused(request.workflow_id)
+                else:
+                    status = current_status
             else:
                 orchestrator_service.active_workflows[request.workflow_id]["state"] = workflow_state
             
@@ -509,7 +541,7 @@ async def resume_workflow_with_corrections(
                 success=False,
                 message=f"Workflow resumed but failed during processing: {str(agent_error)}",
                 workflow_id=request.workflow_id,
-                status="FAILED",
+                status=status,
                 final_invoice_ready=False,
                 ui_template_ready=False
             )
@@ -551,7 +583,7 @@ async def save_invoice_data_directly(
             try:
                 from adk_agents.adk_integration_service import get_adk_integration_service
                 adk_service = get_adk_integration_service()
-                workflow_info = adk_service.active_workflows.get(request.workflow_id)
+                workflow_info = await adk_service.get_workflow_info(request.workflow_id, wake=True)
                 is_adk_workflow = True
                 logger.info(f"🔍 Using ADK workflow for direct save: {request.workflow_id}")
             except Exception as e:
@@ -684,7 +716,8 @@ async def save_invoice_data_directly(
             
             # Update stored workflow state
             if is_adk_workflow:
-                adk_service.active_workflows[request.workflow_id]["state"] = workflow_state
+                adk_service.register_workflow(workflow_state, workflow_info.get("request") or {})
+                await adk_service.hibernate_if_paused(request.workflow_id)
             else:
                 orchestrator_service.active_workflows[request.workflow_id]["state"] = workflow_state
             
@@ -711,6 +744,45 @@ async def save_invoice_data_directly(
             detail=f"Failed to save invoice data: {str(e)}"
         )
 
+@router.post("/bulk")
+async def bulk_validate(
+    request: BulkValidationRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Re-validate every stored invoice row of a user, e.g. after a rule change
+    
+    The report is streamed as newline-delimited JSON: one ``page`` event per
+    page as it completes (plus ``row`` events for invalid rows when
+    ``include_rows`` is set) and a final ``summary`` event.
+    """
+    if request.source not in (SOURCE_EXTRACTED, SOURCE_INVOICES):
+        raise HTTPException(
+            status_code=400,
+            detail=f"source must be '{SOURCE_EXTRACTED}' or '{SOURCE_INVOICES}'"
+        )
+    
+    user_id = current_user["user_id"]
+    if request.user_id and current_user.get("is_admin", False):
+        user_id = request.user_id
+    
+    async def report_stream():
+        try:
+            async for event in bulk_validation_service.revalidate(
+                user_id=user_id,
+                source=request.source,
+                page_size=request.page_size,
+                write_back=request.write_back,
+                include_rows=request.include_rows
+            ):
+                yield json.dumps(event, default=str) + "\n"
+        except Exception as e:
+            # Headers are already sent, so the failure is reported in-band
+            logger.error(f"❌ Bulk validation failed for user {user_id}: {str(e)}")
+            yield json.dumps({"event": "error", "error": str(e)}) + "\n"
+    
+    return StreamingResponse(report_stream(), media_type="application/x-ndjson")
+
 @router.get("/status/{workflow_id}")
 async def get_workflow_validation_status(
     workflow_id: str,
@@ -122,6 +122,9 @@ class InvoiceGenerationResponse(BaseModel):
     invoice_data: ContractInvoiceData
     raw_response: Optional[str] = None
     confidence_score: Optional[float] = None
+    field_confidence: Optional[Dict[str, float]] = None  # Per-field confidence from rule-based pre-extraction
+    extraction_method: Optional[str] = None  # "rules", "rules+llm" or "llm"
+    confidence_signals: Optional[Dict[str, Optional[float]]] = None  # Inputs for the confidence model (retrieval, agreement, extraction confidence)
     generated_at: str
 
 
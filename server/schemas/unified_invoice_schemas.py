@@ -1,9 +1,12 @@
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, EmailStr, Field, PrivateAttr, validator
 from typing import List, Optional, Dict, Any, Union
 from datetime import datetime, date
 from decimal import Decimal
 from enum import Enum
+import functools
+import re
 import uuid
+import weakref
 
 
 class ContractType(str, Enum):
@@ -57,7 +60,63 @@ class CurrencyCode(str, Enum):
     JPY = "JPY"
 
 
-class UnifiedParty(BaseModel):
+class _TrackedModel(BaseModel):
+    """
+    Base for the models nested in UnifiedInvoiceData
+
+    Assigning a field invalidates the cached views of the invoices holding the
+    model (see ``UnifiedInvoiceData.invalidate_views``).
+    """
+    _owners: List[weakref.ReferenceType] = PrivateAttr(default_factory=list)
+
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        if not name.startswith("_") and self._owners:
+            live = []
+            for ref in self._owners:
+                owner = ref()
+                if owner is not None:
+                    owner.invalidate_views()
+                    live.append(ref)
+            self._owners = live
+
+    def _adopt(self, owner: "UnifiedInvoiceData") -> None:
+        if not any(ref() is owner for ref in self._owners):
+            self._owners.append(weakref.ref(owner))
+
+
+def _copy_view(value: Any) -> Any:
+    """Copy the dict/list structure of a cached view; leaf values are immutable or shared"""
+    if isinstance(value, dict):
+        return {key: _copy_view(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_view(item) for item in value]
+    return value
+
+
+def _cached_view(method):
+    """
+    Cache a derived dict view on the instance until the invoice is modified
+
+    Callers get a copy of the cached dict, so mutating it is safe.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self):
+        views = self._views
+        if name not in views:
+            views[name] = method(self)
+        return _copy_view(views[name])
+    return wrapper
+
+
+def _enum_value(value: Any) -> Any:
+    """Plain value of an enum field (``use_enum_values`` stores values, but assigned enums are kept)"""
+    return value.value if hasattr(value, 'value') else value
+
+
+class UnifiedParty(_TrackedModel):
     """Unified party information structure"""
     name: str
     email: Optional[EmailStr] = None
@@ -78,7 +137,7 @@ class UnifiedParty(BaseModel):
         use_enum_values = True
 
 
-class UnifiedPaymentTerms(BaseModel):
+class UnifiedPaymentTerms(_TrackedModel):
     """Unified payment terms structure"""
     amount: Optional[Union[Decimal, float, str]] = None
     currency: CurrencyCode = CurrencyCode.USD
@@ -129,7 +188,7 @@ class UnifiedPaymentTerms(BaseModel):
         use_enum_values = True
 
 
-class UnifiedServiceItem(BaseModel):
+class UnifiedServiceItem(_TrackedModel):
     """Unified service/item structure"""
     description: str
     quantity: Optional[float] = 1.0
@@ -149,7 +208,7 @@ class UnifiedServiceItem(BaseModel):
         return Decimal(str(v))
 
 
-class UnifiedInvoiceTotals(BaseModel):
+class UnifiedInvoiceTotals(_TrackedModel):
     """Unified invoice totals structure"""
     subtotal: Union[Decimal, float] = 0.0
     tax_amount: Union[Decimal, float] = 0.0
@@ -167,13 +226,14 @@ class UnifiedInvoiceTotals(BaseModel):
         return v if v is not None else 0.0
 
 
-class UnifiedInvoiceMetadata(BaseModel):
+class UnifiedInvoiceMetadata(_TrackedModel):
     """Unified metadata structure"""
     workflow_id: Optional[str] = None
     user_id: Optional[str] = None
     confidence_score: Optional[float] = Field(None, ge=0.0, le=1.0)
     quality_score: Optional[float] = Field(None, ge=0.0, le=1.0)
     validation_score: Optional[float] = Field(None, ge=0.0, le=1.0)
+    extraction_signals: Optional[Dict[str, Optional[float]]] = None  # Retrieval/extraction signals for confidence scoring
     human_input_applied: bool = False
     human_reviewed: bool = False
     generated_by: Optional[str] = "smart_invoice_scheduler"
@@ -184,6 +244,59 @@ class UnifiedInvoiceMetadata(BaseModel):
     extracted_at: Optional[datetime] = None
 
 
+_EMAIL_SHAPE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+_CURRENCY_VALUES = frozenset(currency.value for currency in CurrencyCode)
+_FREQUENCY_VALUES = frozenset(frequency.value for frequency in InvoiceFrequency)
+_CONTRACT_TYPE_VALUES = frozenset(contract_type.value for contract_type in ContractType)
+_ROLE_VALUES = frozenset(role.value for role in PartyRole)
+_STATUS_VALUES = frozenset(status.value for status in InvoiceStatus)
+
+
+def _is_amount(value: Any) -> bool:
+    return value is None or isinstance(value, Decimal)
+
+
+def _is_validated_dump(data: Dict[str, Any]) -> bool:
+    """Cheap check that ``data`` holds the value types the UnifiedInvoiceData validators produce"""
+    metadata = data.get("metadata")
+    if not isinstance(metadata, dict) or not isinstance(metadata.get("created_at"), datetime):
+        return False
+    if not data.get("invoice_number") or data.get("status") not in _STATUS_VALUES:
+        return False
+    if data.get("contract_type") not in _CONTRACT_TYPE_VALUES and data.get("contract_type") is not None:
+        return False
+    if data.get("invoice_frequency") not in _FREQUENCY_VALUES and data.get("invoice_frequency") is not None:
+        return False
+    for party in (data.get("client"), data.get("service_provider")):
+        if party is None:
+            continue
+        if not isinstance(party, dict) or not isinstance(party.get("name"), str) or party.get("role") not in _ROLE_VALUES:
+            return False
+        email = party.get("email")
+        if email is not None and not (isinstance(email, str) and _EMAIL_SHAPE.fullmatch(email)):
+            return False
+    terms = data.get("payment_terms")
+    if terms is not None:
+        if not isinstance(terms, dict) or terms.get("currency") not in _CURRENCY_VALUES:
+            return False
+        if terms.get("frequency") is not None and terms.get("frequency") not in _FREQUENCY_VALUES:
+            return False
+        if not (_is_amount(terms.get("amount")) and _is_amount(terms.get("late_fee"))):
+            return False
+        if terms.get("due_days") is not None and type(terms.get("due_days")) is not int:
+            return False
+    services = data.get("services")
+    if not isinstance(services, list):
+        return False
+    for service in services:
+        if not isinstance(service, dict) or not isinstance(service.get("description"), str):
+            return False
+        if not (_is_amount(service.get("unit_price")) and _is_amount(service.get("total_amount"))):
+            return False
+    totals = data.get("totals")
+    return isinstance(totals, dict) and all(isinstance(value, (Decimal, float, int)) for value in totals.values())
+
+
 class UnifiedInvoiceData(BaseModel):
     """
     Unified Invoice Data Structure
@@ -236,6 +349,86 @@ class UnifiedInvoiceData(BaseModel):
     # === METADATA ===
     metadata: UnifiedInvoiceMetadata = Field(default_factory=UnifiedInvoiceMetadata)
     
+    # Derived views (model_dump, legacy, correction agent and database formats) by name
+    _views: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    
+    def model_post_init(self, __context: Any) -> None:
+        self._adopt_children()
+    
+    def _adopt_children(self) -> None:
+        for child in [self.client, self.service_provider, self.payment_terms, self.totals, self.metadata, *self.services]:
+            if isinstance(child, _TrackedModel):
+                child._adopt(self)
+    
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self.invalidate_views()
+            self._adopt_children()
+    
+    def __copy__(self):
+        copied = super().__copy__()
+        copied._views = {}  # would otherwise be shared with this instance
+        copied._adopt_children()
+        return copied
+    
+    def __deepcopy__(self, memo: Optional[Dict[int, Any]] = None):
+        copied = super().__deepcopy__(memo)
+        copied._views = {}
+        copied._adopt_children()
+        return copied
+    
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "UnifiedInvoiceData":
+        copied = super().model_copy(update=update, deep=deep)
+        copied._adopt_children()  # models passed in ``update``
+        return copied
+    
+    def invalidate_views(self) -> None:
+        """
+        Drop cached views
+        
+        Field assignments on the invoice and its nested models do this
+        automatically; call it after in-place changes such as ``services.append``.
+        """
+        self._views.clear()
+    
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]) -> "UnifiedInvoiceData":
+        """
+        Rebuild from a ``model_dump()`` made in this process, skipping validation
+        
+        Workflow state keeps invoices as ``model_dump()`` dicts and agents turn
+        them back into models several times per run; re-running every validator
+        (email validation above all) on already-validated data is the most
+        expensive part of that. Data whose values don't have the types the
+        validators produce - raw corrections merged into the dict, or a JSON
+        round trip that turned Decimals and datetimes into strings - is
+        validated normally.
+        """
+        if not _is_validated_dump(data):
+            return cls(**data)
+        
+        fields = dict(data)
+        for name, model in (("client", UnifiedParty), ("service_provider", UnifiedParty),
+                            ("payment_terms", UnifiedPaymentTerms), ("totals", UnifiedInvoiceTotals),
+                            ("metadata", UnifiedInvoiceMetadata)):
+            if isinstance(fields.get(name), dict):
+                fields[name] = model.model_construct(**fields[name])
+        fields["services"] = [
+            UnifiedServiceItem.model_construct(**service) if isinstance(service, dict) else service
+            for service in fields.get("services") or []
+        ]
+        return cls.model_construct(**fields)
+    
+    def model_dump(self, **kwargs) -> Dict[str, Any]:
+        if kwargs:
+            return super().model_dump(**kwargs)
+        return self._cached_model_dump()
+    
+    @_cached_view
+    def _cached_model_dump(self) -> Dict[str, Any]:
+        return super().model_dump()
+    
     @validator('invoice_number', always=True)
     def set_invoice_number(cls, v, values):
         if v:
@@ -298,11 +491,12 @@ class UnifiedInvoiceData(BaseModel):
             return None
         return v
     
+    @_cached_view
     def to_legacy_contract_invoice_data(self) -> Dict[str, Any]:
         """Convert to legacy ContractInvoiceData format for backward compatibility"""
         return {
             "contract_title": self.contract_title,
-            "contract_type": self.contract_type.value if self.contract_type else None,
+            "contract_type": _enum_value(self.contract_type) if self.contract_type else None,
             "contract_number": self.contract_number,
             "client": self.client.model_dump() if self.client else None,
             "service_provider": self.service_provider.model_dump() if self.service_provider else None,
@@ -311,7 +505,7 @@ class UnifiedInvoiceData(BaseModel):
             "effective_date": self.effective_date,
             "payment_terms": self.payment_terms.model_dump() if self.payment_terms else None,
             "services": [service.model_dump() for service in self.services],
-            "invoice_frequency": (self.invoice_frequency.value if hasattr(self.invoice_frequency, 'value') else self.invoice_frequency) if self.invoice_frequency else None,
+            "invoice_frequency": _enum_value(self.invoice_frequency) if self.invoice_frequency else None,
             "first_invoice_date": self.first_invoice_date,
             "next_invoice_date": self.next_invoice_date,
             "special_terms": self.special_terms,
@@ -320,6 +514,7 @@ class UnifiedInvoiceData(BaseModel):
             "extracted_at": self.metadata.extracted_at or self.metadata.created_at
         }
     
+    @_cached_view
     def to_correction_agent_format(self) -> Dict[str, Any]:
         """Convert to correction agent's expected format"""
         return {
@@ -337,7 +532,7 @@ class UnifiedInvoiceData(BaseModel):
                 "service_provider": self.service_provider.model_dump() if self.service_provider else {}
             },
             "contract_details": {
-                "contract_type": self.contract_type.value if self.contract_type else None,
+                "contract_type": _enum_value(self.contract_type) if self.contract_type else None,
                 "start_date": str(self.start_date) if self.start_date else None,
                 "end_date": str(self.end_date) if self.end_date else None,
                 "effective_date": str(self.effective_date) if self.effective_date else None
@@ -345,7 +540,7 @@ class UnifiedInvoiceData(BaseModel):
             "payment_information": self.payment_terms.model_dump() if self.payment_terms else {},
             "services_and_items": [service.model_dump() for service in self.services],
             "invoice_schedule": {
-                "frequency": (self.invoice_frequency.value if hasattr(self.invoice_frequency, 'value') else self.invoice_frequency) if self.invoice_frequency else None,
+                "frequency": _enum_value(self.invoice_frequency) if self.invoice_frequency else None,
                 "first_invoice_date": str(self.first_invoice_date) if self.first_invoice_date else None,
                 "next_invoice_date": str(self.next_invoice_date) if self.next_invoice_date else None
             },
@@ -358,6 +553,7 @@ class UnifiedInvoiceData(BaseModel):
             "metadata": self.metadata.model_dump()
         }
     
+    @_cached_view
     def to_database_format(self) -> Dict[str, Any]:
         """Convert to format expected by database service"""
         return {
@@ -376,7 +572,7 @@ class UnifiedInvoiceData(BaseModel):
             "payment_information": self.payment_terms.model_dump() if self.payment_terms else {},
             "totals": self.totals.model_dump() if self.totals else {},
             "contract_details": {
-                "contract_type": self.contract_type.value if self.contract_type else None,
+                "contract_type": _enum_value(self.contract_type) if self.contract_type else None,
                 "contract_title": self.contract_title
             },
             "metadata": self.metadata.model_dump(),
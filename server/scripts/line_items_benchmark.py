@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Line Items Benchmark Script
+
+Renders service line-item rows for statements of increasing size with the
+previous ``rows_html += f"..."`` loop and with ``render_line_items``, and
+reports the time per row; a constant time per row means rendering is linear
+in the number of line items. Results are printed as JSON:
+
+    python scripts/line_items_benchmark.py --sizes 100 1000 10000
+"""
+
+import argparse
+import html
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.line_items import render_line_items  # noqa: E402
+
+
+def legacy_rows(services):
+    """The string-concatenating row builder this benchmark compares against"""
+    rows_html = ""
+    for service in services:
+        description = html.escape(str(service.get('description', 'Service')))
+        quantity = html.escape(str(service.get('quantity', 1)))
+        unit_price = html.escape(f"{float(service.get('unit_price', 0)):.2f}")
+        total = html.escape(f"{float(service.get('total_amount', 0)):.2f}")
+
+        rows_html += f"""
+            <tr>
+                <td>{description}</td>
+                <td>{quantity}</td>
+                <td>${unit_price}</td>
+                <td>${total}</td>
+            </tr>
+            """
+    return rows_html.strip()
+
+
+def make_services(count):
+    return [
+        {
+            "description": f"Utility charge {index} - electricity & water <meter {index % 17}>",
+            "quantity": index % 40 + 1,
+            "unit_price": 12.5 + index % 9,
+            "total_amount": (index % 40 + 1) * (12.5 + index % 9),
+        }
+        for index in range(count)
+    ]
+
+
+def measure(fn, services, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(services)
+    seconds = (time.perf_counter() - started) / repeat
+    return {"milliseconds": round(seconds * 1e3, 3), "microseconds_per_row": round(seconds / len(services) * 1e6, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare line item row rendering for growing statements")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="Line items per statement")
+    parser.add_argument("--repeat", type=int, default=5, help="Renders per size and mode")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        services = make_services(size)
+        results.append({
+            "line_items": size,
+            "string_concatenation": measure(legacy_rows, services, args.repeat),
+            "line_item_table": measure(render_line_items, services, args.repeat),
+        })
+    print(json.dumps({"repeat": args.repeat, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Sanitizer Benchmark Script
+
+Compares template sanitization over the invoice templates in
+``templates/invoices``:
+
+- ``regex_pipeline``: the previous implementation - twelve dangerous-pattern
+  regexes, seven inline-style regexes, a placeholder scan and the
+  substring-based structure and safety checks, on every call
+- ``tokenizer``: ``scan_template`` with its memo cleared before every round,
+  so each template is tokenized once per round
+- ``tokenizer_memoized``: ``scan_template`` as used at runtime, where an
+  unchanged template is only scanned once
+
+Each mode sanitizes, validates the structure of and safety-checks every
+template. Results are printed as JSON:
+
+    python scripts/sanitizer_benchmark.py --rounds 50
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.html_sanitizer import HTMLSanitizer, TemplateValidator, scan_template  # noqa: E402
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates" / "invoices"
+
+LEGACY_DANGEROUS_PATTERNS = [
+    r'javascript:',
+    r'data:text/html',
+    r'vbscript:',
+    r'on\w+\s*=',
+    r'<script[^>]*>.*?</script>',
+    r'<iframe[^>]*>.*?</iframe>',
+    r'<object[^>]*>.*?</object>',
+    r'<embed[^>]*>.*?</embed>',
+    r'<form[^>]*>.*?</form>',
+    r'<input[^>]*>',
+    r'<button[^>]*>.*?</button>',
+    r'<link[^>]*>'
+]
+LEGACY_DANGEROUS_CSS = [
+    r'expression\s*\(',
+    r'javascript:',
+    r'@import',
+    r'behavior\s*:',
+    r'-moz-binding',
+    r'-webkit-binding',
+    r'binding\s*:'
+]
+
+
+def legacy_regex_pipeline(content):
+    """The multi-pass regex sanitizer and checks this benchmark compares against"""
+    sanitized = content
+    for pattern in LEGACY_DANGEROUS_PATTERNS:
+        sanitized = re.sub(pattern, '', sanitized, flags=re.IGNORECASE | re.DOTALL)
+    for pattern in LEGACY_DANGEROUS_CSS:
+        sanitized = re.sub(pattern, '', sanitized, flags=re.IGNORECASE)
+    placeholders = set(re.findall(r'\{\{([A-Z_]+)\}\}', sanitized))
+    unexpected = placeholders - HTMLSanitizer.EXPECTED_PLACEHOLDERS
+
+    errors = []
+    if not content.strip().startswith('<!DOCTYPE html>'):
+        errors.append("Missing DOCTYPE declaration")
+    if '<html>' not in content or '</html>' not in content:
+        errors.append("Missing HTML tags")
+    if '<head>' not in content or '</head>' not in content:
+        errors.append("Missing HEAD section")
+    if '<body>' not in content or '</body>' not in content:
+        errors.append("Missing BODY section")
+    if '<link' in content.lower():
+        errors.append("External stylesheets not allowed - use embedded CSS only")
+    if 'src=' in content and 'http' in content:
+        errors.append("External resources not allowed")
+    for placeholder in ['{{INVOICE_NUMBER}}', '{{CLIENT_NAME}}', '{{PROVIDER_NAME}}']:
+        if placeholder not in content:
+            errors.append(f"Missing required placeholder: {placeholder}")
+
+    content_lower = content.lower()
+    safe = not any(pattern in content_lower for pattern in ['<script', 'javascript:', 'on=', 'onerror', 'onclick'])
+    return sanitized, unexpected, errors, safe
+
+
+def tokenizer_pipeline(content):
+    sanitized = HTMLSanitizer.sanitize_html_template(content)
+    errors = TemplateValidator.validate_template_structure(content)
+    safe = TemplateValidator.is_template_safe(content)
+    return sanitized, errors, safe
+
+
+def measure(label, fn, templates, rounds, before_round=None):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        if before_round:
+            before_round()
+        for content in templates:
+            fn(content)
+    seconds = time.perf_counter() - started
+    calls = rounds * len(templates)
+    return {
+        "mode": label,
+        "seconds": round(seconds, 4),
+        "microseconds_per_template": round(seconds / calls * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the tokenizer sanitizer with the regex pipeline")
+    parser.add_argument("--rounds", type=int, default=50, help="Passes over all templates per mode")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    templates = [path.read_text(encoding="utf-8") for path in sorted(TEMPLATES_DIR.glob("*.html"))]
+    size = sum(len(content) for content in templates)
+
+    scan_template.cache_clear()
+    report = {
+        "templates": len(templates),
+        "average_template_bytes": size // max(len(templates), 1),
+        "rounds": args.rounds,
+        "results": [
+            measure("regex_pipeline", legacy_regex_pipeline, templates, args.rounds),
+            measure("tokenizer", tokenizer_pipeline, templates, args.rounds, before_round=scan_template.cache_clear),
+            measure("tokenizer_memoized", tokenizer_pipeline, templates, args.rounds),
+        ],
+        # Templates whose output differs from the regex pipeline (comments dropped, attributes
+        # such as content= no longer mangled by the on\w+= pattern, ...)
+        "outputs_differing_from_regex_pipeline": sum(
+            legacy_regex_pipeline(content)[0] != scan_template(content).html for content in templates
+        ),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
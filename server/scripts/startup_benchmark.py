@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark Script
+
+Measures how long the Smart Invoice Scheduler takes to become useful:
+
+- import time of ``main`` and ``routes.routes`` (what ``main.lifespan`` imports),
+  with the slowest modules from ``python -X importtime``
+- time-to-first-response: spawn uvicorn, poll ``/health`` until it answers,
+  then time the first request to an API route
+
+Results are printed as JSON and can be compared with a previous run:
+
+    python scripts/startup_benchmark.py --output startup.json
+    python scripts/startup_benchmark.py --baseline startup.json
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+
+
+def measure_import_time(module_names, top=15):
+    """Import modules in a fresh interpreter and parse ``-X importtime`` output"""
+    code = "import time; t = time.perf_counter()\n"
+    code += "".join(f"import {name}\n" for name in module_names)
+    code += "print(time.perf_counter() - t)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SERVER_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr else "import failed"}
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [part.strip() for part in line[len("import time:"):].split("|")]
+        if len(parts) != 3 or not parts[1].isdigit():
+            continue
+        modules.append((int(parts[1]), parts[2].strip()))
+    modules.sort(reverse=True)
+
+    return {
+        "modules": module_names,
+        "wall_seconds": round(float(result.stdout.strip().splitlines()[-1]), 3),
+        "modules_imported": len(modules),
+        "slowest_cumulative_ms": [
+            {"module": name, "ms": round(micros / 1000, 1)} for micros, name in modules[:top]
+        ],
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(url, timeout=30):
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - started
+
+
+def measure_first_response(first_path, timeout=120.0, env=None):
+    """Start uvicorn and time health readiness plus the first API request"""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=SERVER_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        env={**os.environ, **(env or {})}
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        ready_at = None
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                return {"error": f"uvicorn exited with code {process.returncode}"}
+            try:
+                status, _ = _get(f"{base_url}/health", timeout=2)
+                if status == 200:
+                    ready_at = time.perf_counter() - started
+                    break
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                time.sleep(0.05)
+        if ready_at is None:
+            return {"error": f"/health not ready after {timeout}s"}
+
+        first_status, first_seconds = _get(f"{base_url}{first_path}")
+        second_status, second_seconds = _get(f"{base_url}{first_path}")
+        return {
+            "health_ready_seconds": round(ready_at, 3),
+            "first_request": {"path": first_path, "status": first_status, "seconds": round(first_seconds, 3)},
+            "second_request": {"path": first_path, "status": second_status, "seconds": round(second_seconds, 3)},
+            "time_to_first_response_seconds": round(ready_at + first_seconds, 3),
+        }
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def compare(current, baseline):
+    """Relative change for the headline numbers"""
+    def pick(report):
+        return {
+            "import_seconds": report.get("import", {}).get("wall_seconds"),
+            "health_ready_seconds": report.get("server", {}).get("health_ready_seconds"),
+            "time_to_first_response_seconds": report.get("server", {}).get("time_to_first_response_seconds"),
+        }
+
+    now, before = pick(current), pick(baseline)
+    return {
+        key: {
+            "baseline": before[key],
+            "current": now[key],
+            "change_pct": round((now[key] - before[key]) / before[key] * 100, 1) if now[key] and before[key] else None,
+        }
+        for key in now
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and time-to-first-response")
+    parser.add_argument("--first-path", default="/api/v1/adk/workflow/health",
+                        help="API route timed as the first real request")
+    parser.add_argument("--skip-server", action="store_true", help="Only measure import time")
+    parser.add_argument("--warmup", default="", help="Value for STARTUP_WARMUP in the spawned server")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Compare against a previous JSON report")
+    args = parser.parse_args()
+
+    report = {
+        "python": sys.version.split()[0],
+        "import": measure_import_time(["main", "routes.routes"]),
+    }
+    if not args.skip_server:
+        report["server"] = measure_first_response(args.first_path, env={"STARTUP_WARMUP": args.warmup})
+    if args.baseline:
+        with open(args.baseline) as handle:
+            report["comparison"] = compare(report, json.load(handle))
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
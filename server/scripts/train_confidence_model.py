@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Confidence Model Training Script
+
+Trains the logistic confidence model (``services/confidence_model.py``) offline
+from invoice history. Each example is the ``confidence_features`` recorded at
+an invoice's first validation, labelled 1 if it went through without a human
+correction and 0 if ``corrected_by_human`` is set.
+
+Examples come from ``extracted_invoice_data`` or from a JSONL export with one
+``{"confidence_features": {...}, "corrected_by_human": bool}`` object per line.
+A fifth of the examples is held out to compare the trained model with the
+current one; the evaluation is printed as JSON and the model is written to
+``--output`` (the path ``CONFIDENCE_MODEL_PATH`` points to by default):
+
+    python scripts/train_confidence_model.py --input history.jsonl
+    python scripts/train_confidence_model.py --from-db --output services/confidence_model.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.confidence_model import (  # noqa: E402
+    evaluate_confidence_model,
+    get_confidence_model,
+    train_confidence_model,
+)
+
+DEFAULT_OUTPUT = Path(__file__).resolve().parent.parent / "services" / "confidence_model.json"
+
+
+def load_jsonl(path):
+    examples = []
+    with open(path) as handle:
+        for line in handle:
+            if line.strip():
+                record = json.loads(line)
+                if record.get("confidence_features"):
+                    examples.append((record["confidence_features"], 0 if record.get("corrected_by_human") else 1))
+    return examples
+
+
+async def load_from_db(limit):
+    from sqlalchemy import select
+    from db.postgresdb import AsyncSessionLocal
+    from models.database_models import ExtractedInvoiceData
+
+    stmt = (
+        select(ExtractedInvoiceData.confidence_features, ExtractedInvoiceData.corrected_by_human)
+        .where(ExtractedInvoiceData.confidence_features.isnot(None))
+        .order_by(ExtractedInvoiceData.correction_timestamp.desc())
+        .limit(limit)
+    )
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(stmt)
+        return [(features, 0 if corrected else 1) for features, corrected in result.all()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the invoice confidence model")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="JSONL export of labelled confidence features")
+    source.add_argument("--from-db", action="store_true", help="Read labelled rows from extracted_invoice_data")
+    parser.add_argument("--limit", type=int, default=50000, help="Most recent rows to read from the database")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="Where to write the trained model")
+    parser.add_argument("--threshold", type=float, default=0.9, help="Auto-approve threshold used for the pause rate")
+    parser.add_argument("--l2", type=float, default=0.01, help="L2 penalty")
+    parser.add_argument("--epochs", type=int, default=300, help="Gradient descent steps")
+    parser.add_argument("--dry-run", action="store_true", help="Evaluate without writing the model")
+    args = parser.parse_args()
+
+    examples = load_jsonl(args.input) if args.input else asyncio.run(load_from_db(args.limit))
+    if len(examples) < 20:
+        sys.exit(f"Need at least 20 labelled examples, found {len(examples)}")
+
+    random.Random(13).shuffle(examples)
+    split = max(1, len(examples) // 5)
+    held_out, training = examples[:split], examples[split:]
+    rows, labels = [row for row, _ in training], [label for _, label in training]
+    test_rows, test_labels = [row for row, _ in held_out], [label for _, label in held_out]
+
+    model = train_confidence_model(rows, labels, l2=args.l2, epochs=args.epochs)
+    current = get_confidence_model()
+    report = {
+        "examples": len(examples),
+        "held_out": len(held_out),
+        "current": evaluate_confidence_model([current.predict(row) for row in test_rows], test_labels, args.threshold),
+        "trained": evaluate_confidence_model([model.predict(row) for row in test_rows], test_labels, args.threshold),
+        "model": model.to_dict(),
+    }
+    print(json.dumps(report, indent=2))
+
+    if not args.dry_run:
+        # Refit on everything before writing
+        final = train_confidence_model([row for row, _ in examples], [label for _, label in examples],
+                                       l2=args.l2, epochs=args.epochs)
+        final.save(args.output)
+        print(f"Wrote model to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
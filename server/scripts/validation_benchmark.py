@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Validation Benchmark Script
+
+Measures invoice validation throughput with the compiled rule set:
+
+- ``validate_unified_invoice_data`` called once per invoice
+- ``validate_unified_invoice_batch`` over the whole book
+- the bulk validation pipeline without the database: stored-row mapping,
+  paged batch validation and report aggregation
+
+Invoices are synthetic ``model_dump()``-shaped dicts with a realistic mix of
+clean records, missing fields and malformed values. Results are printed as JSON:
+
+    python scripts/validation_benchmark.py --invoices 20000
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.validation_service import InvoiceDataValidationService  # noqa: E402
+from services.bulk_validation_service import BulkValidationReport, extracted_row_to_dict  # noqa: E402
+
+
+class _Dumped:
+    """Minimal stand-in for UnifiedInvoiceData (validation only calls ``model_dump``)"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def model_dump(self):
+        return self.data
+
+
+def build_invoices(count, seed=7):
+    rnd = random.Random(seed)
+    currencies = ["USD", "USD", "EUR", "INR", "GBP", "usd"]
+    frequencies = ["monthly", "monthly", "quarterly", "annually", "monthy", None]
+    invoices = []
+    for index in range(count):
+        invoices.append({
+            "invoice_number": f"INV-{index:06d}",
+            "invoice_date": rnd.choice(["2024-01-01", "2024-02-01", "01/03/2024", "soon"]),
+            "contract_title": f"Contract {index % 500}",
+            "contract_type": rnd.choice(["rental_lease", "service_agreement", "consulting"]),
+            "start_date": "2024-01-01",
+            "end_date": rnd.choice(["2024-12-31", None]),
+            "client": {
+                "name": rnd.choice([f"Client {index % 1000}", ""]),
+                "email": rnd.choice([f"client{index % 1000}@example.com", "invalid-email", None]),
+            },
+            "service_provider": {"name": f"Provider {index % 50}", "email": f"billing{index % 50}@provider.com"},
+            "payment_terms": {
+                "amount": rnd.choice([1200.0, 2500.0, 0, 15000.0, 750.5]),
+                "currency": rnd.choice(currencies),
+                "frequency": rnd.choice(frequencies),
+                "due_days": rnd.choice([15, 30, 45]),
+            },
+            "invoice_frequency": rnd.choice(["monthly", "quarterly"]),
+        })
+    return invoices
+
+
+def build_extracted_rows(invoices):
+    """``extracted_invoice_data`` rows (as selected by the bulk service) plus their contract parties"""
+    rows, parties = [], {}
+    for index, invoice in enumerate(invoices):
+        contract_id = f"contract-{index}"
+        terms = invoice["payment_terms"]
+        rows.append({
+            "id": f"{index:08d}", "contract_id": contract_id, "invoice_frequency": terms["frequency"],
+            "first_invoice_date": None, "next_invoice_date": None, "payment_amount": terms["amount"],
+            "currency": terms["currency"], "payment_due_days": terms["due_days"], "late_fee": None,
+            "corrected_invoice_data": None,
+        })
+        parties[contract_id] = [
+            {**invoice["client"], "phone": None, "address": None, "role": "tenant"},
+            {**invoice["service_provider"], "phone": None, "address": None, "role": "landlord"},
+        ]
+    return rows, parties
+
+
+def run_bulk_pipeline(service, rows, parties, page_size):
+    report = BulkValidationReport("extracted_invoice_data", "bench")
+    for start in range(0, len(rows), page_size):
+        page = rows[start:start + page_size]
+        dicts = [extracted_row_to_dict(row, parties[row["contract_id"]]) for row in page]
+        report.add_page([row["id"] for row in page], service.validate_unified_invoice_batch(dicts, "bench"))
+    return report.summary(written=0)
+
+
+def measure(label, fn, count):
+    started = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - started
+    return {"mode": label, "seconds": round(seconds, 3), "invoices_per_second": round(count / seconds, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure invoice validation throughput")
+    parser.add_argument("--invoices", type=int, default=10000, help="Number of synthetic invoices")
+    parser.add_argument("--page-size", type=int, default=5000, help="Page size for the bulk pipeline")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    service = InvoiceDataValidationService()
+    invoices = build_invoices(args.invoices)
+    wrapped = [_Dumped(invoice) for invoice in invoices]
+    rows, parties = build_extracted_rows(invoices)
+
+    report = {
+        "invoices": args.invoices,
+        "results": [
+            measure("per_invoice", lambda: [service.validate_unified_invoice_data(item, "bench", "bench") for item in wrapped], args.invoices),
+            measure("batch", lambda: service.validate_unified_invoice_batch(invoices, "bench"), args.invoices),
+            measure("bulk_pipeline", lambda: run_bulk_pipeline(service, rows, parties, args.page_size), args.invoices),
+        ],
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
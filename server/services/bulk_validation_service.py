@@ -0,0 +1,368 @@
+"""
+Bulk Invoice Validation Service
+
+Re-validates a user's whole book of stored invoice data without going through
+the ADK workflow. Rows are read from ``extracted_invoice_data`` or
+``invoices`` in keyset-paginated pages, projecting only the columns the rules
+need, then validated column by column with the compiled rule set
+(``validate_unified_invoice_batch``). Results are written back with one bulk
+UPDATE per page and the report is streamed as it is produced.
+"""
+
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
+
+from services.validation_service import get_validation_service, InvoiceDataValidationService, ValidationResult
+
+logger = logging.getLogger(__name__)
+
+# Supported row sources
+SOURCE_EXTRACTED = "extracted_invoice_data"
+SOURCE_INVOICES = "invoices"
+
+# Party roles stored in contract_parties, mapped onto the unified party slots
+_CLIENT_ROLES = {"client", "tenant", "rent_payer", "customer", "lessee"}
+_PROVIDER_ROLES = {"service_provider", "landlord", "provider", "vendor", "lessor"}
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if hasattr(value, "value") else value
+
+
+def _number(value: Any) -> Any:
+    """Numeric strings stored in JSON columns become floats; anything else is left for the rules to flag"""
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _party(name: Any = None, email: Any = None, phone: Any = None, address: Any = None) -> Optional[Dict[str, Any]]:
+    if not any((name, email, phone, address)):
+        return None
+    return {"name": name, "email": email, "phone": phone, "address": address}
+
+
+def _normalize_unified(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Shallow-copy a stored unified invoice dict, coercing the payment amount"""
+    payment_terms = data.get("payment_terms")
+    if isinstance(payment_terms, dict) and "amount" in payment_terms:
+        data = {**data, "payment_terms": {**payment_terms, "amount": _number(payment_terms["amount"])}}
+    return data
+
+
+def extracted_row_to_dict(row: Dict[str, Any], parties: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Unified-shaped dict for an ``extracted_invoice_data`` row
+
+    Corrected invoice data (the correction agent's full unified output) wins
+    over the flat extraction columns; parties come from ``contract_parties``.
+    """
+    corrected = row.get("corrected_invoice_data")
+    if isinstance(corrected, dict) and corrected:
+        return _normalize_unified(corrected)
+
+    client = provider = None
+    for party in parties:
+        role = (party.get("role") or "").lower()
+        if client is None and role in _CLIENT_ROLES:
+            client = _party(party.get("name"), party.get("email"), party.get("phone"), party.get("address"))
+        elif provider is None and role in _PROVIDER_ROLES:
+            provider = _party(party.get("name"), party.get("email"), party.get("phone"), party.get("address"))
+
+    frequency = _enum_value(row.get("invoice_frequency"))
+    return {
+        "client": client,
+        "service_provider": provider,
+        "payment_terms": {
+            "amount": row.get("payment_amount"),
+            "currency": row.get("currency"),
+            "frequency": frequency,
+            "due_days": row.get("payment_due_days"),
+            "late_fee": row.get("late_fee"),
+        },
+        "invoice_frequency": frequency,
+        "first_invoice_date": row.get("first_invoice_date"),
+        "next_invoice_date": row.get("next_invoice_date"),
+    }
+
+
+def invoice_row_to_dict(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Unified-shaped dict for an ``invoices`` row
+
+    ``invoice_data`` holds either a unified ``model_dump()`` (used as is) or
+    the legacy header/parties layout, in which case the flat columns are used
+    and the payment frequency is taken from ``payment_information``.
+    """
+    invoice_data = row.get("invoice_data")
+    if not isinstance(invoice_data, dict):
+        invoice_data = {}
+    if "payment_terms" in invoice_data:
+        return _normalize_unified(invoice_data)
+
+    payment_information = invoice_data.get("payment_information") or {}
+    return {
+        "invoice_number": row.get("invoice_number"),
+        "invoice_date": row.get("invoice_date"),
+        "due_date": row.get("due_date"),
+        "contract_title": row.get("contract_title"),
+        "contract_type": row.get("contract_type"),
+        "client": _party(row.get("client_name"), row.get("client_email"), row.get("client_phone"), row.get("client_address")),
+        "service_provider": _party(row.get("service_provider_name"), row.get("service_provider_email"),
+                                   row.get("service_provider_phone"), row.get("service_provider_address")),
+        "payment_terms": {
+            "amount": row.get("total_amount"),
+            "currency": row.get("currency"),
+            "frequency": payment_information.get("frequency"),
+            "due_days": _number(payment_information.get("due_days")),
+        },
+    }
+
+
+class BulkValidationReport:
+    """Running totals for a bulk validation run, emitted as page and summary events"""
+
+    def __init__(self, source: str, user_id: str):
+        self.source = source
+        self.user_id = user_id
+        self.started = time.perf_counter()
+        self.pages = 0
+        self.rows = 0
+        self.valid = 0
+        self.human_input_required = 0
+        self.score_total = 0.0
+        self.issues_by_field: Counter = Counter()
+        self.issues_by_type: Counter = Counter()
+        self.missing_by_field: Counter = Counter()
+
+    def add_page(self, row_ids: List[str], results: List[ValidationResult],
+                 include_rows: bool = False) -> List[Dict[str, Any]]:
+        """Fold one page of results into the totals; returns the events to stream"""
+        page_issues: Counter = Counter()
+        page_valid = 0
+        events = []
+        for row_id, result in zip(row_ids, results):
+            page_valid += result.is_valid
+            self.human_input_required += result.human_input_required
+            self.score_total += result.validation_score
+            self.missing_by_field.update(result.missing_required_fields)
+            for issue in result.issues:
+                page_issues[issue.field_name] += 1
+                self.issues_by_type[issue.issue_type] += 1
+            if include_rows and not result.is_valid:
+                events.append({"event": "row", "id": row_id, **result_summary(result)})
+
+        self.pages += 1
+        self.rows += len(results)
+        self.valid += page_valid
+        self.issues_by_field.update(page_issues)
+        events.insert(0, {
+            "event": "page",
+            "page": self.pages,
+            "rows": len(results),
+            "valid": page_valid,
+            "invalid": len(results) - page_valid,
+            "issues_by_field": dict(page_issues),
+            "rows_processed": self.rows,
+            "elapsed_seconds": round(self.elapsed, 3),
+        })
+        return events
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self, written: int) -> Dict[str, Any]:
+        elapsed = max(self.elapsed, 1e-6)
+        return {
+            "event": "summary",
+            "source": self.source,
+            "user_id": self.user_id,
+            "pages": self.pages,
+            "rows": self.rows,
+            "valid": self.valid,
+            "invalid": self.rows - self.valid,
+            "human_input_required": self.human_input_required,
+            "average_validation_score": round(self.score_total / self.rows, 4) if self.rows else None,
+            "issues_by_field": dict(self.issues_by_field.most_common()),
+            "issues_by_type": dict(self.issues_by_type.most_common()),
+            "missing_by_field": dict(self.missing_by_field.most_common()),
+            "rows_written": written,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.rows / elapsed, 1),
+        }
+
+
+def result_summary(result: ValidationResult) -> Dict[str, Any]:
+    """Compact JSON form of a validation result, as stored by the write-back"""
+    return {
+        "is_valid": result.is_valid,
+        "validation_score": round(result.validation_score, 4),
+        "human_input_required": result.human_input_required,
+        "missing_required_fields": result.missing_required_fields,
+        "issues": [
+            {
+                "field_name": issue.field_name,
+                "issue_type": issue.issue_type,
+                "severity": issue.severity.value,
+                "message": issue.message,
+                "suggested_value": issue.suggested_value,
+                "suggestions": issue.suggestions,
+            }
+            for issue in result.issues
+        ],
+    }
+
+
+class BulkValidationService:
+    """Service for re-validating stored invoice data in bulk"""
+
+    def __init__(self, validation_service: Optional[InvoiceDataValidationService] = None, page_size: int = 5000):
+        self.validation_service = validation_service or get_validation_service()
+        self.page_size = page_size
+        self.logger = logging.getLogger(__name__)
+
+    async def revalidate(
+        self,
+        user_id: str,
+        source: str = SOURCE_EXTRACTED,
+        page_size: Optional[int] = None,
+        write_back: bool = True,
+        include_rows: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Re-validate every stored row of ``source`` owned by ``user_id``
+
+        Args:
+            user_id: Owner of the rows
+            source: ``extracted_invoice_data`` or ``invoices``
+            page_size: Rows fetched, validated and written per page
+            write_back: Store the results on each row (``validation_*`` columns)
+            include_rows: Also emit a ``row`` event for every invalid row
+
+        Yields:
+            ``page`` events as pages complete (plus ``row`` events if requested),
+            then one ``summary`` event
+        """
+        if source not in (SOURCE_EXTRACTED, SOURCE_INVOICES):
+            raise ValueError(f"Unknown bulk validation source '{source}'")
+        from db.postgresdb import AsyncSessionLocal
+
+        page_size = page_size or self.page_size
+        report = BulkValidationReport(source, user_id)
+        written = 0
+        after_id = None
+        self.logger.info(f"📚 Bulk validation started - User: {user_id}, Source: {source}, Page size: {page_size}")
+
+        async with AsyncSessionLocal() as session:
+            while True:
+                row_ids, data_dicts = await self._fetch_page(session, source, user_id, after_id, page_size)
+                if not row_ids:
+                    break
+                after_id = row_ids[-1]
+
+                results = self.validation_service.validate_unified_invoice_batch(data_dicts, user_id)
+                if write_back:
+                    written += await self._write_back(session, source, row_ids, results)
+                for event in report.add_page(row_ids, results, include_rows):
+                    yield event
+                if len(row_ids) < page_size:
+                    break
+
+        summary = report.summary(written)
+        self.logger.info(
+            f"✅ Bulk validation completed - User: {user_id}, Rows: {summary['rows']}, Invalid: {summary['invalid']}, "
+            f"{summary['rows_per_second']} rows/s"
+        )
+        yield summary
+
+    async def _fetch_page(self, session, source: str, user_id: str, after_id: Optional[str],
+                          limit: int) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Next keyset page as (row ids, unified-shaped dicts); only rule inputs are selected"""
+        from sqlalchemy import select
+        from models.database_models import ExtractedInvoiceData, Invoice, ContractParty
+
+        if source == SOURCE_EXTRACTED:
+            model = ExtractedInvoiceData
+            columns = (
+                model.id, model.contract_id, model.invoice_frequency, model.first_invoice_date,
+                model.next_invoice_date, model.payment_amount, model.currency, model.payment_due_days,
+                model.late_fee, model.corrected_invoice_data,
+            )
+        else:
+            model = Invoice
+            columns = (
+                model.id, model.invoice_number, model.invoice_date, model.due_date, model.contract_title,
+                model.contract_type, model.client_name, model.client_email, model.client_phone,
+                model.client_address, model.service_provider_name, model.service_provider_email,
+                model.service_provider_phone, model.service_provider_address, model.total_amount,
+                model.currency, model.invoice_data,
+            )
+
+        stmt = select(*columns).where(model.user_id == user_id)
+        if after_id is not None:
+            stmt = stmt.where(model.id > after_id)
+        rows = [dict(row) for row in (await session.execute(stmt.order_by(model.id).limit(limit))).mappings()]
+        if not rows:
+            return [], []
+
+        if source == SOURCE_INVOICES:
+            return [row["id"] for row in rows], [invoice_row_to_dict(row) for row in rows]
+
+        # Parties only matter for rows without corrected data; fetch them in one query per page
+        contract_ids = {row["contract_id"] for row in rows if not row.get("corrected_invoice_data")}
+        parties: Dict[str, List[Dict[str, Any]]] = {}
+        if contract_ids:
+            party_stmt = select(
+                ContractParty.contract_id, ContractParty.name, ContractParty.email,
+                ContractParty.phone, ContractParty.address, ContractParty.role
+            ).where(ContractParty.contract_id.in_(contract_ids))
+            for party in (await session.execute(party_stmt)).mappings():
+                parties.setdefault(party["contract_id"], []).append(dict(party))
+
+        return (
+            [row["id"] for row in rows],
+            [extracted_row_to_dict(row, parties.get(row["contract_id"], [])) for row in rows],
+        )
+
+    async def _write_back(self, session, source: str, row_ids: List[str], results: List[ValidationResult]) -> int:
+        """Store one page of results with a single executemany UPDATE keyed by primary key"""
+        from sqlalchemy import update
+        from models.database_models import ExtractedInvoiceData, Invoice
+
+        model = ExtractedInvoiceData if source == SOURCE_EXTRACTED else Invoice
+        validated_at = datetime.now(timezone.utc)
+        await session.execute(update(model), [
+            {
+                "id": row_id,
+                "validation_score": result.validation_score,
+                "validation_results": result_summary(result),
+                "validated_at": validated_at,
+            }
+            for row_id, result in zip(row_ids, results)
+        ])
+        await session.commit()
+        return len(row_ids)
+
+
+# Global bulk validation service instance
+_bulk_validation_service: Optional[BulkValidationService] = None
+
+
+def get_bulk_validation_service() -> BulkValidationService:
+    """
+    Get the global bulk validation service instance
+
+    Returns:
+        BulkValidationService instance
+    """
+    global _bulk_validation_service
+    if _bulk_validation_service is None:
+        _bulk_validation_service = BulkValidationService()
+    return _bulk_validation_service
@@ -0,0 +1,258 @@
+"""
+Confidence Scoring Model
+
+Confidence used to be a set of constants and hand-tuned sums. This module
+scores an invoice with a small logistic regression over cheap signals that are
+already available when validation runs:
+
+- ``retrieval_similarity``: mean vector-search score of the contract chunks
+  the extraction was based on
+- ``extraction_agreement``: share of fields where rule-based pre-extraction
+  and the LLM agreed (1.0 when the rules settled everything, unknown when
+  the LLM response could not be parsed)
+- ``extraction_confidence``: confidence reported by the extraction step
+- ``required_completeness`` / ``overall_completeness``: filled share of the
+  required / all validated fields
+- ``error_count`` / ``warning_count`` / ``info_count``: validation issues
+
+The score is the predicted probability that the invoice goes through without a
+human correction. Models are trained offline from stored invoices labelled by
+``corrected_by_human`` (see ``scripts/train_confidence_model.py``) and loaded
+from ``CONFIDENCE_MODEL_PATH``; without a trained model the built-in default
+coefficients are used. Everything is plain Python - the model has eight
+weights and scoring must not pull numeric libraries into the request path.
+"""
+
+import json
+import logging
+import math
+import os
+import random
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+FEATURE_NAMES = (
+    "retrieval_similarity",
+    "extraction_agreement",
+    "extraction_confidence",
+    "required_completeness",
+    "overall_completeness",
+    "error_count",
+    "warning_count",
+    "info_count",
+)
+
+# Used for features an invoice does not have (e.g. no retrieval score for a bulk re-validation)
+DEFAULT_FEATURE_VALUES = {
+    "retrieval_similarity": 0.75,
+    "extraction_agreement": 0.75,
+    "extraction_confidence": 0.8,
+}
+
+# Hand-set starting point, roughly matching the previous heuristic ordering
+DEFAULT_COEFFICIENTS = {
+    "bias": -4.0,
+    "weights": {
+        "retrieval_similarity": 1.0,
+        "extraction_agreement": 1.0,
+        "extraction_confidence": 1.5,
+        "required_completeness": 4.0,
+        "overall_completeness": 1.5,
+        "error_count": -1.5,
+        "warning_count": -0.5,
+        "info_count": -0.1,
+    },
+}
+
+
+def _sigmoid(z: float) -> float:
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    exp_z = math.exp(z)
+    return exp_z / (1.0 + exp_z)
+
+
+class ConfidenceModel:
+    """
+    Logistic regression over ``FEATURE_NAMES``
+
+    Features are standardized with the training means/scales before the
+    weights are applied; missing features take their imputation value.
+    """
+
+    def __init__(self, weights: Dict[str, float], bias: float,
+                 means: Optional[Dict[str, float]] = None,
+                 scales: Optional[Dict[str, float]] = None,
+                 defaults: Optional[Dict[str, float]] = None,
+                 metadata: Optional[Dict[str, Any]] = None):
+        self.weights = {name: float(weights.get(name, 0.0)) for name in FEATURE_NAMES}
+        self.bias = float(bias)
+        self.means = {name: float((means or {}).get(name, 0.0)) for name in FEATURE_NAMES}
+        self.scales = {name: float((scales or {}).get(name, 1.0)) or 1.0 for name in FEATURE_NAMES}
+        self.defaults = {name: float((defaults or DEFAULT_FEATURE_VALUES).get(name, 0.0)) for name in FEATURE_NAMES}
+        self.metadata = metadata or {}
+
+    @classmethod
+    def default(cls) -> "ConfidenceModel":
+        return cls(DEFAULT_COEFFICIENTS["weights"], DEFAULT_COEFFICIENTS["bias"],
+                   metadata={"source": "default"})
+
+    def vector(self, features: Dict[str, Any]) -> List[float]:
+        """Standardized feature vector in ``FEATURE_NAMES`` order"""
+        vector = []
+        for name in FEATURE_NAMES:
+            value = features.get(name)
+            if value is None:
+                value = self.defaults[name]
+            vector.append((float(value) - self.means[name]) / self.scales[name])
+        return vector
+
+    def predict(self, features: Dict[str, Any]) -> float:
+        """Probability that the invoice needs no human correction"""
+        z = self.bias + sum(
+            weight * value for weight, value in zip((self.weights[name] for name in FEATURE_NAMES), self.vector(features))
+        )
+        return _sigmoid(z)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "features": list(FEATURE_NAMES),
+            "weights": self.weights,
+            "bias": self.bias,
+            "means": self.means,
+            "scales": self.scales,
+            "defaults": self.defaults,
+            "metadata": self.metadata,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConfidenceModel":
+        return cls(data["weights"], data["bias"], data.get("means"), data.get("scales"),
+                   data.get("defaults"), data.get("metadata"))
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as handle:
+            json.dump(self.to_dict(), handle, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "ConfidenceModel":
+        with open(path) as handle:
+            return cls.from_dict(json.load(handle))
+
+
+def train_confidence_model(rows: Sequence[Dict[str, Any]], labels: Sequence[int],
+                           l2: float = 0.01, epochs: int = 300, learning_rate: float = 0.5,
+                           seed: int = 7) -> ConfidenceModel:
+    """
+    Fit a ``ConfidenceModel`` with full-batch gradient descent on log loss
+
+    Args:
+        rows: Feature dicts (missing features are imputed with their mean)
+        labels: 1 if the invoice went through without a human correction, else 0
+        l2: L2 penalty on the weights (not the bias)
+        epochs: Gradient steps over the whole set
+        learning_rate: Step size on standardized features
+        seed: Seed for the initial weights
+    """
+    if not rows or len(rows) != len(labels):
+        raise ValueError("Training needs one label per feature row")
+
+    means, scales, defaults = {}, {}, {}
+    for name in FEATURE_NAMES:
+        present = [float(row[name]) for row in rows if row.get(name) is not None]
+        fallback = DEFAULT_FEATURE_VALUES.get(name, 0.0)
+        mean = sum(present) / len(present) if present else fallback
+        variance = sum((value - mean) ** 2 for value in present) / len(present) if present else 0.0
+        means[name], scales[name] = mean, math.sqrt(variance) or 1.0
+        defaults[name] = mean
+    model = ConfidenceModel({}, 0.0, means, scales, defaults)
+
+    vectors = [model.vector(row) for row in rows]
+    targets = [float(label) for label in labels]
+    rnd = random.Random(seed)
+    weights = [rnd.uniform(-0.01, 0.01) for _ in FEATURE_NAMES]
+    positive_rate = min(max(sum(targets) / len(targets), 1e-3), 1 - 1e-3)
+    bias = math.log(positive_rate / (1 - positive_rate))
+    count = len(vectors)
+
+    for _ in range(epochs):
+        gradient = [0.0] * len(weights)
+        bias_gradient = 0.0
+        for vector, target in zip(vectors, targets):
+            error = _sigmoid(bias + sum(w * x for w, x in zip(weights, vector))) - target
+            bias_gradient += error
+            for index, value in enumerate(vector):
+                gradient[index] += error * value
+        bias -= learning_rate * bias_gradient / count
+        weights = [
+            weight - learning_rate * (grad / count + l2 * weight)
+            for weight, grad in zip(weights, gradient)
+        ]
+
+    model.weights = dict(zip(FEATURE_NAMES, weights))
+    model.bias = bias
+    model.metadata = {"source": "trained", "examples": count, "positive_rate": round(sum(targets) / count, 4)}
+    return model
+
+
+def evaluate_confidence_model(scores: Sequence[float], labels: Sequence[int],
+                              threshold: float) -> Dict[str, float]:
+    """
+    Ranking and routing quality of confidence scores
+
+    ``pause_rate`` is the share of invoices scored below ``threshold`` (sent to
+    review) and ``missed_correction_rate`` the share of invoices that needed a
+    correction but were scored at or above it.
+    """
+    count = len(scores)
+    eps = 1e-9
+    log_loss = -sum(
+        label * math.log(max(score, eps)) + (1 - label) * math.log(max(1 - score, eps))
+        for score, label in zip(scores, labels)
+    ) / count
+    brier = sum((score - label) ** 2 for score, label in zip(scores, labels)) / count
+
+    # AUC as the probability that a clean invoice outscores one that needed correction
+    ranked = sorted(zip(scores, labels), key=lambda item: item[0])
+    positives = sum(labels)
+    negatives = count - positives
+    rank_sum, index = 0.0, 0
+    while index < count:
+        end = index
+        while end + 1 < count and ranked[end + 1][0] == ranked[index][0]:
+            end += 1
+        average_rank = (index + end) / 2 + 1
+        rank_sum += average_rank * sum(label for _, label in ranked[index:end + 1])
+        index = end + 1
+    auc = (rank_sum - positives * (positives + 1) / 2) / (positives * negatives) if positives and negatives else 0.5
+
+    paused = sum(1 for score in scores if score < threshold)
+    missed = sum(1 for score, label in zip(scores, labels) if score >= threshold and not label)
+    return {
+        "log_loss": round(log_loss, 4),
+        "brier": round(brier, 4),
+        "auc": round(auc, 4),
+        "pause_rate": round(paused / count, 4),
+        "missed_correction_rate": round(missed / max(negatives, 1), 4),
+    }
+
+
+# Singleton model instance
+_confidence_model = None
+
+
+def get_confidence_model() -> ConfidenceModel:
+    """Trained model from ``CONFIDENCE_MODEL_PATH`` if present, else the default coefficients"""
+    global _confidence_model
+    if _confidence_model is None:
+        path = os.getenv("CONFIDENCE_MODEL_PATH", os.path.join(os.path.dirname(__file__), "confidence_model.json"))
+        if os.path.exists(path):
+            try:
+                _confidence_model = ConfidenceModel.load(path)
+                logger.info(f"📈 Loaded confidence model from {path} ({_confidence_model.metadata})")
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"⚠️ Could not load confidence model from {path}: {e} - using default coefficients")
+        if _confidence_model is None:
+            _confidence_model = ConfidenceModel.default()
+    return _confidence_model
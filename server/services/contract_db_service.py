@@ -8,6 +8,7 @@ from decimal import Decimal
 
 from models.database_models import Contract, ContractParty, ExtractedInvoiceData, GeneratedInvoice, ContractType, InvoiceFrequency
 from db.postgresdb import AsyncSessionLocal
+from utils.tracing import trace_dependency
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,7 @@ class ContractDatabaseService:
         """Initialize the contract database service"""
         logger.info("✅ Contract Database Service initialized")
     
+    @trace_dependency("database", "save_contract")
     async def save_contract(
         self,
         user_id: str,
@@ -85,6 +87,7 @@ class ContractDatabaseService:
             logger.error(f"❌ Failed to save contract: {str(e)}")
             raise
     
+    @trace_dependency("database", "update_contract_processing_status")
     async def update_contract_processing_status(
         self,
         storage_path: str,
@@ -142,6 +145,7 @@ class ContractDatabaseService:
             logger.error(f"❌ Failed to update contract status: {str(e)}")
             raise
     
+    @trace_dependency("database", "save_extracted_invoice_data")
     async def save_extracted_invoice_data(
         self,
         contract_id: str,
@@ -251,11 +255,13 @@ class ContractDatabaseService:
             logger.error(f"❌ Failed to save extracted invoice data: {str(e)}")
             raise
     
+    @trace_dependency("database", "save_corrected_invoice_data")
     async def save_corrected_invoice_data(
         self,
         contract_id: str,
         corrected_data: Dict[str, Any],
-        corrected_by_human: bool = False
+        corrected_by_human: bool = False,
+        confidence_features: Optional[Dict[str, Any]] = None
     ) -> ExtractedInvoiceData:
         """
         Save corrected invoice data from the correction agent
@@ -264,6 +270,8 @@ class ContractDatabaseService:
             contract_id: Contract ID
             corrected_data: Complete corrected invoice data
             corrected_by_human: Whether the correction involved human input
+            confidence_features: Confidence model inputs from the first validation;
+                with ``corrected_by_human`` they form a training example
             
         Returns:
             Updated ExtractedInvoiceData object
@@ -308,6 +316,8 @@ class ContractDatabaseService:
                 extracted_data.corrected_invoice_data = serialize_for_json(corrected_data)
                 extracted_data.correction_timestamp = datetime.now(timezone.utc)
                 extracted_data.corrected_by_human = corrected_by_human
+                if confidence_features:
+                    extracted_data.confidence_features = confidence_features
                 
                 # Update other fields if available in corrected data
                 if 'payment_terms' in corrected_data and corrected_data['payment_terms']:
@@ -332,6 +342,7 @@ class ContractDatabaseService:
             logger.error(f"❌ Failed to save corrected invoice data: {str(e)}")
             raise
     
+    @trace_dependency("database", "get_contract_by_storage_path")
     async def get_contract_by_storage_path(self, storage_path: str) -> Optional[Contract]:
         """
         Get contract by storage path
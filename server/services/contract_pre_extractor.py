@@ -0,0 +1,552 @@
+"""
+Rule-based pre-extraction of invoice data from contract text
+
+Most rental and lease agreements follow a handful of templates: parties are
+introduced with "hereinafter called the LANDLORD", rent is stated as
+"Rs. 15,000/- (Rupees Fifteen Thousand only)" and is due "on or before the 5th
+of every month". ``ContractPreExtractor`` reads those patterns deterministically
+and returns a ``ContractInvoiceData`` together with a confidence per field, so
+``ContractRAGService`` only asks the LLM for the fields the rules could not
+settle.
+
+Confidence reflects how unambiguous the evidence was (a numeric amount
+confirmed by the amount in words beats a bare number, a numeric date that
+could be day- or month-first is not trusted), not how likely the value is to
+be correct in some calibrated sense.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Tuple
+
+from schemas.contract_schemas import (
+    ContractInvoiceData,
+    ContractParty,
+    ContractType,
+    InvoiceFrequency,
+    LineItem,
+    LineItemCategory,
+)
+
+logger = logging.getLogger(__name__)
+
+# Fields the pre-extractor scores; the LLM is asked only for those below threshold
+FIELDS = (
+    "contract_title", "contract_type", "client", "service_provider",
+    "start_date", "end_date", "line_items", "invoice_frequency",
+)
+# Fields an invoice cannot be generated without; low confidence on these triggers the LLM
+CORE_FIELDS = ("contract_type", "client", "service_provider", "start_date", "line_items", "invoice_frequency")
+
+DEFAULT_THRESHOLD = 0.8
+
+# Confidence of a billing period that was assumed rather than found; below the threshold
+_DEFAULT_FREQUENCY_CONFIDENCE = 0.5
+
+# --- Amounts ---
+
+_CURRENCY_SYMBOLS = {
+    "₹": "INR", "rs": "INR", "rs.": "INR", "inr": "INR", "rupees": "INR",
+    "$": "USD", "usd": "USD", "€": "EUR", "eur": "EUR", "£": "GBP", "gbp": "GBP",
+}
+_AMOUNT_RE = re.compile(
+    r"(?P<currency>₹|\bRs\.?|\bINR\b|\$|\bUSD\b|€|\bEUR\b|£|\bGBP\b)\s*"
+    r"(?P<number>\d{1,3}(?:,\d{2,3})+(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?)\s*(?:/-)?"
+    r"(?:\s*\(\s*(?P<words>[A-Za-z][A-Za-z\s\-]*?)\s*\))?",
+    re.IGNORECASE,
+)
+_WORDS_AMOUNT_RE = re.compile(r"\bRupees\s+(?P<words>[A-Za-z][A-Za-z\s\-]*?)\s+only\b", re.IGNORECASE)
+
+_UNITS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8,
+    "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+_TENS = {"twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90}
+_SCALES = {
+    "thousand": 1_000, "lakh": 100_000, "lakhs": 100_000, "lac": 100_000, "lacs": 100_000,
+    "million": 1_000_000, "crore": 10_000_000, "crores": 10_000_000,
+}
+_FILLER_WORDS = {"and", "only", "rupees", "rupee", "rs", "inr"}
+
+# Keywords that name a charge, checked in the text just before an amount
+_CHARGE_KEYWORDS = (
+    (LineItemCategory.DEPOSIT, ("security deposit", "deposit", "advance")),
+    (LineItemCategory.MAINTENANCE_FEE, ("maintenance",)),
+    (LineItemCategory.LATE_FEE, ("late fee", "late payment", "penalty", "delayed payment")),
+    (LineItemCategory.UTILITY, ("electricity", "water charges", "utility", "utilities")),
+    (LineItemCategory.RENT, ("rent", "licence fee", "license fee", "rental")),
+)
+_CHARGE_DESCRIPTIONS = {
+    LineItemCategory.RENT: "Monthly Rent",
+    LineItemCategory.DEPOSIT: "Security Deposit",
+    LineItemCategory.MAINTENANCE_FEE: "Maintenance Charges",
+    LineItemCategory.LATE_FEE: "Late Payment Fee",
+    LineItemCategory.UTILITY: "Utility Charges",
+}
+_CONTEXT_CHARS = 120
+
+_DUE_DAY_RE = re.compile(
+    r"(?:on\s+or\s+before|before|by|on|not\s+later\s+than)\s+(?:the\s+)?(?P<day>\d{1,2})(?:st|nd|rd|th)?\s+"
+    r"(?:day\s+)?of\s+(?:every|each|the)\s+(?:english\s+)?(?:calendar\s+)?month",
+    re.IGNORECASE,
+)
+_FREQUENCY_HINTS = (
+    (InvoiceFrequency.QUARTERLY, re.compile(r"\bquarterly\b|\bper\s+quarter\b|\bevery\s+quarter\b", re.I)),
+    (InvoiceFrequency.ANNUALLY, re.compile(r"\bper\s+annum\b|\bannual(?:ly)?\b|\byearly\b|\bper\s+year\b", re.I)),
+    (InvoiceFrequency.MONTHLY, re.compile(r"\bmonthly\b|\bper\s+month\b|\bp\.?\s?m\.?\b|\bevery\s+month\b|\beach\s+month\b", re.I)),
+)
+
+# --- Parties ---
+
+_HEREINAFTER_RE = re.compile(
+    r"hereinafter\s+(?:jointly\s+)?(?:called|referred\s+to\s+as|known\s+as|termed\s+as)\s+(?:the\s+)?"
+    r"[\"“”'‘’]*\s*(?P<role>landlord|lessor|owner|licensor|tenant|lessee|licensee)",
+    re.IGNORECASE,
+)
+_LABELLED_PARTY_RE = re.compile(
+    r"^\s*(?P<role>landlord|lessor|owner|licensor|tenant|lessee|licensee)(?:'s)?\s*(?:name)?\s*[:\-]\s*(?P<name>[^\n,(]{2,80})",
+    re.IGNORECASE | re.MULTILINE,
+)
+_PROVIDER_ROLES = {"landlord", "lessor", "owner", "licensor"}
+_NAME_RE = re.compile(
+    r"(?:^|\bbetween\b|\bAND\b|\band\b)\s*[:,]?\s*"
+    r"(?:(?:Mr|Mrs|Ms|Miss|Dr|M/s|Shri|Smt|Sri)\.?\s+)?"
+    r"(?P<name>[A-Z][A-Za-z.&'\-]*(?!/)(?:\s+(?:[A-Z][A-Za-z.&'\-]*(?!/)|&)){0,5})"
+)
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_PHONE_RE = re.compile(r"(?<!\d)(?:\+?\d{1,3}[\s-]?)?\d{5}[\s-]?\d{5}(?!\d)|(?<!\d)\+?\d[\d\s-]{8,14}\d(?!\d)")
+_ADDRESS_RE = re.compile(r"\b(?:residing|resident|office)\s+at\s*:?\s*(?P<address>[^()]{5,200}?)(?=\s*(?:\(|,?\s*(?:hereinafter|e-?mail|phone|mobile|tel|ph)\b|$))", re.I)
+_PARTY_BLOCK_CHARS = 600
+
+# --- Dates ---
+
+_DATE_TOKEN = (
+    r"(?:\d{1,2}(?:st|nd|rd|th)?\s+(?:day\s+of\s+)?[A-Za-z]{3,9},?\s+\d{4}"
+    r"|[A-Za-z]{3,9}\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{4}"
+    r"|\d{1,2}[/.\-]\d{1,2}[/.\-]\d{2,4}"
+    r"|\d{4}-\d{2}-\d{2})"
+)
+_RANGE_RE = re.compile(rf"\bfrom\s+(?:the\s+)?(?P<start>{_DATE_TOKEN})\s+(?:to|till|until|upto|up\s+to)\s+(?:the\s+)?(?P<end>{_DATE_TOKEN})", re.I)
+_START_RE = re.compile(
+    rf"(?:commenc\w*|starting|start\s+date|effective|with\s+effect\s+from|w\.e\.f\.?)\s*(?:from|on|date)?\s*[:\-]?\s*(?:the\s+)?(?P<date>{_DATE_TOKEN})",
+    re.I,
+)
+_END_RE = re.compile(rf"(?:ending|end\s+date|expir\w*|terminat\w*)\s*(?:on|date)?\s*[:\-]?\s*(?:the\s+)?(?P<date>{_DATE_TOKEN})", re.I)
+_DURATION_RE = re.compile(
+    r"(?:period|term)\s+of\s+(?P<count>\d{1,3}|[A-Za-z\-]+)\s*(?:\(\s*[A-Za-z\d\-]+\s*\)\s*)?(?P<unit>months?|years?)",
+    re.I,
+)
+_DATE_FORMATS = ("%d %B %Y", "%d %b %Y", "%B %d %Y", "%b %d %Y", "%Y-%m-%d",
+                 "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%d/%m/%y", "%d-%m-%y", "%d.%m.%y")
+
+# --- Contract type and title ---
+
+_CONTRACT_TYPE_HINTS = (
+    (ContractType.RENTAL_LEASE, re.compile(r"\brent(?:al)?\s+agreement\b|\blease\b|\bleave\s+and\s+licen[cs]e\b|\btenancy\b|\blandlord\b", re.I)),
+    (ContractType.MAINTENANCE_CONTRACT, re.compile(r"\bmaintenance\s+(?:contract|agreement)\b|\bAMC\b")),
+    (ContractType.CONSULTING_AGREEMENT, re.compile(r"\bconsult(?:ing|ancy)\s+agreement\b", re.I)),
+    (ContractType.SUPPLY_CONTRACT, re.compile(r"\bsupply\s+(?:contract|agreement)\b", re.I)),
+    (ContractType.SERVICE_AGREEMENT, re.compile(r"\bservices?\s+agreement\b", re.I)),
+)
+_TITLE_RE = re.compile(r"^\s*(?P<title>[^\n]{0,80}\b(?:AGREEMENT|CONTRACT|DEED|LEASE)\b[^\n]{0,40}?)\s*$", re.I | re.M)
+
+
+@dataclass
+class PreExtractionResult:
+    """Rule-based extraction with a confidence in [0, 1] for every field in ``FIELDS``"""
+    invoice_data: ContractInvoiceData
+    field_confidence: Dict[str, float]
+    evidence: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def confidence_score(self) -> float:
+        return round(sum(self.field_confidence.get(name, 0.0) for name in FIELDS) / len(FIELDS), 3)
+
+    def low_confidence_fields(self, threshold: float = DEFAULT_THRESHOLD, fields: Tuple[str, ...] = FIELDS) -> List[str]:
+        return [name for name in fields if self.field_confidence.get(name, 0.0) < threshold]
+
+    def needs_llm(self, threshold: float = DEFAULT_THRESHOLD) -> bool:
+        """True if any field an invoice depends on is below ``threshold``"""
+        return bool(self.low_confidence_fields(threshold, CORE_FIELDS))
+
+    def known_values(self, threshold: float = DEFAULT_THRESHOLD) -> Dict[str, Any]:
+        """High-confidence fields as JSON-ready values, for the LLM prompt"""
+        data = self.invoice_data.model_dump(mode="json", include=set(FIELDS))
+        return {name: data[name] for name in FIELDS if self.field_confidence.get(name, 0.0) >= threshold}
+
+    def agreement(self, llm_data: ContractInvoiceData) -> Optional[float]:
+        """
+        Share of fields on which the rules and the LLM agree, or None if none overlap
+
+        Only fields both extractions filled are compared (parties by name, line
+        items by category and amount). Call before ``merge``.
+        """
+        compared = agreed = 0
+        for name in FIELDS:
+            ours, theirs = _comparable(getattr(self.invoice_data, name)), _comparable(getattr(llm_data, name))
+            if ours is None or theirs is None:
+                continue
+            compared += 1
+            agreed += ours == theirs
+        return round(agreed / compared, 3) if compared else None
+
+    def merge(self, llm_data: ContractInvoiceData, fields: List[str], llm_confidence: float) -> ContractInvoiceData:
+        """
+        Take ``fields`` from the LLM result and everything else from the rules
+
+        Fields the LLM left empty keep the rule-based value. ``field_confidence``
+        is updated to ``llm_confidence`` for the fields the LLM supplied.
+        """
+        updates = {}
+        for name in fields:
+            value = getattr(llm_data, name)
+            if value not in (None, [], ""):
+                updates[name] = value
+                self.field_confidence[name] = max(self.field_confidence.get(name, 0.0), llm_confidence)
+        self.invoice_data = self.invoice_data.model_copy(update={
+            **updates,
+            "special_terms": self.invoice_data.special_terms or llm_data.special_terms,
+            "notes": self.invoice_data.notes or llm_data.notes,
+            "confidence_score": self.confidence_score,
+        })
+        return self.invoice_data
+
+
+def _comparable(value: Any) -> Any:
+    """Normalized form of a field value for ``PreExtractionResult.agreement``"""
+    if value in (None, [], ""):
+        return None
+    if isinstance(value, ContractParty):
+        return value.name.strip().lower() if value.name else None
+    if isinstance(value, list):
+        return sorted((str(getattr(item.category, "value", item.category)), float(item.amount or 0)) for item in value)
+    if isinstance(value, str):
+        return value.strip().lower()
+    return getattr(value, "value", value)
+
+
+def words_to_number(text: str) -> Optional[int]:
+    """
+    Parse an amount written in words, with Indian (lakh, crore) and western scales
+
+    "Rupees One Lakh Twenty Five Thousand only" -> 125000. Returns None if any
+    word is not part of a number.
+    """
+    total = current = 0
+    seen = False
+    for word in re.findall(r"[a-z]+", text.lower()):
+        if word in _FILLER_WORDS:
+            continue
+        if word in _UNITS:
+            current += _UNITS[word]
+        elif word in _TENS:
+            current += _TENS[word]
+        elif word == "hundred":
+            current = (current or 1) * 100
+        elif word in _SCALES:
+            total += (current or 1) * _SCALES[word]
+            current = 0
+        else:
+            return None
+        seen = True
+    return total + current if seen else None
+
+
+def parse_contract_date(text: str) -> Tuple[Optional[date], float]:
+    """
+    Parse a date as written in contracts; returns (date, confidence)
+
+    Numeric dates are read day-first (as in Indian contracts) and get a lower
+    confidence when the month/day order is ambiguous.
+    """
+    cleaned = re.sub(r"(\d)(st|nd|rd|th)\b", r"\1", text.strip(), flags=re.I)
+    cleaned = re.sub(r"\bday\s+of\s+", "", cleaned, flags=re.I).replace(",", " ")
+    cleaned = re.sub(r"\s+", " ", cleaned)
+    for fmt in _DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(cleaned, fmt).date()
+        except ValueError:
+            continue
+        numeric = fmt.startswith("%d") and "%B" not in fmt and "%b" not in fmt
+        if numeric and parsed.day <= 12 and parsed.day != parsed.month:
+            return parsed, 0.6
+        return parsed, 0.9
+    return None, 0.0
+
+
+def _add_months(start: date, months: int) -> date:
+    month_index = start.month - 1 + months
+    year, month = start.year + month_index // 12, month_index % 12 + 1
+    for day in (start.day, 30, 29, 28):
+        try:
+            return date(year, month, day)
+        except ValueError:
+            continue
+    raise ValueError(f"Cannot add {months} months to {start}")
+
+
+class ContractPreExtractor:
+    """Deterministic extractor for templated contracts (see module docstring)"""
+
+    def extract(self, text: str) -> PreExtractionResult:
+        """Extract invoice data and per-field confidence from cleaned contract text"""
+        confidence: Dict[str, float] = {}
+        evidence: Dict[str, str] = {}
+        values: Dict[str, Any] = {}
+
+        values["contract_title"], confidence["contract_title"] = self._extract_title(text)
+        values["contract_type"], confidence["contract_type"] = self._extract_contract_type(text)
+
+        parties = self._extract_parties(text)
+        for name in ("client", "service_provider"):
+            party, party_confidence, snippet = parties.get(name, (None, 0.0, ""))
+            values[name], confidence[name] = party, party_confidence
+            if snippet:
+                evidence[name] = snippet
+
+        dates = self._extract_dates(text)
+        for name in ("start_date", "end_date"):
+            values[name], confidence[name] = dates.get(name, (None, 0.0))
+
+        line_items, items_confidence, frequency, frequency_confidence, snippet = self._extract_line_items(text)
+        values["line_items"], confidence["line_items"] = line_items, items_confidence
+        values["invoice_frequency"], confidence["invoice_frequency"] = frequency, frequency_confidence
+        if snippet:
+            evidence["line_items"] = snippet
+
+        invoice_data = ContractInvoiceData(**values, extracted_at=datetime.now())
+        result = PreExtractionResult(invoice_data, {name: round(confidence[name], 3) for name in FIELDS}, evidence)
+        result.invoice_data.confidence_score = result.confidence_score
+        return result
+
+    # --- Title and type ---
+
+    def _extract_title(self, text: str) -> Tuple[Optional[str], float]:
+        match = _TITLE_RE.search(text)
+        if not match:
+            return None, 0.0
+        title = re.sub(r"\s+", " ", match.group("title")).strip(" :-")
+        # A heading near the top of the document is almost always the title
+        return title, 0.85 if match.start() < 300 else 0.6
+
+    def _extract_contract_type(self, text: str) -> Tuple[Optional[ContractType], float]:
+        hits = [(contract_type, len(pattern.findall(text))) for contract_type, pattern in _CONTRACT_TYPE_HINTS]
+        hits = [hit for hit in hits if hit[1]]
+        if not hits:
+            return None, 0.0
+        hits.sort(key=lambda hit: -hit[1])
+        contract_type, count = hits[0]
+        if len(hits) > 1 and hits[1][1] == count:
+            return contract_type, 0.5
+        return contract_type, 0.9 if count > 1 else 0.8
+
+    # --- Parties ---
+
+    def _extract_parties(self, text: str) -> Dict[str, Tuple[ContractParty, float, str]]:
+        parties: Dict[str, Tuple[ContractParty, float, str]] = {}
+        block_start = None
+        for match in _HEREINAFTER_RE.finditer(text):
+            if block_start is None:
+                between = text.rfind("between", max(0, match.start() - _PARTY_BLOCK_CHARS), match.start())
+                if between < 0:
+                    between = text.rfind("BETWEEN", max(0, match.start() - _PARTY_BLOCK_CHARS), match.start())
+                block_start = between if between >= 0 else max(0, match.start() - _PARTY_BLOCK_CHARS)
+            block = text[max(block_start, match.start() - _PARTY_BLOCK_CHARS):match.start()]
+            block_start = match.end()
+            party_key = "service_provider" if match.group("role").lower() in _PROVIDER_ROLES else "client"
+            if party_key in parties:
+                continue
+            party, party_confidence = self._party_from_block(block, party_key, 0.9)
+            if party:
+                parties[party_key] = (party, party_confidence, block.strip()[-200:])
+
+        for match in _LABELLED_PARTY_RE.finditer(text):
+            party_key = "service_provider" if match.group("role").lower() in _PROVIDER_ROLES else "client"
+            name = match.group("name").strip(" .")
+            if party_key in parties:
+                # Agreeing evidence from a signature or summary block
+                party, party_confidence, snippet = parties[party_key]
+                if name.lower() == party.name.lower():
+                    parties[party_key] = (party, min(0.95, party_confidence + 0.05), snippet)
+                continue
+            line_end = text.find("\n", match.end())
+            block = text[match.start():line_end if line_end >= 0 else len(text)]
+            parties[party_key] = (self._build_party(name, block, party_key), 0.8, block.strip())
+        return parties
+
+    def _party_from_block(self, block: str, role: str, base_confidence: float) -> Tuple[Optional[ContractParty], float]:
+        # The name follows the last connector ("between", "AND") that precedes it
+        names = list(_NAME_RE.finditer(block))
+        if not names:
+            return None, 0.0
+        match = names[-1] if len(names) > 1 and names[-1].group(0).lstrip().upper().startswith("AND") else names[0]
+        name = match.group("name").strip(" .,")
+        if len(name) < 3:
+            return None, 0.0
+        party_confidence = base_confidence if " " in name else base_confidence - 0.2
+        return self._build_party(name, block[match.start():], role), party_confidence
+
+    def _build_party(self, name: str, block: str, role: str) -> ContractParty:
+        email = _EMAIL_RE.search(block)
+        phone = _PHONE_RE.search(block)
+        address = _ADDRESS_RE.search(block)
+        return ContractParty(
+            name=name,
+            email=email.group(0) if email else None,
+            phone=phone.group(0).strip() if phone else None,
+            address=re.sub(r"\s+", " ", address.group("address")).strip(" ,") if address else None,
+            role=role,
+        )
+
+    # --- Dates ---
+
+    def _extract_dates(self, text: str) -> Dict[str, Tuple[Optional[date], float]]:
+        dates: Dict[str, Tuple[Optional[date], float]] = {}
+        range_match = _RANGE_RE.search(text)
+        if range_match:
+            dates["start_date"] = parse_contract_date(range_match.group("start"))
+            dates["end_date"] = parse_contract_date(range_match.group("end"))
+
+        if not dates.get("start_date", (None,))[0]:
+            starts = {parse_contract_date(match.group("date")) for match in _START_RE.finditer(text)}
+            starts = {parsed for parsed in starts if parsed[0]}
+            if starts:
+                best = max(starts, key=lambda parsed: parsed[1])
+                dates["start_date"] = (best[0], best[1] if len({parsed[0] for parsed in starts}) == 1 else 0.5)
+
+        if not dates.get("end_date", (None,))[0]:
+            end_match = _END_RE.search(text)
+            if end_match:
+                dates["end_date"] = parse_contract_date(end_match.group("date"))
+            start = dates.get("start_date", (None, 0.0))
+            duration = _DURATION_RE.search(text)
+            if not dates.get("end_date", (None,))[0] and start[0] and duration:
+                count = duration.group("count")
+                months = int(count) if count.isdigit() else words_to_number(count)
+                if months:
+                    if duration.group("unit").lower().startswith("year"):
+                        months *= 12
+                    # An 11-month lease from 1 Jan ends on 30 Nov
+                    dates["end_date"] = (_add_months(start[0], months) - timedelta(days=1), min(start[1], 0.8))
+        return dates
+
+    # --- Charges ---
+
+    def _extract_line_items(self, text: str):
+        candidates: Dict[Tuple[LineItemCategory, Decimal], Dict[str, Any]] = {}
+        for match in _AMOUNT_RE.finditer(text):
+            try:
+                amount = Decimal(match.group("number").replace(",", ""))
+            except InvalidOperation:
+                continue
+            currency = _CURRENCY_SYMBOLS.get(match.group("currency").lower(), "INR")
+            words = match.group("words")
+            in_words = words_to_number(words) if words else None
+            self._add_candidate(candidates, text, match.start(), match.end(), amount, currency,
+                                agrees=None if in_words is None else in_words == amount)
+        for match in _WORDS_AMOUNT_RE.finditer(text):
+            # Amounts written only in words ("a monthly rent of Rupees Fifteen Thousand only")
+            preceding = text[max(0, match.start() - 25):match.start()]
+            if re.search(r"\d\s*(?:/-)?\s*\(?\s*$", preceding):
+                continue
+            in_words = words_to_number(match.group("words"))
+            if in_words:
+                self._add_candidate(candidates, text, match.start(), match.end(), Decimal(in_words), "INR", agrees=None)
+
+        items: List[LineItem] = []
+        item_confidence: List[float] = []
+        rent_amounts = {amount for category, amount in candidates if category == LineItemCategory.RENT}
+        due_day = _DUE_DAY_RE.search(text)
+        rent_snippet = ""
+        for (category, amount), candidate in sorted(candidates.items(), key=lambda item: item[1]["position"]):
+            item_score = candidate["confidence"]
+            if category == LineItemCategory.RENT and len(rent_amounts) > 1:
+                item_score = min(item_score, 0.5)  # escalation clauses or conflicting figures
+            items.append(LineItem(
+                item_description=_CHARGE_DESCRIPTIONS[category] if category != LineItemCategory.RENT or candidate["frequency"] in (None, InvoiceFrequency.MONTHLY) else "Rent",
+                amount=amount,
+                currency=candidate["currency"],
+                category=category,
+                billing_cycle=candidate["frequency"],
+                # Due-day clauses ("on or before the 5th of every month") refer to the rent
+                due_days=int(due_day.group("day")) if due_day and category == LineItemCategory.RENT and 1 <= int(due_day.group("day")) <= 31 else None,
+            ))
+            item_confidence.append(item_score)
+            if category == LineItemCategory.RENT and not rent_snippet:
+                rent_snippet = candidate["snippet"]
+
+        rent_items = [(item, score) for item, score in zip(items, item_confidence) if item.category == LineItemCategory.RENT]
+        if not rent_items:
+            # Without a recurring charge the invoice amount has to come from the LLM
+            return items, 0.0 if not items else min(0.5, min(item_confidence)), None, 0.0, ""
+        rent_item, rent_score = rent_items[0]
+        rent_candidate = candidates[(LineItemCategory.RENT, rent_item.amount)]
+        if not rent_item.billing_cycle:
+            frequency_score = 0.0
+        elif not rent_candidate["frequency_stated"]:
+            # Monthly is only the default; the period may be stated away from the amount
+            frequency_score = min(rent_score, _DEFAULT_FREQUENCY_CONFIDENCE)
+        else:
+            frequency_score = rent_score
+        return items, min(item_confidence), rent_item.billing_cycle, frequency_score, rent_snippet
+
+    def _add_candidate(self, candidates, text: str, start: int, end: int, amount: Decimal, currency: str,
+                       agrees: Optional[bool]) -> None:
+        window = text[max(0, start - _CONTEXT_CHARS):start].lower()
+        # Only look back within the current sentence
+        window = re.split(r"(?<!rs)(?<!no)\.\s|\n\s*\n|;", window)[-1]
+        category, position = None, -1
+        for candidate_category, keywords in _CHARGE_KEYWORDS:
+            for keyword in keywords:
+                found = window.rfind(keyword)
+                if found > position:
+                    category, position = candidate_category, found
+        if category is None or amount <= 0:
+            return
+
+        after = text[end:end + 80]
+        frequency = None
+        if category == LineItemCategory.DEPOSIT:
+            frequency = InvoiceFrequency.ONE_TIME
+        elif category in (LineItemCategory.RENT, LineItemCategory.MAINTENANCE_FEE, LineItemCategory.UTILITY):
+            surrounding = window + " " + after.lower()
+            frequency = next((hint for hint, pattern in _FREQUENCY_HINTS if pattern.search(surrounding)), None)
+        stated = frequency is not None
+        if frequency is None and category == LineItemCategory.RENT:
+            frequency = InvoiceFrequency.MONTHLY  # rent without a stated period is monthly
+
+        # A numeric amount confirmed by the amount in words is the strongest evidence
+        score = 0.85 if agrees is None else (0.95 if agrees else 0.4)
+        key = (category, amount)
+        existing = candidates.get(key)
+        if existing:
+            existing["confidence"] = max(existing["confidence"], score)
+            if stated and not existing["frequency_stated"]:
+                existing["frequency"], existing["frequency_stated"] = frequency, True
+            else:
+                existing["frequency"] = existing["frequency"] or frequency
+            return
+        candidates[key] = {
+            "position": start,
+            "currency": currency,
+            "frequency": frequency,
+            "frequency_stated": stated,
+            "confidence": score,
+            "snippet": text[max(0, start - 60):end + 40].strip(),
+        }
+
+
+# Singleton extractor instance
+_contract_pre_extractor = None
+
+
+def get_contract_pre_extractor() -> ContractPreExtractor:
+    """Get singleton contract pre-extractor instance"""
+    global _contract_pre_extractor
+    if _contract_pre_extractor is None:
+        _contract_pre_extractor = ContractPreExtractor()
+    return _contract_pre_extractor
@@ -1,4 +1,4 @@
-import pdfplumber
+import asyncio
 from typing import List, Dict, Any, Optional
 from fastapi import HTTPException
 import logging
@@ -11,6 +11,7 @@ import re
 import hashlib
 from services.gcp_storage_service import get_gcp_storage_service
 from services.contract_db_service import get_contract_db_service
+from utils.tracing import trace_dependency
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +27,7 @@ class ContractProcessor:
         self.db_service = get_contract_db_service()
         logger.info("🚀 Contract Processor initialized")
     
+    @trace_dependency("pdf_parsing")
     def extract_text_from_pdf(self, pdf_file: bytes) -> str:
         """
         Extract text from PDF file using pdfplumber for better layout preservation
@@ -39,6 +41,7 @@ class ContractProcessor:
         try:
             text = ""
             
+            import pdfplumber  # deferred: heavy import only needed for PDF uploads
             with pdfplumber.open(io.BytesIO(pdf_file)) as pdf:
                 for page_num, page in enumerate(pdf.pages):
                     logger.info(f"📄 Processing page {page_num + 1}")
@@ -222,6 +225,7 @@ class ContractProcessor:
                 detail=f"Failed to generate embeddings: {str(e)}"
             )
     
+    @trace_dependency("pinecone", "upsert")
     def store_in_pinecone(self, 
                          user_id: str,
                          contract_name: str,
@@ -340,6 +344,7 @@ class ContractProcessor:
         safe_filename = re.sub(r'[^\w\-_\.]', '_', filename)
         return f"contracts/{user_id}/{contract_id}/{safe_filename}"
     
+    @trace_dependency("gcs", "upload_contract")
     async def store_contract_in_gcp(self, 
                                    file_content: bytes, 
                                    storage_path: str, 
@@ -365,8 +370,9 @@ class ContractProcessor:
                 "file_type": "contract_pdf"
             }
             
-            # Upload to GCP
-            result = self.storage_service.upload_file(
+            # Upload to GCP (the blocking client and its retries run off the event loop)
+            result = await asyncio.to_thread(
+                self.storage_service.upload_file,
                 file_content=file_content,
                 destination_path=storage_path,
                 content_type="application/pdf",
@@ -446,7 +452,7 @@ class ContractProcessor:
             )
             
             # Step 6: Extract text
-            text = self.extract_text_from_pdf(pdf_file)
+            text = await asyncio.to_thread(self.extract_text_from_pdf, pdf_file)
             logger.info(f"📄 Extracted text length: {len(text)}")
             
             # Step 7: Chunk text
@@ -454,11 +460,11 @@ class ContractProcessor:
             logger.info(f"📄 Created {len(chunks)} chunks")
             
             # Step 8: Generate embeddings
-            embeddings = self.generate_embeddings(chunks)
+            embeddings = await asyncio.to_thread(self.generate_embeddings, chunks)
             logger.info(f"🔢 Generated {len(embeddings)} embeddings")
             
             # Step 9: Store in Pinecone
-            vector_ids = self.store_in_pinecone(user_id, contract_name, chunks, embeddings)
+            vector_ids = await asyncio.to_thread(self.store_in_pinecone, user_id, contract_name, chunks, embeddings)
             
             # Step 10: Update contract processing status
             await self.db_service.update_contract_processing_status(
@@ -4,11 +4,15 @@ from db.db import get_pinecone_client
 from models.llm.embedding import get_embedding_service
 from models.llm.base import get_model
 from schemas.contract_schemas import ContractInvoiceData, InvoiceGenerationResponse, ContractParty, LineItem
+from services.contract_pre_extractor import get_contract_pre_extractor, DEFAULT_THRESHOLD
+from utils.tracing import trace_dependency
+from utils.resilience import resilient
+from utils.batching import get_llm_gate
 import os
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import re
 
 logger = logging.getLogger(__name__)
@@ -30,6 +34,9 @@ class ContractRAGService:
     def __init__(self):
         self.embedding_service = get_embedding_service()
         self.chat_model = get_model()
+        self.pre_extractor = get_contract_pre_extractor()
+        # Fields at or above this confidence from the rule-based pre-extractor are not sent to the LLM
+        self.pre_extraction_threshold = float(os.getenv("PRE_EXTRACTION_THRESHOLD", str(DEFAULT_THRESHOLD)))
         logger.info("🚀 Contract RAG Service initialized")
     
     def generate_invoice_data(self, user_id: str, contract_name: str, query: str = None) -> InvoiceGenerationResponse:
@@ -51,13 +58,35 @@ class ContractRAGService:
             logger.info(f"🚀 Generating invoice data for contract: {contract_name}")
             
             # Get contract context using RAG
-            context = self._retrieve_contract_context(user_id, contract_name, query)
-            
-            # Generate structured invoice data
-            invoice_data = self._extract_invoice_data_from_context(context, contract_name)
+            similarity_scores: List[float] = []
+            context = self._retrieve_contract_context(user_id, contract_name, query, similarity_scores)
             
-            # Parse the response into structured data
-            structured_data = self._parse_invoice_response(invoice_data)
+            # Rule-based pre-extraction; the LLM is only asked for what the rules could not settle
+            pre_extraction = self.pre_extractor.extract(context)
+            threshold = self.pre_extraction_threshold
+            invoice_data = None
+            extraction_agreement = 1.0  # The rules settled every field an invoice depends on
+            if pre_extraction.needs_llm(threshold):
+                focus_fields = pre_extraction.low_confidence_fields(threshold)
+                logger.info(f"🤖 Pre-extraction confidence {pre_extraction.confidence_score:.2f} - asking LLM for {focus_fields}")
+                invoice_data = self._extract_invoice_data_from_context(
+                    context, contract_name,
+                    focus_fields=focus_fields,
+                    known_values=pre_extraction.known_values(threshold)
+                )
+                llm_data = self._parse_invoice_response(invoice_data)
+                if llm_data.confidence_score is not None and llm_data.confidence_score < 0.5:
+                    # Parse fallback placeholders ("Unknown Client") must not replace extracted values
+                    logger.warning("⚠️ LLM response could not be parsed - keeping rule-based values")
+                    extraction_agreement = None  # Unknown, not agreement
+                else:
+                    extraction_agreement = pre_extraction.agreement(llm_data)
+                    pre_extraction.merge(llm_data, focus_fields, llm_confidence=0.85)
+                extraction_method = "rules+llm"
+            else:
+                logger.info(f"⚡ Pre-extraction confidence {pre_extraction.confidence_score:.2f} - skipping LLM extraction")
+                extraction_method = "rules"
+            structured_data = pre_extraction.invoice_data
             
             return InvoiceGenerationResponse(
                 status="success",
@@ -66,7 +95,15 @@ class ContractRAGService:
                 user_id=user_id,
                 invoice_data=structured_data,
                 raw_response=invoice_data,
-                confidence_score=0.85,  # You can implement confidence scoring
+                confidence_score=pre_extraction.confidence_score,
+                field_confidence=pre_extraction.field_confidence,
+                extraction_method=extraction_method,
+                confidence_signals={
+                    "retrieval_similarity": round(sum(similarity_scores) / len(similarity_scores), 4) if similarity_scores else None,
+                    "extraction_agreement": extraction_agreement,
+                    # Kept apart from metadata.confidence_score, which later holds the model's own score
+                    "extraction_confidence": pre_extraction.confidence_score,
+                },
                 generated_at=datetime.now().isoformat()
             )
             
@@ -77,24 +114,23 @@ class ContractRAGService:
                 detail=f"Failed to generate invoice data: {str(e)}"
             )
     
-    def _retrieve_contract_context(self, user_id: str, contract_name: str, query: str) -> str:
-        """Retrieve relevant contract context using vector search"""
+    def _retrieve_contract_context(self, user_id: str, contract_name: str, query: str,
+                                   similarity_scores: Optional[List[float]] = None) -> str:
+        """
+        Retrieve relevant contract context using vector search
+        
+        If ``similarity_scores`` is given, the scores of the chunks used are appended to it.
+        """
         try:
             # Generate query embedding
             query_embedding = self.embedding_service.embed_query(query)
             
             # Search Pinecone for relevant chunks
-            index = get_pinecone_client()
-            response = index.query(
-                vector=query_embedding,
-                top_k=10,
-                include_metadata=True,
-                filter={
-                    "user_id": user_id,
-                    "contract_name": contract_name,
-                    "document_type": "contract"
-                }
-            )
+            response = self._query_contract_chunks(query_embedding, {
+                "user_id": user_id,
+                "contract_name": contract_name,
+                "document_type": "contract"
+            })
             
             if not response.matches:
                 raise HTTPException(
@@ -107,6 +143,8 @@ class ContractRAGService:
             for match in response.matches:
                 if match.metadata and "text" in match.metadata:
                     context_chunks.append(match.metadata["text"])
+                    if similarity_scores is not None and getattr(match, "score", None) is not None:
+                        similarity_scores.append(float(match.score))
             
             context = "\n\n".join(context_chunks)
             logger.info(f"✅ Retrieved context: {len(context)} characters")
@@ -116,9 +154,45 @@ class ContractRAGService:
             logger.error(f"❌ Failed to retrieve contract context: {str(e)}")
             raise
     
-    def _extract_invoice_data_from_context(self, context: str, contract_name: str) -> str:
-        """Extract invoice data from contract context using LLM"""
+    @resilient("pinecone", hedge_after=1.5)
+    @trace_dependency("pinecone", "query")
+    def _query_contract_chunks(self, query_embedding: List[float], metadata_filter: Dict[str, Any]):
+        """Idempotent Pinecone read - retried and hedged on slow responses"""
+        index = get_pinecone_client()
+        return index.query(
+            vector=query_embedding,
+            top_k=10,
+            include_metadata=True,
+            filter=metadata_filter
+        )
+    
+    @resilient("gemini", max_attempts=3, base_delay=1.0)
+    @trace_dependency("gemini", "generate_content")
+    def _generate_content(self, prompt: str):
+        """Gemini call guarded by the shared breaker and retried on transient errors"""
+        with get_llm_gate().slot():
+            return get_model().generate_content(prompt)
+    
+    def _extract_invoice_data_from_context(self, context: str, contract_name: str,
+                                           focus_fields: Optional[List[str]] = None,
+                                           known_values: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Extract invoice data from contract context using LLM
+        
+        With ``focus_fields``, the prompt passes the pre-extracted ``known_values``
+        and asks the model to concentrate on the listed fields.
+        """
         try:
+            focus_section = ""
+            if focus_fields:
+                focus_section = f"""
+**PRE-EXTRACTED FIELDS:**
+The following fields were already extracted from this contract; copy them unchanged:
+{json.dumps(known_values or {}, indent=2, default=str)}
+
+Focus on extracting these fields accurately: {", ".join(focus_fields)}
+"""
+
             # Create specialized prompt for invoice data extraction (enhanced for all contract types)
             system_prompt = f'''You are an expert contract analyst specializing in extracting invoice and billing information from rental and lease agreements.
 
@@ -188,12 +262,11 @@ Your task is to analyze the provided contract text and extract ALL relevant info
   ],
   "notes": "string or null"
 }}
-
+{focus_section}
 Contract Text:
 {context}'''
             
-            model = get_model()
-            response = model.generate_content(system_prompt)
+            response = self._generate_content(system_prompt)
             result = response.text
             
             logger.info(f"✅ Extracted invoice data from context")
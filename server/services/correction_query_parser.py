@@ -0,0 +1,473 @@
+"""
+Local parsing of natural-language invoice corrections
+
+Most correction queries are short and formulaic ("rent is 25k, net 30",
+"client email is ap@acme.com"). ``CorrectionQueryParser`` settles those
+without the LLM:
+
+- field names are found by alias ("rent", "landlord", "due", ...), with
+  fuzzy matching for typos at the start of a clause
+- the text after a field name, up to the next field name or sentence end,
+  is parsed by the field's type: amounts ("25k", "$1,500", "1.5 lakh",
+  "twenty five thousand"), payment terms in days ("net 30", "within 15
+  days"), dates, names and free text
+- self-identifying values (emails, phone numbers, frequencies, currency
+  symbols) are picked up anywhere and assigned to the party whose clause
+  contains them, or to the only field they can belong to
+
+Anything the parser cannot settle - two amounts for one field, a day/month
+order that could be swapped, a day of the month where a number of days is
+expected, words that no rule consumed - is returned as the ambiguous
+remainder (the whole clause of an ambiguous field), which is all the LLM
+needs to see.
+"""
+
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional, Tuple
+
+from services.contract_pre_extractor import parse_contract_date, words_to_number
+from utils.fuzzy_match import FuzzyMatchIndex
+
+# Field path -> value type
+FIELD_TYPES: Dict[str, str] = {
+    "client.name": "name",
+    "client.email": "email",
+    "client.address": "text",
+    "client.phone": "phone",
+    "service_provider.name": "name",
+    "service_provider.email": "email",
+    "service_provider.address": "text",
+    "payment_terms.amount": "amount",
+    "payment_terms.currency": "currency",
+    "payment_terms.frequency": "frequency",
+    "payment_terms.due_days": "day",
+    "services.0.description": "text",
+    "services.0.quantity": "number",
+    "services.0.unit_price": "amount",
+    "start_date": "date",
+    "end_date": "date",
+    "contract_title": "text",
+    "invoice_frequency": "frequency",
+}
+
+SUPPORTED_FIELDS = tuple(FIELD_TYPES)
+
+_FIELD_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "client.name": ("client", "client name", "customer", "customer name", "tenant", "tenant name", "lessee",
+                    "lessee name", "bill to", "billed to"),
+    "client.email": ("client email", "customer email", "tenant email"),
+    "client.address": ("client address", "customer address", "tenant address", "address"),
+    "client.phone": ("client phone", "customer phone", "tenant phone", "phone", "phone number", "mobile"),
+    "service_provider.name": ("service provider", "provider", "landlord", "lessor", "vendor", "company",
+                              "service provider name", "provider name", "landlord name", "lessor name",
+                              "vendor name"),
+    "service_provider.email": ("provider email", "service provider email", "landlord email", "vendor email"),
+    "service_provider.address": ("provider address", "service provider address", "landlord address", "vendor address"),
+    "payment_terms.amount": ("amount", "rent", "fee", "fees", "price", "cost", "charge", "charges", "payment",
+                             "total", "monthly rent", "monthly fee"),
+    "payment_terms.currency": ("currency",),
+    "payment_terms.frequency": ("frequency", "payment frequency", "billing cycle", "billing frequency"),
+    "payment_terms.due_days": ("due", "due on", "due date", "payment due", "due days", "net"),
+    "services.0.description": ("service", "services", "description", "service description"),
+    "services.0.quantity": ("quantity", "qty"),
+    "services.0.unit_price": ("unit price", "rate"),
+    "start_date": ("start date", "start", "starts", "starting", "started", "commencing", "begins", "beginning"),
+    "end_date": ("end date", "end", "ends", "ending", "until", "expires", "expiry"),
+    "contract_title": ("title", "contract title", "contract name"),
+    "invoice_frequency": ("invoice frequency", "invoicing", "invoicing frequency"),
+}
+
+_ALIAS_FIELDS: Dict[str, str] = {
+    alias: path for path, aliases in _FIELD_ALIASES.items() for alias in aliases
+}
+
+_ALIAS_RE = re.compile(
+    r"\b(?P<alias>" + "|".join(
+        r"(?:'?s)?\s+".join(re.escape(word) for word in alias.split())
+        for alias in sorted(_ALIAS_FIELDS, key=len, reverse=True)
+    ) + r")\b",
+    re.IGNORECASE,
+)
+
+# Typos are only forgiven for single-word aliases that open a clause
+_FUZZY_ALIASES = FuzzyMatchIndex([alias for alias in _ALIAS_FIELDS if " " not in alias and len(alias) >= 5])
+_FUZZY_MIN_SCORE = 0.8
+_CLAUSE_START_RE = re.compile(r"(?:^|[,;:\n]|\.\s|\band\s)\s*(?P<word>[A-Za-z]{5,})\b")
+
+# Words that open a clause without naming a field ("change" is one letter from "charge")
+_CLAUSE_VERBS = {
+    "change", "changed", "changes", "changing", "update", "updated", "updates", "correct", "corrected",
+    "please", "modify", "modified", "replace", "replaced", "adjust", "adjusted", "remove", "should",
+    "actually", "instead", "there", "their", "those", "these",
+}
+
+# Payment terms as a number of days; "due on 5th" (a day of the month) is left to the LLM
+_DUE_DAYS_RE = re.compile(
+    r"\bnet\s*(?P<net>\d{1,3})\b(?!\s*(?:st|nd|rd|th)\b)|\b(?:within|in)\s+(?P<days>\d{1,3})\s+days?\b",
+    re.IGNORECASE,
+)
+
+_SENTENCE_END_RE = re.compile(r"(?<!\d)\.(?=\s|$)|[;\n]")
+_CONNECTOR_RE = re.compile(
+    r"^(?:\s|[:=\-,]|\b(?:is|are|was|to|be|should|will|would|has|have|changed|change|set|update|updated|"
+    r"as|of|on|the|it|its|now|actually|by|at|every|each|in|within|after|from)\b)*",
+    re.IGNORECASE,
+)
+_TRAILING_RE = re.compile(r"(?:[\s,;:.]|\b(?:and|also|plus|with|please|the)\b)*$", re.IGNORECASE)
+_NAME_BREAK_RE = re.compile(r"\s*(?:[,;(]|\.(?:\s|$)|\s(?:and|with|who|from|at|for)\s|$)", re.IGNORECASE)
+
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_PHONE_RE = re.compile(r"(?<![\w.])\+?\(?\d[\d\s().-]{5,16}\d(?![\w.])")
+
+_CURRENCY_SYMBOLS = {"$": "USD", "€": "EUR", "£": "GBP", "₹": "INR", "rs": "INR", "rs.": "INR"}
+_CURRENCY_WORDS = {
+    "usd": "USD", "dollar": "USD", "dollars": "USD", "eur": "EUR", "euro": "EUR", "euros": "EUR",
+    "gbp": "GBP", "pound": "GBP", "pounds": "GBP", "inr": "INR", "rupee": "INR", "rupees": "INR",
+    "cad": "CAD", "aud": "AUD", "jpy": "JPY", "yen": "JPY",
+}
+_CURRENCY_RE = re.compile(r"[$€£₹]|\b(?:" + "|".join(_CURRENCY_WORDS) + r")\b", re.IGNORECASE)
+
+_AMOUNT_SCALES = {
+    "k": 1_000, "thousand": 1_000, "m": 1_000_000, "mn": 1_000_000, "million": 1_000_000,
+    "lakh": 100_000, "lakhs": 100_000, "lac": 100_000, "lacs": 100_000, "crore": 10_000_000, "cr": 10_000_000,
+}
+_AMOUNT_RE = re.compile(
+    r"(?P<symbol>[$€£₹]|\brs\.?)?\s*(?P<number>\d[\d,]*(?:\.\d+)?)\s*"
+    r"(?P<scale>k|m|mn|thousand|million|lakhs?|lacs?|crore|cr)?\b",
+    re.IGNORECASE,
+)
+_DAY_RE = re.compile(
+    r"\b(?P<day>\d{1,3})(?:st|nd|rd|th)?\b(?:\s+days?\b)?(?:\s+(?:day\s+)?of\s+(?:the|each|every)\s+month\b)?",
+    re.IGNORECASE,
+)
+_NUMBER_WORD_RE = re.compile(r"[A-Za-z]+(?:[\s-]+[A-Za-z]+){0,7}")
+
+_MONTHS = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE_RE = re.compile(
+    r"\b\d{4}-\d{2}-\d{2}\b"
+    r"|\b\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}\b"
+    rf"|\b\d{{1,2}}(?:st|nd|rd|th)?\s+(?:day\s+of\s+)?{_MONTHS},?\s+\d{{4}}\b"
+    rf"|\b{_MONTHS}\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}\b",
+    re.IGNORECASE,
+)
+
+_FREQUENCIES = {
+    "monthly": "monthly", "month": "monthly",
+    "quarterly": "quarterly", "quarter": "quarterly",
+    "annually": "annually", "annual": "annually", "yearly": "annually", "year": "annually",
+    "weekly": "weekly", "week": "weekly",
+    "daily": "daily", "day": "daily",
+    "one time": "one_time", "one-time": "one_time", "onetime": "one_time", "once": "one_time",
+    "biannually": "biannually", "biannual": "biannually", "half yearly": "biannually",
+    "half-yearly": "biannually", "twice yearly": "biannually",
+}
+_FREQUENCY_RE = re.compile(
+    r"\b(?:(?:per|every|a|each)\s+(?P<unit>month|quarter|year|week|day)"
+    r"|(?P<word>monthly|quarterly|annually|annual|yearly|weekly|daily|one[\s-]?time|once|"
+    r"biannually|biannual|half[\s-]yearly|twice\s+yearly))\b",
+    re.IGNORECASE,
+)
+
+_STOPWORDS = {
+    "the", "a", "an", "is", "are", "was", "and", "or", "for", "of", "to", "on", "in", "it", "its", "it's",
+    "should", "be", "will", "would", "please", "set", "change", "changed", "make", "update", "updated",
+    "also", "with", "invoice", "this", "that", "now", "actually", "by", "at", "as", "per", "email",
+    "e-mail", "mail", "contact", "number", "their", "his", "her", "my", "our", "so", "then", "correct",
+    "correction", "fix", "value", "field", "every", "each", "from", "there", "has", "have", "ok", "okay",
+}
+
+
+@dataclass
+class LocalParseResult:
+    """Fields settled locally plus the text that still needs interpretation"""
+    corrections: Dict[str, str] = field(default_factory=dict)
+    spans: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    ambiguous_fields: List[str] = field(default_factory=list)
+    remainder: str = ""
+
+    def unresolved(self, fields: List[str]) -> List[str]:
+        """Requested fields the parser did not settle"""
+        return [path for path in fields if path not in self.corrections]
+
+
+@dataclass
+class _Anchor:
+    path: str
+    start: int
+    end: int
+    segment_end: int = 0
+
+
+def parse_amount(text: str) -> Tuple[Optional[str], Optional[str], Optional[Tuple[int, int]]]:
+    """
+    First amount in ``text``: (amount string, currency code or None, span)
+
+    Returns (None, None, None) when no amount is found or when the text holds
+    more than one distinct amount.
+    """
+    found = []
+    for match in _AMOUNT_RE.finditer(text):
+        if _DATE_RE.match(text, match.start("number")):
+            continue
+        try:
+            value = Decimal(match.group("number").replace(",", ""))
+        except InvalidOperation:
+            continue
+        scale = (match.group("scale") or "").lower()
+        if scale == "m" and not match.group("symbol") and value >= 100:
+            # "500 m" reads as a distance, not half a billion
+            continue
+        value *= _AMOUNT_SCALES.get(scale, 1)
+        symbol = (match.group("symbol") or "").lower()
+        found.append((value, _CURRENCY_SYMBOLS.get(symbol), match.span()))
+
+    if not found:
+        for match in _NUMBER_WORD_RE.finditer(text):
+            words = match.group(0).split()
+            # Longest leading run of number words
+            for count in range(len(words), 0, -1):
+                number = words_to_number(" ".join(words[:count]))
+                if number:
+                    phrase = " ".join(words[:count])
+                    start = text.find(words[0], match.start())
+                    span = (start, text.find(words[count - 1], start) + len(words[count - 1]))
+                    currency = "INR" if re.search(r"\brupees?\b", phrase, re.I) else None
+                    found.append((Decimal(number), currency, span))
+                    break
+            if found:
+                break
+
+    if not found or len({value for value, _, _ in found}) > 1:
+        return None, None, None
+    value, currency, span = found[0]
+    return _format_decimal(value), currency, span
+
+
+def _format_decimal(value: Decimal) -> str:
+    return str(value.quantize(Decimal(1))) if value == value.to_integral() else str(value)
+
+
+class CorrectionQueryParser:
+    """Rule-based extraction of field corrections from a free-text query"""
+
+    def parse(self, query: str) -> LocalParseResult:
+        """Settle what the rules can; everything else becomes the remainder"""
+        result = LocalParseResult()
+        text = query or ""
+        if not text.strip():
+            return result
+
+        consumed = bytearray(len(text))
+        ambiguous: Dict[str, Tuple[int, int]] = {}
+
+        def consume(span: Tuple[int, int]) -> None:
+            consumed[span[0]:span[1]] = b"\x01" * (span[1] - span[0])
+
+        def settle(path: str, value: str, span: Tuple[int, int]) -> None:
+            previous = result.corrections.get(path)
+            if previous is not None and previous != value:
+                ambiguous[path] = span
+                return
+            result.corrections[path] = value
+            result.spans.setdefault(path, span)
+            consume(span)
+
+        anchors = self._find_anchors(text)
+        typed = self._find_typed_values(text)
+
+        for anchor in anchors:
+            segment = text[anchor.end:anchor.segment_end]
+            lead = _CONNECTOR_RE.match(segment).end()
+            value_start = anchor.end + lead
+            if FIELD_TYPES[anchor.path] == "day":
+                parsed = self._parse_due_days(text, anchor.start, anchor.segment_end)
+            else:
+                parsed = self._parse_segment(anchor.path, text, value_start, anchor.segment_end, typed)
+            if parsed is None:
+                ambiguous.setdefault(anchor.path, (anchor.start, anchor.segment_end))
+                continue
+            value, span = parsed
+            consume((anchor.start, anchor.end))
+            consume((anchor.end, value_start))
+            settle(anchor.path, value, span)
+
+        # Self-identifying values: claimed by the party clause around them, else by the only possible field
+        party_segments = [
+            (anchor.path.split(".")[0], anchor.end, anchor.segment_end)
+            for anchor in anchors if FIELD_TYPES[anchor.path] == "name"
+        ]
+        for kind in ("email", "phone"):
+            values = typed[kind]
+            for value, span in values:
+                if any(consumed[span[0]:span[1]]):
+                    continue
+                party = next((name for name, start, end in party_segments if start <= span[0] < end), None)
+                path = f"{party}.{kind}" if party else None
+                if path not in FIELD_TYPES:
+                    candidates = [p for p, t in FIELD_TYPES.items() if t == kind and p not in result.corrections]
+                    path = candidates[0] if len(candidates) == 1 and len(values) == 1 else None
+                if path:
+                    settle(path, value, span)
+
+        frequencies = {value for value, _ in typed["frequency"]}
+        if len(frequencies) == 1:
+            frequency = frequencies.pop()
+            for path in ("payment_terms.frequency", "invoice_frequency"):
+                if path not in result.corrections and path not in ambiguous:
+                    result.corrections[path] = frequency
+            for _, span in typed["frequency"]:
+                consume(span)
+
+        currencies = {value for value, _ in typed["currency"]}
+        if len(currencies) == 1 and "payment_terms.currency" not in ambiguous:
+            result.corrections.setdefault("payment_terms.currency", currencies.pop())
+            for _, span in typed["currency"]:
+                # Symbols stay next to their amount in the remainder
+                if text[span[0]].isalpha():
+                    consume(span)
+
+        # Every clause of an ambiguous field goes back to the LLM whole
+        clauses = list(ambiguous.values())
+        clauses += [(anchor.start, anchor.segment_end) for anchor in anchors if anchor.path in ambiguous]
+        for path in ambiguous:
+            result.corrections.pop(path, None)
+        for start, end in clauses:
+            consumed[start:end] = bytes(end - start)
+        result.ambiguous_fields = sorted(ambiguous)
+        result.remainder = self._remainder(text, consumed, keep=bool(ambiguous))
+        return result
+
+    def _find_anchors(self, text: str) -> List[_Anchor]:
+        emails = [match.span() for match in _EMAIL_RE.finditer(text)]
+        anchors = [
+            _Anchor(_ALIAS_FIELDS[re.sub(r"(?:'?s)?\s+", " ", match.group("alias").lower())], match.start(), match.end())
+            for match in _ALIAS_RE.finditer(text)
+            # "company" in "ap@company.com" is not a field name
+            if not any(start <= match.start() < end for start, end in emails)
+        ]
+        taken = {anchor.start for anchor in anchors}
+        for match in _CLAUSE_START_RE.finditer(text):
+            start = match.start("word")
+            word = match.group("word").lower()
+            if start in taken or word in _ALIAS_FIELDS or word in _CLAUSE_VERBS or word in _STOPWORDS:
+                continue
+            alias, score = _FUZZY_ALIASES.best(match.group("word"))
+            if alias and score >= _FUZZY_MIN_SCORE:
+                anchors.append(_Anchor(_ALIAS_FIELDS[alias], start, match.end("word")))
+        anchors.sort(key=lambda anchor: anchor.start)
+
+        # An anchor's clause runs to the next anchor or the end of the sentence
+        for index, anchor in enumerate(anchors):
+            limit = anchors[index + 1].start if index + 1 < len(anchors) else len(text)
+            sentence_end = _SENTENCE_END_RE.search(text, anchor.end, limit)
+            anchor.segment_end = sentence_end.start() if sentence_end else limit
+        return anchors
+
+    def _find_typed_values(self, text: str) -> Dict[str, List[Tuple[str, Tuple[int, int]]]]:
+        emails = [(match.group(0), match.span()) for match in _EMAIL_RE.finditer(text)]
+        phones = []
+        for match in _PHONE_RE.finditer(text):
+            digits = re.sub(r"\D", "", match.group(0))
+            if 7 <= len(digits) <= 15 and not _DATE_RE.fullmatch(match.group(0).strip()) and not any(
+                start <= match.start() < end for _, (start, end) in emails
+            ):
+                phones.append((match.group(0).strip(), match.span()))
+        frequencies = []
+        for match in _FREQUENCY_RE.finditer(text):
+            key = re.sub(r"\s+", " ", (match.group("unit") or match.group("word")).lower())
+            frequencies.append((_FREQUENCIES[key], match.span()))
+        currencies = []
+        for match in _CURRENCY_RE.finditer(text):
+            token = match.group(0).lower()
+            currencies.append((_CURRENCY_SYMBOLS.get(token) or _CURRENCY_WORDS[token], match.span()))
+        return {"email": emails, "phone": phones, "frequency": frequencies, "currency": currencies}
+
+    def _parse_due_days(self, text: str, start: int, end: int) -> Optional[Tuple[str, Tuple[int, int]]]:
+        """Days from "net N" or "within N days" in a due clause; None for anything else"""
+        values = {
+            (match.group("net") or match.group("days"), match.span())
+            for match in _DUE_DAYS_RE.finditer(text, start, end)
+        }
+        if len({int(value) for value, _ in values}) != 1:
+            return None
+        value, span = min(values, key=lambda item: item[1])
+        return str(int(value)), span
+
+    def _parse_segment(self, path: str, text: str, start: int, end: int,
+                       typed: Dict[str, List[Tuple[str, Tuple[int, int]]]]) -> Optional[Tuple[str, Tuple[int, int]]]:
+        """(value, span in ``text``) for the clause after a field name, or None if unclear"""
+        segment = text[start:end]
+        kind = FIELD_TYPES[path]
+
+        if kind in ("email", "phone", "frequency", "currency"):
+            values = {(value, span) for value, span in typed[kind] if start <= span[0] < end}
+            if len({value for value, _ in values}) != 1:
+                return None
+            return min(values, key=lambda item: item[1])
+
+        if kind == "amount":
+            amount, _, span = parse_amount(segment)
+            return (amount, (start + span[0], start + span[1])) if amount else None
+
+        if kind == "number":
+            numbers = {(int(match.group("day")), match.span()) for match in _DAY_RE.finditer(segment)}
+            if len({value for value, _ in numbers}) != 1:
+                return None
+            value, span = numbers.pop()
+            return str(value), (start + span[0], start + span[1])
+
+        if kind == "date":
+            matches = list(_DATE_RE.finditer(segment))
+            if len(matches) != 1:
+                return None
+            parsed, confidence = parse_contract_date(matches[0].group(0))
+            # Dates whose day and month could be swapped are left to the LLM
+            if parsed is None or confidence < 0.9:
+                return None
+            return parsed.isoformat(), (start + matches[0].start(), start + matches[0].end())
+
+        if kind == "name":
+            stop = _NAME_BREAK_RE.search(segment)
+            value = segment[:stop.start() if stop else len(segment)].strip(" \"'")
+            words = value.split()
+            if not words or len(words) > 6 or not value[0].isalpha():
+                return None
+            return value, (start, start + len(segment[:stop.start() if stop else len(segment)]))
+
+        # Free text runs to the end of the clause
+        trimmed = segment[:_TRAILING_RE.search(segment).start()].strip(" \"'")
+        if len(trimmed) < 2:
+            return None
+        return trimmed, (start, start + len(segment.rstrip()))
+
+    def _remainder(self, text: str, consumed: bytearray, keep: bool = False) -> str:
+        """Unconsumed text, or "" when it is only connectives and punctuation (unless ``keep``)"""
+        pieces, current = [], []
+        for char, used in zip(text, consumed):
+            if used:
+                if current:
+                    pieces.append("".join(current))
+                    current = []
+            else:
+                current.append(char)
+        if current:
+            pieces.append("".join(current))
+
+        remainder = " ".join(re.sub(r"\s+", " ", piece).strip(" ,;:.-") for piece in pieces)
+        remainder = re.sub(r"\s+", " ", remainder).strip()
+        meaningful = [word for word in re.findall(r"[A-Za-z0-9@'-]+", remainder.lower())
+                      if word not in _STOPWORDS and len(word) > 1]
+        return remainder if meaningful or keep else ""
+
+
+_parser = None
+
+
+def get_correction_query_parser() -> CorrectionQueryParser:
+    """Get singleton instance of the correction query parser"""
+    global _parser
+    if _parser is None:
+        _parser = CorrectionQueryParser()
+    return _parser
@@ -3,11 +3,12 @@ from datetime import datetime, timezone, date
 import logging
 import json
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, and_, or_
+from sqlalchemy import select, update, delete, and_, or_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 from db.postgresdb import AsyncSessionLocal
-from models.database_models import User, Address, SecurityEvent, UserSession, UserRole, UserStatus, Invoice, InvoiceTemplate, InvoiceStatus
+from models.database_models import User, Address, SecurityEvent, UserSession, UserRole, UserStatus, Invoice, InvoiceTemplate, InvoiceStatus, HTMLInvoice
 from schemas.auth_schemas import (
     UserRegistrationRequest, UpdateProfileRequest, 
     SecurityEventType, AuthStatus
@@ -738,6 +739,60 @@ class DatabaseService:
             logger.error(f"❌ Error listing invoice templates: {str(e)}")
             return [], 0
 
+    
+    # HTML Invoice Operations
+    async def get_html_invoice_by_uuid(self, invoice_uuid: str) -> Optional[HTMLInvoice]:
+        """Get the stored HTML invoice of an invoice (unique index on invoice_uuid)"""
+        try:
+            async with self.get_session() as session:
+                result = await session.execute(
+                    select(HTMLInvoice).where(HTMLInvoice.invoice_uuid == invoice_uuid)
+                )
+                return result.scalar_one_or_none()
+        except Exception as e:
+            logger.error(f"❌ Error getting HTML invoice by UUID: {str(e)}")
+            return None
+    
+    async def save_html_invoice(self, values: Dict[str, Any]) -> Optional[HTMLInvoice]:
+        """Create the HTML invoice of ``values['invoice_uuid']``, or replace the stored one"""
+        try:
+            async with self.get_session() as session:
+                # One statement, so concurrent saves for the same invoice cannot both insert
+                stmt = pg_insert(HTMLInvoice).values(**values)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[HTMLInvoice.invoice_uuid],
+                    set_={
+                        **{key: stmt.excluded[key] for key in values if key not in ("id", "invoice_uuid")},
+                        "updated_at": func.now()
+                    }
+                ).returning(HTMLInvoice)
+                result = await session.execute(stmt, execution_options={"populate_existing": True})
+                html_invoice = result.scalar_one()
+                await session.commit()
+                return html_invoice
+                
+        except Exception as e:
+            logger.error(f"❌ Error saving HTML invoice: {str(e)}")
+            return None
+    
+    async def record_html_invoice_view(self, invoice_uuid: str) -> bool:
+        """Increment the view count of an HTML invoice in a single UPDATE"""
+        try:
+            async with self.get_session() as session:
+                await session.execute(
+                    update(HTMLInvoice)
+                    .where(HTMLInvoice.invoice_uuid == invoice_uuid)
+                    .values(
+                        access_count=func.coalesce(HTMLInvoice.access_count, 0) + 1,
+                        last_viewed_at=datetime.now(timezone.utc)
+                    )
+                )
+                await session.commit()
+                return True
+        except Exception as e:
+            logger.error(f"❌ Error recording HTML invoice view: {str(e)}")
+            return False
+
 
 # Global service instance
 _database_service = None
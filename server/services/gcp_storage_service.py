@@ -6,6 +6,9 @@ from datetime import datetime, timedelta
 import mimetypes
 from io import BytesIO
 
+from utils.tracing import trace_dependency
+from utils.resilience import call_with_resilience
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,6 +52,7 @@ class GCPStorageService:
                 logger.error(f"❌ Failed to create bucket '{self.bucket_name}': {str(e)}")
                 raise
     
+    @trace_dependency("gcs", "upload")
     def upload_file(
         self, 
         file_content: bytes, 
@@ -85,8 +89,8 @@ class GCPStorageService:
             if metadata:
                 blob.metadata = metadata
             
-            # Upload file
-            blob.upload_from_string(file_content, content_type=blob.content_type)
+            # Upload file (same object path, so retries are idempotent)
+            call_with_resilience("gcs", blob.upload_from_string, file_content, content_type=blob.content_type)
             
             # Generate download URL (valid for 1 hour)
             download_url = self.generate_download_url(destination_path, expires_in_hours=1)
@@ -116,6 +120,7 @@ class GCPStorageService:
                 "file_path": destination_path
             }
     
+    @trace_dependency("gcs", "download")
     def download_file(self, source_path: str) -> Optional[bytes]:
         """
         Download file from GCP Storage
@@ -135,7 +140,7 @@ class GCPStorageService:
                 logger.warning(f"⚠️ File not found: {source_path}")
                 return None
             
-            content = blob.download_as_bytes()
+            content = call_with_resilience("gcs", blob.download_as_bytes)
             logger.info(f"✅ File downloaded successfully: {source_path} ({len(content)} bytes)")
             return content
             
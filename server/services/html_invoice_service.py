@@ -0,0 +1,300 @@
+"""
+HTML Invoice Service
+
+HTML invoices generated by the UI generation agent are stored in
+``html_invoices`` together with a gzip-compressed copy and a content hash,
+and ``/invoices/{uuid}/view`` serves them with a single indexed lookup by
+``invoice_uuid``: the stored bytes go out as they are (gzip when the client
+accepts it) with an ETag, and nothing is generated on the read path.
+
+Invoices without a stored HTML version (e.g. created before the UI agent
+persisted its output) are rendered on demand from the ``invoices`` row, once,
+and the result is stored for every later view.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from services.template_registry import TemplateEntry, get_template_registry
+from services.template_selection import get_template_selector
+from utils.line_items import DETAILED_COLUMNS, SUMMARY_COLUMNS, render_line_items
+from utils.template_engine import get_template_engine
+
+logger = logging.getLogger(__name__)
+
+# Template variables that hold pre-built HTML rather than text
+RAW_TEMPLATE_VARIABLES = frozenset({"SERVICE_ITEMS"})
+
+
+def compress_html(html_content: str) -> bytes:
+    """Gzip body stored next to the HTML (fixed mtime, so equal content gives equal bytes)"""
+    return gzip.compress(html_content.encode("utf-8"), compresslevel=6, mtime=0)
+
+
+def content_hash(html_content: str) -> str:
+    return hashlib.sha256(html_content.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class StoredHTMLInvoice:
+    """What the view endpoint needs from an ``html_invoices`` row"""
+    invoice_uuid: str
+    invoice_number: str
+    html_content: str
+    html_gzip: bytes
+    content_hash: str
+    viewable: bool = True
+    stored: bool = True
+
+    @classmethod
+    def from_row(cls, row) -> "StoredHTMLInvoice":
+        # Rows written before compressed storage get their derived fields computed here
+        return cls(
+            invoice_uuid=row.invoice_uuid,
+            invoice_number=row.invoice_number,
+            html_content=row.html_content,
+            html_gzip=row.html_gzip or compress_html(row.html_content),
+            content_hash=row.content_hash or content_hash(row.html_content),
+            viewable=bool(row.viewing_enabled and row.is_active and row.html_content is not None),
+        )
+
+
+class HTMLInvoiceService:
+    """Renders, stores and serves HTML invoices"""
+
+    def __init__(self, db_service=None):
+        if db_service is None:
+            from services.database_service import get_database_service
+            db_service = get_database_service()
+        self.db_service = db_service
+        self.registry = get_template_registry()
+        self._rendering: Dict[str, asyncio.Task] = {}
+
+    def select_template(self, invoice_data: Any = None, user_id: Optional[str] = None) -> TemplateEntry:
+        """Select the most appropriate invoice template (see ``TemplateSelector``)"""
+        entry = get_template_selector().select(invoice_data, user_id=user_id)
+        logger.info(f"✅ Selected template: {entry.file_name}")
+        return entry
+
+    def render(self, invoice_data: Any, template: TemplateEntry) -> str:
+        """Generate HTML invoice from template and data"""
+        # Convert invoice data to dict if it's a Pydantic model
+        if hasattr(invoice_data, 'model_dump'):
+            data_dict = invoice_data.model_dump()
+        elif isinstance(invoice_data, dict):
+            data_dict = invoice_data
+        else:
+            raise ValueError(f"Unsupported invoice data type: {type(invoice_data)}")
+
+        # Line item rows get as many columns as the template's table has
+        detailed = template.features is not None and template.features.detailed_line_items
+        template_vars = self.extract_template_variables(data_dict, DETAILED_COLUMNS if detailed else SUMMARY_COLUMNS)
+
+        # Fill all placeholders in one pass; everything but the item rows is escaped
+        compiled = get_template_engine().compile(template.content)
+        return compiled.render(template_vars, raw=RAW_TEMPLATE_VARIABLES)
+
+    @staticmethod
+    def extract_template_variables(data_dict: Dict[str, Any], columns: str = SUMMARY_COLUMNS) -> Dict[str, str]:
+        """Extract variables for template substitution"""
+        try:
+            # Default values
+            template_vars = {
+                "INVOICE_NUMBER": "INV-001",
+                "INVOICE_DATE": datetime.now().strftime("%Y-%m-%d"),
+                "DUE_DATE": datetime.now().strftime("%Y-%m-%d"),
+                "CLIENT_NAME": "Client Name",
+                "CLIENT_ADDRESS": "Client Address",
+                "PROVIDER_NAME": "Service Provider",
+                "PROVIDER_ADDRESS": "Provider Address",
+                "TOTAL_AMOUNT": "0.00",
+                "PAYMENT_TERMS": "Payment due within 30 days",
+                "STATUS": "generated",
+                "SERVICE_ITEMS": render_line_items([{"description": "Service"}], columns=columns)
+            }
+
+            # Extract from invoice data structure
+            if 'client' in data_dict and data_dict['client']:
+                client = data_dict['client']
+                template_vars["CLIENT_NAME"] = client.get('name', 'Client Name')
+                template_vars["CLIENT_ADDRESS"] = client.get('address', 'Client Address')
+
+            if 'service_provider' in data_dict and data_dict['service_provider']:
+                provider = data_dict['service_provider']
+                template_vars["PROVIDER_NAME"] = provider.get('name', 'Service Provider')
+                template_vars["PROVIDER_ADDRESS"] = provider.get('address', 'Provider Address')
+
+            if 'payment_terms' in data_dict and data_dict['payment_terms']:
+                payment = data_dict['payment_terms']
+                template_vars["TOTAL_AMOUNT"] = str(payment.get('amount', '0.00'))
+                template_vars["DUE_DATE"] = payment.get('due_date', datetime.now().strftime("%Y-%m-%d"))
+                template_vars["PAYMENT_TERMS"] = f"Amount: ${payment.get('amount', '0.00')} {payment.get('currency', 'USD')} - Frequency: {payment.get('frequency', 'One-time')}"
+
+            payment = data_dict.get('payment_terms') or {}
+            if data_dict.get('services'):
+                template_vars["SERVICE_ITEMS"] = render_line_items(
+                    data_dict['services'],
+                    currency=payment.get('currency'),
+                    locale=data_dict.get('locale'),
+                    columns=columns,
+                )
+            elif 'service_details' in data_dict and data_dict['service_details']:
+                service = data_dict['service_details']
+                item = {'description': service.get('description', 'Service'), 'total_amount': payment.get('amount', '0.00')}
+                template_vars["SERVICE_ITEMS"] = render_line_items(
+                    [item], currency=payment.get('currency'), locale=data_dict.get('locale'), columns=columns
+                )
+
+            # Override with any specific values from data
+            if 'invoice_number' in data_dict:
+                template_vars["INVOICE_NUMBER"] = data_dict['invoice_number']
+            if 'invoice_date' in data_dict:
+                template_vars["INVOICE_DATE"] = data_dict['invoice_date']
+            if 'status' in data_dict:
+                template_vars["STATUS"] = data_dict['status']
+
+            return template_vars
+
+        except Exception as e:
+            logger.error(f"❌ Failed to extract template variables: {str(e)}")
+            # Return defaults on error
+            return {
+                "INVOICE_NUMBER": "INV-ERROR",
+                "INVOICE_DATE": datetime.now().strftime("%Y-%m-%d"),
+                "DUE_DATE": datetime.now().strftime("%Y-%m-%d"),
+                "CLIENT_NAME": "Error Loading Data",
+                "CLIENT_ADDRESS": "Error Loading Data",
+                "PROVIDER_NAME": "Error Loading Data",
+                "PROVIDER_ADDRESS": "Error Loading Data",
+                "TOTAL_AMOUNT": "0.00",
+                "PAYMENT_TERMS": "Error loading payment terms",
+                "STATUS": "error",
+                "SERVICE_ITEMS": "<tr><td>Error loading service items</td><td>$0.00</td></tr>"
+            }
+
+    async def save(
+        self,
+        invoice_uuid: str,
+        invoice_number: str,
+        html_content: str,
+        invoice_data: Any,
+        user_id: str,
+        contract_name: Optional[str],
+        workflow_id: str,
+        template_name: str,
+        generation_method: str = "template_based"
+    ) -> Dict[str, Any]:
+        """Store (or replace) the HTML invoice of ``invoice_uuid``"""
+        values = {
+            "invoice_uuid": invoice_uuid,
+            "invoice_number": invoice_number,
+            "user_id": user_id,
+            "workflow_id": workflow_id,
+            "html_content": html_content,
+            "html_gzip": compress_html(html_content),
+            "content_hash": content_hash(html_content),
+            "template_used": template_name,
+            "template_version": "1.0",
+            "contract_name": contract_name,
+            "contract_reference": contract_name,
+            "invoice_data_json": invoice_data.model_dump(mode="json") if hasattr(invoice_data, 'model_dump') else invoice_data,
+            "generation_method": generation_method,
+            "generated_by_agent": "ui_generation_agent",
+            "content_type": "text/html",
+            "character_count": len(html_content),
+            "viewing_enabled": True,
+            "viewing_url": f"/api/invoices/{invoice_uuid}/view",
+            "status": "generated",
+        }
+
+        logger.info(f"💾 Saving HTML invoice {invoice_number} to PostgreSQL database")
+        row = await self.db_service.save_html_invoice(values)
+        if row is None:
+            logger.warning(f"⚠️ HTML invoice {invoice_number} not stored; it will be rendered on first view")
+        else:
+            logger.info(f"✅ HTML invoice {invoice_number} saved to database with ID: {row.id}")
+
+        record = {key: value for key, value in values.items() if key != "html_gzip"}
+        record.update({
+            "id": row.id if row is not None else None,
+            "created_at": datetime.now().isoformat(),
+            "database_saved": row is not None,
+        })
+        return record
+
+    async def get_for_view(self, invoice_uuid: str) -> Optional[StoredHTMLInvoice]:
+        """
+        Stored HTML invoice for ``invoice_uuid`` (one indexed lookup)
+
+        Falls back to rendering it from the ``invoices`` row, storing the
+        result; concurrent first views of the same invoice share one render.
+        """
+        row = await self.db_service.get_html_invoice_by_uuid(invoice_uuid)
+        if row is not None:
+            return StoredHTMLInvoice.from_row(row)
+
+        task = self._rendering.get(invoice_uuid)
+        if task is None:
+            task = asyncio.ensure_future(self._render_on_demand(invoice_uuid))
+            self._rendering[invoice_uuid] = task
+            task.add_done_callback(lambda _: self._rendering.pop(invoice_uuid, None))
+        return await asyncio.shield(task)
+
+    async def _render_on_demand(self, invoice_uuid: str) -> Optional[StoredHTMLInvoice]:
+        invoice = await self.db_service.get_invoice_by_id(invoice_uuid)
+        if invoice is None:
+            return None
+
+        data = dict(invoice.invoice_data or {})
+        data.setdefault('invoice_number', invoice.invoice_number)
+        if invoice.status is not None:
+            data.setdefault('status', getattr(invoice.status, 'value', invoice.status))
+
+        template = self.select_template(data, user_id=invoice.user_id)
+        html_content = self.render(data, template)
+        logger.info(f"🎨 Rendered HTML invoice {invoice.invoice_number} on demand")
+
+        stored = False
+        if invoice.user_id:
+            record = await self.save(
+                invoice_uuid=invoice_uuid,
+                invoice_number=invoice.invoice_number,
+                html_content=html_content,
+                invoice_data=data,
+                user_id=invoice.user_id,
+                contract_name=invoice.contract_title,
+                workflow_id=invoice.workflow_id,
+                template_name=template.file_name,
+                generation_method="on_demand"
+            )
+            stored = record["database_saved"]
+
+        return StoredHTMLInvoice(
+            invoice_uuid=invoice_uuid,
+            invoice_number=invoice.invoice_number,
+            html_content=html_content,
+            html_gzip=compress_html(html_content),
+            content_hash=content_hash(html_content),
+            stored=stored,
+        )
+
+    async def record_view(self, invoice_uuid: str) -> None:
+        """Increment the view count (run after the response is sent)"""
+        await self.db_service.record_html_invoice_view(invoice_uuid)
+
+
+# Singleton service instance
+_html_invoice_service = None
+
+
+def get_html_invoice_service() -> HTMLInvoiceService:
+    """Get singleton HTML invoice service instance"""
+    global _html_invoice_service
+    if _html_invoice_service is None:
+        _html_invoice_service = HTMLInvoiceService()
+    return _html_invoice_service
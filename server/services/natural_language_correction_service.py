@@ -7,40 +7,92 @@ instead of requiring users to fill out structured forms.
 
 import logging
 import json
+import os
 import re
+import time
+import uuid
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from decimal import Decimal
 
 from services.llm_service import get_llm_service
 from schemas.unified_invoice_schemas import UnifiedInvoiceData, PartyRole, CurrencyCode, InvoiceFrequency
+from services.correction_query_parser import LocalParseResult, SUPPORTED_FIELDS, get_correction_query_parser
 
 logger = logging.getLogger(__name__)
 
 
+class CorrectionSession:
+    """Extraction state for one query by one user on one workflow, shared by preview and apply"""
+
+    def __init__(self, token: str, query: str, local: LocalParseResult,
+                 user_id: Optional[str] = None, workflow_id: Optional[str] = None):
+        self.token = token
+        self.query = query
+        self.local = local
+        self.user_id = user_id
+        self.workflow_id = workflow_id
+        self.llm_corrections: Dict[str, Any] = {}
+        # Fields the LLM has already been asked about for this query
+        self.llm_fields: set = set()
+        self.llm_calls = 0
+        self.raw_response = ""
+        self.created_at = time.time()
+
+    def corrections(self) -> Dict[str, Any]:
+        merged = dict(self.llm_corrections)
+        merged.update(self.local.corrections)
+        return merged
+
+    def fields_needing_llm(self, fields: List[str]) -> List[str]:
+        """Requested fields that only the LLM can still settle"""
+        if not self.local.remainder:
+            return []
+        return [path for path in self.local.unresolved(fields) if path not in self.llm_fields]
+
+
 class NaturalLanguageCorrectionService:
     """Service for processing natural language corrections to invoice data"""
     
-    def __init__(self):
-        # Use proper Vertex AI text generation model instead of embedding-only service
-        from models.llm.base import get_model
-        self.model = get_model(model_name="gemini-1.5-pro", temperature=0.1)
+    def __init__(self, model=None):
+        if model is None:
+            # Use proper Vertex AI text generation model instead of embedding-only service
+            from models.llm.base import get_model
+            model = get_model(model_name="gemini-1.5-pro", temperature=0.1)
+        self.model = model
+        self.parser = get_correction_query_parser()
+        self.session_ttl = int(os.getenv("NL_CORRECTION_SESSION_TTL", "900"))
+        self.max_sessions = int(os.getenv("NL_CORRECTION_MAX_SESSIONS", "512"))
+        self._sessions: "OrderedDict[str, CorrectionSession]" = OrderedDict()
     
     async def process_natural_language_query(
         self,
         query: str,
         current_invoice_data: UnifiedInvoiceData,
         missing_fields: List[str],
-        validation_issues: List[str]
+        validation_issues: List[str],
+        session_token: Optional[str] = None,
+        user_id: Optional[str] = None,
+        workflow_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Process a natural language query to extract missing invoice fields
         
+        Common patterns (amounts, dates, emails, phone numbers, field names) are
+        parsed locally; only the ambiguous remainder of the query is sent to the
+        LLM, and only for fields the rules could not settle.
+        
         Args:
             query: Natural language input from user
             current_invoice_data: Current invoice data with missing fields
             missing_fields: List of fields that need to be filled
             validation_issues: List of validation issues to address
+            session_token: Token from an earlier preview/extraction of the same
+                query; its parse and LLM answer are reused
+            user_id: User the session belongs to
+            workflow_id: Workflow (or invoice) the query corrects; a session is only
+                reused for the same user and workflow
             
         Returns:
             Dictionary of field corrections to apply
@@ -48,28 +100,46 @@ class NaturalLanguageCorrectionService:
         logger.info(f"🗣️ Processing natural language query: '{query[:100]}...'")
         
         try:
-            # Create context for LLM
-            context = self._build_context(current_invoice_data, missing_fields, validation_issues)
-            logger.info(f"📋 Built context with {len(missing_fields)} missing fields")
-            
-            # Generate extraction prompt
-            prompt = self._create_extraction_prompt(query, context, missing_fields)
-            logger.info(f"📝 Generated extraction prompt ({len(prompt)} chars)")
-            
-            # Use Vertex AI model to extract structured data from query
-            logger.info("🤖 Calling LLM for field extraction...")
-            response = self.model.generate_content(prompt)
-            
-            # Parse LLM response into corrections
-            response_text = response.text if hasattr(response, 'text') else str(response)
-            logger.info(f"📥 LLM response received ({len(response_text)} chars)")
-            logger.debug(f"🔍 Raw LLM response: {response_text[:500]}...")
+            session = self._get_session(session_token, query, user_id, workflow_id)
+            if session is None:
+                session = self._start_session(query, user_id, workflow_id)
+            else:
+                logger.info(f"♻️ Reusing correction session {session.token[:8]}")
+            logger.info(
+                f"⚡ Parsed {len(session.local.corrections)} fields locally"
+                + (f", remainder: '{session.local.remainder[:80]}'" if session.local.remainder else "")
+            )
             
-            corrections = self._parse_llm_response(response_text, missing_fields)
-            logger.info(f"🧩 Parsed {len(corrections)} raw corrections from LLM")
+            llm_fields = session.fields_needing_llm(missing_fields)
+            if llm_fields:
+                # Create context for LLM
+                context = self._build_context(current_invoice_data, missing_fields, validation_issues)
+                logger.info(f"📋 Built context with {len(llm_fields)} fields left for the LLM")
+                
+                # Generate extraction prompt for what the rules could not settle
+                prompt = self._create_extraction_prompt(
+                    session.local.remainder, context, llm_fields, resolved=session.local.corrections
+                )
+                logger.info(f"📝 Generated extraction prompt ({len(prompt)} chars)")
+                
+                # Use Vertex AI model to extract structured data from query
+                logger.info("🤖 Calling LLM for field extraction...")
+                response = self.model.generate_content(prompt)
+                session.llm_calls += 1
+                
+                # Parse LLM response into corrections
+                response_text = response.text if hasattr(response, 'text') else str(response)
+                logger.info(f"📥 LLM response received ({len(response_text)} chars)")
+                logger.debug(f"🔍 Raw LLM response: {response_text[:500]}...")
+                
+                llm_corrections = self._parse_llm_response(response_text, llm_fields)
+                logger.info(f"🧩 Parsed {len(llm_corrections)} raw corrections from LLM")
+                session.llm_corrections.update(llm_corrections)
+                session.llm_fields.update(llm_fields)
+                session.raw_response = response_text
             
             # Validate and clean corrections
-            validated_corrections = self._validate_corrections(corrections, missing_fields)
+            validated_corrections = self._validate_corrections(session.corrections(), missing_fields)
             logger.info(f"✅ Validated {len(validated_corrections)} field corrections")
             
             # Log each validated correction
@@ -79,11 +149,14 @@ class NaturalLanguageCorrectionService:
             confidence = self._calculate_confidence(validated_corrections, missing_fields)
             logger.info(f"📊 Extraction confidence: {confidence:.2f}")
             
+            response_text = session.raw_response
             return {
                 "success": True,
                 "corrections": validated_corrections,
                 "original_query": query,
                 "extraction_confidence": confidence,
+                "extraction_method": self._extraction_method(session, validated_corrections),
+                "session_token": session.token,
                 "raw_response": response_text[:200] + "..." if len(response_text) > 200 else response_text
             }
             
@@ -98,6 +171,44 @@ class NaturalLanguageCorrectionService:
                 "original_query": query
             }
     
+    def _start_session(self, query: str, user_id: Optional[str] = None,
+                       workflow_id: Optional[str] = None) -> CorrectionSession:
+        self._expire_sessions()
+        session = CorrectionSession(uuid.uuid4().hex, query, self.parser.parse(query), user_id, workflow_id)
+        self._sessions[session.token] = session
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return session
+    
+    def _get_session(self, token: Optional[str], query: str, user_id: Optional[str] = None,
+                     workflow_id: Optional[str] = None) -> Optional[CorrectionSession]:
+        """Live session for ``token``, provided it was opened for the same query, user and workflow"""
+        if not token:
+            return None
+        self._expire_sessions()
+        session = self._sessions.get(token)
+        if session is None or session.query.strip() != query.strip():
+            return None
+        if session.user_id != user_id or session.workflow_id != workflow_id:
+            logger.warning(f"🚫 Correction session {token[:8]} belongs to another user or workflow - not reused")
+            return None
+        self._sessions.move_to_end(token)
+        return session
+    
+    def _expire_sessions(self) -> None:
+        cutoff = time.time() - self.session_ttl
+        while self._sessions:
+            token, session = next(iter(self._sessions.items()))
+            if session.created_at >= cutoff:
+                break
+            del self._sessions[token]
+    
+    def _extraction_method(self, session: CorrectionSession, corrections: Dict[str, Any]) -> str:
+        from_llm = any(field not in session.local.corrections for field in corrections)
+        if not from_llm:
+            return "local"
+        return "local+llm" if any(field in session.local.corrections for field in corrections) else "llm"
+    
     def _build_context(self, current_data: UnifiedInvoiceData, missing_fields: List[str], issues: List[str]) -> Dict[str, Any]:
         """Build context information for LLM prompt"""
         # Get service description from first service item if available
@@ -116,7 +227,8 @@ class NaturalLanguageCorrectionService:
             "validation_issues": issues
         }
     
-    def _create_extraction_prompt(self, query: str, context: Dict[str, Any], missing_fields: List[str]) -> str:
+    def _create_extraction_prompt(self, query: str, context: Dict[str, Any], missing_fields: List[str],
+                                  resolved: Optional[Dict[str, Any]] = None) -> str:
         """Create LLM prompt for field extraction"""
         
         field_descriptions = {
@@ -145,6 +257,14 @@ class NaturalLanguageCorrectionService:
             "invoice_frequency": "How often invoices are generated (monthly, quarterly, annually, one_time)"
         }
         
+        resolved_section = ""
+        if resolved:
+            resolved_section = (
+                "\nALREADY EXTRACTED FROM THE REST OF THE QUERY (do not repeat):\n"
+                + "\n".join(f"- {field}: {value}" for field, value in resolved.items())
+                + "\n"
+            )
+        
         prompt = f"""
 You are an AI assistant that extracts invoice information from natural language queries.
 
@@ -160,7 +280,7 @@ Current invoice data has these values:
 
 MISSING FIELDS THAT NEED TO BE FILLED:
 {chr(10).join([f"- {field}: {field_descriptions.get(field, 'Unknown field')}" for field in missing_fields])}
-
+{resolved_section}
 TASK:
 Extract values from the user query for the missing fields listed above. Only extract information that is clearly stated in the query.
 
@@ -344,17 +464,29 @@ EXTRACT THE INFORMATION:
         
         return round(filled_count / total_count, 2)
     
-    async def preview_corrections(self, query: str, current_invoice_data: UnifiedInvoiceData) -> Dict[str, Any]:
-        """Preview what would be extracted from a query without applying changes"""
-        
-        # Mock missing fields for preview
-        mock_missing_fields = ["client.name", "service_provider.name", "payment_terms.amount", "service_details.description"]
+    async def preview_corrections(
+        self,
+        query: str,
+        current_invoice_data: UnifiedInvoiceData,
+        missing_fields: Optional[List[str]] = None,
+        session_token: Optional[str] = None,
+        user_id: Optional[str] = None,
+        workflow_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Preview what would be extracted from a query without applying changes
         
+        The returned ``session_token`` can be passed when the same user applies
+        the same query to the same workflow, so the LLM is not asked a second time.
+        """
         result = await self.process_natural_language_query(
             query=query,
             current_invoice_data=current_invoice_data,
-            missing_fields=mock_missing_fields,
-            validation_issues=[]
+            missing_fields=list(missing_fields or SUPPORTED_FIELDS),
+            validation_issues=[],
+            session_token=session_token,
+            user_id=user_id,
+            workflow_id=workflow_id
         )
         
         return {
@@ -362,7 +494,9 @@ EXTRACT THE INFORMATION:
             "query": query,
             "extracted_fields": result.get("corrections", {}),
             "confidence": result.get("extraction_confidence", 0.0),
-            "success": result.get("success", False)
+            "success": result.get("success", False),
+            "extraction_method": result.get("extraction_method"),
+            "session_token": result.get("session_token")
         }
 
 
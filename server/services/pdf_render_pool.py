@@ -0,0 +1,429 @@
+"""
+PDF Rendering Worker Pool
+
+WeasyPrint layout is CPU-bound and holds the GIL, so ``write_pdf`` inside an
+async handler stalls every other request on the worker. PDF rendering now
+runs in a pool of worker processes:
+
+- workers are pre-warmed: WeasyPrint, the font configuration and the
+  default and print stylesheets are loaded and parsed once per process by
+  the pool initializer, which then lays out a tiny document so font lookup
+  and the layout code are hot before the first real job. ``warm_up`` starts
+  every process ahead of the first request (at application startup unless
+  ``PDF_WARM_UP_ON_STARTUP=false``)
+- the queue is bounded (``PDF_RENDER_QUEUE`` jobs waiting on top of the
+  running ones); beyond that ``render`` fails fast with ``PDFRenderQueueFull``
+  instead of piling up work and latency
+- every job has a timeout (``PDF_RENDER_TIMEOUT`` seconds), counted from
+  when it reaches a worker, not while it waits in the queue; a timed-out
+  job cannot be cancelled inside a process, so the pool is replaced and the
+  old processes terminated. Jobs that were running on the old processes are
+  retried once on the new pool
+
+``PDF_RENDER_WORKERS=0`` renders in-process on a thread instead (development,
+or hosts where spawning processes is not allowed).
+"""
+
+import asyncio
+import io
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Default stylesheet applied to every PDF
+DEFAULT_PDF_CSS = """
+    @page {
+        margin: 0.5in;
+        size: letter;
+    }
+
+    body {
+        font-family: Arial, sans-serif;
+        font-size: 12px;
+        line-height: 1.4;
+        color: #333;
+    }
+
+    .preview-watermark {
+        display: none !important;
+    }
+
+    table {
+        border-collapse: collapse;
+        width: 100%;
+    }
+
+    th, td {
+        border: 1px solid #ddd;
+        padding: 8px;
+        text-align: left;
+    }
+
+    th {
+        background-color: #f8f9fa;
+        font-weight: bold;
+    }
+
+    .status-draft { background-color: #f8f9fa; color: #6c757d; }
+    .status-pending { background-color: #fff3cd; color: #856404; }
+    .status-paid { background-color: #d1edff; color: #0c5460; }
+    .status-overdue { background-color: #f8d7da; color: #721c24; }
+
+    @media print {
+        .no-print { display: none !important; }
+        .preview-watermark { display: none !important; }
+    }
+"""
+
+
+# Print rules for every PDF; parsed once per worker instead of injected into each document
+PDF_PRINT_CSS = """
+    @media print {
+        .no-print { display: none !important; }
+        .preview-watermark { display: none !important; }
+    }
+
+    /* Ensure good PDF formatting */
+    body {
+        -webkit-print-color-adjust: exact;
+        print-color-adjust: exact;
+    }
+
+    /* Page breaks */
+    .page-break-before { page-break-before: always; }
+    .page-break-after { page-break-after: always; }
+    .page-break-avoid { page-break-inside: avoid; }
+
+    /* Long line item tables: repeat the header on every page, never split a row */
+    thead { display: table-header-group; }
+    tr { page-break-inside: avoid; }
+"""
+
+# Laid out once per worker by the initializer
+WARM_UP_HTML = (
+    '<!DOCTYPE html><html><head><meta charset="UTF-8"></head><body>'
+    '<h1>Invoice</h1><table><tr><th>Description</th><th>Amount</th></tr>'
+    '<tr><td>Warm-up</td><td>$0.00</td></tr></table></body></html>'
+)
+
+
+class PDFRenderQueueFull(RuntimeError):
+    """Raised when the render queue is full; callers should retry later"""
+
+
+class PDFRenderTimeout(TimeoutError):
+    """Raised when a render job exceeds its timeout"""
+
+
+# Per-process WeasyPrint state, set up once by the pool initializer
+_worker_state = {}
+_worker_state_lock = threading.Lock()
+
+
+def init_render_worker() -> None:
+    """
+    Load WeasyPrint, fonts and the shared stylesheets once per process,
+    then warm up with a tiny render (skipped with ``PDF_WARM_UP_RENDER=false``)
+    """
+    with _worker_state_lock:
+        if _worker_state:
+            return
+        started = time.perf_counter()
+        from weasyprint import CSS, HTML
+        from weasyprint.text.fonts import FontConfiguration
+
+        font_config = FontConfiguration()
+        _worker_state.update(
+            HTML=HTML,
+            font_config=font_config,
+            stylesheets=[
+                CSS(string=DEFAULT_PDF_CSS, font_config=font_config),
+                CSS(string=PDF_PRINT_CSS, font_config=font_config),
+            ],
+        )
+        if os.getenv("PDF_WARM_UP_RENDER", "true").lower() not in ("0", "false", "no"):
+            # A failing warm-up must not take the pool down; real jobs report their own errors
+            try:
+                _write_pdf(WARM_UP_HTML)
+            except Exception as e:
+                logger.warning(f"⚠️ PDF warm-up render failed: {str(e)}")
+        logger.info(f"🔥 PDF renderer ready in process {os.getpid()} ({time.perf_counter() - started:.2f}s)")
+
+
+def _write_pdf(html: str) -> bytes:
+    buffer = io.BytesIO()
+    _worker_state["HTML"](string=html).write_pdf(
+        buffer,
+        stylesheets=_worker_state["stylesheets"],
+        font_config=_worker_state["font_config"],
+    )
+    return buffer.getvalue()
+
+
+def render_pdf(html: str) -> bytes:
+    """Lay out ``html`` with the shared stylesheets and return the PDF bytes"""
+    init_render_worker()
+    return _write_pdf(html)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class PDFRenderPool:
+    """Awaitable PDF rendering on a bounded pool of pre-warmed worker processes"""
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 render_fn: Callable[[str], Any] = render_pdf,
+                 initializer: Optional[Callable[[], None]] = init_render_worker):
+        workers = max_workers if max_workers is not None else os.getenv("PDF_RENDER_WORKERS")
+        self.max_workers = int(workers) if workers is not None else min(4, os.cpu_count() or 1)
+        self.max_queue = max_queue if max_queue is not None else int(
+            os.getenv("PDF_RENDER_QUEUE", str(4 * max(self.max_workers, 1)))
+        )
+        self.timeout = timeout if timeout is not None else float(os.getenv("PDF_RENDER_TIMEOUT", "60"))
+        self.render_fn = render_fn
+        self.initializer = initializer
+        self.start_method = os.getenv("PDF_RENDER_START_METHOD", "spawn")
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._generation = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        # One running job per worker; the rest wait here, outside the job timeout
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"rendered": 0, "rejected": 0, "timeouts": 0, "restarts": 0}
+
+    @property
+    def capacity(self) -> int:
+        """Jobs accepted at once: one running per worker plus the waiting queue"""
+        return max(self.max_workers, 1) + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(max(self.max_workers, 1))
+            self._slots_loop = loop
+        return self._slots
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None and self.max_workers > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=self.initializer,
+                )
+                self._generation += 1
+            return self._executor, self._generation
+
+    def warm_up(self) -> None:
+        """Start every worker process (running the initializer) without waiting for them"""
+        executor, _ = self._get_executor()
+        if executor is not None:
+            for _ in range(self.max_workers):
+                executor.submit(_ping)
+            logger.info(f"🔥 Warming up {self.max_workers} PDF render workers")
+        elif self.initializer is not None:
+            # In-process rendering: load the shared state on a background thread
+            threading.Thread(target=self.initializer, name="pdf-warm-up", daemon=True).start()
+
+    def _restart(self, generation: int) -> None:
+        """Replace the executor of ``generation`` (no-op if it was already replaced)"""
+        with self._lock:
+            if self._executor is None or self._generation != generation:
+                return
+            executor, self._executor = self._executor, None
+            self.stats["restarts"] += 1
+        # A stuck layout cannot be interrupted, so the old processes are terminated.
+        # ProcessPoolExecutor has no public way to reach its processes: _processes is
+        # a CPython implementation detail, so this degrades to a plain shutdown without it
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        logger.warning(f"♻️ PDF render pool restarted ({len(processes)} workers terminated)")
+
+    async def render(self, html: str, timeout: Optional[float] = None) -> bytes:
+        """
+        Render ``html`` to PDF bytes off the event loop
+
+        Raises:
+            PDFRenderQueueFull: ``capacity`` jobs are already queued or running
+            PDFRenderTimeout: the job did not finish within ``timeout`` seconds
+                of reaching a worker (time spent queued does not count)
+        """
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.stats["rejected"] += 1
+                raise PDFRenderQueueFull(f"PDF render queue is full ({self._in_flight} jobs)")
+            self._in_flight += 1
+        try:
+            async with self._get_slots():
+                for attempt in range(2):
+                    executor, generation = self._get_executor()
+                    loop = asyncio.get_running_loop()
+                    future = loop.run_in_executor(executor, self.render_fn, html)
+                    try:
+                        pdf = await asyncio.wait_for(future, timeout or self.timeout)
+                    except asyncio.TimeoutError:
+                        self.stats["timeouts"] += 1
+                        if executor is not None:
+                            self._restart(generation)
+                        raise PDFRenderTimeout(f"PDF rendering exceeded {timeout or self.timeout:.0f}s")
+                    except BrokenProcessPool:
+                        # Another job's timeout (or a crashed worker) took this pool down
+                        self._restart(generation)
+                        if attempt:
+                            raise
+                        continue
+                    self.stats["rendered"] += 1
+                    return pdf
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    async def render_when_free(self, html: str, max_wait: Optional[float] = None) -> bytes:
+        """
+        ``render`` for batch work: waits (with backoff) while the queue is full
+        instead of failing, for at most ``max_wait`` seconds (default: the job timeout)
+        """
+        deadline = asyncio.get_running_loop().time() + (max_wait if max_wait is not None else self.timeout)
+        delay = 0.05
+        while True:
+            try:
+                return await self.render(html)
+            except PDFRenderQueueFull:
+                if asyncio.get_running_loop().time() + delay > deadline:
+                    raise
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 1.0)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Singleton pool instance
+_pdf_render_pool = None
+
+
+def get_pdf_render_pool() -> PDFRenderPool:
+    """Get singleton PDF render pool instance"""
+    global _pdf_render_pool
+    if _pdf_render_pool is None:
+        _pdf_render_pool = PDFRenderPool()
+    return _pdf_render_pool
+
+
+def shutdown_pdf_render_pool() -> None:
+    """Stop the worker processes, if the pool was ever created"""
+    global _pdf_render_pool
+    if _pdf_render_pool is not None:
+        _pdf_render_pool.shutdown()
+        _pdf_render_pool = None
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def map_ordered(items: Iterable[T], fn: Callable[[T], Awaitable[R]],
+                      window: int) -> AsyncIterator[Tuple[T, Any]]:
+    """
+    Run ``fn`` over ``items`` with at most ``window`` calls in flight and
+    yield ``(item, result)`` in input order, as soon as each result is next
+
+    A failed call yields its exception as the result, so one bad invoice
+    does not end a batch. Only ``window`` results are held at a time, which
+    keeps memory bounded however many items there are.
+    """
+    iterator = iter(items)
+    pending: deque = deque()
+
+    def schedule() -> None:
+        for item in itertools.islice(iterator, max(window, 1) - len(pending)):
+            pending.append((item, asyncio.ensure_future(fn(item))))
+
+    schedule()
+    try:
+        while pending:
+            item, task = pending[0]
+            try:
+                result = await task
+            except Exception as e:
+                result = e
+            pending.popleft()
+            schedule()
+            yield item, result
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+
+class _ZipChunks(io.RawIOBase):
+    """Write-only sink for ``zipfile`` that hands out what was written since the last drain"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_zip(entries: AsyncIterable[Tuple[str, bytes]]) -> AsyncIterator[bytes]:
+    """
+    Stream a ZIP archive of ``(file name, content)`` entries
+
+    Each entry is emitted as soon as it arrives (stored, since PDFs are
+    already compressed); duplicate names get a numeric suffix.
+    """
+    sink = _ZipChunks()
+    seen = set()
+    timestamp = datetime.now().timetuple()[:6]
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        async for name, content in entries:
+            stem, dot, extension = name.rpartition(".")
+            unique, counter = name, 1
+            while unique in seen:
+                counter += 1
+                unique = f"{stem}-{counter}{dot}{extension}" if dot else f"{name}-{counter}"
+            seen.add(unique)
+            archive.writestr(zipfile.ZipInfo(unique, date_time=timestamp), content)
+            yield sink.drain()
+    yield sink.drain()
@@ -1,79 +1,42 @@
-from typing import Dict, Any, Optional
+from typing import IO, Any, AsyncIterator, Dict, Iterable, Optional, Tuple
+import asyncio
+import importlib.util
 import io
 import logging
+import os
+import re
+import tempfile
 from datetime import datetime
 
-# Graceful import handling for weasyprint
-try:
-    from weasyprint import HTML, CSS
-    from weasyprint.text.fonts import FontConfiguration
-    WEASYPRINT_AVAILABLE = True
-except ImportError:
-    logger = logging.getLogger(__name__)
-    logger.warning("WeasyPrint not available. PDF generation will be disabled.")
-    HTML = CSS = FontConfiguration = None
-    WEASYPRINT_AVAILABLE = False
-
 from utils.html_sanitizer import HTMLSanitizer
+from services.pdf_render_pool import (
+    PDFRenderQueueFull,
+    PDFRenderTimeout,
+    get_pdf_render_pool,
+    map_ordered,
+    stream_zip,
+)
 from services.template_service import TemplateService
 
 logger = logging.getLogger(__name__)
 
+def _check_weasyprint() -> None:
+    """Raise ImportError when WeasyPrint is not installed (it is imported by the render workers)"""
+    if importlib.util.find_spec("weasyprint") is None:
+        logger.warning("WeasyPrint not available. PDF generation will be disabled.")
+        raise ImportError("WeasyPrint is not available. PDF generation is disabled.")
+
 class PDFService:
     """Service for generating PDF documents from HTML templates"""
     
     def __init__(self):
         self.template_service = TemplateService()
         
-        if not WEASYPRINT_AVAILABLE:
-            raise ImportError("WeasyPrint is not available. PDF generation is disabled.")
+        _check_weasyprint()
         
-        self.font_config = FontConfiguration()
-        
-        # Default CSS for PDF generation
-        self.pdf_css = CSS(string="""
-            @page {
-                margin: 0.5in;
-                size: letter;
-            }
-            
-            body {
-                font-family: Arial, sans-serif;
-                font-size: 12px;
-                line-height: 1.4;
-                color: #333;
-            }
-            
-            .preview-watermark {
-                display: none !important;
-            }
-            
-            table {
-                border-collapse: collapse;
-                width: 100%;
-            }
-            
-            th, td {
-                border: 1px solid #ddd;
-                padding: 8px;
-                text-align: left;
-            }
-            
-            th {
-                background-color: #f8f9fa;
-                font-weight: bold;
-            }
-            
-            .status-draft { background-color: #f8f9fa; color: #6c757d; }
-            .status-pending { background-color: #fff3cd; color: #856404; }
-            .status-paid { background-color: #d1edff; color: #0c5460; }
-            .status-overdue { background-color: #f8d7da; color: #721c24; }
-            
-            @media print {
-                .no-print { display: none !important; }
-                .preview-watermark { display: none !important; }
-            }
-        """, font_config=self.font_config)
+        # Layout runs in worker processes that load fonts and the default CSS once
+        self.render_pool = get_pdf_render_pool()
+        self.render_pool.warm_up()
     
     async def generate_invoice_pdf(
         self,
@@ -99,35 +62,37 @@ class PDFService:
             PDF content as bytes
         """
         try:
-            # Get rendered HTML from template service
-            rendered_html = await self.template_service.render_final_invoice(
-                template_id=template_id,
-                invoice_data=invoice_data,
-                invoice_number=invoice_number,
-                invoice_date=invoice_date,
-                due_date=due_date,
-                status=status
-            )
-            
-            # Additional sanitization for PDF generation
-            safe_html = self._prepare_html_for_pdf(rendered_html)
-            
-            # Generate PDF
-            html_doc = HTML(string=safe_html)
-            pdf_buffer = io.BytesIO()
+            async def render() -> bytes:
+                # Get rendered HTML from template service
+                rendered_html = await self.template_service.render_final_invoice(
+                    template_id=template_id,
+                    invoice_data=invoice_data,
+                    invoice_number=invoice_number,
+                    invoice_date=invoice_date,
+                    due_date=due_date,
+                    status=status
+                )
+                
+                # Additional sanitization for PDF generation
+                safe_html = self._prepare_html_for_pdf(rendered_html)
+                
+                # Generate PDF on the render pool
+                return await self.render_pool.render(safe_html)
             
-            html_doc.write_pdf(
-                pdf_buffer, 
-                stylesheets=[self.pdf_css],
-                font_config=self.font_config
+            key = self.template_service.render_key(
+                "pdf", template_id, invoice_data, invoice_number, invoice_date, due_date, status
             )
+            if key is None:
+                raise ValueError(f"Template not found: {template_id}")
             
-            pdf_content = pdf_buffer.getvalue()
-            pdf_buffer.close()
+            # WeasyPrint only runs for template versions and data not rendered before
+            pdf_content = await self.template_service.render_cache.get_or_render(key, render)
             
             logger.info(f"Successfully generated PDF for invoice {invoice_number}")
             return pdf_content
             
+        except (PDFRenderQueueFull, PDFRenderTimeout):
+            raise
         except Exception as e:
             logger.error(f"Error generating PDF for invoice {invoice_number}: {str(e)}")
             raise ValueError(f"Failed to generate PDF: {str(e)}")
@@ -147,7 +112,8 @@ class PDFService:
         return await self.generate_invoice_pdf(
             template_id=template_id,
             invoice_data=invoice_data,
-            invoice_number=f"PREVIEW-{datetime.now().strftime('%Y%m%d-%H%M%S')}",
+            # Day-stable number, so repeat previews are served from the render cache
+            invoice_number=f"PREVIEW-{datetime.now().strftime('%Y%m%d')}",
             invoice_date=datetime.now(),
             due_date=datetime.now(),
             status="Draft"
@@ -174,29 +140,7 @@ class PDFService:
                     '<head>\n    <meta charset="UTF-8">'
                 )
         
-        # Add print-friendly styles
-        pdf_print_styles = """
-        <style>
-            @media print {
-                .no-print { display: none !important; }
-                .preview-watermark { display: none !important; }
-            }
-            
-            /* Ensure good PDF formatting */
-            body {
-                -webkit-print-color-adjust: exact;
-                print-color-adjust: exact;
-            }
-            
-            /* Page breaks */
-            .page-break-before { page-break-before: always; }
-            .page-break-after { page-break-after: always; }
-            .page-break-avoid { page-break-inside: avoid; }
-        </style>
-        """
-        
-        if '</head>' in processed_html:
-            processed_html = processed_html.replace('</head>', f'{pdf_print_styles}</head>')
+        # Print-friendly styles (PDF_PRINT_CSS) are applied by the render workers, parsed once per process
         
         return processed_html
     
@@ -250,6 +194,78 @@ class PDFService:
                 'pdf_ready': False
             }
     
+    async def _render_bulk_invoice(self, invoice_data: Dict[str, Any]) -> bytes:
+        """Render one invoice of a batch to its own PDF (shares the render cache with single PDFs)"""
+        arguments = dict(
+            template_id=invoice_data['template_id'],
+            invoice_data=invoice_data['data'],
+            invoice_number=invoice_data['invoice_number'],
+            invoice_date=invoice_data['invoice_date'],
+            due_date=invoice_data['due_date'],
+            status=invoice_data.get('status', 'Pending')
+        )
+        
+        async def render() -> bytes:
+            rendered_html = await self.template_service.render_final_invoice(**arguments)
+            return await self.render_pool.render_when_free(self._prepare_html_for_pdf(rendered_html))
+        
+        key = self.template_service.render_key("pdf", **arguments)
+        if key is None:
+            raise ValueError(f"Template not found: {arguments['template_id']}")
+        return await self.template_service.render_cache.get_or_render(key, render)
+    
+    def iter_bulk_invoice_pdfs(self, invoices: Iterable[Dict[str, Any]]) -> AsyncIterator[Tuple[Dict[str, Any], Any]]:
+        """
+        Render a batch in parallel on the render pool
+        
+        Yields ``(invoice, pdf bytes or exception)`` in input order, with at
+        most ``PDF_BULK_WINDOW`` invoices rendering or buffered at a time.
+        """
+        window = int(os.getenv("PDF_BULK_WINDOW", str(2 * max(self.render_pool.max_workers, 1))))
+        return map_ordered(invoices, self._render_bulk_invoice, window)
+    
+    async def build_bulk_pdf(self, invoices: list[Dict[str, Any]]) -> IO[bytes]:
+        """
+        Render a batch in parallel and merge the PDFs page-wise
+        
+        The merged document is written to a spooled temporary file (kept in
+        memory up to ``PDF_BULK_SPOOL_BYTES``, on disk beyond that) so it can
+        be streamed back in chunks; the caller closes it.
+        """
+        from pypdf import PdfReader, PdfWriter
+        
+        writer = PdfWriter()
+        async for invoice, result in self.iter_bulk_invoice_pdfs(invoices):
+            if isinstance(result, Exception):
+                raise ValueError(f"Invoice {invoice.get('invoice_number')}: {str(result)}")
+            await asyncio.to_thread(writer.append, PdfReader(io.BytesIO(result)))
+        
+        spool = tempfile.SpooledTemporaryFile(max_size=int(os.getenv("PDF_BULK_SPOOL_BYTES", str(16 * 1024 * 1024))))
+        await asyncio.to_thread(writer.write, spool)
+        spool.seek(0)
+        logger.info(f"Successfully generated bulk PDF with {len(invoices)} invoices")
+        return spool
+    
+    async def stream_bulk_zip(self, invoices: list[Dict[str, Any]]) -> AsyncIterator[bytes]:
+        """
+        Stream a ZIP with one PDF per invoice, each entry sent as soon as it is rendered
+        
+        An invoice that fails to render gets an ``.error.txt`` entry instead,
+        so the rest of the batch still arrives.
+        """
+        async def entries():
+            async for invoice, result in self.iter_bulk_invoice_pdfs(invoices):
+                name = f"invoice-{_safe_file_name(str(invoice.get('invoice_number', 'unnumbered')))}"
+                if isinstance(result, Exception):
+                    logger.error(f"Error generating PDF for invoice {invoice.get('invoice_number')}: {str(result)}")
+                    yield f"{name}.error.txt", str(result).encode()
+                else:
+                    yield f"{name}.pdf", result
+        
+        async for chunk in stream_zip(entries()):
+            if chunk:
+                yield chunk
+    
     async def generate_bulk_invoices_pdf(
         self,
         invoices: list[Dict[str, Any]]
@@ -257,63 +273,16 @@ class PDFService:
         """Generate a single PDF containing multiple invoices"""
         
         try:
-            combined_html = """
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <title>Invoice Batch</title>
-                <style>
-                    .invoice-page {
-                        page-break-after: always;
-                    }
-                    .invoice-page:last-child {
-                        page-break-after: auto;
-                    }
-                </style>
-            </head>
-            <body>
-            """
-            
-            for i, invoice_data in enumerate(invoices):
-                # Get rendered HTML for each invoice
-                rendered_html = await self.template_service.render_final_invoice(
-                    template_id=invoice_data['template_id'],
-                    invoice_data=invoice_data['data'],
-                    invoice_number=invoice_data['invoice_number'],
-                    invoice_date=invoice_data['invoice_date'],
-                    due_date=invoice_data['due_date'],
-                    status=invoice_data.get('status', 'Pending')
-                )
-                
-                # Extract body content (without html/head tags)
-                import re
-                body_match = re.search(r'<body[^>]*>(.*?)</body>', rendered_html, re.DOTALL | re.IGNORECASE)
-                if body_match:
-                    body_content = body_match.group(1)
-                    combined_html += f'<div class="invoice-page">{body_content}</div>\n'
-            
-            combined_html += """
-            </body>
-            </html>
-            """
-            
-            # Generate PDF
-            html_doc = HTML(string=combined_html)
-            pdf_buffer = io.BytesIO()
-            
-            html_doc.write_pdf(
-                pdf_buffer,
-                stylesheets=[self.pdf_css],
-                font_config=self.font_config
-            )
-            
-            pdf_content = pdf_buffer.getvalue()
-            pdf_buffer.close()
-            
-            logger.info(f"Successfully generated bulk PDF with {len(invoices)} invoices")
-            return pdf_content
+            spool = await self.build_bulk_pdf(invoices)
+            with spool:
+                return spool.read()
             
+        except (PDFRenderQueueFull, PDFRenderTimeout):
+            raise
         except Exception as e:
             logger.error(f"Error generating bulk PDF: {str(e)}")
-            raise ValueError(f"Failed to generate bulk PDF: {str(e)}")
\ No newline at end of file
+            raise ValueError(f"Failed to generate bulk PDF: {str(e)}")
+
+
+def _safe_file_name(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", value).strip("._") or "unnamed"
@@ -3,8 +3,9 @@ import logging
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 from dotenv import load_dotenv
-from pinecone import Pinecone, ServerlessSpec
 from models.llm.embedding import EmbeddingService
+from utils.tracing import trace_dependency
+from utils.resilience import call_with_resilience
 import uuid
 import time
 
@@ -29,7 +30,8 @@ class PineconeService:
         
         logger.info(f"🔗 Initializing Pinecone service with index: {self.index_name}")
         
-        # Initialize Pinecone client
+        # Initialize Pinecone client (SDK imported on first use to keep startup fast)
+        from pinecone import Pinecone
         self.client = Pinecone(api_key=self.api_key)
         
         # Initialize embedding service
@@ -54,6 +56,7 @@ class PineconeService:
             logger.info(f"📝 Creating new index: {self.index_name}")
             
             # Create index with specifications for text embeddings
+            from pinecone import ServerlessSpec
             self.client.create_index(
                 name=self.index_name,
                 dimension=768,  # Google Vertex AI text-embedding-004 dimension
@@ -230,7 +233,8 @@ class PineconeService:
             # Store in Pinecone
             logger.info(f"📤 Storing {len(vectors)} vectors in Pinecone")
             
-            self.index.upsert(vectors=vectors)
+            # Upserts are keyed by vector id, so retrying is safe (no hedging for writes)
+            call_with_resilience("pinecone", self._traced_upsert, vectors=vectors)
             
             result = {
                 "success": True,
@@ -253,6 +257,14 @@ class PineconeService:
                 "error": str(e)
             }
     
+    @trace_dependency("pinecone", "query")
+    def _traced_query(self, **kwargs):
+        return self.index.query(**kwargs)
+    
+    @trace_dependency("pinecone", "upsert")
+    def _traced_upsert(self, **kwargs):
+        return self.index.upsert(**kwargs)
+    
     def search_similar(
         self, 
         query_text: str, 
@@ -277,7 +289,10 @@ class PineconeService:
             query_embedding = self.create_embedding(query_text)
             
             # Search in Pinecone
-            search_results = self.index.query(
+            search_results = call_with_resilience(
+                "pinecone",
+                self._traced_query,
+                hedge_after=1.5,
                 vector=query_embedding,
                 top_k=top_k,
                 filter=filter_metadata,
@@ -0,0 +1,268 @@
+"""
+Rendered Artifact Cache
+
+The same invoice is rendered again and again - previews, ``generate-pdf``,
+emails - and every call used to re-inject the template and re-run
+WeasyPrint. Rendered HTML and PDFs are now cached by content address: the
+key is a hash of the artifact kind, the template version (a digest of its
+content) and the canonical JSON of the invoice data, so an edited template
+or changed data simply produces a new key and nothing has to be invalidated.
+
+Two tiers:
+
+- an in-process LRU of ``RENDER_CACHE_MEMORY_BYTES`` for the hottest artifacts
+- a shared store selected by ``RENDER_CACHE_BACKEND``: ``disk`` (default,
+  ``RENDER_CACHE_DIR``, LRU-evicted beyond ``RENDER_CACHE_MAX_BYTES``),
+  ``gcs`` (``render-cache/`` in the documents bucket; expiry is left to the
+  bucket's lifecycle rules) or ``memory`` (no shared store)
+
+The key doubles as the HTTP ETag, so endpoints can answer ``If-None-Match``
+with 304 before rendering or even reading the cache.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from utils.resilience import call_with_resilience
+
+logger = logging.getLogger(__name__)
+
+# Bump when rendering code changes in a way that alters output for the same inputs
+RENDERER_VERSION = "4"
+
+
+def canonical_hash(value: Any) -> str:
+    """SHA-256 of the canonical JSON of ``value`` (sorted keys, no whitespace)"""
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_key(kind: str, template_version: str, data: Any) -> str:
+    """Content address of an artifact of ``kind`` rendered from a template version and data"""
+    return canonical_hash({
+        "kind": kind,
+        "renderer": RENDERER_VERSION,
+        "template": template_version,
+        "data": data,
+    })[:40]
+
+
+def etag_for(key: str) -> str:
+    return f'"{key}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True when an ``If-None-Match`` header value matches ``etag`` (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in (value[2:] if value.startswith("W/") else value for value in candidates)
+
+
+class LocalArtifactStore:
+    """Artifacts as files in one directory, least recently used evicted beyond ``max_bytes``"""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        # Rebuild the LRU order from modification times (touched on every hit)
+        files = [item for item in os.scandir(self.directory) if item.is_file() and not item.name.endswith(".tmp")]
+        for item in sorted(files, key=lambda item: item.stat().st_mtime_ns):
+            size = item.stat().st_size
+            self._index[item.name] = size
+            self._size += size
+        self._evict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+        path = self.directory / key
+        try:
+            content = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._size -= self._index.pop(key, 0)
+            return None
+        return content
+
+    def put(self, key: str, content: bytes) -> None:
+        path = self.directory / key
+        temp_path = path.with_name(f"{key}.{threading.get_ident()}.tmp")
+        temp_path.write_bytes(content)
+        os.replace(temp_path, path)
+        with self._lock:
+            self._size += len(content) - self._index.pop(key, 0)
+            self._index[key] = len(content)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._size -= size
+            try:
+                (self.directory / key).unlink()
+            except FileNotFoundError:
+                pass
+
+
+class GCSArtifactStore:
+    """
+    Artifacts as objects under ``prefix`` in the documents bucket
+
+    Uses the bucket's blob API directly: a missing object is a miss, any
+    other error propagates so ``RenderCache`` counts it as a store error.
+    """
+
+    def __init__(self, storage=None, prefix: str = "render-cache/"):
+        if storage is None:
+            from services.gcp_storage_service import get_gcp_storage_service
+            storage = get_gcp_storage_service()
+        self.bucket = storage.bucket
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        from google.api_core.exceptions import NotFound
+
+        blob = self.bucket.blob(f"{self.prefix}{key}")
+        try:
+            return call_with_resilience("gcs", blob.download_as_bytes)
+        except NotFound:
+            return None
+
+    def put(self, key: str, content: bytes) -> None:
+        blob = self.bucket.blob(f"{self.prefix}{key}")
+        call_with_resilience("gcs", blob.upload_from_string, content, content_type="application/octet-stream")
+
+
+class RenderCache:
+    """Two-tier cache of rendered artifacts by content address"""
+
+    def __init__(self, store=None, memory_bytes: Optional[int] = None):
+        self.store = store
+        self.memory_bytes = memory_bytes if memory_bytes is not None else int(
+            os.getenv("RENDER_CACHE_MEMORY_BYTES", str(32 * 1024 * 1024))
+        )
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._rendering: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "store_errors": 0}
+
+    def _remember(self, key: str, content: bytes) -> None:
+        if len(content) > self.memory_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            self._memory_size += len(content) - (len(previous) if previous is not None else 0)
+            self._memory[key] = content
+            while self._memory_size > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            content = self._memory.get(key)
+            if content is not None:
+                self._memory.move_to_end(key)
+                return content
+        if self.store is None:
+            return None
+        try:
+            content = await asyncio.to_thread(self.store.get, key)
+        except Exception as e:
+            self.stats["store_errors"] += 1
+            logger.warning(f"⚠️ Render cache read failed for {key}: {str(e)}")
+            return None
+        if content is not None:
+            self._remember(key, content)
+        return content
+
+    async def put(self, key: str, content: bytes) -> None:
+        self._remember(key, content)
+        if self.store is None:
+            return
+        try:
+            await asyncio.to_thread(self.store.put, key, content)
+        except Exception as e:
+            self.stats["store_errors"] += 1
+            logger.warning(f"⚠️ Render cache write failed for {key}: {str(e)}")
+
+    async def get_or_render(self, key: str, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        """
+        Cached artifact for ``key``, rendering and storing it on a miss
+
+        Concurrent misses for the same key share one render.
+        """
+        content = await self.get(key)
+        if content is not None:
+            self.stats["hits"] += 1
+            return content
+
+        pending = self._rendering.get(key)
+        if pending is not None:
+            self.stats["hits"] += 1
+            return await asyncio.shield(pending)
+
+        self.stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._rendering[key] = future
+        try:
+            content = await render()
+            await self.put(key, content)
+            future.set_result(content)
+            return content
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieved here so an unshared failure is not reported as never retrieved
+            future.exception()
+            raise
+        finally:
+            self._rendering.pop(key, None)
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+
+
+def _create_store():
+    backend = os.getenv("RENDER_CACHE_BACKEND", "disk").lower()
+    if backend == "memory":
+        return None
+    if backend == "gcs":
+        try:
+            return GCSArtifactStore()
+        except Exception as e:
+            logger.warning(f"⚠️ GCS render cache unavailable, falling back to local disk: {str(e)}")
+    directory = os.getenv("RENDER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "invoice-render-cache"))
+    max_bytes = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+    return LocalArtifactStore(Path(directory), max_bytes)
+
+
+# Singleton cache instance
+_render_cache = None
+
+
+def get_render_cache() -> RenderCache:
+    """Get singleton render cache instance"""
+    global _render_cache
+    if _render_cache is None:
+        _render_cache = RenderCache(store=_create_store())
+        logger.info(f"🗃️ Render cache initialized ({type(_render_cache.store).__name__ if _render_cache.store else 'memory only'})")
+    return _render_cache
@@ -0,0 +1,593 @@
+"""
+Human Input Review Queue
+
+Workflows that need human input used to pause one by one: the paused state
+stayed in ``ADKIntegrationService.active_workflows`` until a reviewer answered
+that workflow over its own HTTP call. This service keeps a persistent queue
+instead:
+
+- a paused workflow is *hibernated*: its state snapshot goes to storage and
+  leaves process memory, and each field it needs becomes a queue item
+- reviewers list pending items across workflows, grouped by field name, field
+  type (amount, email, date, ...) or user
+- one bulk submission answers many items and resumes every affected workflow,
+  a bounded number at a time
+
+States are stored as ``WorkflowState.to_snapshot`` snapshots: typed values
+(``Decimal``, dates) survive the round trip, the invoice history stays
+delta-encoded, and the contract file is stored once, by reference, as a blob
+next to the snapshot.
+
+Storage is the ``hibernated_workflows`` / ``review_queue_items`` /
+``hibernated_workflow_blobs`` tables, or a directory of JSON and blob files
+(``REVIEW_QUEUE_BACKEND=file``, ``REVIEW_QUEUE_DIR``) for deployments without
+a database.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Iterable, Tuple
+
+from adk_agents.workflow_state import WorkflowState
+from services.correction_query_parser import FIELD_TYPES
+from utils.typed_json import TypedJSONCodec
+
+logger = logging.getLogger(__name__)
+
+# Statuses of a workflow waiting for a reviewer
+PAUSED_STATUSES = ("PAUSED_FOR_HUMAN_INPUT", "needs_human_input")
+
+GROUP_KEYS = ("field_name", "field_type", "user_id", "workflow_id")
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_.-]+$")
+_BLOB_REF = re.compile(r"^[0-9a-f]{64}$")
+
+# Resumes one workflow with the answered field values and returns its final state
+Resumer = Callable[[str, Dict[str, Any], Optional[str]], Awaitable[Dict[str, Any]]]
+
+
+def is_paused_for_review(state: Dict[str, Any]) -> bool:
+    """Whether a workflow state is waiting for human input"""
+    return state.get("processing_status") in PAUSED_STATUSES
+
+
+def field_type_for(field_name: str) -> str:
+    """Semantic type of a field path, used to group similar requests"""
+    if field_name in FIELD_TYPES:
+        return FIELD_TYPES[field_name]
+    leaf = field_name.rsplit(".", 1)[-1]
+    for marker, field_type in (("email", "email"), ("phone", "phone"), ("date", "date"),
+                               ("amount", "amount"), ("fee", "amount"), ("name", "name")):
+        if marker in leaf:
+            return field_type
+    return "text"
+
+
+def _json_safe(value: Any) -> Any:
+    """Display copy of a value for queue items (never read back into a workflow)"""
+    return json.loads(json.dumps(value, default=str))
+
+
+def build_review_items(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Queue items for the fields a paused workflow asks for
+
+    Reads ``required_field_updates`` (set by the validation agent when it
+    pauses) or the fields of ``human_input_request``; one item per field.
+    """
+    workflow_id = state["workflow_id"]
+    fields = state.get("required_field_updates") or (state.get("human_input_request") or {}).get("fields") or []
+    created_at = datetime.now().isoformat()
+    items, seen = [], set()
+    for field in fields:
+        field_name = field.get("field_name") or field.get("field")
+        if not field_name or field_name in seen:
+            continue
+        seen.add(field_name)
+        items.append(_json_safe({
+            "item_id": f"{workflow_id}:{field_name}",
+            "workflow_id": workflow_id,
+            "user_id": state.get("user_id"),
+            "contract_name": state.get("contract_name"),
+            "field_name": field_name,
+            "field_type": field_type_for(field_name),
+            "request_type": field.get("field_type"),
+            "severity": field.get("severity"),
+            "description": field.get("description"),
+            "current_value": field.get("current_value"),
+            "suggested_value": field.get("suggested_value"),
+            "suggestions": field.get("suggestions"),
+            "created_at": created_at,
+        }))
+    return items
+
+
+def group_review_items(items: Iterable[Dict[str, Any]], group_by: str = "field_name") -> List[Dict[str, Any]]:
+    """Group queue items, largest groups first"""
+    if group_by not in GROUP_KEYS:
+        raise ValueError(f"group_by must be one of {', '.join(GROUP_KEYS)}")
+    groups: Dict[Any, Dict[str, Any]] = {}
+    for item in items:
+        key = item.get(group_by)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {"key": key, "count": 0, "workflow_ids": [], "items": []}
+        group["count"] += 1
+        group["items"].append(item)
+        if item["workflow_id"] not in group["workflow_ids"]:
+            group["workflow_ids"].append(item["workflow_id"])
+    return sorted(groups.values(), key=lambda group: (-group["count"], str(group["key"])))
+
+
+class ReviewQueueStore(ABC):
+    """
+    Storage for hibernated workflows and their queue items
+
+    A record is ``{"workflow_id", "user_id", "contract_name",
+    "processing_status", "state", "request", "blobs", "hibernated_at", "items"}``;
+    ``state`` and ``request`` are JSON snapshots and ``blobs`` maps the
+    references they contain to bytes. ``load`` and ``claim`` return records
+    without ``items``.
+    """
+
+    @abstractmethod
+    async def save(self, record: Dict[str, Any]) -> None:
+        """Store a hibernated workflow, replacing an earlier snapshot, its blobs and its items"""
+
+    @abstractmethod
+    async def load(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Read a hibernated workflow without removing it"""
+
+    @abstractmethod
+    async def claim(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Atomically remove and return a hibernated workflow (None if another caller got it first)"""
+
+    @abstractmethod
+    async def pending_items(self, user_id: Optional[str] = None,
+                            workflow_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Queue items, optionally for one user and/or a set of workflows"""
+
+
+class FileReviewQueueStore(ReviewQueueStore):
+    """
+    One JSON file per hibernated workflow plus one ``.blob`` file per blob;
+    claims are atomic renames of the JSON file
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, workflow_id: str) -> str:
+        if not _SAFE_ID.match(workflow_id):
+            raise ValueError(f"Invalid workflow id: {workflow_id!r}")
+        return os.path.join(self.directory, f"{workflow_id}.json")
+
+    def _blob_path(self, workflow_id: str, ref: str) -> str:
+        return os.path.join(self.directory, f"{workflow_id}.{ref}.blob")
+
+    def _blob_refs(self, workflow_id: str) -> List[str]:
+        prefix = f"{workflow_id}."
+        refs = (
+            name[len(prefix):-len(".blob")] for name in os.listdir(self.directory)
+            if name.startswith(prefix) and name.endswith(".blob")
+        )
+        return [ref for ref in refs if _BLOB_REF.match(ref)]
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        workflow_id = record["workflow_id"]
+        path = self._path(workflow_id)
+        blobs = record.get("blobs") or {}
+        stale = set(self._blob_refs(workflow_id)) - set(blobs)
+        # Blobs first: the JSON file appearing is what makes the record visible
+        for ref, content in blobs.items():
+            with open(self._blob_path(workflow_id, ref), "wb") as handle:
+                handle.write(content)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as handle:
+            json.dump({key: value for key, value in record.items() if key != "blobs"}, handle)
+        os.replace(tmp_path, path)
+        for ref in stale:
+            self._remove_blob(workflow_id, ref)
+
+    def _remove_blob(self, workflow_id: str, ref: str) -> None:
+        try:
+            os.remove(self._blob_path(workflow_id, ref))
+        except FileNotFoundError:
+            pass
+
+    def _read(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path) as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+
+    def _read_blobs(self, workflow_id: str) -> Dict[str, bytes]:
+        blobs = {}
+        for ref in self._blob_refs(workflow_id):
+            with open(self._blob_path(workflow_id, ref), "rb") as handle:
+                blobs[ref] = handle.read()
+        return blobs
+
+    def _load(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        record = self._read(self._path(workflow_id))
+        if record is None:
+            return None
+        record.pop("items", None)
+        record["blobs"] = self._read_blobs(workflow_id)
+        return record
+
+    def _claim(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        claimed = f"{self._path(workflow_id)}.{uuid.uuid4().hex}.claimed"
+        try:
+            os.rename(self._path(workflow_id), claimed)
+        except FileNotFoundError:
+            return None
+        try:
+            record = self._read(claimed)
+            record.pop("items", None)
+            record["blobs"] = self._read_blobs(workflow_id)
+            for ref in record["blobs"]:
+                self._remove_blob(workflow_id, ref)
+            return record
+        finally:
+            os.remove(claimed)
+
+    def _pending(self, user_id: Optional[str], workflow_ids: Optional[List[str]]) -> List[Dict[str, Any]]:
+        if workflow_ids is not None:
+            paths = [self._path(workflow_id) for workflow_id in workflow_ids if _SAFE_ID.match(workflow_id)]
+        else:
+            paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".json")]
+        items = []
+        for path in paths:
+            record = self._read(path)
+            if record and (user_id is None or record.get("user_id") == user_id):
+                items.extend(record.get("items", []))
+        return sorted(items, key=lambda item: item.get("created_at") or "")
+
+    async def save(self, record: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._write, record)
+
+    async def load(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._load, workflow_id)
+
+    async def claim(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._claim, workflow_id)
+
+    async def pending_items(self, user_id: Optional[str] = None,
+                            workflow_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._pending, user_id, workflow_ids)
+
+
+_ITEM_COLUMNS = ("workflow_id", "user_id", "contract_name", "field_name", "field_type", "request_type",
+                 "severity", "description", "current_value", "suggested_value", "suggestions")
+
+
+class DatabaseReviewQueueStore(ReviewQueueStore):
+    """``hibernated_workflows`` / ``review_queue_items`` / ``hibernated_workflow_blobs`` tables"""
+
+    async def save(self, record: Dict[str, Any]) -> None:
+        from sqlalchemy import delete
+        from db.postgresdb import AsyncSessionLocal
+        from models.database_models import HibernatedWorkflow, HibernatedWorkflowBlob, ReviewQueueItem
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(ReviewQueueItem).where(ReviewQueueItem.workflow_id == record["workflow_id"]))
+            await session.execute(
+                delete(HibernatedWorkflowBlob).where(HibernatedWorkflowBlob.workflow_id == record["workflow_id"])
+            )
+            await session.merge(HibernatedWorkflow(
+                workflow_id=record["workflow_id"],
+                user_id=record["user_id"],
+                contract_name=record.get("contract_name"),
+                processing_status=record.get("processing_status"),
+                state=record["state"],
+                request=record.get("request"),
+            ))
+            session.add_all([
+                ReviewQueueItem(id=item["item_id"], **{column: item.get(column) for column in _ITEM_COLUMNS})
+                for item in record["items"]
+            ])
+            session.add_all([
+                HibernatedWorkflowBlob(workflow_id=record["workflow_id"], ref=ref, content=content)
+                for ref, content in (record.get("blobs") or {}).items()
+            ])
+            await session.commit()
+
+    @staticmethod
+    def _record(row, blobs: Dict[str, bytes]) -> Dict[str, Any]:
+        return {
+            "workflow_id": row.workflow_id,
+            "user_id": row.user_id,
+            "contract_name": row.contract_name,
+            "processing_status": row.processing_status,
+            "state": row.state,
+            "request": row.request,
+            "hibernated_at": row.hibernated_at.isoformat() if row.hibernated_at else None,
+            "blobs": blobs,
+        }
+
+    async def load(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        from sqlalchemy import select
+        from db.postgresdb import AsyncSessionLocal
+        from models.database_models import HibernatedWorkflow, HibernatedWorkflowBlob
+
+        async with AsyncSessionLocal() as session:
+            row = await session.get(HibernatedWorkflow, workflow_id)
+            if row is None:
+                return None
+            blob_rows = (await session.execute(
+                select(HibernatedWorkflowBlob.ref, HibernatedWorkflowBlob.content)
+                .where(HibernatedWorkflowBlob.workflow_id == workflow_id)
+            )).all()
+            return self._record(row, {ref: content for ref, content in blob_rows})
+
+    async def claim(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        from sqlalchemy import delete
+        from db.postgresdb import AsyncSessionLocal
+        from models.database_models import HibernatedWorkflow, HibernatedWorkflowBlob
+
+        # Blobs are taken first, in the same transaction, before the cascade would drop them
+        blobs_stmt = (
+            delete(HibernatedWorkflowBlob)
+            .where(HibernatedWorkflowBlob.workflow_id == workflow_id)
+            .returning(HibernatedWorkflowBlob.ref, HibernatedWorkflowBlob.content)
+        )
+        # DELETE ... RETURNING: only one concurrent claimer gets the row; items go with it (ON DELETE CASCADE)
+        stmt = (
+            delete(HibernatedWorkflow)
+            .where(HibernatedWorkflow.workflow_id == workflow_id)
+            .returning(*(getattr(HibernatedWorkflow, column) for column in (
+                "workflow_id", "user_id", "contract_name", "processing_status", "state", "request", "hibernated_at"
+            )))
+        )
+        async with AsyncSessionLocal() as session:
+            blob_rows = (await session.execute(blobs_stmt)).all()
+            row = (await session.execute(stmt)).first()
+            if row is None:
+                await session.rollback()
+                return None
+            await session.commit()
+            return self._record(row, {ref: content for ref, content in blob_rows})
+
+    async def pending_items(self, user_id: Optional[str] = None,
+                            workflow_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        from sqlalchemy import select
+        from db.postgresdb import AsyncSessionLocal
+        from models.database_models import ReviewQueueItem
+
+        stmt = select(ReviewQueueItem).order_by(ReviewQueueItem.created_at, ReviewQueueItem.id)
+        if user_id is not None:
+            stmt = stmt.where(ReviewQueueItem.user_id == user_id)
+        if workflow_ids is not None:
+            stmt = stmt.where(ReviewQueueItem.workflow_id.in_(workflow_ids))
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(stmt)).scalars().all()
+        return [
+            {
+                "item_id": row.id,
+                **{column: getattr(row, column) for column in _ITEM_COLUMNS},
+                "created_at": row.created_at.isoformat() if row.created_at else None,
+            }
+            for row in rows
+        ]
+
+
+class ReviewQueueService:
+    """
+    Persistent queue of human input requests across workflows
+    """
+
+    def __init__(self, store: Optional[ReviewQueueStore] = None, resumer: Optional[Resumer] = None,
+                 resume_concurrency: Optional[int] = None):
+        self._store = store
+        self._resumer = resumer
+        self.resume_concurrency = resume_concurrency or int(os.getenv("REVIEW_QUEUE_RESUME_CONCURRENCY", "4"))
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def store(self) -> ReviewQueueStore:
+        if self._store is None:
+            backend = os.getenv("REVIEW_QUEUE_BACKEND", "database" if os.getenv("DATABASE_URL") else "file")
+            if backend == "file":
+                directory = os.getenv("REVIEW_QUEUE_DIR", os.path.join(tempfile.gettempdir(), "invoice_review_queue"))
+                self._store = FileReviewQueueStore(directory)
+            else:
+                self._store = DatabaseReviewQueueStore()
+            self.logger.info(f"🗄️ Review queue storage: {backend}")
+        return self._store
+
+    @property
+    def resumer(self) -> Resumer:
+        if self._resumer is None:
+            from adk_agents.adk_integration_service import get_adk_integration_service
+            self._resumer = get_adk_integration_service().resume_from_review
+        return self._resumer
+
+    async def hibernate(self, workflow_state: Dict[str, Any], request: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Move a paused workflow to storage and queue the fields it needs
+
+        Returns:
+            The queued items
+        """
+        state = WorkflowState.from_dict(workflow_state)
+        items = build_review_items(state)
+        # State and request share the blobs, so the contract file is stored once
+        blobs: Dict[str, bytes] = {}
+        await self.store.save({
+            "workflow_id": state["workflow_id"],
+            "user_id": state.get("user_id"),
+            "contract_name": state.get("contract_name"),
+            "processing_status": state.get("processing_status"),
+            "state": state.to_snapshot(blobs),
+            "request": TypedJSONCodec(blobs).encode(request or {}),
+            "blobs": blobs,
+            "hibernated_at": datetime.now().isoformat(),
+            "items": items,
+        })
+        self.logger.info(f"💤 Hibernated workflow {state['workflow_id']} with {len(items)} field request(s)")
+        return items
+
+    @staticmethod
+    def _restore(record: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Stored record with its state as a ``WorkflowState`` and its request decoded"""
+        if record is None:
+            return None
+        blobs = record.pop("blobs", None) or {}
+        record["state"] = WorkflowState.from_snapshot(record["state"], blobs)
+        record["request"] = TypedJSONCodec(blobs).decode(record.get("request") or {})
+        return record
+
+    async def load(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        return self._restore(await self.store.load(workflow_id))
+
+    async def claim(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        return self._restore(await self.store.claim(workflow_id))
+
+    async def get_queue(self, user_id: Optional[str] = None, group_by: str = "field_name",
+                        field_name: Optional[str] = None, field_type: Optional[str] = None,
+                        workflow_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Pending field requests, grouped for review
+
+        Args:
+            user_id: Only this user's workflows (None for all)
+            group_by: field_name, field_type, user_id or workflow_id
+            field_name / field_type: Optional filters
+            workflow_ids: Only these workflows (e.g. one batch)
+        """
+        items = await self.store.pending_items(user_id=user_id, workflow_ids=workflow_ids)
+        if field_name:
+            items = [item for item in items if item["field_name"] == field_name]
+        if field_type:
+            items = [item for item in items if item["field_type"] == field_type]
+        return {
+            "group_by": group_by,
+            "pending_count": len(items),
+            "workflow_count": len({item["workflow_id"] for item in items}),
+            "groups": group_review_items(items, group_by),
+        }
+
+    def resolve_answers(self, answers: List[Dict[str, Any]],
+                        pending: List[Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Map answers onto pending items, per workflow
+
+        An answer names one ``item_id``, or a ``field_name`` applied to every
+        pending request for that field (optionally limited to ``workflow_ids``).
+        Later answers for the same item win.
+
+        Returns:
+            (field values by workflow id, rejected answers with a reason)
+        """
+        by_id = {item["item_id"]: item for item in pending}
+        by_field: Dict[str, List[Dict[str, Any]]] = {}
+        for item in pending:
+            by_field.setdefault(item["field_name"], []).append(item)
+
+        field_values: Dict[str, Dict[str, Any]] = {}
+        rejected = []
+        for answer in answers:
+            if answer.get("item_id"):
+                item = by_id.get(answer["item_id"])
+                targets = [item] if item else []
+            else:
+                targets = by_field.get(answer.get("field_name"), [])
+                if answer.get("workflow_ids"):
+                    wanted = set(answer["workflow_ids"])
+                    targets = [item for item in targets if item["workflow_id"] in wanted]
+            if not targets:
+                rejected.append({**answer, "reason": "No pending request matches this answer"})
+                continue
+            for item in targets:
+                field_values.setdefault(item["workflow_id"], {})[item["field_name"]] = answer.get("value")
+        return field_values, rejected
+
+    async def submit_bulk_answers(self, answers: List[Dict[str, Any]], user_id: Optional[str] = None,
+                                  user_notes: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Apply answers across workflows and resume every workflow they touch
+
+        Args:
+            answers: ``{"item_id", "value"}`` or ``{"field_name", "value", "workflow_ids"?}``
+            user_id: Only answer this user's requests (None for all)
+            user_notes: Notes stored with the corrections
+        """
+        # Answers that only name items need just those workflows' requests
+        workflow_ids = None
+        if all(answer.get("item_id") for answer in answers):
+            workflow_ids = sorted({answer["item_id"].split(":", 1)[0] for answer in answers})
+        pending = await self.store.pending_items(user_id=user_id, workflow_ids=workflow_ids)
+        field_values, rejected = self.resolve_answers(answers, pending)
+
+        self.logger.info(f"📬 Review queue: {len(answers)} answer(s) for {len(field_values)} workflow(s)")
+        report = await self.resume_workflows(field_values, user_notes, user_id=user_id)
+        return {"submitted": len(answers), **report, "rejected": rejected}
+
+    async def resume_workflows(self, field_values: Dict[str, Dict[str, Any]],
+                               user_notes: Optional[str] = None,
+                               user_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Resume several workflows with their answered fields
+
+        Workflows are resumed concurrently (``REVIEW_QUEUE_RESUME_CONCURRENCY``
+        at a time); a failure in one does not stop the others. A workflow that
+        still needs input after its answers is hibernated again by the resumer.
+
+        Args:
+            field_values: Field values (dotted paths) by workflow id
+            user_notes: Notes stored with the corrections
+            user_id: Only resume this user's workflows (None for all)
+        """
+        semaphore = asyncio.Semaphore(self.resume_concurrency)
+
+        async def resume(workflow_id: str, values: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    if user_id is not None:
+                        record = await self.store.load(workflow_id)
+                        if record is None or record["user_id"] != user_id:
+                            return {"workflow_id": workflow_id, "success": False, "fields": sorted(values),
+                                    "message": "Workflow is not in this user's review queue"}
+                    final_state = await self.resumer(workflow_id, values, user_notes)
+                except Exception as e:
+                    self.logger.error(f"❌ Review queue: resuming workflow {workflow_id} failed: {str(e)}")
+                    return {"workflow_id": workflow_id, "success": False, "fields": sorted(values), "message": str(e)}
+                status = final_state.get("processing_status")
+                return {
+                    "workflow_id": workflow_id,
+                    "success": status != "failed",
+                    "fields": sorted(values),
+                    "processing_status": status,
+                    "workflow_resumed": not is_paused_for_review(final_state) and status != "failed",
+                }
+
+        results = await asyncio.gather(*(resume(workflow_id, values) for workflow_id, values in field_values.items()))
+        return {
+            "workflows": len(results),
+            "resumed": sum(1 for result in results if result.get("workflow_resumed")),
+            "still_pending": sum(1 for result in results if result["success"] and not result.get("workflow_resumed")),
+            "failed": sum(1 for result in results if not result["success"]),
+            "results": list(results),
+        }
+
+
+# Singleton service instance
+_review_queue_service = None
+
+
+def get_review_queue_service() -> ReviewQueueService:
+    """Get singleton review queue service instance"""
+    global _review_queue_service
+    if _review_queue_service is None:
+        _review_queue_service = ReviewQueueService()
+    return _review_queue_service
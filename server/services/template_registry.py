@@ -0,0 +1,265 @@
+"""
+Template Registry
+
+Preview, PDF, bulk-PDF and listing requests used to glob the templates
+directory and read the matching files on every call. ``TemplateRegistry``
+indexes a directory once - content, file stats and metadata parsed from the
+content - and answers id lookups and listings from memory.
+
+Templates can also be reduced to ``TemplateFeatures`` (placeholders, line
+item columns, style, size) as they are indexed, so template selection never
+has to read or parse a file.
+
+The index is refreshed incrementally: at most once every
+``TEMPLATE_REGISTRY_REFRESH_SECONDS`` the directory is listed and each file's
+mtime and size compared with the indexed version, so only added, removed or
+edited files are read again. ``refresh(force=True)`` skips the interval, e.g.
+right after a template is written.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from utils.template_engine import PLACEHOLDER_RE
+
+logger = logging.getLogger(__name__)
+
+MetadataParser = Callable[[Path, str], Dict[str, Any]]
+
+# Template styles, by the first of these words in the file name
+TEMPLATE_STYLES = ("modern", "professional", "simple", "clean", "basic", "standard", "classic", "minimal", "elegant")
+
+_THEAD_RE = re.compile(r"<thead\b.*?</thead>", re.IGNORECASE | re.DOTALL)
+_TH_RE = re.compile(r"<th[\s>]", re.IGNORECASE)
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+@dataclass(frozen=True)
+class TemplateFeatures:
+    """What template selection needs to know about a template"""
+    placeholders: FrozenSet[str]
+    # Columns of the line item table (0 when the template has no SERVICE_ITEMS table)
+    line_item_columns: int
+    style: str
+    size: int
+
+    @property
+    def detailed_line_items(self) -> bool:
+        """Room for description, quantity, unit price and total"""
+        return self.line_item_columns >= 4
+
+
+FeatureExtractor = Callable[[Path, str], TemplateFeatures]
+
+
+@dataclass
+class TemplateEntry:
+    """One indexed template file"""
+    id: str
+    path: Path
+    content: str
+    size: int
+    modified_at: float
+    created_at: float
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    # Content digest, the template's version in render cache keys
+    digest: str = ""
+    features: Optional[TemplateFeatures] = None
+
+    @property
+    def file_name(self) -> str:
+        return self.path.name
+
+    @property
+    def created_at_iso(self) -> str:
+        return datetime.fromtimestamp(self.created_at).isoformat()
+
+    @property
+    def modified_at_iso(self) -> str:
+        return datetime.fromtimestamp(self.modified_at).isoformat()
+
+
+def parse_invoice_template_metadata(path: Path, content: str) -> Dict[str, Any]:
+    """Metadata for HTML invoice templates, as listed by ``TemplateService``"""
+    template_type = "Professional Invoice Template"
+    # Basic content analysis for better metadata
+    if "{{PROVIDER_NAME}}" in content:
+        template_type = "Business Invoice Template"
+    if "professional" in content.lower():
+        template_type = "Professional Invoice Template"
+    return {
+        "name": path.stem.replace("-", " ").title(),
+        "type": template_type,
+        "model_used": "AI Generated",
+    }
+
+
+def extract_invoice_template_features(path: Path, content: str) -> TemplateFeatures:
+    """Features of an HTML invoice template"""
+    placeholders = frozenset(PLACEHOLDER_RE.findall(content))
+
+    # The header of the table holding the line item rows gives their columns
+    line_item_columns = 0
+    slot = content.find("{{SERVICE_ITEMS}}")
+    if slot >= 0:
+        headers = list(_THEAD_RE.finditer(content, 0, slot))
+        if headers:
+            line_item_columns = len(_TH_RE.findall(headers[-1].group(0)))
+        line_item_columns = line_item_columns or 2
+
+    words = _WORD_RE.findall(path.stem.lower())
+    style = next((word for word in words if word in TEMPLATE_STYLES), "standard")
+    return TemplateFeatures(
+        placeholders=placeholders,
+        line_item_columns=line_item_columns,
+        style=style,
+        size=len(content.encode("utf-8")),
+    )
+
+
+class TemplateRegistry:
+    """In-memory index of the template files in one directory"""
+
+    def __init__(self, directory: Path, suffix: str = ".html",
+                 include: Optional[Callable[[str], bool]] = None,
+                 metadata_parser: Optional[MetadataParser] = None,
+                 feature_extractor: Optional[FeatureExtractor] = None,
+                 refresh_interval: Optional[float] = None):
+        self.directory = Path(directory)
+        self.suffix = suffix
+        self.include = include
+        self.metadata_parser = metadata_parser
+        self.feature_extractor = feature_extractor
+        self.refresh_interval = (
+            refresh_interval if refresh_interval is not None
+            else float(os.getenv("TEMPLATE_REGISTRY_REFRESH_SECONDS", "2"))
+        )
+        self._entries: Dict[str, TemplateEntry] = {}
+        self._versions: Dict[str, Tuple[int, int]] = {}
+        self._lookups: Dict[str, Optional[str]] = {}
+        self._checked_at: Optional[float] = None
+        # Bumped whenever the indexed templates change, for caches built on top of the index
+        self.generation = 0
+        self._lock = threading.RLock()
+
+    def refresh(self, force: bool = False) -> None:
+        """Re-index files that were added, removed or changed since the last check"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._checked_at is not None and now - self._checked_at < self.refresh_interval:
+                return
+            self._checked_at = now
+
+            seen = set()
+            changed = 0
+            try:
+                scanned = list(os.scandir(self.directory))
+            except FileNotFoundError:
+                scanned = []
+            for item in scanned:
+                if not item.name.endswith(self.suffix) or (self.include and not self.include(item.name)):
+                    continue
+                try:
+                    stat = item.stat()
+                except OSError:
+                    continue
+                if not item.is_file():
+                    continue
+                template_id = item.name[:-len(self.suffix)]
+                seen.add(template_id)
+                version = (stat.st_mtime_ns, stat.st_size)
+                if self._versions.get(template_id) == version:
+                    continue
+                entry = self._load(Path(item.path), template_id, stat)
+                if entry is not None:
+                    self._entries[template_id] = entry
+                    self._versions[template_id] = version
+                    changed += 1
+
+            removed = set(self._entries) - seen
+            for template_id in removed:
+                del self._entries[template_id]
+                self._versions.pop(template_id, None)
+            if changed or removed:
+                self._lookups.clear()
+                self.generation += 1
+                logger.info(f"📚 Template registry {self.directory.name}: {len(self._entries)} templates "
+                            f"({changed} indexed, {len(removed)} removed)")
+
+    def _load(self, path: Path, template_id: str, stat: os.stat_result) -> Optional[TemplateEntry]:
+        try:
+            content = path.read_text(encoding="utf-8")
+            metadata = self.metadata_parser(path, content) if self.metadata_parser else {}
+            features = self.feature_extractor(path, content) if self.feature_extractor else None
+        except Exception as e:
+            logger.warning(f"Error processing template file {path}: {str(e)}")
+            return None
+        return TemplateEntry(
+            id=template_id,
+            path=path,
+            content=content,
+            size=stat.st_size,
+            modified_at=stat.st_mtime,
+            created_at=stat.st_ctime,
+            metadata=metadata,
+            digest=hashlib.sha256(content.encode("utf-8")).hexdigest()[:16],
+            features=features,
+        )
+
+    def get(self, template_id: str) -> Optional[TemplateEntry]:
+        """
+        Template by id (file name without suffix)
+
+        Falls back to the first template, by file name, whose id contains
+        ``template_id``, so short ids such as the hash suffix keep working.
+        """
+        self.refresh()
+        with self._lock:
+            entry = self._entries.get(template_id)
+            if entry is not None:
+                return entry
+            if template_id not in self._lookups:
+                if len(self._lookups) >= 1024:
+                    self._lookups.clear()
+                matches = sorted(entry_id for entry_id in self._entries if template_id and template_id in entry_id)
+                self._lookups[template_id] = matches[0] if matches else None
+            resolved = self._lookups[template_id]
+            return self._entries.get(resolved) if resolved else None
+
+    def get_content(self, template_id: str) -> Optional[str]:
+        entry = self.get(template_id)
+        return entry.content if entry else None
+
+    def list(self) -> List[TemplateEntry]:
+        """All templates, sorted by file name"""
+        self.refresh()
+        with self._lock:
+            return [self._entries[template_id] for template_id in sorted(self._entries)]
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._entries)
+
+
+# Singleton registry of the HTML invoice templates
+_template_registry = None
+
+
+def get_template_registry() -> TemplateRegistry:
+    """Get singleton registry for ``templates/invoices``"""
+    global _template_registry
+    if _template_registry is None:
+        _template_registry = TemplateRegistry(
+            Path(__file__).parent.parent / "templates" / "invoices",
+            metadata_parser=parse_invoice_template_metadata,
+            feature_extractor=extract_invoice_template_features,
+        )
+    return _template_registry
@@ -0,0 +1,185 @@
+"""
+Template Selection
+
+Picks the invoice template for an invoice from the ``TemplateFeatures`` the
+template registry extracts as it indexes templates, so selection never reads
+a template file.
+
+Whenever the registry's templates change, the best template is ranked once
+for every combination of line-item layout (detailed rows with quantity and
+unit price, summary rows, or no preference) and style. Selecting a template
+for an invoice is then a dictionary lookup on the invoice's profile.
+Decisions are also remembered per (user, contract type), so a user's
+invoices for one kind of contract keep the same template, as long as it
+fits the invoice's profile.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import product
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from services.template_registry import TemplateEntry, TemplateRegistry, get_template_registry
+
+logger = logging.getLogger(__name__)
+
+# Ranked first among equally good fits
+PREFERRED_TEMPLATES = [
+    "modern -professional -invoice-bb14c848",
+    "professional -invoice -template-b3c77171",
+    "modern -blue -invoice -template-e51c1ad1"
+]
+
+# Placeholders a template needs to be considered at all
+REQUIRED_PLACEHOLDERS = frozenset({"INVOICE_NUMBER", "CLIENT_NAME", "PROVIDER_NAME", "SERVICE_ITEMS"})
+
+ProfileKey = Tuple[Optional[bool], Optional[str]]
+
+
+@dataclass(frozen=True)
+class InvoiceProfile:
+    """What an invoice asks of its template; None means no preference"""
+    detailed_line_items: Optional[bool] = None
+    style: Optional[str] = None
+
+    @classmethod
+    def from_invoice(cls, invoice_data: Any = None, style: Optional[str] = None) -> "InvoiceProfile":
+        if invoice_data is None:
+            return cls(style=style)
+        data = invoice_data.model_dump() if hasattr(invoice_data, 'model_dump') else dict(invoice_data)
+        services = data.get('services') or data.get('items') or []
+        # Several items, or any priced per unit, need quantity and unit price columns
+        detailed = len(services) > 1 or any(
+            isinstance(item, Mapping) and item.get('unit_price') is not None and item.get('quantity') not in (None, 1, 1.0)
+            for item in services
+        )
+        return cls(detailed_line_items=detailed, style=style)
+
+    @property
+    def key(self) -> ProfileKey:
+        return self.detailed_line_items, self.style
+
+    def accepts(self, entry: TemplateEntry) -> bool:
+        """Whether ``entry`` has the layout and style this profile asks for"""
+        features = entry.features
+        if features is None:
+            return False
+        return (
+            (self.detailed_line_items is None or features.detailed_line_items == self.detailed_line_items)
+            and (self.style is None or features.style == self.style)
+        )
+
+
+def _contract_type_of(invoice_data: Any) -> Optional[str]:
+    if invoice_data is None:
+        return None
+    contract_type = (
+        invoice_data.get('contract_type') if isinstance(invoice_data, Mapping)
+        else getattr(invoice_data, 'contract_type', None)
+    )
+    return getattr(contract_type, 'value', contract_type)
+
+
+class TemplateSelector:
+    """Selects invoice templates by precomputed features"""
+
+    def __init__(self, registry: Optional[TemplateRegistry] = None, cache_size: Optional[int] = None):
+        self.registry = registry or get_template_registry()
+        self.cache_size = cache_size or int(os.getenv("TEMPLATE_SELECTION_CACHE_SIZE", "4096"))
+        self._best: Dict[ProfileKey, str] = {}
+        self._decisions: "OrderedDict[Tuple[str, Optional[str]], str]" = OrderedDict()
+        self._generation: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def select(
+        self,
+        invoice_data: Any = None,
+        user_id: Optional[str] = None,
+        contract_type: Optional[str] = None,
+        style: Optional[str] = None
+    ) -> TemplateEntry:
+        """
+        Best template for an invoice
+
+        Args:
+            invoice_data: Invoice data (dict or model); its line items decide the layout
+            user_id: Remember the decision for this user and contract type
+            contract_type: Defaults to the invoice's contract type
+            style: Preferred template style (``TEMPLATE_STYLES``)
+        """
+        self.registry.refresh()
+        with self._lock:
+            if self._generation != self.registry.generation:
+                self._reindex()
+
+            profile = InvoiceProfile.from_invoice(invoice_data, style=style)
+            decision_key = None
+            if user_id:
+                decision_key = (user_id, contract_type or _contract_type_of(invoice_data))
+                template_id = self._decisions.get(decision_key)
+                if template_id is not None:
+                    self._decisions.move_to_end(decision_key)
+                    entry = self.registry.get(template_id)
+                    # An invoice needing another layout (or style) is selected afresh
+                    if entry is not None and profile.accepts(entry):
+                        return entry
+
+            template_id = self._best.get(profile.key) or self._best.get((profile.detailed_line_items, None))
+            if template_id is None:
+                raise ValueError("No HTML templates found in templates directory")
+
+            if decision_key is not None:
+                self._decisions[decision_key] = template_id
+                while len(self._decisions) > self.cache_size:
+                    self._decisions.popitem(last=False)
+
+        return self.registry.get(template_id)
+
+    def _reindex(self) -> None:
+        """Rank the best template for every profile (lock held)"""
+        entries = [entry for entry in self.registry.list() if entry.features is not None]
+        eligible = [entry for entry in entries if REQUIRED_PLACEHOLDERS <= entry.features.placeholders] or entries
+        styles = sorted({entry.features.style for entry in eligible})
+
+        self._best = {
+            (detailed, style): self._rank(eligible, detailed, style).id
+            for detailed, style in product((None, True, False), [None] + styles)
+            if eligible
+        }
+        self._decisions.clear()
+        self._generation = self.registry.generation
+        logger.info(f"🧭 Template selection indexed {len(eligible)} templates ({len(self._best)} profiles)")
+
+    @staticmethod
+    def _rank(entries: Iterable[TemplateEntry], detailed: Optional[bool], style: Optional[str]) -> TemplateEntry:
+        def score(entry: TemplateEntry):
+            features = entry.features
+            return (
+                detailed is not None and features.detailed_line_items != detailed,
+                style is not None and features.style != style,
+                PREFERRED_TEMPLATES.index(entry.id) if entry.id in PREFERRED_TEMPLATES else len(PREFERRED_TEMPLATES),
+                -len(features.placeholders),
+                features.size,
+                entry.id,
+            )
+        return min(entries, key=score)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._decisions.clear()
+            self._generation = None
+
+
+# Singleton selector instance
+_template_selector = None
+
+
+def get_template_selector() -> TemplateSelector:
+    """Get singleton template selector instance"""
+    global _template_selector
+    if _template_selector is None:
+        _template_selector = TemplateSelector()
+    return _template_selector
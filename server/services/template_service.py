@@ -4,8 +4,10 @@ import json
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
-from utils.html_sanitizer import HTMLSanitizer, TemplateValidator
+from utils.html_sanitizer import HTMLSanitizer, TemplateValidator, scan_template
 from services.database_service import get_database_service
+from services.template_registry import get_template_registry
+from services.render_cache import get_render_cache, render_key
 
 logger = logging.getLogger(__name__)
 
@@ -16,29 +18,52 @@ class TemplateService:
         self.db_service = get_database_service()
         self.templates_dir = Path(__file__).parent.parent / "templates" / "invoices"
         self.templates_dir.mkdir(parents=True, exist_ok=True)
+        self.registry = get_template_registry()
+        self.render_cache = get_render_cache()
     
     async def get_template_by_id(self, template_id: str) -> Optional[str]:
         """Retrieve HTML template content by template ID"""
         try:
-            # Try file system first (for now, until database integration is complete)
-            template_files = list(self.templates_dir.glob(f"*{template_id}*.html"))
-            if template_files:
-                with open(template_files[0], 'r', encoding='utf-8') as f:
-                    return f.read()
-            
-            # Try exact filename match
-            exact_file = self.templates_dir / f"{template_id}.html"
-            if exact_file.exists():
-                with open(exact_file, 'r', encoding='utf-8') as f:
-                    return f.read()
-            
-            logger.warning(f"Template not found: {template_id}")
-            return None
+            # Served from the in-memory registry (file system only, until database integration is complete)
+            content = self.registry.get_content(template_id)
+            if content is None:
+                logger.warning(f"Template not found: {template_id}")
+            return content
             
         except Exception as e:
             logger.error(f"Error retrieving template {template_id}: {str(e)}")
             return None
     
+    def render_key(
+        self,
+        kind: str,
+        template_id: str,
+        invoice_data: Dict[str, Any],
+        invoice_number: Optional[str] = None,
+        invoice_date: Optional[datetime] = None,
+        due_date: Optional[datetime] = None,
+        status: str = "Draft"
+    ) -> Optional[str]:
+        """
+        Render cache key (and ETag) of an invoice rendered as ``kind`` ("html" or "pdf")
+        
+        Covers exactly what reaches the output: the template version, the
+        invoice data, the number, the dates as printed and the status.
+        Returns None when the template does not exist.
+        """
+        entry = self.registry.get(template_id)
+        if entry is None:
+            return None
+        # Overwritten by _prepare_preview_data and never rendered
+        data = {k: v for k, v in invoice_data.items() if k not in ('generated_at', 'preview_mode')}
+        return render_key(kind, f"{entry.id}:{entry.digest}", {
+            'invoice_data': data,
+            'invoice_number': invoice_number,
+            'invoice_date': invoice_date.strftime('%Y-%m-%d') if invoice_date else None,
+            'due_date': due_date.strftime('%Y-%m-%d') if due_date else None,
+            'status': status,
+        })
+    
     async def render_invoice_preview(
         self,
         template_id: str,
@@ -63,29 +88,18 @@ class TemplateService:
             Rendered HTML ready for safe display
         """
         try:
-            # Get template content
-            template_content = await self.get_template_by_id(template_id)
-            if not template_content:
+            key = self.render_key("html", template_id, invoice_data, invoice_number, invoice_date, due_date, status)
+            if key is None:
                 raise ValueError(f"Template not found: {template_id}")
             
-            # Validate template safety
-            if not TemplateValidator.is_template_safe(template_content):
-                raise ValueError("Template contains unsafe content")
-            
-            # Sanitize the template
-            safe_template = HTMLSanitizer.sanitize_html_template(template_content)
-            
-            # Prepare enhanced invoice data with preview overrides
-            enhanced_data = self._prepare_preview_data(
-                invoice_data, invoice_number, invoice_date, due_date, status
-            )
+            async def render() -> bytes:
+                html = self._render_invoice_html(
+                    template_id, invoice_data, invoice_number, invoice_date, due_date, status
+                )
+                return html.encode('utf-8')
             
-            # Inject data safely
-            rendered_html = HTMLSanitizer.inject_data_safely(safe_template, enhanced_data)
-            
-            # Add preview watermark CSS if in preview mode
-            if status == "Draft" or "PREVIEW" in (invoice_number or ""):
-                rendered_html = self._add_preview_watermark(rendered_html)
+            # Repeat renders of the same template version and data are served from the cache
+            rendered_html = (await self.render_cache.get_or_render(key, render)).decode('utf-8')
             
             logger.info(f"Successfully rendered invoice preview for template {template_id}")
             return rendered_html
@@ -94,6 +108,41 @@ class TemplateService:
             logger.error(f"Error rendering invoice preview: {str(e)}")
             raise ValueError(f"Failed to render invoice preview: {str(e)}")
     
+    def _render_invoice_html(
+        self,
+        template_id: str,
+        invoice_data: Dict[str, Any],
+        invoice_number: Optional[str],
+        invoice_date: Optional[datetime],
+        due_date: Optional[datetime],
+        status: str
+    ) -> str:
+        """Inject invoice data into the sanitized template (uncached)"""
+        # Get template content
+        template_content = self.registry.get_content(template_id)
+        if not template_content:
+            raise ValueError(f"Template not found: {template_id}")
+        
+        # Validate and sanitize the template (one memoized pass per template version)
+        scan = scan_template(template_content)
+        if not scan.safe:
+            raise ValueError("Template contains unsafe content")
+        safe_template = scan.html
+        
+        # Prepare enhanced invoice data with preview overrides
+        enhanced_data = self._prepare_preview_data(
+            invoice_data, invoice_number, invoice_date, due_date, status
+        )
+        
+        # Inject data safely
+        rendered_html = HTMLSanitizer.inject_data_safely(safe_template, enhanced_data)
+        
+        # Add preview watermark CSS if in preview mode
+        if status == "Draft" or "PREVIEW" in (invoice_number or ""):
+            rendered_html = self._add_preview_watermark(rendered_html)
+        
+        return rendered_html
+    
     async def render_final_invoice(
         self,
         template_id: str,
@@ -257,38 +306,17 @@ class TemplateService:
         try:
             templates = []
             
-            # Get templates from file system
-            for template_file in self.templates_dir.glob("*.html"):
-                try:
-                    file_id = template_file.stem
-                    stat = template_file.stat()
-                    
-                    # Try to extract metadata from file content
-                    with open(template_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    template_type = "Professional Invoice Template"
-                    model_used = "AI Generated"
-                    
-                    # Basic content analysis for better metadata
-                    if "{{PROVIDER_NAME}}" in content:
-                        template_type = "Business Invoice Template"
-                    if "professional" in content.lower():
-                        template_type = "Professional Invoice Template"
-                    
-                    templates.append({
-                        'id': file_id,
-                        'name': file_id.replace('-', ' ').title(),
-                        'type': template_type,
-                        'created_at': datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                        'model_used': model_used,
-                        'source': 'file_system',
-                        'file_size': stat.st_size
-                    })
-                    
-                except Exception as file_error:
-                    logger.warning(f"Error processing template file {template_file}: {str(file_error)}")
-                    continue
+            # Get templates from the file system index
+            for entry in self.registry.list():
+                templates.append({
+                    'id': entry.id,
+                    'name': entry.metadata['name'],
+                    'type': entry.metadata['type'],
+                    'created_at': entry.created_at_iso,
+                    'model_used': entry.metadata['model_used'],
+                    'source': 'file_system',
+                    'file_size': entry.size
+                })
             
             # Try to get templates from database as well
             try:
@@ -1,14 +1,46 @@
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Callable, Sequence, Iterable
 from datetime import datetime
+import copy
+import hashlib
 import logging
+import os
+import re
+from functools import lru_cache
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from schemas.contract_schemas import ContractInvoiceData
 from schemas.unified_invoice_schemas import UnifiedInvoiceData
 from schemas.workflow_schemas import ProcessingStatus
+from services.confidence_model import get_confidence_model
+from utils.fuzzy_match import FuzzyMatchIndex, similarity
 
 logger = logging.getLogger(__name__)
 
+try:
+    from dateutil.parser import parse as _parse_date
+except ImportError:  # dates are then reported as unparseable, as before
+    _parse_date = None
+
+try:
+    import numpy as np
+except ImportError:  # optional ("bulk" extra); batch validation falls back to per-value range checks
+    np = None
+
+# Smallest column for which the NumPy range pre-check pays for itself
+_VECTORIZE_MIN_ROWS = 256
+
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_PHONE_RE = re.compile(r'^[\+]?[1-9][\d]{0,15}$')  # Very basic international format
+_PHONE_SEPARATORS_RE = re.compile(r'[\s\-\(\)]')
+
+# Payment amount reasonableness ranges per currency
+_CURRENCY_RANGES = {
+    "USD": {"min": 10, "max": 50000, "typical_max": 10000},
+    "EUR": {"min": 10, "max": 45000, "typical_max": 9000},
+    "INR": {"min": 500, "max": 2000000, "typical_max": 500000},
+    "GBP": {"min": 10, "max": 40000, "typical_max": 8000}
+}
+
 class ValidationSeverity(Enum):
     """Severity levels for validation issues"""
     ERROR = "error"          # Must be fixed before proceeding
@@ -34,6 +66,7 @@ class ValidationIssue:
     current_value: Any
     suggested_value: Optional[Any] = None
     requires_human_input: bool = False
+    suggestions: Optional[List[Dict[str, Any]]] = None  # Top-k {"value", "score"} for invalid values
 
 @dataclass
 class ValidationResult:
@@ -45,14 +78,499 @@ class ValidationResult:
     human_input_required: bool
     confidence_score: float
     validation_timestamp: str
+    # Per-rule outcomes for ``revalidate_changed_fields`` (single-invoice validation only)
+    rule_snapshot: Optional[Dict[str, Any]] = field(default=None, repr=False)
+    # Inputs of the confidence model, stored with corrections as training data
+    confidence_features: Optional[Dict[str, float]] = field(default=None, repr=False)
+
+    def to_state_dict(self) -> Dict[str, Any]:
+        """Form stored as ``state["validation_results"]`` in the workflow state"""
+        return {
+            "is_valid": self.is_valid,
+            "validation_score": self.validation_score,
+            "confidence_score": self.confidence_score,
+            "human_input_required": self.human_input_required,
+            "issues_count": len(self.issues),
+            "missing_required_fields_count": len(self.missing_required_fields),
+            "validation_timestamp": self.validation_timestamp,
+            "issues": [issue_to_dict(issue) for issue in self.issues],
+            "missing_required_fields": self.missing_required_fields,
+            "confidence_features": self.confidence_features
+        }
+
+
+def issue_to_dict(issue: ValidationIssue) -> Dict[str, Any]:
+    """JSON-friendly form of an issue (severity as its string value)"""
+    return {
+        "field_name": issue.field_name,
+        "issue_type": issue.issue_type,
+        "severity": issue.severity.value if hasattr(issue.severity, 'value') else issue.severity,
+        "message": issue.message,
+        "current_value": issue.current_value,
+        "suggested_value": issue.suggested_value,
+        "suggestions": issue.suggestions,
+        "requires_human_input": issue.requires_human_input
+    }
+
+
+def issue_from_dict(data: Dict[str, Any]) -> ValidationIssue:
+    """Inverse of ``issue_to_dict``"""
+    return ValidationIssue(**{**data, "severity": ValidationSeverity(data["severity"])})
+
+
+def fields_overlap(path: str, other: str) -> bool:
+    """True if two dotted field paths are equal or one contains the other (``client`` / ``client.name``)"""
+    return path == other or path.startswith(other + ".") or other.startswith(path + ".")
+
+
+FieldCheck = Callable[[Any], Optional[ValidationIssue]]
+
+
+def _compile_accessor(field_path: str) -> Callable[[Dict[str, Any]], Any]:
+    """Precompiled equivalent of ``_get_nested_field`` for one dotted path"""
+    keys = tuple(field_path.split('.'))
+    if len(keys) == 1:
+        (key,) = keys
+
+        def get(data):
+            return data.get(key) if isinstance(data, dict) else None
+    elif len(keys) == 2:
+        outer, inner = keys
+
+        def get(data):
+            value = data.get(outer) if isinstance(data, dict) else None
+            return value.get(inner) if isinstance(value, dict) else None
+    else:
+        def get(data):
+            value = data
+            for key in keys:
+                if not isinstance(value, dict):
+                    return None
+                value = value.get(key)
+            return value
+    return get
+
+
+# Suggestions scoring at least this are applied without pausing for human input
+_AUTO_CORRECT_SCORE = 0.6
+
+
+def _compile_text_check(field_path: str, rules: Dict[str, Any]) -> FieldCheck:
+    """Validate text fields"""
+    min_length = rules.get("min_length")
+    max_length = rules.get("max_length")
+    allowed_values = rules.get("allowed_values")
+    allowed_lower = frozenset(v.lower() for v in allowed_values) if allowed_values else None
+    fuzzy_index = FuzzyMatchIndex(allowed_values) if allowed_values else None
+    invalid_value_message = f"Field '{field_path}' has unexpected value. Allowed: {allowed_values}"
+
+    def check(value):
+        if not isinstance(value, str):
+            return ValidationIssue(
+                field_name=field_path,
+                issue_type="invalid_type",
+                severity=ValidationSeverity.ERROR,
+                message=f"Field '{field_path}' should be text, got {type(value).__name__}",
+                current_value=value,
+                requires_human_input=True
+            )
+        
+        # Check length constraints
+        if min_length is not None and len(value.strip()) < min_length:
+            return ValidationIssue(
+                field_name=field_path,
+                issue_type="too_short",
+                severity=ValidationSeverity.WARNING,
+                message=f"Field '{field_path}' is too short (minimum {min_length} characters)",
+                current_value=value,
+                requires_human_input=True
+            )
+        
+        if max_length is not None and len(value) > max_length:
+            return ValidationIssue(
+                field_name=field_path,
+                issue_type="too_long",
+                severity=ValidationSeverity.WARNING,
+                message=f"Field '{field_path}' is too long (maximum {max_length} characters)",
+                current_value=value,
+                requires_human_input=False  # Auto-truncation possible
+            )
+        
+        # Check allowed values (case-insensitive) - be lenient for better automation
+        if allowed_lower is not None and value.lower().strip() not in allowed_lower:
+            matches = fuzzy_index.suggest(value, 3, 0.01)
+            # Only require human input if the best suggestion is very different
+            requires_human = not matches or matches[0][1] < _AUTO_CORRECT_SCORE
+            return ValidationIssue(
+                field_name=field_path,
+                issue_type="invalid_value",
+                severity=ValidationSeverity.WARNING if not requires_human else ValidationSeverity.ERROR,
+                message=invalid_value_message,
+                current_value=value,
+                suggested_value=matches[0][0] if matches else None,
+                requires_human_input=requires_human,
+                suggestions=[{"value": match, "score": score} for match, score in matches]
+            )
+        
+        return None
+    return check
+
+
+def _compile_number_check(field_path: str, rules: Dict[str, Any]) -> FieldCheck:
+    """Validate numeric and currency amount fields"""
+    min_value = rules.get("min_value")
+    max_value = rules.get("max_value")
+
+    def check(value):
+        if not isinstance(value, (int, float)):
+            try:
+                value = float(value)
+            except (ValueError, TypeError):
+                return ValidationIssue(
+                    field_name=field_path,
+                    issue_type="invalid_type",
+                    severity=ValidationSeverity.ERROR,
+                    message=f"Field '{field_path}' should be a number, got {type(value).__name__}",
+                    current_value=value,
+                    requires_human_input=True
+                )
+        
+        # Check range constraints
+        if min_value is not None and value < min_value:
+            return ValidationIssue(
+                field_name=field_path,
+                issue_type="value_too_low",
+                severity=ValidationSeverity.WARNING,
+                message=f"Field '{field_path}' is below minimum value ({min_value})",
+                current_value=value,
+                requires_human_input=True
+            )
+        
+        if max_value is not None and value > max_value:
+            return ValidationIssue(
+                field_name=field_path,
+                issue_type="value_too_high",
+                severity=ValidationSeverity.WARNING,
+                message=f"Field '{field_path}' exceeds maximum value ({max_value})",
+                current_value=value,
+                requires_human_input=True
+            )
+        
+        return None
+    return check
+
+
+def _compile_email_check(field_path: str, lenient: bool) -> FieldCheck:
+    """Validate email fields (lenient mode only checks for an @)"""
+    def check(value):
+        if not isinstance(value, str):
+            if lenient:
+                return None
+            return ValidationIssue(
+                field_name=field_path,
+                issue_type="invalid_type",
+                severity=ValidationSeverity.ERROR,
+                message=f"Email field '{field_path}' should be text",
+                current_value=value,
+                requires_human_input=True
+            )
+        
+        if ("@" not in value) if lenient else (not _EMAIL_RE.match(value)):
+            return ValidationIssue(
+                field_name=field_path,
+                issue_type="invalid_format",
+                severity=ValidationSeverity.WARNING,
+                message=f"Field '{field_path}' doesn't appear to be a valid email address",
+                current_value=value,
+                requires_human_input=True
+            )
+        
+        return None
+    return check
+
+
+def _compile_date_check(field_path: str, lenient: bool) -> FieldCheck:
+    """Validate date fields (any format dateutil can parse)"""
+    def check(value):
+        if not isinstance(value, str) or (lenient and not value.strip()):
+            return None
+        try:
+            _parse_date(value)
+            return None
+        except Exception:
+            return ValidationIssue(
+                field_name=field_path,
+                issue_type="invalid_date_format",
+                severity=ValidationSeverity.WARNING,
+                message=f"Field '{field_path}' doesn't appear to be a valid date",
+                current_value=value,
+                suggested_value="YYYY-MM-DD format recommended",
+                requires_human_input=True
+            )
+    return check
+
+
+def _compile_phone_check(field_path: str) -> FieldCheck:
+    """Validate phone number fields"""
+    def check(value):
+        if not isinstance(value, str):
+            return ValidationIssue(
+                field_name=field_path,
+                issue_type="invalid_type",
+                severity=ValidationSeverity.ERROR,
+                message=f"Phone field '{field_path}' should be text",
+                current_value=value,
+                requires_human_input=True
+            )
+        
+        # Basic phone validation - allows various formats once separators are removed
+        if not _PHONE_RE.match(_PHONE_SEPARATORS_RE.sub('', value)):
+            return ValidationIssue(
+                field_name=field_path,
+                issue_type="invalid_format",
+                severity=ValidationSeverity.WARNING,
+                message=f"Field '{field_path}' doesn't appear to be a valid phone number",
+                current_value=value,
+                requires_human_input=True
+            )
+        
+        return None
+    return check
+
+
+class CompiledFieldRule:
+    """One field rule with its path accessor and type check resolved ahead of time"""
+    __slots__ = ("field_path", "required", "description", "field_type", "get", "check", "missing_message", "bounds")
+
+    def __init__(self, field_path: str, config: Dict[str, Any], check: Optional[FieldCheck]):
+        self.field_path = field_path
+        self.required = config["required"]
+        self.description = config["description"]
+        self.field_type = config["type"]
+        self.get = _compile_accessor(field_path)
+        self.check = check
+        self.missing_message = f"Required field '{field_path}' is missing: {config['description']}"
+        # (min, max) for numeric rules, used by the vectorized pre-check in ``evaluate_many``
+        rules = config.get("validation_rules", {})
+        self.bounds = (rules.get("min_value"), rules.get("max_value")) if self.field_type in (FieldType.NUMBER, FieldType.CURRENCY) else None
+
+
+# (issue or None, missing required, filled) for one field rule
+RuleOutcome = Tuple[Optional[ValidationIssue], bool, bool]
+
+
+class CompiledRuleSet:
+    """
+    Flat, precompiled form of the field rule definitions
+
+    Built once per validation service; ``evaluate`` walks a list of rules with
+    precompiled accessors and checks instead of re-interpreting the rule dict.
+    ``evaluate_many`` runs rule by rule over many invoices and memoizes checks
+    per distinct value, since invoices in a book share most enum-like values.
+    """
+
+    def __init__(self, rules: List[CompiledFieldRule]):
+        self.rules = rules
+        self.total_required = sum(1 for rule in rules if rule.required)
+
+    @classmethod
+    def compile(cls, required_fields: Dict[str, Dict[str, Any]], lenient: bool = False) -> "CompiledRuleSet":
+        rules = []
+        for field_path, config in required_fields.items():
+            field_type = config["type"]
+            validation_rules = config.get("validation_rules", {})
+            if field_type == FieldType.TEXT:
+                check = _compile_text_check(field_path, validation_rules)
+            elif field_type in (FieldType.NUMBER, FieldType.CURRENCY):
+                check = _compile_number_check(field_path, validation_rules)
+            elif field_type == FieldType.EMAIL:
+                check = _compile_email_check(field_path, lenient)
+            elif field_type == FieldType.DATE:
+                check = _compile_date_check(field_path, lenient)
+            elif field_type == FieldType.PHONE and not lenient:
+                check = _compile_phone_check(field_path)
+            else:
+                check = None
+            rules.append(CompiledFieldRule(field_path, config, check))
+        return cls(rules)
+
+    @staticmethod
+    def _missing_issue(rule: CompiledFieldRule, value: Any) -> ValidationIssue:
+        return ValidationIssue(
+            field_name=rule.field_path,
+            issue_type="missing_required",
+            severity=ValidationSeverity.ERROR,
+            message=rule.missing_message,
+            current_value=value,
+            requires_human_input=True
+        )
+
+    def outcome(self, rule: CompiledFieldRule, data_dict: Dict[str, Any]) -> RuleOutcome:
+        """Run one field rule; returns (issue or None, missing required, filled)"""
+        value = rule.get(data_dict)
+        filled = value is not None and bool(str(value).strip())
+        if value is None or value == "":
+            return (self._missing_issue(rule, value) if rule.required else None), rule.required, filled
+        return (rule.check(value) if rule.check else None), False, filled
+
+    def outcomes(self, data_dict: Dict[str, Any],
+                 previous: Optional[Dict[str, RuleOutcome]] = None,
+                 dirty_fields: Iterable[str] = ()) -> List[RuleOutcome]:
+        """
+        Outcome of every field rule, in rule order
+
+        With ``previous`` (outcomes by field path from an earlier run), rules whose
+        path does not overlap ``dirty_fields`` reuse their previous outcome.
+        """
+        dirty = list(dirty_fields)
+        results = []
+        for rule in self.rules:
+            if previous is not None and rule.field_path in previous and not any(fields_overlap(rule.field_path, path) for path in dirty):
+                results.append(previous[rule.field_path])
+            else:
+                results.append(self.outcome(rule, data_dict))
+        return results
+
+    def summarize(self, outcomes: Sequence[RuleOutcome]) -> Tuple[List[ValidationIssue], List[str], float, Tuple[int, int]]:
+        """Fold rule outcomes into (issues, missing required fields, validation score, completeness)"""
+        issues: List[ValidationIssue] = []
+        missing: List[str] = []
+        score = 1.0
+        filled = required_filled = 0
+        for rule, (issue, is_missing, is_filled) in zip(self.rules, outcomes):
+            if is_filled:
+                filled += 1
+                required_filled += rule.required
+            if is_missing:
+                missing.append(rule.field_path)
+                score -= 0.15  # Significant penalty for missing required fields
+            elif issue:
+                score += _SEVERITY_PENALTY[issue.severity]
+            if issue:
+                issues.append(issue)
+        return issues, missing, score, (filled, required_filled)
+
+    def evaluate(self, data_dict: Dict[str, Any]) -> Tuple[List[ValidationIssue], List[str], float]:
+        """Run every field rule; returns (issues, missing required fields, validation score)"""
+        issues, missing, score, _ = self.summarize(self.outcomes(data_dict))
+        return issues, missing, score
+
+    def evaluate_many(self, data_dicts: Sequence[Dict[str, Any]],
+                      completeness: Optional[List[List[int]]] = None) -> List[Tuple[List[ValidationIssue], List[str], float]]:
+        """
+        ``evaluate`` for many invoices at once, column by column
+
+        Only number columns with bounds are pre-checked vectorized (with NumPy,
+        the ``bulk`` extra); text, date, email, phone and currency columns run
+        their compiled check once per distinct value in the column.
+
+        If ``completeness`` is given it is filled with one ``[filled, required_filled]``
+        pair per invoice (see ``completeness``) from the same column reads.
+        """
+        results: List[Tuple[List[ValidationIssue], List[str]]] = [([], []) for _ in data_dicts]
+        scores = [1.0] * len(data_dicts)
+        if completeness is not None:
+            completeness[:] = [[0, 0] for _ in data_dicts]
+        for rule in self.rules:
+            column = [rule.get(data_dict) for data_dict in data_dicts]
+            if completeness is not None:
+                for counts, value in zip(completeness, column):
+                    if value is not None and str(value).strip():
+                        counts[0] += 1
+                        counts[1] += rule.required
+            in_range = _numbers_in_range(column, *rule.bounds) if rule.bounds and rule.check else None
+            memo: Dict[Any, Optional[ValidationIssue]] = {}
+            for position, value in enumerate(column):
+                if in_range is not None and in_range[position]:
+                    continue
+                issues, missing = results[position]
+                if value is None or value == "":
+                    if rule.required:
+                        missing.append(rule.field_path)
+                        issues.append(self._missing_issue(rule, value))
+                        scores[position] -= 0.15
+                    continue
+                if rule.check is None:
+                    continue
+                try:
+                    key = (type(value), value)
+                    if key in memo:
+                        cached = memo[key]
+                        issue = copy.copy(cached) if cached else None
+                    else:
+                        issue = memo[key] = rule.check(value)
+                except TypeError:  # unhashable value
+                    issue = rule.check(value)
+                if issue:
+                    issues.append(issue)
+                    scores[position] += _SEVERITY_PENALTY[issue.severity]
+        return [(issues, missing, score) for (issues, missing), score in zip(results, scores)]
+
+    def completeness(self, data_dict: Dict[str, Any]) -> Tuple[int, int]:
+        """(filled fields, filled required fields) for confidence scoring"""
+        filled = required_filled = 0
+        for rule in self.rules:
+            value = rule.get(data_dict)
+            if value is not None and str(value).strip():
+                filled += 1
+                if rule.required:
+                    required_filled += 1
+        return filled, required_filled
+
+
+def _numbers_in_range(column: List[Any], min_value: Optional[float], max_value: Optional[float]):
+    """
+    Boolean mask of plain int/float values inside [min_value, max_value]
+
+    Those values cannot produce an issue, so ``evaluate_many`` skips them;
+    everything else (missing, strings, out of range) goes through the full
+    check. Returns None without NumPy or for short columns.
+    """
+    if np is None or len(column) < _VECTORIZE_MIN_ROWS:
+        return None
+    numbers = np.fromiter(
+        (value if type(value) in (int, float) else np.nan for value in column),
+        dtype=np.float64, count=len(column)
+    )
+    with np.errstate(invalid="ignore"):
+        mask = ~np.isnan(numbers)
+        if min_value is not None:
+            mask &= numbers >= min_value
+        if max_value is not None:
+            mask &= numbers <= max_value
+    return mask
+
+
+@lru_cache(maxsize=64)
+def _fuzzy_index(allowed_values: Tuple[str, ...]) -> FuzzyMatchIndex:
+    """Shared index per allowed-value set for ad-hoc suggestions"""
+    return FuzzyMatchIndex(allowed_values)
+
+
+_SEVERITY_PENALTY = {
+    ValidationSeverity.ERROR: -0.10,
+    ValidationSeverity.WARNING: -0.05,
+    ValidationSeverity.INFO: 0.0,
+}
+
 
 class InvoiceDataValidationService:
     """Service for validating extracted invoice data and handling human-in-the-loop"""
     
     def __init__(self):
         self.required_fields = self._define_required_fields()
-        self.field_validators = self._setup_field_validators()
         self.logger = logging.getLogger(__name__)
+        self.confidence_model = get_confidence_model()
+        # Invoices without errors or missing fields skip review at or above this confidence
+        self.auto_approve_confidence = float(os.getenv("CONFIDENCE_AUTO_APPROVE_THRESHOLD", "0.9"))
+        self._compile_rules()
+    
+    def _compile_rules(self) -> None:
+        """Compile the field rule definitions (call again after changing ``required_fields``)"""
+        self.compiled_rules = CompiledRuleSet.compile(self.required_fields)
+        self.compiled_lenient_rules = CompiledRuleSet.compile(self.required_fields, lenient=True)
+        # Snapshots taken with different rule definitions are not reused
+        self._rules_fingerprint = hashlib.sha1(repr(self.required_fields).encode()).hexdigest()[:16]
     
     def _define_required_fields(self) -> Dict[str, Dict[str, Any]]:
         """Define required fields for invoice data validation"""
@@ -133,17 +651,6 @@ class InvoiceDataValidationService:
             }
         }
     
-    def _setup_field_validators(self) -> Dict[FieldType, callable]:
-        """Setup field type validators"""
-        return {
-            FieldType.TEXT: self._validate_text_field,
-            FieldType.NUMBER: self._validate_number_field,
-            FieldType.EMAIL: self._validate_email_field,
-            FieldType.DATE: self._validate_date_field,
-            FieldType.CURRENCY: self._validate_currency_field,
-            FieldType.PHONE: self._validate_phone_field
-        }
-    
     def validate_invoice_data(self, invoice_data: ContractInvoiceData, user_id: str, contract_name: str) -> ValidationResult:
         """
         Validate extracted invoice data for completeness and correctness
@@ -158,43 +665,12 @@ class InvoiceDataValidationService:
         """
         self.logger.info(f"🔍 Starting validation for contract: {contract_name}")
         
-        issues = []
-        missing_required_fields = []
-        validation_score = 1.0
-        
         # Convert invoice data to dict for easier validation
         data_dict = self._invoice_data_to_dict(invoice_data)
         self.logger.debug(f"Converted data dict keys: {list(data_dict.keys()) if data_dict else 'None'}")
         
-        # Validate required fields
-        for field_path, field_config in self.required_fields.items():
-            field_value = self._get_nested_field(data_dict, field_path)
-            
-            self.logger.debug(f"Validating field {field_path}: value={field_value}, required={field_config['required']}")
-            
-            if field_config["required"] and (field_value is None or field_value == ""):
-                missing_required_fields.append(field_path)
-                issues.append(ValidationIssue(
-                    field_name=field_path,
-                    issue_type="missing_required",
-                    severity=ValidationSeverity.ERROR,
-                    message=f"Required field '{field_path}' is missing: {field_config['description']}",
-                    current_value=field_value,
-                    requires_human_input=True
-                ))
-                validation_score -= 0.15  # Significant penalty for missing required fields
-                self.logger.debug(f"Missing required field {field_path}, score now: {validation_score:.2f}")
-            
-            elif field_value is not None and field_value != "":
-                # Validate field format/content
-                validation_issue = self._validate_field_content(field_path, field_value, field_config)
-                if validation_issue:
-                    issues.append(validation_issue)
-                    if validation_issue.severity == ValidationSeverity.ERROR:
-                        validation_score -= 0.10
-                    elif validation_issue.severity == ValidationSeverity.WARNING:
-                        validation_score -= 0.05
-                    self.logger.debug(f"Validation issue for {field_path}: {validation_issue.message}")
+        # Validate required fields and field formats/content with the compiled rules
+        issues, missing_required_fields, validation_score = self.compiled_rules.evaluate(data_dict)
         
         # Additional business logic validations
         business_issues = self._perform_business_validation(data_dict)
@@ -213,16 +689,17 @@ class InvoiceDataValidationService:
             validation_score >= 0.6  # Minimum score threshold for validity
         )
         
+        # Score confidence from completeness, validation issues and extraction signals
+        confidence_features = self._confidence_features(data_dict, issues)
+        confidence_score = self._calculate_confidence_score(data_dict, issues, features=confidence_features)
+        
         # Determine human input requirement more intelligently
         human_input_required = self._determine_human_input_required(
-            missing_required_fields, issues, validation_score
+            missing_required_fields, issues, validation_score, confidence_score
         )
         
         self.logger.debug(f"Validation results - Score: {validation_score:.2f}, Valid: {is_valid}, Human input: {human_input_required}")
         
-        # Calculate confidence based on completeness and validation issues
-        confidence_score = self._calculate_confidence_score(data_dict, issues)
-        
         result = ValidationResult(
             is_valid=is_valid,
             validation_score=validation_score,
@@ -230,7 +707,8 @@ class InvoiceDataValidationService:
             missing_required_fields=missing_required_fields,
             human_input_required=human_input_required,
             confidence_score=confidence_score,
-            validation_timestamp=datetime.now().isoformat()
+            validation_timestamp=datetime.now().isoformat(),
+            confidence_features=confidence_features
         )
         
         self.logger.info(f"✅ Validation completed - Valid: {is_valid}, Score: {validation_score:.2f}, Confidence: {confidence_score:.2f}, Issues: {len(issues)}, Missing fields: {len(missing_required_fields)}, Human input required: {human_input_required}")
@@ -265,293 +743,99 @@ class InvoiceDataValidationService:
         
         return value
     
-    def _validate_field_content(self, field_path: str, field_value: Any, field_config: Dict[str, Any]) -> Optional[ValidationIssue]:
-        """Validate individual field content based on its type and rules"""
-        field_type = field_config["type"]
-        validation_rules = field_config.get("validation_rules", {})
-        
-        validator = self.field_validators.get(field_type)
-        if validator:
-            return validator(field_path, field_value, validation_rules, field_config["description"])
-        
-        return None
-    
-    def _validate_text_field(self, field_path: str, value: Any, rules: Dict, description: str) -> Optional[ValidationIssue]:
-        """Validate text fields"""
-        if not isinstance(value, str):
-            return ValidationIssue(
-                field_name=field_path,
-                issue_type="invalid_type",
-                severity=ValidationSeverity.ERROR,
-                message=f"Field '{field_path}' should be text, got {type(value).__name__}",
-                current_value=value,
-                requires_human_input=True
-            )
-        
-        # Check length constraints
-        if "min_length" in rules and len(value.strip()) < rules["min_length"]:
-            return ValidationIssue(
-                field_name=field_path,
-                issue_type="too_short",
-                severity=ValidationSeverity.WARNING,
-                message=f"Field '{field_path}' is too short (minimum {rules['min_length']} characters)",
-                current_value=value,
-                requires_human_input=True
-            )
-        
-        if "max_length" in rules and len(value) > rules["max_length"]:
-            return ValidationIssue(
-                field_name=field_path,
-                issue_type="too_long",
-                severity=ValidationSeverity.WARNING,
-                message=f"Field '{field_path}' is too long (maximum {rules['max_length']} characters)",
-                current_value=value,
-                requires_human_input=False  # Auto-truncation possible
-            )
-        
-        # Check allowed values - be more lenient for better automation
-        if "allowed_values" in rules:
-            # Check exact matches first (case-insensitive)
-            if value.lower().strip() not in [v.lower() for v in rules["allowed_values"]]:
-                # Try to find close matches
-                suggested = self._suggest_closest_value(value, rules["allowed_values"])
-                # Only require human input if the suggestion is very different
-                similarity_threshold = 0.6
-                requires_human = not self._strings_similar(value, suggested, similarity_threshold)
-                
-                return ValidationIssue(
-                    field_name=field_path,
-                    issue_type="invalid_value",
-                    severity=ValidationSeverity.WARNING if not requires_human else ValidationSeverity.ERROR,
-                    message=f"Field '{field_path}' has unexpected value. Allowed: {rules['allowed_values']}",
-                    current_value=value,
-                    suggested_value=suggested,
-                    requires_human_input=requires_human
-                )
-        
-        return None
-    
     def _strings_similar(self, str1: str, str2: str, threshold: float = 0.6) -> bool:
-        """Check if two strings are similar enough"""
+        """Check if two strings are similar enough (normalized edit similarity)"""
         if not str1 or not str2:
             return False
-        
-        str1_lower = str1.lower().strip()
-        str2_lower = str2.lower().strip()
-        
-        # Exact match
-        if str1_lower == str2_lower:
-            return True
-        
-        # Substring match
-        if str1_lower in str2_lower or str2_lower in str1_lower:
-            return True
-        
-        # Character overlap similarity
-        set1, set2 = set(str1_lower), set(str2_lower)
-        overlap = len(set1 & set2)
-        union = len(set1 | set2)
-        similarity = overlap / union if union > 0 else 0
-        
-        return similarity >= threshold
+        return similarity(str1, str2) >= threshold
     
-    def _validate_number_field(self, field_path: str, value: Any, rules: Dict, description: str) -> Optional[ValidationIssue]:
-        """Validate numeric fields"""
-        if not isinstance(value, (int, float)):
-            try:
-                value = float(value)
-            except (ValueError, TypeError):
-                return ValidationIssue(
-                    field_name=field_path,
-                    issue_type="invalid_type",
-                    severity=ValidationSeverity.ERROR,
-                    message=f"Field '{field_path}' should be a number, got {type(value).__name__}",
-                    current_value=value,
-                    requires_human_input=True
-                )
-        
-        # Check range constraints
-        if "min_value" in rules and value < rules["min_value"]:
-            return ValidationIssue(
-                field_name=field_path,
-                issue_type="value_too_low",
-                severity=ValidationSeverity.WARNING,
-                message=f"Field '{field_path}' is below minimum value ({rules['min_value']})",
-                current_value=value,
-                requires_human_input=True
-            )
-        
-        if "max_value" in rules and value > rules["max_value"]:
-            return ValidationIssue(
-                field_name=field_path,
-                issue_type="value_too_high",
-                severity=ValidationSeverity.WARNING,
-                message=f"Field '{field_path}' exceeds maximum value ({rules['max_value']})",
-                current_value=value,
-                requires_human_input=True
-            )
-        
-        return None
-    
-    def _validate_currency_field(self, field_path: str, value: Any, rules: Dict, description: str) -> Optional[ValidationIssue]:
-        """Validate currency amount fields"""
-        return self._validate_number_field(field_path, value, rules, description)
-    
-    def _validate_email_field(self, field_path: str, value: Any, rules: Dict, description: str) -> Optional[ValidationIssue]:
-        """Validate email fields"""
-        import re
-        
-        if not isinstance(value, str):
-            return ValidationIssue(
-                field_name=field_path,
-                issue_type="invalid_type",
-                severity=ValidationSeverity.ERROR,
-                message=f"Email field '{field_path}' should be text",
-                current_value=value,
-                requires_human_input=True
-            )
-        
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, value):
-            return ValidationIssue(
-                field_name=field_path,
-                issue_type="invalid_format",
-                severity=ValidationSeverity.WARNING,
-                message=f"Field '{field_path}' doesn't appear to be a valid email address",
-                current_value=value,
-                requires_human_input=True
-            )
-        
-        return None
-    
-    def _validate_date_field(self, field_path: str, value: Any, rules: Dict, description: str) -> Optional[ValidationIssue]:
-        """Validate date fields"""
-        if isinstance(value, str):
-            try:
-                # Try to parse various date formats
-                from dateutil.parser import parse
-                parsed_date = parse(value)
-                # Convert to standard format if valid
-                return None
-            except:
-                return ValidationIssue(
-                    field_name=field_path,
-                    issue_type="invalid_date_format",
-                    severity=ValidationSeverity.WARNING,
-                    message=f"Field '{field_path}' doesn't appear to be a valid date",
-                    current_value=value,
-                    suggested_value="YYYY-MM-DD format recommended",
-                    requires_human_input=True
-                )
-        
-        return None
-    
-    def _validate_phone_field(self, field_path: str, value: Any, rules: Dict, description: str) -> Optional[ValidationIssue]:
-        """Validate phone number fields"""
-        import re
-        
-        if not isinstance(value, str):
-            return ValidationIssue(
-                field_name=field_path,
-                issue_type="invalid_type",
-                severity=ValidationSeverity.ERROR,
-                message=f"Phone field '{field_path}' should be text",
-                current_value=value,
-                requires_human_input=True
-            )
-        
-        # Basic phone validation - allows various formats
-        phone_pattern = r'^[\+]?[1-9][\d]{0,15}$'  # Very basic international format
-        cleaned_phone = re.sub(r'[\s\-\(\)]', '', value)  # Remove common separators
-        
-        if not re.match(phone_pattern, cleaned_phone):
-            return ValidationIssue(
-                field_name=field_path,
-                issue_type="invalid_format",
-                severity=ValidationSeverity.WARNING,
-                message=f"Field '{field_path}' doesn't appear to be a valid phone number",
-                current_value=value,
-                requires_human_input=True
-            )
-        
-        return None
+    # Business rules as (name, fields they read, method); incremental re-validation
+    # re-runs a rule only when one of its fields changed
+    _BUSINESS_RULES = (
+        ("duplicate_entity", ("client.name", "service_provider.name"), "_check_distinct_parties"),
+        ("amount_reasonableness", ("payment_terms.amount", "payment_terms.currency"), "_check_amount_reasonableness"),
+    )
     
     def _perform_business_validation(self, data_dict: Dict[str, Any]) -> List[ValidationIssue]:
         """Perform business logic validations"""
         issues = []
-        
-        # Check if client and service provider are different
+        for rule_issues in self._run_business_rules(data_dict).values():
+            issues.extend(rule_issues)
+        return issues
+    
+    def _run_business_rules(self, data_dict: Dict[str, Any],
+                            previous: Optional[Dict[str, List[ValidationIssue]]] = None,
+                            dirty_fields: Sequence[str] = ()) -> Dict[str, List[ValidationIssue]]:
+        """Issues per business rule; with ``previous``, rules not reading ``dirty_fields`` are reused"""
+        results = {}
+        for name, depends_on, method in self._BUSINESS_RULES:
+            if previous is not None and name in previous and not any(
+                    fields_overlap(dependency, path) for dependency in depends_on for path in dirty_fields):
+                results[name] = previous[name]
+            else:
+                results[name] = getattr(self, method)(data_dict)
+        return results
+    
+    def _check_distinct_parties(self, data_dict: Dict[str, Any]) -> List[ValidationIssue]:
+        """Check if client and service provider are different"""
         client_name = self._get_nested_field(data_dict, "client.name")
         provider_name = self._get_nested_field(data_dict, "service_provider.name")
         
         if client_name and provider_name and client_name.lower().strip() == provider_name.lower().strip():
-            issues.append(ValidationIssue(
+            return [ValidationIssue(
                 field_name="client.name",
                 issue_type="duplicate_entity",
                 severity=ValidationSeverity.WARNING,
                 message="Client and service provider appear to be the same entity",
                 current_value=client_name,
                 requires_human_input=False
-            ))
-        
-        # Check payment amount reasonableness
+            )]
+        return []
+    
+    def _check_amount_reasonableness(self, data_dict: Dict[str, Any]) -> List[ValidationIssue]:
+        """Check payment amount reasonableness"""
         amount = self._get_nested_field(data_dict, "payment_terms.amount")
         currency = self._get_nested_field(data_dict, "payment_terms.currency")
         
         if amount and currency:
+            # Raw extraction output may carry amounts as text; format problems are reported by the field rules
+            try:
+                value = float(amount)
+            except (TypeError, ValueError):
+                return []
             # Basic reasonableness checks based on currency
-            currency_ranges = {
-                "USD": {"min": 10, "max": 50000, "typical_max": 10000},
-                "EUR": {"min": 10, "max": 45000, "typical_max": 9000},
-                "INR": {"min": 500, "max": 2000000, "typical_max": 500000},
-                "GBP": {"min": 10, "max": 40000, "typical_max": 8000}
-            }
-            
-            if currency in currency_ranges:
-                range_info = currency_ranges[currency]
-                if amount < range_info["min"]:
-                    issues.append(ValidationIssue(
+            if currency in _CURRENCY_RANGES:
+                range_info = _CURRENCY_RANGES[currency]
+                if value < range_info["min"]:
+                    return [ValidationIssue(
                         field_name="payment_terms.amount",
                         issue_type="unusually_low",
                         severity=ValidationSeverity.INFO,
                         message=f"Payment amount seems unusually low for {currency}",
                         current_value=amount,
                         requires_human_input=False
-                    ))
-                elif amount > range_info["typical_max"]:
-                    issues.append(ValidationIssue(
+                    )]
+                elif value > range_info["typical_max"]:
+                    return [ValidationIssue(
                         field_name="payment_terms.amount",
                         issue_type="unusually_high",
                         severity=ValidationSeverity.INFO,
                         message=f"Payment amount seems unusually high for {currency} - please verify",
                         current_value=amount,
                         requires_human_input=False
-                    ))
-        
-        return issues
+                    )]
+        return []
     
     def _suggest_closest_value(self, current_value: str, allowed_values: List[str]) -> str:
-        """Suggest the closest allowed value using simple string similarity"""
+        """Suggest the closest allowed value by edit distance"""
         if not current_value or not allowed_values:
             return allowed_values[0] if allowed_values else ""
-        
-        current_lower = current_value.lower()
-        best_match = allowed_values[0]
-        best_score = 0
-        
-        for allowed in allowed_values:
-            allowed_lower = allowed.lower()
-            # Simple substring matching
-            if current_lower in allowed_lower or allowed_lower in current_lower:
-                score = len(set(current_lower) & set(allowed_lower)) / len(set(current_lower) | set(allowed_lower))
-                if score > best_score:
-                    best_score = score
-                    best_match = allowed
-        
-        return best_match
+        best_match, _ = _fuzzy_index(tuple(allowed_values)).best(current_value)
+        return best_match or allowed_values[0]
     
-    def _determine_human_input_required(self, missing_fields: List[str], issues: List[ValidationIssue], validation_score: float) -> bool:
-        """Determine if human input is required based on validation results"""
+    def _determine_human_input_required(self, missing_fields: List[str], issues: List[ValidationIssue], validation_score: float,
+                                        confidence_score: Optional[float] = None) -> bool:
+        """Determine if human input is required based on validation results and model confidence"""
         
         # Always require human input for missing required fields
         if missing_fields:
@@ -566,6 +850,11 @@ class InvoiceDataValidationService:
         if validation_score >= 0.8 and len([i for i in issues if i.severity == ValidationSeverity.ERROR]) == 0:
             return False
         
+        # Without errors, a confident model lets flagged warnings through without review
+        if (confidence_score is not None and confidence_score >= self.auto_approve_confidence
+                and all(i.severity != ValidationSeverity.ERROR for i in issues)):
+            return False
+        
         # For medium quality data with only warnings, allow automated processing
         if validation_score >= 0.6 and all(i.severity != ValidationSeverity.ERROR for i in issues):
             # Only require human input if warnings specifically request it
@@ -575,53 +864,48 @@ class InvoiceDataValidationService:
         # For lower quality data, require human review
         return True
     
-    def _calculate_confidence_score(self, data_dict: Dict[str, Any], issues: List[ValidationIssue]) -> float:
-        """Calculate confidence score based on data completeness and validation issues"""
+    def _confidence_features(self, data_dict: Dict[str, Any], issues: List[ValidationIssue],
+                             completeness: Optional[Sequence[int]] = None) -> Dict[str, float]:
+        """Cheap signals scored by the confidence model (see ``services.confidence_model``)"""
+        total_fields = len(self.compiled_rules.rules)
+        total_required = self.compiled_rules.total_required
+        filled_fields, required_filled = completeness or self.compiled_rules.completeness(data_dict)
+        
+        # Extraction signals travel with the invoice: unified metadata, or top level for legacy data
+        metadata = data_dict.get("metadata") or {}
+        if not isinstance(metadata, dict):
+            metadata = {}
+        signals = metadata.get("extraction_signals") or data_dict.get("extraction_signals") or {}
+        # Not metadata.confidence_score: after correction that is this model's own earlier score
+        extraction_confidence = signals.get("extraction_confidence", data_dict.get("confidence_score"))
+        
+        return {
+            "retrieval_similarity": signals.get("retrieval_similarity"),
+            "extraction_agreement": signals.get("extraction_agreement"),
+            "extraction_confidence": extraction_confidence,
+            "required_completeness": required_filled / total_required if total_required else 1.0,
+            "overall_completeness": filled_fields / total_fields if total_fields else 1.0,
+            "error_count": sum(1 for issue in issues if issue.severity == ValidationSeverity.ERROR),
+            "warning_count": sum(1 for issue in issues if issue.severity == ValidationSeverity.WARNING),
+            "info_count": sum(1 for issue in issues if issue.severity == ValidationSeverity.INFO),
+        }
+    
+    def _calculate_confidence_score(self, data_dict: Dict[str, Any], issues: List[ValidationIssue],
+                                    completeness: Optional[Sequence[int]] = None,
+                                    features: Optional[Dict[str, float]] = None) -> float:
+        """Probability from the confidence model that the invoice needs no human correction"""
         
         # If no data at all, return 0
         if not data_dict:
             self.logger.debug("Empty data dict - confidence score: 0.0")
             return 0.0
-            
-        base_confidence = 0.3  # Start with higher base for existing data
         
-        # Count all fields that have values
-        total_fields = len(self.required_fields)
-        filled_fields = 0
-        required_filled = 0
-        total_required = 0
+        features = features or self._confidence_features(data_dict, issues, completeness)
+        confidence = round(self.confidence_model.predict(features), 4)
         
-        for field_path, field_config in self.required_fields.items():
-            value = self._get_nested_field(data_dict, field_path)
-            has_value = value is not None and str(value).strip()
-            
-            if has_value:
-                filled_fields += 1
-                
-            if field_config["required"]:
-                total_required += 1
-                if has_value:
-                    required_filled += 1
+        self.logger.debug(f"Confidence calculation - Features: {features}, Final: {confidence:.2f}")
         
-        # Required fields completeness contributes 40% to confidence
-        if total_required > 0:
-            required_completeness = required_filled / total_required
-            base_confidence += required_completeness * 0.4
-        
-        # Overall field completeness contributes 20% to confidence
-        if total_fields > 0:
-            overall_completeness = filled_fields / total_fields
-            base_confidence += overall_completeness * 0.2
-        
-        # Reduce confidence based on validation issues
-        error_penalty = sum(0.15 for issue in issues if issue.severity == ValidationSeverity.ERROR)
-        warning_penalty = sum(0.05 for issue in issues if issue.severity == ValidationSeverity.WARNING)
-        
-        base_confidence = max(0.0, base_confidence - error_penalty - warning_penalty)
-        
-        self.logger.debug(f"Confidence calculation - Required: {required_filled}/{total_required}, Total: {filled_fields}/{total_fields}, Errors: {error_penalty:.2f}, Warnings: {warning_penalty:.2f}, Final: {base_confidence:.2f}")
-        
-        return min(1.0, base_confidence)
+        return confidence
     
     def create_human_input_request(self, validation_result: ValidationResult, user_id: str, contract_name: str) -> Dict[str, Any]:
         """
@@ -674,6 +958,7 @@ class InvoiceDataValidationService:
                     "field": issue.field_name,
                     "current_value": issue.current_value,
                     "suggested_value": issue.suggested_value,
+                    "suggestions": issue.suggestions,
                     "issue_type": issue.issue_type,
                     "message": issue.message,
                     "severity": issue.severity.value if hasattr(issue.severity, 'value') else issue.severity
@@ -723,43 +1008,12 @@ class InvoiceDataValidationService:
         """
         self.logger.info(f"🔍 Starting raw data validation for contract: {contract_name}")
         
-        issues = []
-        missing_required_fields = []
-        validation_score = 1.0
-        
         # Use raw data directly for validation
         data_dict = raw_data
         self.logger.debug(f"Raw data dict keys: {list(data_dict.keys()) if data_dict else 'None'}")
         
-        # Validate required fields
-        for field_path, field_config in self.required_fields.items():
-            field_value = self._get_nested_field(data_dict, field_path)
-            
-            self.logger.debug(f"Validating field {field_path}: value={field_value}, required={field_config['required']}")
-            
-            if field_config["required"] and (field_value is None or field_value == ""):
-                missing_required_fields.append(field_path)
-                issues.append(ValidationIssue(
-                    field_name=field_path,
-                    issue_type="missing_required",
-                    severity=ValidationSeverity.ERROR,
-                    message=f"Required field '{field_path}' is missing: {field_config['description']}",
-                    current_value=field_value,
-                    requires_human_input=True
-                ))
-                validation_score -= 0.15  # Significant penalty for missing required fields
-                self.logger.debug(f"Missing required field {field_path}, score now: {validation_score:.2f}")
-            
-            elif field_value is not None and field_value != "":
-                # Validate field format/content with more lenient rules for raw data
-                validation_issue = self._validate_field_content_lenient(field_path, field_value, field_config)
-                if validation_issue:
-                    issues.append(validation_issue)
-                    if validation_issue.severity == ValidationSeverity.ERROR:
-                        validation_score -= 0.10
-                    elif validation_issue.severity == ValidationSeverity.WARNING:
-                        validation_score -= 0.05
-                    self.logger.debug(f"Validation issue for {field_path}: {validation_issue.message}")
+        # Validate required fields with the compiled rules (more lenient formats for raw data)
+        issues, missing_required_fields, validation_score = self.compiled_lenient_rules.evaluate(data_dict)
         
         # Additional business logic validations
         business_issues = self._perform_business_validation(data_dict)
@@ -778,14 +1032,15 @@ class InvoiceDataValidationService:
             validation_score >= 0.6  # Minimum score threshold for validity
         )
         
+        # Score confidence from completeness, validation issues and extraction signals
+        confidence_features = self._confidence_features(data_dict, issues)
+        confidence_score = self._calculate_confidence_score(data_dict, issues, features=confidence_features)
+        
         # Determine human input requirement more intelligently
         human_input_required = self._determine_human_input_required(
-            missing_required_fields, issues, validation_score
+            missing_required_fields, issues, validation_score, confidence_score
         )
         
-        # Calculate confidence based on completeness and validation issues
-        confidence_score = self._calculate_confidence_score(data_dict, issues)
-        
         self.logger.debug(f"Raw validation results - Score: {validation_score:.2f}, Valid: {is_valid}, Human input: {human_input_required}")
         
         result = ValidationResult(
@@ -795,7 +1050,8 @@ class InvoiceDataValidationService:
             missing_required_fields=missing_required_fields,
             human_input_required=human_input_required,
             confidence_score=confidence_score,
-            validation_timestamp=datetime.now().isoformat()
+            validation_timestamp=datetime.now().isoformat(),
+            confidence_features=confidence_features
         )
         
         self.logger.info(f"✅ Raw validation completed - Valid: {is_valid}, Score: {validation_score:.2f}, Confidence: {confidence_score:.2f}, Issues: {len(issues)}, Missing fields: {len(missing_required_fields)}, Human input required: {human_input_required}")
@@ -820,47 +1076,137 @@ class InvoiceDataValidationService:
         """
         self.logger.info(f"🔍 Starting unified validation for contract: {contract_name}")
         
-        issues = []
-        missing_required_fields = []
-        validation_score = 1.0
-        
         # Convert unified invoice data to dict for validation
         data_dict = invoice_data.model_dump()
         self.logger.debug(f"Unified data dict keys: {list(data_dict.keys()) if data_dict else 'None'}")
         
-        # Validate required fields using the same logic as before
-        for field_path, field_config in self.required_fields.items():
-            field_value = self._get_nested_field(data_dict, field_path)
-            
-            self.logger.debug(f"Validating field {field_path}: value={field_value}, required={field_config['required']}")
-            
-            if field_config["required"] and (field_value is None or field_value == ""):
-                missing_required_fields.append(field_path)
-                issues.append(ValidationIssue(
-                    field_name=field_path,
-                    issue_type="missing_required",
-                    severity=ValidationSeverity.ERROR,
-                    message=f"Required field '{field_path}' is missing: {field_config['description']}",
-                    current_value=field_value,
-                    requires_human_input=True
-                ))
-                validation_score -= 0.15
-                self.logger.debug(f"Missing required field {field_path}, score now: {validation_score:.2f}")
+        # Validate required fields and field formats/content with the compiled rules
+        result = self._validate_with_snapshot(data_dict)
+        issues, missing_required_fields = result.issues, result.missing_required_fields
+        
+        self.logger.info(f"✅ Unified validation completed - Valid: {result.is_valid}, Score: {result.validation_score:.2f}, Confidence: {result.confidence_score:.2f}, Issues: {len(issues)}, Missing fields: {len(missing_required_fields)}, Human input required: {result.human_input_required}")
+        if missing_required_fields:
+            self.logger.info(f"Missing required fields: {missing_required_fields}")
+        if issues:
+            self.logger.info(f"Issues found: {[f'{i.field_name}: {i.message}' for i in issues[:3]]}{' ...' if len(issues) > 3 else ''}")
+        
+        return result
+    
+    def revalidate_changed_fields(self, invoice_data: UnifiedInvoiceData, user_id: str, contract_name: str,
+                                  changed_fields: Sequence[str], snapshot: Optional[Dict[str, Any]]) -> ValidationResult:
+        """
+        Re-validate after corrections, re-running only rules that depend on changed fields
+        
+        Field rules depend on their own path and business rules on the fields they
+        declare in ``_BUSINESS_RULES``. Every other rule reuses its outcome from
+        ``snapshot`` (the ``rule_snapshot`` of the previous result), so the result
+        equals a full ``validate_unified_invoice_data`` of the corrected data.
+        Fields whose value differs from the snapshot are treated as changed even if
+        they are not listed, since schema validators may normalize related fields.
+        
+        Args:
+            invoice_data: Corrected unified invoice data (or its ``model_dump()``)
+            user_id: User ID for logging/tracking
+            contract_name: Contract name for context
+            changed_fields: Dotted paths of the corrected fields
+            snapshot: ``rule_snapshot`` from the previous validation; without a
+                usable snapshot the invoice is validated in full
             
-            elif field_value is not None and field_value != "":
-                # Validate field format/content
-                validation_issue = self._validate_field_content(field_path, field_value, field_config)
-                if validation_issue:
-                    issues.append(validation_issue)
-                    if validation_issue.severity == ValidationSeverity.ERROR:
-                        validation_score -= 0.10
-                    elif validation_issue.severity == ValidationSeverity.WARNING:
-                        validation_score -= 0.05
-                    self.logger.debug(f"Validation issue for {field_path}: {validation_issue.message}")
+        Returns:
+            ValidationResult with a fresh ``rule_snapshot``
+        """
+        if not snapshot or snapshot.get("rules") != self._rules_fingerprint:
+            self.logger.info(f"♻️ No reusable validation snapshot for {contract_name} - running full validation")
+            return self.validate_unified_invoice_data(invoice_data, user_id, contract_name)
+        
+        data_dict = invoice_data if isinstance(invoice_data, dict) else invoice_data.model_dump()
+        previous_fields = snapshot["fields"]
+        dirty = list(changed_fields)
+        for rule in self.compiled_rules.rules:
+            recorded = previous_fields.get(rule.field_path)
+            if recorded is not None and recorded["value"] != rule.get(data_dict):
+                dirty.append(rule.field_path)
+        
+        previous_outcomes = {
+            path: (issue_from_dict(entry["issue"]) if entry["issue"] else None, entry["missing"], entry["filled"])
+            for path, entry in previous_fields.items()
+        }
+        previous_business = {
+            name: [issue_from_dict(issue) for issue in issues] for name, issues in snapshot["business"].items()
+        }
+        outcomes = self.compiled_rules.outcomes(data_dict, previous_outcomes, dirty)
+        business = self._run_business_rules(data_dict, previous_business, dirty)
+        result = self._result_from_outcomes(data_dict, outcomes, business)
+        
+        rerun = sum(1 for outcome, rule in zip(outcomes, self.compiled_rules.rules)
+                    if outcome is not previous_outcomes.get(rule.field_path))
+        rerun += sum(1 for name in business if business[name] is not previous_business.get(name))
+        total = len(self.compiled_rules.rules) + len(self._BUSINESS_RULES)
+        self.logger.info(f"♻️ Incremental validation for {contract_name} - Re-ran {rerun}/{total} rules for {sorted(set(dirty))}, Valid: {result.is_valid}, Score: {result.validation_score:.2f}, Human input required: {result.human_input_required}")
+        return result
+    
+    def _validate_with_snapshot(self, data_dict: Dict[str, Any]) -> ValidationResult:
+        """Full single-invoice validation keeping per-rule outcomes for incremental re-validation"""
+        return self._result_from_outcomes(data_dict, self.compiled_rules.outcomes(data_dict), self._run_business_rules(data_dict))
+    
+    def _result_from_outcomes(self, data_dict: Dict[str, Any], outcomes: List[RuleOutcome],
+                              business: Dict[str, List[ValidationIssue]]) -> ValidationResult:
+        issues, missing, score, completeness = self.compiled_rules.summarize(outcomes)
+        business_issues = [issue for name, _, _ in self._BUSINESS_RULES for issue in business[name]]
+        result = self._build_validation_result(data_dict, issues, missing, score,
+                                               completeness=completeness, business_issues=business_issues)
+        result.rule_snapshot = {
+            "rules": self._rules_fingerprint,
+            "fields": {
+                rule.field_path: {
+                    "value": rule.get(data_dict),
+                    "issue": issue_to_dict(issue) if issue else None,
+                    "missing": is_missing,
+                    "filled": is_filled
+                }
+                for rule, (issue, is_missing, is_filled) in zip(self.compiled_rules.rules, outcomes)
+            },
+            "business": {name: [issue_to_dict(issue) for issue in issues] for name, issues in business.items()}
+        }
+        return result
+    
+    def validate_unified_invoice_batch(self, invoices: Sequence[Any], user_id: str) -> List[ValidationResult]:
+        """
+        Validate many unified invoices in one call
         
-        # Additional business logic validations
-        business_issues = self._perform_business_validation(data_dict)
-        issues.extend(business_issues)
+        Field rules are evaluated column by column across the batch (see
+        ``CompiledRuleSet.evaluate_many``); results match calling
+        ``validate_unified_invoice_data`` once per invoice.
+        
+        Args:
+            invoices: UnifiedInvoiceData instances or their ``model_dump()`` dicts
+            user_id: User ID for logging/tracking
+            
+        Returns:
+            One ValidationResult per invoice, in input order
+        """
+        data_dicts = [invoice if isinstance(invoice, dict) else invoice.model_dump() for invoice in invoices]
+        timestamp = datetime.now().isoformat()
+        
+        completeness: List[List[int]] = []
+        evaluated = self.compiled_rules.evaluate_many(data_dicts, completeness)
+        results = [
+            self._build_validation_result(data_dict, issues, missing, score, timestamp, counts)
+            for data_dict, (issues, missing, score), counts in zip(data_dicts, evaluated, completeness)
+        ]
+        
+        valid_count = sum(1 for result in results if result.is_valid)
+        review_count = sum(1 for result in results if result.human_input_required)
+        self.logger.info(f"✅ Batch validation completed for user {user_id} - Invoices: {len(results)}, Valid: {valid_count}, Human input required: {review_count}")
+        return results
+    
+    def _build_validation_result(self, data_dict: Dict[str, Any], issues: List[ValidationIssue],
+                                 missing_required_fields: List[str], validation_score: float,
+                                 timestamp: Optional[str] = None,
+                                 completeness: Optional[Sequence[int]] = None,
+                                 business_issues: Optional[List[ValidationIssue]] = None) -> ValidationResult:
+        """Add business-rule issues and derive validity, human input need and confidence"""
+        issues.extend(self._perform_business_validation(data_dict) if business_issues is None else business_issues)
         
         # Calculate final scores
         validation_score = max(0.0, validation_score)
@@ -872,74 +1218,20 @@ class InvoiceDataValidationService:
             validation_score >= 0.6
         )
         
-        # Determine human input requirement
-        human_input_required = self._determine_human_input_required(
-            missing_required_fields, issues, validation_score
-        )
-        
-        # Calculate confidence based on completeness and validation issues
-        confidence_score = self._calculate_confidence_score(data_dict, issues)
-        
-        self.logger.debug(f"Unified validation results - Score: {validation_score:.2f}, Valid: {is_valid}, Human input: {human_input_required}")
-        
-        result = ValidationResult(
+        confidence_features = self._confidence_features(data_dict, issues, completeness)
+        confidence_score = self._calculate_confidence_score(data_dict, issues, features=confidence_features)
+        return ValidationResult(
             is_valid=is_valid,
             validation_score=validation_score,
             issues=issues,
             missing_required_fields=missing_required_fields,
-            human_input_required=human_input_required,
+            human_input_required=self._determine_human_input_required(
+                missing_required_fields, issues, validation_score, confidence_score
+            ),
             confidence_score=confidence_score,
-            validation_timestamp=datetime.now().isoformat()
+            validation_timestamp=timestamp or datetime.now().isoformat(),
+            confidence_features=confidence_features
         )
-        
-        self.logger.info(f"✅ Unified validation completed - Valid: {is_valid}, Score: {validation_score:.2f}, Confidence: {confidence_score:.2f}, Issues: {len(issues)}, Missing fields: {len(missing_required_fields)}, Human input required: {human_input_required}")
-        if missing_required_fields:
-            self.logger.info(f"Missing required fields: {missing_required_fields}")
-        if issues:
-            self.logger.info(f"Issues found: {[f'{i.field_name}: {i.message}' for i in issues[:3]]}{' ...' if len(issues) > 3 else ''}")
-        
-        return result
-    
-    def _validate_field_content_lenient(self, field_path: str, field_value: Any, field_config: Dict[str, Any]) -> Optional[ValidationIssue]:
-        """Lenient validation for raw data that doesn't strictly follow Pydantic models"""
-        field_type = field_config["type"]
-        validation_rules = field_config.get("validation_rules", {})
-        
-        # For raw data validation, be more lenient with types and formats
-        if field_type == FieldType.EMAIL:
-            if isinstance(field_value, str) and "@" not in field_value:
-                return ValidationIssue(
-                    field_name=field_path,
-                    issue_type="invalid_format",
-                    severity=ValidationSeverity.WARNING,  # Warning instead of error for raw data
-                    message=f"Field '{field_path}' doesn't appear to be a valid email address",
-                    current_value=field_value,
-                    requires_human_input=True
-                )
-        
-        elif field_type == FieldType.DATE:
-            if isinstance(field_value, str) and field_value.strip():
-                try:
-                    from dateutil.parser import parse
-                    parse(field_value)
-                except:
-                    return ValidationIssue(
-                        field_name=field_path,
-                        issue_type="invalid_date_format",
-                        severity=ValidationSeverity.WARNING,
-                        message=f"Field '{field_path}' doesn't appear to be a valid date",
-                        current_value=field_value,
-                        suggested_value="YYYY-MM-DD format recommended",
-                        requires_human_input=True
-                    )
-        
-        elif field_type == FieldType.TEXT:
-            return self._validate_text_field(field_path, field_value, validation_rules, field_config["description"])
-        
-        elif field_type in [FieldType.NUMBER, FieldType.CURRENCY]:
-            return self._validate_number_field(field_path, field_value, validation_rules, field_config["description"])
-        
-        return None
 
 
 # Singleton service instance
@@ -0,0 +1,645 @@
+#!/usr/bin/env python3
+"""
+Validation/Correction Agent Load Harness
+
+Generates a large randomized corpus of invoices the way an LLM extraction
+step actually returns them - amounts as "$1,200.00" strings, lowercase or
+symbol currencies, misspelled frequencies, padded emails, missing or null
+sections, extra keys, alternate date formats - and drives every invoice
+through ``ValidationADKAgent`` and ``CorrectionADKAgent``:
+
+1. validation of the messy extraction output
+2. if the workflow paused, a human answer built from the clean ground truth,
+   half of them as a natural-language query parsed by
+   ``NaturalLanguageCorrectionService`` on top of ``MockVertexAIModel``
+3. correction and the (recorded, in-memory) database save
+
+Invariants are checked after every stage (statuses, score ranges, the pause
+flags agreeing with the validation result, every missing field being asked
+for, corrections only touching requested fields, a clean final invoice saved
+exactly once, deterministic re-validation). A failing invoice is shrunk to a
+minimal example, Hypothesis-style, and reported with its seed.
+
+Throughput and p50/p90/p95/p99 latencies per stage are printed as JSON and
+compared with a stored baseline; the run exits non-zero on an invariant
+violation or when a stage is slower than the baseline by more than
+``--tolerance``:
+
+    python tests/agent_load_harness.py --invoices 2000 --seed 7
+    python tests/agent_load_harness.py --baseline tests/agent_load_baseline.json --update-baseline
+    python tests/agent_load_harness.py --baseline tests/agent_load_baseline.json
+
+The corpus, invariants and baseline comparison only need the schemas and the
+validation service; running the agents needs the full ADK environment.
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import random
+import re
+import sys
+import time
+import warnings
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydantic import ValidationError  # noqa: E402
+
+from schemas.unified_invoice_schemas import UnifiedInvoiceData  # noqa: E402
+from tests.mock_llm import MockVertexAIModel  # noqa: E402
+
+STAGES = ("validation", "human_input", "correction", "total")
+PERCENTILES = (50, 90, 95, 99)
+ALLOWED_STATUSES = {"pending", "in_progress", "success", "failed", "needs_human_input",
+                    "PAUSED_FOR_HUMAN_INPUT", "completed"}
+
+# How a person would name each field in a natural-language answer
+FIELD_PHRASES = {
+    "client.name": "client name",
+    "client.email": "client email",
+    "service_provider.name": "provider name",
+    "service_provider.email": "provider email",
+    "payment_terms.amount": "amount",
+    "payment_terms.currency": "currency",
+    "payment_terms.frequency": "payment frequency",
+    "payment_terms.due_days": "due days",
+    "start_date": "start date",
+    "end_date": "end date",
+    "contract_title": "contract title",
+}
+
+COMPANY_WORDS = ("Acme", "Northwind", "Globex", "Initech", "Umbrella", "Stark", "Wayne", "Hooli", "Vandelay")
+SUFFIXES = ("Ltd", "LLC", "Inc.", "GmbH", "Corp", "& Sons")
+SERVICES = ("Office cleaning", "Software maintenance", "Consulting hours", "Equipment rental", "Security patrol")
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+def _company(rnd):
+    return f"{rnd.choice(COMPANY_WORDS)} {rnd.choice(COMPANY_WORDS)} {rnd.choice(SUFFIXES)}"
+
+
+def _email(rnd, name):
+    domain = re.sub(r"[^a-z]", "", name.lower())[:12] or "example"
+    return f"{rnd.choice(('billing', 'accounts', 'ap', 'finance'))}@{domain}.com"
+
+
+def clean_invoice(rnd, index):
+    """Ground-truth invoice as a perfect extraction would return it"""
+    client, provider = _company(rnd), _company(rnd)
+    amount = round(rnd.choice((rnd.uniform(50, 2000), rnd.uniform(2000, 40000))), 2)
+    lines = rnd.randint(1, 4)
+    month = rnd.randint(1, 12)
+    return {
+        "contract_title": f"{rnd.choice(SERVICES)} Agreement {index}",
+        "contract_type": rnd.choice(("service_agreement", "rental_lease", "consulting", "maintenance")),
+        "client": {"name": client, "email": _email(rnd, client), "address": f"{rnd.randint(1, 999)} Market Street"},
+        "service_provider": {"name": provider, "email": _email(rnd, provider)},
+        "start_date": f"2024-{month:02d}-01",
+        "end_date": f"2025-{month:02d}-01",
+        "payment_terms": {
+            "amount": amount,
+            "currency": rnd.choice(("USD", "EUR", "GBP")),
+            "frequency": rnd.choice(("monthly", "quarterly", "annually")),
+            "due_days": rnd.choice((15, 30, 45)),
+        },
+        "services": [
+            {"description": rnd.choice(SERVICES), "quantity": 1, "unit_price": round(amount / lines, 2),
+             "total_amount": round(amount / lines, 2)}
+            for _ in range(lines)
+        ],
+        "invoice_frequency": "monthly",
+    }
+
+
+def _money_string(rnd, data):
+    terms = data.get("payment_terms") or {}
+    if isinstance(terms.get("amount"), (int, float)):
+        terms["amount"] = rnd.choice(("${:,.2f}", "{:,.2f}", "{:.0f}", "USD {:,.2f}")).format(terms["amount"])
+
+
+def _currency_noise(rnd, data):
+    terms = data.get("payment_terms") or {}
+    if terms.get("currency"):
+        terms["currency"] = rnd.choice((terms["currency"].lower(), f" {terms['currency']} ", "$", "€", "dollars"))
+
+
+def _frequency_noise(rnd, data):
+    terms = data.get("payment_terms") or {}
+    if terms.get("frequency"):
+        value = terms["frequency"]
+        terms["frequency"] = rnd.choice((value.title(), value.upper() + " ", value[:-1], f"per {value[:-2]}", "bi-weekly"))
+
+
+def _email_noise(rnd, data):
+    party = data.get(rnd.choice(("client", "service_provider"))) or {}
+    if party.get("email"):
+        email = party["email"]
+        party["email"] = rnd.choice((email.upper(), f"  {email} ", f"mailto:{email}", email.split("@")[-1]))
+
+
+def _padded_names(rnd, data):
+    for key in ("client", "service_provider"):
+        party = data.get(key) or {}
+        if party.get("name") and rnd.random() < 0.5:
+            party["name"] = rnd.choice((f"  {party['name']}\n", party["name"].upper(), ""))
+
+
+def _null_section(rnd, data):
+    key = rnd.choice(("client", "service_provider", "payment_terms", "services"))
+    data[key] = rnd.choice((None, {} if key != "services" else []))
+
+
+def _drop_field(rnd, data):
+    section = rnd.choice(("client", "service_provider", "payment_terms"))
+    if isinstance(data.get(section), dict) and data[section]:
+        data[section].pop(rnd.choice(sorted(data[section])))
+
+
+def _extra_keys(rnd, data):
+    data["confidence"] = rnd.choice(("high", 0.93, None))
+    data["notes_from_model"] = "Values extracted from pages 1-3; amount assumed exclusive of VAT."
+    if isinstance(data.get("client"), dict):
+        data["client"]["vat_number"] = f"GB{rnd.randint(100000000, 999999999)}"
+
+
+def _date_formats(rnd, data):
+    for key in ("start_date", "end_date"):
+        if data.get(key) and rnd.random() < 0.7:
+            year, month, day = data[key].split("-")
+            data[key] = rnd.choice((f"{month}/{day}/{year}", f"{day}.{month}.{year}", f"{data[key]}T00:00:00Z",
+                                    f"{year}-{month}-{day} 00:00", "TBD"))
+
+
+def _due_days_text(rnd, data):
+    terms = data.get("payment_terms") or {}
+    if "due_days" in terms:
+        terms["due_days"] = rnd.choice((f"{terms['due_days']} days", str(terms["due_days"]), f"Net {terms['due_days']}"))
+
+
+def _messy_services(rnd, data):
+    for service in data.get("services") or []:
+        choice = rnd.random()
+        if choice < 0.3:
+            service.pop("total_amount", None)
+        elif choice < 0.6:
+            service["quantity"] = str(service.get("quantity", 1))
+        elif choice < 0.8:
+            service["description"] = None
+
+
+MUTATIONS = {
+    "money_string": _money_string,
+    "currency_noise": _currency_noise,
+    "frequency_noise": _frequency_noise,
+    "email_noise": _email_noise,
+    "padded_names": _padded_names,
+    "null_section": _null_section,
+    "drop_field": _drop_field,
+    "extra_keys": _extra_keys,
+    "date_formats": _date_formats,
+    "due_days_text": _due_days_text,
+    "messy_services": _messy_services,
+}
+
+
+def messy_invoice(rnd, clean):
+    """LLM-like variant of ``clean`` with a random subset of ``MUTATIONS`` applied"""
+    data = copy.deepcopy(clean)
+    applied = sorted(rnd.sample(sorted(MUTATIONS), rnd.randint(0, 4)))
+    for name in applied:
+        MUTATIONS[name](rnd, data)
+    return data, applied
+
+
+def build_corpus(count, seed=7):
+    """``count`` cases of ``{"seed", "index", "truth", "raw", "mutations"}``, reproducible per seed"""
+    rnd = random.Random(seed)
+    cases = []
+    for index in range(count):
+        truth = clean_invoice(rnd, index)
+        raw, applied = messy_invoice(rnd, truth)
+        cases.append({"seed": seed, "index": index, "truth": truth, "raw": raw, "mutations": applied})
+    return cases
+
+
+def shrink(raw, fails):
+    """
+    Greedily minimise a failing invoice
+
+    Keys are removed and lists cut to their first element for as long as
+    ``fails(candidate)`` still holds, so the report shows only what matters.
+    """
+    current = copy.deepcopy(raw)
+    changed = True
+    while changed:
+        changed = False
+        for path in _paths(current):
+            candidate = copy.deepcopy(current)
+            parent, key = _resolve(candidate, path)
+            if isinstance(parent[key], list) and len(parent[key]) > 1:
+                parent[key] = parent[key][:1]
+            elif isinstance(parent, dict):
+                del parent[key]
+            else:
+                continue
+            try:
+                still_failing = fails(candidate)
+            except Exception:
+                still_failing = True
+            if still_failing:
+                current, changed = candidate, True
+                break
+    return current
+
+
+def _paths(data, prefix=()):
+    items = data.items() if isinstance(data, dict) else enumerate(data)
+    for key, value in items:
+        if isinstance(value, (dict, list)):
+            yield from _paths(value, prefix + (key,))
+        yield prefix + (key,)
+
+
+def _resolve(data, path):
+    for key in path[:-1]:
+        data = data[key]
+    return data, path[-1]
+
+
+def _get_path(data, field_name):
+    for part in field_name.split("."):
+        if isinstance(data, list):
+            data = data[int(part)] if part.isdigit() and int(part) < len(data) else None
+        elif isinstance(data, dict):
+            data = data.get(part)
+        else:
+            return None
+    return data
+
+
+# ---------------------------------------------------------------------------
+# Invariants that need only the schemas and the validation service
+# ---------------------------------------------------------------------------
+
+def check_conversion(case):
+    """Messy extraction output either converts or fails with a pydantic error, never anything else"""
+    try:
+        UnifiedInvoiceData.from_legacy_format({"invoice_response": {"invoice_data": case["raw"]}})
+    except ValidationError:
+        return []
+    except Exception as e:
+        return [f"from_legacy_format raised {type(e).__name__}: {e}"]
+    return []
+
+
+def check_validation_result(result):
+    """Invariants on a ``ValidationResult``"""
+    violations = []
+    for name in ("validation_score", "confidence_score"):
+        value = getattr(result, name)
+        if not 0.0 <= value <= 1.0:
+            violations.append(f"{name} out of range: {value}")
+    if result.missing_required_fields and result.is_valid:
+        violations.append("valid result with missing required fields")
+    if result.missing_required_fields and not result.human_input_required:
+        violations.append("missing required fields without asking for human input")
+    issue_fields = {issue.field_name for issue in result.issues}
+    for field_name in result.missing_required_fields:
+        if field_name not in issue_fields:
+            violations.append(f"missing field {field_name} has no issue")
+    return violations
+
+
+# ---------------------------------------------------------------------------
+# Agents
+# ---------------------------------------------------------------------------
+
+class HarnessLLM(MockVertexAIModel):
+    """
+    Answers extraction prompts like a real model would: fenced JSON with the
+    true value of every requested field that appears in the prompt
+    """
+
+    def __init__(self, truth, **kwargs):
+        super().__init__(**kwargs)
+        self.truth = truth
+
+    def _generate_response(self, input_text):
+        section = input_text.split("MISSING FIELDS THAT NEED TO BE FILLED:", 1)[-1].split("TASK:", 1)[0]
+        requested = re.findall(r"^- ([a-z_.0-9]+):", section, re.MULTILINE)
+        answer = {field: _get_path(self.truth, field) for field in requested}
+        answer = {field: value for field, value in answer.items() if value not in (None, "")}
+        return f"Here are the extracted fields:\n```json\n{json.dumps(answer, indent=2)}\n```"
+
+
+class RecordingContractDB:
+    """Stands in for ``ContractDatabaseService`` and records every save"""
+
+    def __init__(self):
+        self.saves = []
+
+    async def save_corrected_invoice_data(self, contract_id, corrected_data, corrected_by_human=False,
+                                          confidence_features=None):
+        self.saves.append({"contract_id": contract_id, "corrected_data": corrected_data,
+                           "corrected_by_human": corrected_by_human})
+        return SimpleNamespace(id=len(self.saves))
+
+
+def build_agents():
+    from adk_agents.correction_adk_agent import CorrectionADKAgent
+    from adk_agents.validation_adk_agents import ValidationADKAgent
+
+    with patch("adk_agents.correction_adk_agent.get_database_service"), \
+            patch("adk_agents.correction_adk_agent.ContractDatabaseService"):
+        correction = CorrectionADKAgent()
+    return ValidationADKAgent(), correction
+
+
+async def _drain(events):
+    async for _ in events:
+        pass
+
+
+def _answers_for(state, truth, rnd):
+    """Field values a reviewer would give, and a natural-language version of part of them"""
+    requested = [item["field_name"] for item in state.get("required_field_updates") or []]
+    values = {field: _get_path(truth, field) for field in requested}
+    values = {field: value for field, value in values.items() if value not in (None, "")}
+    spoken = {field: value for field, value in values.items() if field in FIELD_PHRASES and rnd.random() < 0.5}
+    query = ". ".join(f"The {FIELD_PHRASES[field]} is {value}" for field, value in spoken.items())
+    return requested, {field: value for field, value in values.items() if field not in spoken}, query
+
+
+async def run_case(case, agents, nl_service_factory, timings, rnd):
+    """Drive one case through the agents; returns a list of invariant violations"""
+    from adk_agents.workflow_state import WorkflowState
+
+    validation_agent, correction_agent = agents
+    recorder = RecordingContractDB()
+    correction_agent._contract_db_service = recorder
+    workflow_id = f"load-{case['seed']}-{case['index']}"
+    state = WorkflowState.from_dict({
+        "workflow_id": workflow_id,
+        "user_id": "load-harness",
+        "contract_name": f"{workflow_id}.pdf",
+        "contract_id": case["index"] + 1,
+        "processing_status": "in_progress",
+        "invoice_data": {"invoice_response": {"invoice_data": copy.deepcopy(case["raw"])}},
+    })
+    context = SimpleNamespace(state={})
+    violations = []
+
+    started = time.perf_counter()
+    await _drain(validation_agent.process_adk(state, context))
+    timings["validation"].append(time.perf_counter() - started)
+
+    if state.get("processing_status") not in ALLOWED_STATUSES:
+        violations.append(f"unknown status after validation: {state.get('processing_status')}")
+    result = (state.get("validation_result") or {}).get("validation_result") or {}
+    for name in ("validation_score", "confidence_score"):
+        if name in result and not 0.0 <= result[name] <= 1.0:
+            violations.append(f"{name} out of range: {result[name]}")
+    paused = state.get("processing_status") == "PAUSED_FOR_HUMAN_INPUT"
+    if bool(result.get("human_input_required")) != paused:
+        violations.append("human_input_required does not match the pause")
+    requested_fields = {item["field_name"] for item in state.get("required_field_updates") or []}
+    missing = (state.get("validation_results") or {}).get("missing_required_fields") or []
+    for field_name in missing:
+        if paused and field_name not in requested_fields:
+            violations.append(f"missing field {field_name} not requested from the reviewer")
+
+    if paused:
+        requested, field_values, query = _answers_for(state, case["truth"], rnd)
+        started = time.perf_counter()
+        if query:
+            nl = await nl_service_factory(case["truth"]).process_natural_language_query(
+                query, UnifiedInvoiceData.from_trusted(state["unified_invoice_data"]), requested, []
+            ) if state.get("unified_invoice_data") else {"corrections": {}}
+            stray = set(nl.get("corrections", {})) - set(requested)
+            if stray:
+                violations.append(f"natural-language corrections outside the request: {sorted(stray)}")
+            field_values.update(nl.get("corrections", {}))
+        # What the resume route does before handing the answers to the agent
+        state.update(awaiting_human_input=False, workflow_paused=False, human_input_completed=True,
+                     human_input_resolved=True, processing_status="in_progress")
+        await _drain(validation_agent.handle_human_input_response(state, context, {"field_values": field_values}))
+        timings["human_input"].append(time.perf_counter() - started)
+        if state.get("processing_status") == "needs_human_input" and not state.get("required_field_updates"):
+            violations.append("re-paused without any field to ask for")
+
+    started = time.perf_counter()
+    await _drain(correction_agent.process_adk(state, context))
+    timings["correction"].append(time.perf_counter() - started)
+
+    if state.get("correction_completed"):
+        final = state.get("final_invoice_json") or {}
+        if state.get("processing_status") != "success":
+            violations.append(f"corrected invoice left in status {state.get('processing_status')}")
+        currency = _get_path(final, "payment_terms.currency") or _get_path(final, "currency")
+        if currency is not None and not re.fullmatch(r"[A-Z]{3}", str(currency)):
+            violations.append(f"final currency not an ISO code: {currency!r}")
+        for field_name in ("payment_terms.amount", "totals.total_amount", "total_amount"):
+            value = _get_path(final, field_name)
+            if isinstance(value, (int, float)) and value < 0:
+                violations.append(f"negative {field_name}: {value}")
+        if len(recorder.saves) != 1:
+            violations.append(f"expected one database save, got {len(recorder.saves)}")
+        elif paused and not recorder.saves[0]["corrected_by_human"]:
+            violations.append("human-reviewed invoice saved as not corrected by a human")
+    elif recorder.saves:
+        violations.append("database save without a completed correction")
+    return violations
+
+
+def _nl_service_factory():
+    from services.natural_language_correction_service import NaturalLanguageCorrectionService
+
+    def build(truth):
+        return NaturalLanguageCorrectionService(model=HarnessLLM(truth))
+    return build
+
+
+async def run_agents(cases, seed, determinism_sample=25):
+    agents = build_agents()
+    nl_factory = _nl_service_factory()
+    rnd = random.Random(seed)
+    timings = {stage: [] for stage in STAGES}
+    failures = []
+
+    started = time.perf_counter()
+    for case in cases:
+        case_started = time.perf_counter()
+        try:
+            violations = await run_case(case, agents, nl_factory, timings, rnd)
+        except Exception as e:
+            violations = [f"{type(e).__name__}: {e}"]
+        timings["total"].append(time.perf_counter() - case_started)
+        if violations:
+            failures.append((case, violations))
+    elapsed = time.perf_counter() - started
+
+    # Validation of the same invoice must not depend on what ran before it
+    validation_agent = agents[0]
+    for case in cases[:determinism_sample]:
+        try:
+            unified = UnifiedInvoiceData.from_legacy_format({"invoice_response": {"invoice_data": case["raw"]}})
+        except ValidationError:
+            continue
+        service = validation_agent._validation_service
+        first = service.validate_unified_invoice_data(unified, "load-harness", "determinism.pdf")
+        second = service.validate_unified_invoice_data(unified, "load-harness", "determinism.pdf")
+        if (first.is_valid, first.validation_score, first.missing_required_fields) != \
+                (second.is_valid, second.validation_score, second.missing_required_fields):
+            failures.append((case, ["re-validation is not deterministic"]))
+
+    return timings, elapsed, failures
+
+
+# ---------------------------------------------------------------------------
+# Statistics and baseline
+# ---------------------------------------------------------------------------
+
+def percentile(samples, pct):
+    """Nearest-rank percentile"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, -(-pct * len(ordered) // 100))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(timings, elapsed, count):
+    stages = {}
+    for stage, samples in timings.items():
+        if samples:
+            stages[stage] = {
+                "count": len(samples),
+                **{f"p{pct}_ms": round(percentile(samples, pct) * 1000, 3) for pct in PERCENTILES},
+                "max_ms": round(max(samples) * 1000, 3),
+            }
+    return {"invoices": count, "seconds": round(elapsed, 3),
+            "invoices_per_second": round(count / elapsed, 1) if elapsed else 0.0, "stages": stages}
+
+
+def compare(current, baseline, tolerance):
+    """Regressions of ``current`` against ``baseline``: slower p95 per stage, lower throughput"""
+    if baseline.get("mode", current.get("mode")) != current.get("mode"):
+        return [f"baseline was recorded in {baseline['mode']} mode, this run is {current.get('mode')}"]
+    regressions = []
+    for stage, stats in current["stages"].items():
+        reference = baseline.get("stages", {}).get(stage)
+        if reference and stats["p95_ms"] > reference["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{stage} p95 {stats['p95_ms']}ms > baseline {reference['p95_ms']}ms")
+    if baseline.get("invoices_per_second") and \
+            current["invoices_per_second"] < baseline["invoices_per_second"] * (1 - tolerance):
+        regressions.append(
+            f"throughput {current['invoices_per_second']}/s < baseline {baseline['invoices_per_second']}/s"
+        )
+    return regressions
+
+
+def property_violations(case, service):
+    try:
+        result = service.validate_raw_invoice_data(case["raw"], "load-harness", "properties.pdf")
+    except Exception as e:
+        return check_conversion(case) + [f"validate_raw_invoice_data raised {type(e).__name__}: {e}"]
+    return check_conversion(case) + check_validation_result(result)
+
+
+def failure_predicate(case, properties_only):
+    """Whether a shrunk variant of ``case`` still violates an invariant"""
+    if properties_only:
+        from services.validation_service import InvoiceDataValidationService
+        service = InvoiceDataValidationService()
+        return lambda raw: bool(property_violations({**case, "raw": raw}, service))
+
+    agents = build_agents()
+    nl_factory = _nl_service_factory()
+
+    def fails(raw):
+        timings = {stage: [] for stage in STAGES}
+        return bool(asyncio.run(run_case({**case, "raw": raw}, agents, nl_factory, timings, random.Random(case["seed"]))))
+    return fails
+
+
+def report_failure(case, violations, fails):
+    return {
+        "seed": case["seed"],
+        "index": case["index"],
+        "mutations": case["mutations"],
+        "violations": violations,
+        "minimal_example": shrink(case["raw"], fails),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Property and load test the validation and correction agents")
+    parser.add_argument("--invoices", type=int, default=1000, help="Number of generated invoices")
+    parser.add_argument("--seed", type=int, default=7, help="Corpus seed; failures are reported with it")
+    parser.add_argument("--baseline", help="JSON baseline to compare with (and to write with --update-baseline)")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing")
+    parser.add_argument("--properties-only", action="store_true",
+                        help="Check corpus and validation-service invariants without running the agents")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.CRITICAL)
+
+    cases = build_corpus(args.invoices, args.seed)
+    failures = []
+
+    if args.properties_only:
+        from services.validation_service import InvoiceDataValidationService
+        service = InvoiceDataValidationService()
+        started = time.perf_counter()
+        timings = {"validation": []}
+        for case in cases:
+            case_started = time.perf_counter()
+            violations = property_violations(case, service)
+            timings["validation"].append(time.perf_counter() - case_started)
+            if violations:
+                failures.append((case, violations))
+        elapsed = time.perf_counter() - started
+    else:
+        failures = [(case, violations) for case in cases for violations in [check_conversion(case)] if violations]
+        try:
+            timings, elapsed, agent_failures = asyncio.run(run_agents(cases, args.seed))
+        except ImportError as e:
+            sys.exit(f"Cannot load the ADK agents ({e}); use --properties-only without the ADK environment")
+        failures.extend(agent_failures)
+
+    summary = summarize(timings, elapsed, len(cases))
+    summary["mode"] = "properties" if args.properties_only else "agents"
+    summary["seed"] = args.seed
+    summary["invariant_failures"] = [
+        report_failure(case, violations, failure_predicate(case, args.properties_only))
+        for case, violations in failures[:5]
+    ]
+    summary["invariant_failure_count"] = len(failures)
+
+    regressions = []
+    if args.baseline:
+        baseline_path = Path(args.baseline)
+        if args.update_baseline:
+            baseline_path.write_text(json.dumps({k: summary[k] for k in ("mode", "invoices", "invoices_per_second", "stages")},
+                                                indent=2) + "\n")
+        elif baseline_path.exists():
+            regressions = compare(summary, json.loads(baseline_path.read_text()), args.tolerance)
+    summary["regressions"] = regressions
+
+    print(json.dumps(summary, indent=2, default=str))
+    if failures or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import unittest
+
+from services.validation_service import InvoiceDataValidationService
+from tests.agent_load_harness import (
+    MUTATIONS,
+    build_corpus,
+    compare,
+    percentile,
+    property_violations,
+    shrink,
+    summarize,
+)
+
+
+class TestInvoiceCorpus(unittest.TestCase):
+
+    def test_corpus_is_reproducible_and_messy(self):
+        first, second = build_corpus(200, seed=3), build_corpus(200, seed=3)
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, build_corpus(200, seed=4))
+        applied = {name for case in first for name in case["mutations"]}
+        self.assertEqual(applied, set(MUTATIONS))
+        # The ground truth is never touched by the mutations
+        self.assertTrue(all(isinstance(case["truth"]["payment_terms"]["amount"], float) for case in first))
+
+    def test_validation_invariants_hold_on_messy_invoices(self):
+        service = InvoiceDataValidationService()
+        for case in build_corpus(300, seed=11):
+            self.assertEqual(property_violations(case, service), [], case["mutations"])
+
+    def test_text_amounts_do_not_break_raw_validation(self):
+        service = InvoiceDataValidationService()
+        for amount in ("$1,200.00", "1200", None):
+            raw = {"client": {"name": "Acme"}, "service_provider": {"name": "Globex"},
+                   "payment_terms": {"amount": amount, "currency": "USD", "frequency": "monthly"}}
+            result = service.validate_raw_invoice_data(raw, "user-1", "contract.pdf")
+            self.assertTrue(0.0 <= result.validation_score <= 1.0)
+
+    def test_shrink_keeps_only_what_fails(self):
+        raw = build_corpus(1, seed=5)[0]["raw"]
+        raw["payment_terms"] = {"amount": "bad", "currency": "USD"}
+
+        def fails(candidate):
+            return (candidate.get("payment_terms") or {}).get("amount") == "bad"
+
+        self.assertEqual(shrink(raw, fails), {"payment_terms": {"amount": "bad"}})
+
+
+class TestBaseline(unittest.TestCase):
+
+    def test_percentiles_and_regressions(self):
+        samples = [i / 1000 for i in range(1, 101)]
+        self.assertEqual(percentile(samples, 50), 0.05)
+        self.assertEqual(percentile(samples, 95), 0.095)
+
+        baseline = summarize({"validation": samples}, 1.0, 100)
+        baseline["mode"] = "properties"
+        self.assertEqual(compare(baseline, baseline, 0.25), [])
+
+        slower = summarize({"validation": [s * 2 for s in samples]}, 2.0, 100)
+        slower["mode"] = "properties"
+        regressions = compare(slower, baseline, 0.25)
+        self.assertEqual(len(regressions), 2)
+        self.assertIn("validation p95", regressions[0])
+
+        slower["mode"] = "agents"
+        self.assertIn("properties mode", compare(slower, baseline, 0.25)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.batching import MicroBatcher, ConcurrencyGate, shared_batching
+
+
+class TestMicroBatcher(unittest.TestCase):
+    """Coalescing of concurrent embedding-style requests"""
+
+    def setUp(self):
+        self.calls = []
+
+        def batch_fn(items):
+            self.calls.append(list(items))
+            return [item * 10 for item in items]
+
+        self.batcher = MicroBatcher("test", batch_fn, max_batch_size=8, max_wait=0.05)
+
+    def test_inactive_calls_through(self):
+        self.assertEqual(self.batcher.submit([1, 2]), [10, 20])
+        self.assertEqual(self.batcher.submit([3]), [30])
+        self.assertEqual(len(self.calls), 2)
+
+    def test_concurrent_requests_share_calls(self):
+        self.batcher.activate()
+        requests = [[i, i + 100] for i in range(12)]
+        with ThreadPoolExecutor(max_workers=12) as pool:
+            results = list(pool.map(self.batcher.submit, requests))
+
+        for request, result in zip(requests, results):
+            self.assertEqual(result, [item * 10 for item in request])
+        # 24 items with a batch size of 8 need at least 3 calls, far fewer than 12
+        self.assertLess(len(self.calls), 12)
+        self.assertTrue(all(len(call) <= 8 for call in self.calls))
+        self.assertEqual(self.batcher.stats()["items"], 24)
+
+    def test_errors_reach_every_caller(self):
+        def failing(items):
+            raise ConnectionError("embedding backend down")
+
+        batcher = MicroBatcher("failing", failing, max_wait=0.02)
+        batcher.activate()
+        errors = []
+
+        def call():
+            try:
+                batcher.submit(["text"])
+            except ConnectionError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(errors), 4)
+
+
+class TestConcurrencyGate(unittest.TestCase):
+
+    def test_caps_in_flight_calls(self):
+        gate = ConcurrencyGate("gemini", max_concurrency=2)
+        gate.activate()
+        lock = threading.Lock()
+        peak = [0, 0]
+
+        def call(_):
+            with gate.slot():
+                with lock:
+                    peak[0] += 1
+                    peak[1] = max(peak[1], peak[0])
+                time.sleep(0.01)
+                with lock:
+                    peak[0] -= 1
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(call, range(6)))
+
+        self.assertEqual(peak[1], 2)
+        self.assertEqual(gate.stats()["calls"], 6)
+
+    def test_inactive_gate_is_transparent(self):
+        gate = ConcurrencyGate("gemini", max_concurrency=1)
+        with gate.slot():
+            with gate.slot():
+                pass
+        self.assertEqual(gate.stats()["calls"], 0)
+
+
+class TestSharedBatchingScope(unittest.TestCase):
+
+    def test_scope_covers_only_the_batch(self):
+        calls = []
+
+        def batch_fn(items):
+            calls.append(list(items))
+            return items
+
+        batcher = MicroBatcher("scoped", batch_fn, max_wait=0.05)
+        gate = ConcurrencyGate("scoped", max_concurrency=1)
+
+        async def batch_member(text):
+            # Blocking waits happen in worker threads, which inherit the batch's scope
+            return await asyncio.to_thread(batcher.submit, [text])
+
+        async def run():
+            with shared_batching():
+                self.assertFalse(batcher.active)  # never on the event loop thread itself
+                results = await asyncio.gather(*(batch_member(f"chunk {i}") for i in range(4)))
+                self.assertTrue(await asyncio.to_thread(lambda: gate.active))
+            return results
+
+        self.assertEqual(asyncio.run(run()), [["chunk 0"], ["chunk 1"], ["chunk 2"], ["chunk 3"]])
+        self.assertLess(len(calls), 4)
+
+        # Outside the block (or in unrelated threads) calls go straight through
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            self.assertFalse(pool.submit(lambda: batcher.active).result())
+        self.assertFalse(gate.active)
+
+
+if __name__ == "__main__":
+    unittest.main()
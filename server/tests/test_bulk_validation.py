@@ -0,0 +1,95 @@
+import unittest
+from datetime import datetime
+
+from services.bulk_validation_service import (
+    BulkValidationReport,
+    extracted_row_to_dict,
+    invoice_row_to_dict,
+)
+from services.validation_service import InvoiceDataValidationService
+
+
+def _extracted_row(**overrides):
+    row = {
+        "id": "row-1",
+        "contract_id": "contract-1",
+        "invoice_frequency": "monthly",
+        "first_invoice_date": datetime(2024, 1, 1),
+        "next_invoice_date": None,
+        "payment_amount": 2500.0,
+        "currency": "USD",
+        "payment_due_days": 30,
+        "late_fee": None,
+        "corrected_invoice_data": None,
+    }
+    row.update(overrides)
+    return row
+
+
+_PARTIES = [
+    {"name": "Acme Corp", "email": "billing@acme.com", "phone": None, "address": None, "role": "tenant"},
+    {"name": "Property Co", "email": None, "phone": None, "address": "1 Main St", "role": "landlord"},
+]
+
+
+class TestRowMapping(unittest.TestCase):
+
+    def test_extracted_row_uses_parties_and_flat_columns(self):
+        data = extracted_row_to_dict(_extracted_row(), _PARTIES)
+        self.assertEqual(data["client"]["name"], "Acme Corp")
+        self.assertEqual(data["service_provider"]["address"], "1 Main St")
+        self.assertEqual(data["payment_terms"]["frequency"], "monthly")
+        self.assertEqual(data["payment_terms"]["amount"], 2500.0)
+
+    def test_corrected_data_wins_and_amount_is_coerced(self):
+        corrected = {"client": {"name": "Fixed"}, "payment_terms": {"amount": "1200.50", "currency": "EUR"}}
+        data = extracted_row_to_dict(_extracted_row(corrected_invoice_data=corrected), _PARTIES)
+        self.assertEqual(data["client"]["name"], "Fixed")
+        self.assertEqual(data["payment_terms"]["amount"], 1200.5)
+        # The stored JSON is not modified
+        self.assertEqual(corrected["payment_terms"]["amount"], "1200.50")
+
+    def test_legacy_invoice_row(self):
+        data = invoice_row_to_dict({
+            "invoice_number": "INV-1",
+            "client_name": "Acme Corp",
+            "service_provider_name": "Property Co",
+            "total_amount": 900.0,
+            "currency": "GBP",
+            "invoice_data": {"payment_information": {"frequency": "quarterly", "due_days": "15"}},
+        })
+        self.assertEqual(data["payment_terms"], {"amount": 900.0, "currency": "GBP", "frequency": "quarterly", "due_days": 15.0})
+        self.assertIsNone(data["client"]["email"])
+
+
+class TestBulkValidationReport(unittest.TestCase):
+
+    def test_pages_roll_up_into_summary(self):
+        service = InvoiceDataValidationService()
+        rows = [
+            _extracted_row(id="a"),
+            _extracted_row(id="b", payment_amount=None),
+            _extracted_row(id="c", currency="XYZ"),
+        ]
+        dicts = [extracted_row_to_dict(row, _PARTIES) for row in rows]
+        results = service.validate_unified_invoice_batch(dicts, "user-1")
+
+        report = BulkValidationReport("extracted_invoice_data", "user-1")
+        events = report.add_page([row["id"] for row in rows], results, include_rows=True)
+        report.add_page(["a"], results[:1])
+        summary = report.summary(written=4)
+
+        self.assertEqual(events[0]["event"], "page")
+        self.assertEqual(events[0]["valid"], 1)
+        self.assertEqual([event["id"] for event in events[1:]], ["b", "c"])
+        self.assertEqual(events[1]["issues"][0]["severity"], "error")
+
+        self.assertEqual(summary["rows"], 4)
+        self.assertEqual(summary["valid"], 2)
+        self.assertEqual(summary["missing_by_field"], {"payment_terms.amount": 1})
+        self.assertEqual(summary["issues_by_field"]["payment_terms.currency"], 1)
+        self.assertEqual(summary["rows_written"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import math
+import os
+import random
+import tempfile
+import unittest
+
+from services.confidence_model import (
+    ConfidenceModel,
+    evaluate_confidence_model,
+    train_confidence_model,
+)
+from services.validation_service import (
+    InvoiceDataValidationService,
+    ValidationIssue,
+    ValidationSeverity,
+)
+
+
+def _history(count, seed):
+    """
+    Synthetic invoice history: features as recorded at first validation, and
+    whether a human had to correct the invoice
+
+    Corrections are driven mostly by weak retrieval, rules/LLM disagreement and
+    errors; warnings matter much less than the old routing assumed.
+    """
+    rnd = random.Random(seed)
+    rows, labels = [], []
+    for _ in range(count):
+        row = {
+            "retrieval_similarity": rnd.uniform(0.4, 0.95),
+            "extraction_agreement": rnd.choice([1.0, 1.0, rnd.uniform(0.3, 1.0)]),
+            "extraction_confidence": rnd.uniform(0.5, 0.95),
+            "required_completeness": rnd.choice([1.0, 1.0, 1.0, 0.9, 0.8]),
+            "overall_completeness": rnd.uniform(0.6, 1.0),
+            "error_count": rnd.choice([0, 0, 0, 1, 2]),
+            "warning_count": rnd.choice([0, 0, 1, 1, 2]),
+            "info_count": rnd.choice([0, 1]),
+        }
+        z = (-9.0 + 6.0 * row["retrieval_similarity"] + 4.0 * row["extraction_agreement"]
+             + 5.0 * row["required_completeness"] - 2.0 * row["error_count"] - 0.2 * row["warning_count"])
+        corrected = rnd.random() > 1.0 / (1.0 + math.exp(-z))
+        rows.append(row)
+        labels.append(0 if corrected else 1)
+    return rows, labels
+
+
+def _rule_routing(row):
+    """The routing before the model: any error, warning or missing required field pauses"""
+    return row["error_count"] > 0 or row["warning_count"] > 0 or row["required_completeness"] < 1.0
+
+
+class TestConfidenceModel(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rows, labels = _history(1500, seed=3)
+        cls.model = train_confidence_model(rows[:1000], labels[:1000])
+        cls.test_rows, cls.test_labels = rows[1000:], labels[1000:]
+        cls.scores = [cls.model.predict(row) for row in cls.test_rows]
+
+    def test_trained_model_ranks_and_calibrates(self):
+        trained = evaluate_confidence_model(self.scores, self.test_labels, 0.9)
+        default = evaluate_confidence_model(
+            [ConfidenceModel.default().predict(row) for row in self.test_rows], self.test_labels, 0.9
+        )
+        self.assertGreater(trained["auc"], 0.8)
+        self.assertLess(trained["log_loss"], default["log_loss"])
+        self.assertLess(trained["brier"], default["brier"])
+
+    def test_fewer_pauses_for_the_same_missed_corrections(self):
+        paused = [_rule_routing(row) for row in self.test_rows]
+        needs_correction = [not label for label in self.test_labels]
+        rule_pause_rate = sum(paused) / len(paused)
+        rule_missed = sum(1 for p, c in zip(paused, needs_correction) if c and not p) / sum(needs_correction)
+
+        # Lowest threshold whose missed-correction rate is no worse than the rules
+        for threshold in sorted(set(self.scores)):
+            metrics = evaluate_confidence_model(self.scores, self.test_labels, threshold)
+            if metrics["missed_correction_rate"] <= rule_missed:
+                break
+        self.assertLess(metrics["pause_rate"], rule_pause_rate)
+
+    def test_save_load_and_missing_features(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.json")
+            self.model.save(path)
+            loaded = ConfidenceModel.load(path)
+        row = self.test_rows[0]
+        self.assertAlmostEqual(loaded.predict(row), self.model.predict(row))
+
+        # Missing signals are imputed with the training mean
+        partial = {name: value for name, value in row.items() if name != "retrieval_similarity"}
+        imputed = dict(partial, retrieval_similarity=self.model.means["retrieval_similarity"])
+        self.assertAlmostEqual(self.model.predict(partial), self.model.predict(imputed))
+
+
+class TestValidationConfidence(unittest.TestCase):
+
+    def setUp(self):
+        self.service = InvoiceDataValidationService()
+        self.service.confidence_model = ConfidenceModel.default()
+
+    def test_result_carries_features(self):
+        data = {
+            "contract_title": "Office Lease",
+            "client": {"name": "Acme Corp", "email": "billing@acme.com"},
+            "service_provider": {"name": "Property Co"},
+            "payment_terms": {"amount": 2500.0, "currency": "USD", "frequency": "monthly", "due_days": 30},
+            "metadata": {
+                "confidence_score": 0.3,
+                "extraction_signals": {"retrieval_similarity": 0.82, "extraction_confidence": 0.9},
+            },
+        }
+        result = self.service.validate_raw_invoice_data(data, "user-1", "contract")
+        features = result.to_state_dict()["confidence_features"]
+        self.assertEqual(features["retrieval_similarity"], 0.82)
+        # The model's earlier score (metadata.confidence_score) is never fed back in
+        self.assertEqual(features["extraction_confidence"], 0.9)
+        self.assertIsNone(features["extraction_agreement"])
+        self.assertEqual(result.confidence_score, round(self.service.confidence_model.predict(features), 4))
+
+    def test_confident_warnings_skip_review(self):
+        warning = ValidationIssue("payment_terms.amount", "unusually_high", ValidationSeverity.WARNING,
+                                  "Amount seems high", 90000, requires_human_input=True)
+        error = ValidationIssue("client.email", "invalid_format", ValidationSeverity.ERROR,
+                                "Bad email", "x@", requires_human_input=False)
+        decide = self.service._determine_human_input_required
+        self.assertTrue(decide([], [warning], 0.7))
+        self.assertTrue(decide([], [warning], 0.7, confidence_score=0.6))
+        self.assertFalse(decide([], [warning], 0.7, confidence_score=0.95))
+        self.assertTrue(decide([], [warning, error], 0.5, confidence_score=0.95))
+        self.assertTrue(decide(["client.name"], [], 0.9, confidence_score=0.99))
+
+
+if __name__ == "__main__":
+    unittest.main()
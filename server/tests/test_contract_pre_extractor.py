@@ -0,0 +1,111 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from schemas.contract_schemas import ContractInvoiceData, ContractParty
+from services.contract_pre_extractor import (
+    ContractPreExtractor,
+    parse_contract_date,
+    words_to_number,
+)
+
+TEMPLATED_LEASE = """RENTAL AGREEMENT
+
+This Rental Agreement is made and executed at Bengaluru on this 25th day of December, 2023 between Mr. Ramesh Kumar Sharma S/o Late Shri K. Sharma, residing at No. 12, 4th Cross, Indiranagar, Bengaluru 560038, email ramesh.sharma@example.com (hereinafter called the "LANDLORD", which expression shall include his heirs, executors and assigns) of the ONE PART
+
+AND
+
+Ms. Priya Nair D/o Shri V. Nair, residing at Flat 3B, Lake View Apartments, Bengaluru (hereinafter called the "TENANT") of the OTHER PART.
+
+1. The tenancy shall be for a period of 11 (eleven) months commencing from 1st January 2024.
+2. The Tenant shall pay a monthly rent of Rs. 25,000/- (Rupees Twenty Five Thousand only) on or before the 5th day of every month.
+3. The Tenant has paid a security deposit of Rs. 1,50,000/- (Rupees One Lakh Fifty Thousand only).
+"""
+
+
+class TestParsingHelpers(unittest.TestCase):
+
+    def test_words_to_number(self):
+        self.assertEqual(words_to_number("Rupees Twenty Five Thousand only"), 25000)
+        self.assertEqual(words_to_number("One Lakh Fifty Thousand"), 150000)
+        self.assertEqual(words_to_number("two crore five lakh and ninety-nine"), 20500099)
+        self.assertIsNone(words_to_number("Twenty Five Thousand per month"))
+
+    def test_contract_dates(self):
+        self.assertEqual(parse_contract_date("1st January 2024"), (date(2024, 1, 1), 0.9))
+        self.assertEqual(parse_contract_date("25/12/2023"), (date(2023, 12, 25), 0.9))
+        # Day and month could be swapped
+        self.assertEqual(parse_contract_date("05/06/2024"), (date(2024, 6, 5), 0.6))
+        self.assertEqual(parse_contract_date("next spring"), (None, 0.0))
+
+
+class TestContractPreExtractor(unittest.TestCase):
+
+    def setUp(self):
+        self.extractor = ContractPreExtractor()
+
+    def test_templated_lease_needs_no_llm(self):
+        result = self.extractor.extract(TEMPLATED_LEASE)
+        data = result.invoice_data
+
+        self.assertEqual(data.contract_type.value, "rental_lease")
+        self.assertEqual(data.service_provider.name, "Ramesh Kumar Sharma")
+        self.assertEqual(data.service_provider.email, "ramesh.sharma@example.com")
+        self.assertEqual(data.client.name, "Priya Nair")
+        self.assertEqual((data.start_date, data.end_date), (date(2024, 1, 1), date(2024, 11, 30)))
+
+        rent, deposit = data.line_items
+        self.assertEqual((rent.category.value, rent.amount, rent.currency, rent.due_days), ("rent", Decimal("25000"), "INR", 5))
+        self.assertEqual((deposit.category.value, deposit.amount, deposit.billing_cycle.value), ("deposit", Decimal("150000"), "one_time"))
+        self.assertEqual(data.invoice_frequency.value, "monthly")
+
+        self.assertEqual(result.field_confidence["line_items"], 0.95)
+        self.assertFalse(result.needs_llm())
+
+    def test_ambiguous_fields_are_left_to_the_llm(self):
+        text = (
+            "LEASE DEED\n"
+            "Lessor: Sunrise Properties LLP\n"
+            "Lessee: Kiran Rao\n"
+            "The lease is from 01/04/2024 to 31/03/2025. Rent: $1,200 per month, "
+            "increasing to a rent of $1,300 after six months."
+        )
+        result = self.extractor.extract(text)
+        self.assertEqual(result.invoice_data.client.name, "Kiran Rao")
+        self.assertTrue(result.needs_llm())
+        self.assertEqual(result.low_confidence_fields(), ["start_date", "line_items", "invoice_frequency"])
+        self.assertNotIn("start_date", result.known_values())
+        self.assertEqual(result.known_values()["client"]["name"], "Kiran Rao")
+
+    def test_assumed_billing_period_is_left_to_the_llm(self):
+        text = (
+            "LEASE DEED\n"
+            "Lessor: Sunrise Properties LLP\n"
+            "Lessee: Kiran Rao\n"
+            "The lease commences on 1st April 2024. The Lessee shall pay a rent of Rs. 90,000/- "
+            "(Rupees Ninety Thousand only) to the Lessor by bank transfer to the account named below, "
+            "in advance, for each quarter of the year."
+        )
+        result = self.extractor.extract(text)
+        self.assertEqual(result.invoice_data.line_items[0].amount, Decimal("90000"))
+        self.assertLess(result.field_confidence["invoice_frequency"], 0.8)
+        self.assertIn("invoice_frequency", result.low_confidence_fields())
+        self.assertTrue(result.needs_llm())
+
+    def test_merge_takes_only_focus_fields_from_llm(self):
+        result = self.extractor.extract(TEMPLATED_LEASE.replace("commencing from 1st January 2024", "commencing soon"))
+        self.assertIn("start_date", result.low_confidence_fields())
+
+        llm_data = ContractInvoiceData(
+            client=ContractParty(name="Someone Else", role="client"),
+            start_date=date(2024, 2, 1),
+        )
+        merged = result.merge(llm_data, ["start_date"], llm_confidence=0.85)
+        self.assertEqual(merged.start_date, date(2024, 2, 1))
+        self.assertEqual(merged.client.name, "Priya Nair")
+        self.assertEqual(result.field_confidence["start_date"], 0.85)
+        self.assertEqual(merged.confidence_score, result.confidence_score)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import random
+import unittest
+
+from utils.fuzzy_match import BKTree, FuzzyMatchIndex, edit_distance, normalize
+
+FREQUENCIES = ["monthly", "quarterly", "annually", "biannually", "weekly", "one_time"]
+
+
+class TestEditDistance(unittest.TestCase):
+
+    def test_known_distances(self):
+        self.assertEqual(edit_distance("montly", "monthly"), 1)
+        self.assertEqual(edit_distance("kitten", "sitting"), 3)
+        self.assertEqual(edit_distance("", "abc"), 3)
+        self.assertEqual(edit_distance("same", "same"), 0)
+
+    def test_max_distance_caps_result(self):
+        self.assertEqual(edit_distance("kitten", "sitting", max_distance=1), 2)
+        self.assertEqual(edit_distance("a", "abcdef", max_distance=2), 3)
+        self.assertEqual(edit_distance("kitten", "sitting", max_distance=5), 3)
+
+    def test_normalize_ignores_case_and_separators(self):
+        self.assertEqual(normalize(" One-Time "), normalize("one_time"))
+        self.assertEqual(normalize("Bi Annually"), "biannually")
+
+
+class TestBKTree(unittest.TestCase):
+
+    def test_radius_search_matches_brute_force(self):
+        rnd = random.Random(5)
+        words = {"".join(rnd.choices("abcd", k=rnd.randint(1, 7))) for _ in range(300)}
+        tree = BKTree(sorted(words))
+        for _ in range(100):
+            query = "".join(rnd.choices("abcd", k=rnd.randint(1, 7)))
+            radius = rnd.randint(0, 3)
+            expected = sorted((edit_distance(query, word), word) for word in words
+                              if edit_distance(query, word) <= radius)
+            self.assertEqual(tree.search(query, radius), expected)
+
+
+class TestFuzzyMatchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = FuzzyMatchIndex(FREQUENCIES)
+
+    def test_top_k_with_scores(self):
+        matches = self.index.suggest("montly", 2)
+        self.assertEqual(matches[0], ("monthly", 0.8571))
+        self.assertEqual(len(matches), 2)
+        self.assertGreater(matches[0][1], matches[1][1])
+
+    def test_formatting_differences_are_exact(self):
+        self.assertEqual(self.index.suggest("One Time"), (("one_time", 1.0),))
+        self.assertIn("ONE-TIME", self.index)
+
+    def test_min_score_filters(self):
+        self.assertEqual(self.index.suggest("fortnightly", 3, 0.6), ())
+        self.assertEqual(self.index.best("bi-annual")[0], "biannually")
+
+    def test_results_are_memoized(self):
+        self.index.suggest("quarterley")
+        self.index.suggest("quarterley")
+        self.assertEqual(self.index.suggest.cache_info().hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import asyncio
+import gzip
+import unittest
+from types import SimpleNamespace
+
+from services.html_invoice_service import HTMLInvoiceService, compress_html, content_hash
+
+
+class FakeDatabase:
+    """The four database calls the service makes, backed by dicts"""
+
+    def __init__(self, invoices=None):
+        self.invoices = invoices or {}
+        self.rows = {}
+        self.invoice_reads = 0
+
+    async def get_html_invoice_by_uuid(self, invoice_uuid):
+        return self.rows.get(invoice_uuid)
+
+    async def save_html_invoice(self, values):
+        row = SimpleNamespace(id=f"row-{len(self.rows) + 1}", is_active=True, **values)
+        self.rows[values["invoice_uuid"]] = row
+        return row
+
+    async def get_invoice_by_id(self, invoice_id):
+        self.invoice_reads += 1
+        await asyncio.sleep(0.01)
+        return self.invoices.get(invoice_id)
+
+    async def record_html_invoice_view(self, invoice_uuid):
+        return True
+
+
+class TestHTMLInvoiceService(unittest.TestCase):
+
+    def test_stored_invoice_is_served_without_rendering(self):
+        db = FakeDatabase()
+        db.rows["inv-1"] = SimpleNamespace(
+            invoice_uuid="inv-1", invoice_number="INV-1", html_content="<p>stored</p>",
+            html_gzip=None, content_hash=None, viewing_enabled=True, is_active=True,
+        )
+        service = HTMLInvoiceService(db)
+        service.render = None  # Any rendering would fail
+
+        stored = asyncio.run(service.get_for_view("inv-1"))
+        self.assertEqual(stored.html_content, "<p>stored</p>")
+        self.assertEqual(gzip.decompress(stored.html_gzip), b"<p>stored</p>")
+        self.assertEqual(stored.content_hash, content_hash("<p>stored</p>"))
+        self.assertTrue(stored.viewable)
+        self.assertEqual(db.invoice_reads, 0)
+        self.assertIsNone(asyncio.run(service.get_for_view("missing")))
+
+    def test_missing_html_is_rendered_once_and_stored(self):
+        invoice = SimpleNamespace(
+            id="inv-2", invoice_number="INV-2", user_id="user-1", workflow_id="wf-2",
+            contract_title="MSA", status=SimpleNamespace(value="generated"),
+            invoice_data={"client": {"name": "Acme <Corp>"}, "payment_terms": {"amount": 2500}},
+        )
+        db = FakeDatabase({"inv-2": invoice})
+        service = HTMLInvoiceService(db)
+
+        async def views():
+            return await asyncio.gather(*(service.get_for_view("inv-2") for _ in range(3)))
+
+        first = asyncio.run(views())
+        self.assertEqual(db.invoice_reads, 1)
+        self.assertIn("Acme &lt;Corp&gt;", first[0].html_content)
+        self.assertIn("INV-2", first[0].html_content)
+
+        row = db.rows["inv-2"]
+        self.assertEqual((row.generation_method, row.user_id, row.html_gzip), ("on_demand", "user-1", compress_html(row.html_content)))
+
+        # Later views are a lookup of the stored row
+        again = asyncio.run(service.get_for_view("inv-2"))
+        self.assertEqual(again.content_hash, first[0].content_hash)
+        self.assertEqual(db.invoice_reads, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from pathlib import Path
+
+from utils.html_sanitizer import HTMLSanitizer, TemplateValidator, scan_template
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates" / "invoices"
+
+VALID_TEMPLATE = (
+    '<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><meta name="viewport" content="width=device-width">'
+    '<style>body { color: #333; }</style></head>'
+    '<body><h1>{{INVOICE_NUMBER}}</h1><p>{{CLIENT_NAME}}</p><p>{{PROVIDER_NAME}}</p></body></html>'
+)
+
+
+class TestTemplateScan(unittest.TestCase):
+
+    def test_dangerous_markup_is_removed(self):
+        html = (
+            '<div onclick="steal()" style="color: red; width: expression(alert(1))">ok</div>'
+            '<script>alert(1)</script><scr<script>ipt>alert(2)</script>'
+            '<a href=" java&#x73;cript:alert(3)">link</a><iframe src="x"></iframe><!-- note -->'
+            '<img src="https://tracker.example/p.gif">'
+        )
+        scan = scan_template(html)
+
+        self.assertNotIn("onclick", scan.html)
+        self.assertNotIn("expression", scan.html)
+        self.assertNotIn("<script", scan.html.lower())
+        self.assertNotIn("javascript", scan.html.lower())
+        self.assertNotIn("iframe", scan.html)
+        self.assertNotIn("note", scan.html)
+        self.assertIn("color: red", scan.html)
+        self.assertFalse(scan.safe)
+        self.assertIn("External resources not allowed", scan.structure_errors)
+
+    def test_nested_dangerous_css_is_removed(self):
+        html = (
+            '<div style="width: expexpression(ression(alert(1))">a</div>'
+            '<style>@im@importport url(x.css); p { -moz-bi-moz-bindingnding: url(x.xml) }</style>'
+        )
+        scan = scan_template(html)
+
+        self.assertNotIn("expression", scan.html)
+        self.assertNotIn("@import", scan.html)
+        self.assertNotIn("binding", scan.html)
+        self.assertIn("dangerous CSS in <style>", scan.dangerous)
+
+    def test_valid_template_passes_unchanged(self):
+        scan = scan_template(VALID_TEMPLATE)
+
+        # content= is no longer taken for an event handler
+        self.assertEqual(HTMLSanitizer.sanitize_html_template(VALID_TEMPLATE), VALID_TEMPLATE)
+        self.assertEqual(TemplateValidator.validate_template_structure(VALID_TEMPLATE), [])
+        self.assertTrue(TemplateValidator.is_template_safe(VALID_TEMPLATE))
+        self.assertIs(scan_template(VALID_TEMPLATE), scan)
+
+        errors = TemplateValidator.validate_template_structure("<div>{{CLIENT_NAME}}</div>")
+        self.assertIn("Missing DOCTYPE declaration", errors)
+        self.assertIn("Missing required placeholder: {{INVOICE_NUMBER}}", errors)
+
+    def test_shipped_templates_are_safe(self):
+        for path in sorted(TEMPLATES_DIR.glob("*.html")):
+            content = path.read_text(encoding="utf-8")
+            scan = scan_template(content)
+            self.assertTrue(scan.safe, path.name)
+            self.assertEqual(scan.removed, (), path.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from decimal import Decimal
+
+from utils.html_sanitizer import HTMLSanitizer
+from utils.line_items import SUMMARY_COLUMNS, get_currency_formatter, render_line_items
+
+
+class TestCurrencyFormatter(unittest.TestCase):
+
+    def test_locale_aware_formats(self):
+        self.assertEqual(get_currency_formatter("USD", "en_US")(1234567.5), "$1,234,567.50")
+        self.assertEqual(get_currency_formatter("EUR", "de_DE")("1234.565"), "1.234,57\u00a0€")
+        self.assertEqual(get_currency_formatter("INR", "en_IN")(Decimal("12345678.9")), "₹1,23,45,678.90")
+        self.assertEqual(get_currency_formatter("JPY", "ja_JP")(-1500), "-¥1,500")
+        self.assertEqual(get_currency_formatter("chf", "de_AT")(None), "0,00\u00a0CHF")
+        self.assertIs(get_currency_formatter("USD", "en_US"), get_currency_formatter("USD", "en_US"))
+
+
+class TestLineItemRows(unittest.TestCase):
+
+    def test_rows_are_escaped_and_paginated(self):
+        services = [
+            {"description": f"Meter <{index}> & co", "quantity": 2, "unit_price": 10, "total_amount": 20.0}
+            for index in range(5)
+        ]
+        rows = render_line_items(services, rows_per_page=2).split("\n")
+
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0], "<tr><td>Meter &lt;0&gt; &amp; co</td><td>2</td><td>$10.00</td><td>$20.00</td></tr>")
+        self.assertEqual([row.startswith('<tr class="page-break-before">') for row in rows], [False, False, True, False, True])
+
+        # A missing total is quantity x unit price
+        summary = render_line_items([{"description": "Rent", "quantity": 3, "unit_price": "1000.10"}], columns=SUMMARY_COLUMNS)
+        self.assertEqual(summary, "<tr><td>Rent</td><td>$3,000.30</td></tr>")
+
+    def test_sanitizer_rows_use_invoice_currency(self):
+        data = {"payment_terms": {"currency": "GBP"}, "services": [{"description": "Audit", "quantity": 1.0, "unit_price": 950}]}
+        self.assertEqual(
+            HTMLSanitizer._generate_service_items_html(data),
+            "<tr><td>Audit</td><td>1</td><td>£950.00</td><td>£950.00</td></tr>",
+        )
+        self.assertEqual(HTMLSanitizer._generate_service_items_html({}), '<tr><td colspan="4">No services listed</td></tr>')
+
+
+if __name__ == "__main__":
+    unittest.main()
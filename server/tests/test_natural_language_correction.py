@@ -0,0 +1,130 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import Mock
+
+from schemas.unified_invoice_schemas import UnifiedInvoiceData
+from services.correction_query_parser import CorrectionQueryParser, parse_amount
+from services.natural_language_correction_service import NaturalLanguageCorrectionService
+
+
+def _llm_returning(corrections):
+    model = Mock()
+    model.generate_content.return_value = Mock(text=json.dumps(corrections))
+    return model
+
+
+class TestCorrectionQueryParser(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = CorrectionQueryParser()
+
+    def test_amount_shorthands(self):
+        self.assertEqual(parse_amount("25k")[0], "25000")
+        self.assertEqual(parse_amount("$1,500.50"), ("1500.50", "USD", (0, 9)))
+        self.assertEqual(parse_amount("1.5 lakh")[0], "150000")
+        self.assertEqual(parse_amount("rupees twenty five thousand only")[:2], ("25000", "INR"))
+        self.assertEqual(parse_amount("25k rising to 27k"), (None, None, None))
+
+    def test_formulaic_query_is_fully_local(self):
+        result = self.parser.parse("rent is 25k, net 30")
+        self.assertEqual(result.corrections, {"payment_terms.amount": "25000", "payment_terms.due_days": "30"})
+        self.assertEqual(result.remainder, "")
+        self.assertEqual(self.parser.parse("payment due within 15 days").corrections, {"payment_terms.due_days": "15"})
+        self.assertEqual(self.parser.parse("tenant name: Anil").corrections, {"client.name": "Anil"})
+
+        result = self.parser.parse("Client: Sarah Johnson (sarah@acme.com), landlord is Ravi Rao, amout is $800 monthly")
+        self.assertEqual(result.corrections["client.name"], "Sarah Johnson")
+        self.assertEqual(result.corrections["client.email"], "sarah@acme.com")
+        self.assertEqual(result.corrections["service_provider.name"], "Ravi Rao")
+        self.assertEqual(result.corrections["payment_terms.amount"], "800")
+        self.assertEqual(result.corrections["payment_terms.frequency"], "monthly")
+        self.assertEqual(result.remainder, "")
+
+    def test_ambiguous_parts_become_the_remainder(self):
+        result = self.parser.parse("start date 05/06/2024, end date 31 March 2025")
+        self.assertEqual(result.corrections, {"end_date": "2025-03-31"})
+        self.assertEqual(result.ambiguous_fields, ["start_date"])
+        self.assertEqual(result.remainder, "start date 05/06/2024")
+
+        result = self.parser.parse("rent is 25k increasing to 27k after six months")
+        self.assertNotIn("payment_terms.amount", result.corrections)
+        self.assertIn("27k", result.remainder)
+
+        # A day of the month is not a number of days
+        result = self.parser.parse("rent is 25k, due on 5th")
+        self.assertEqual(result.corrections, {"payment_terms.amount": "25000"})
+        self.assertEqual(result.remainder, "due on 5th")
+
+    def test_verbs_are_not_field_names(self):
+        # "change" is one letter from the alias "charge"
+        result = self.parser.parse("change the rent to 30000")
+        self.assertEqual(result.corrections, {"payment_terms.amount": "30000"})
+        self.assertEqual(result.ambiguous_fields, [])
+
+        result = self.parser.parse("change amount to 2500 dollars")
+        self.assertEqual(result.corrections, {"payment_terms.amount": "2500", "payment_terms.currency": "USD"})
+
+
+class TestNaturalLanguageCorrectionService(unittest.TestCase):
+
+    def setUp(self):
+        self.invoice = UnifiedInvoiceData()
+
+    def test_local_parse_skips_llm(self):
+        model = _llm_returning({})
+        service = NaturalLanguageCorrectionService(model=model)
+        result = asyncio.run(service.process_natural_language_query(
+            "rent is 25k, net 30", self.invoice, ["payment_terms.amount", "payment_terms.due_days"], []
+        ))
+        self.assertEqual(result["corrections"], {"payment_terms.amount": "25000", "payment_terms.due_days": "30"})
+        self.assertEqual(result["extraction_method"], "local")
+        model.generate_content.assert_not_called()
+
+    def test_ambiguous_clause_goes_to_llm(self):
+        model = _llm_returning({"payment_terms.due_days": "5"})
+        service = NaturalLanguageCorrectionService(model=model)
+        result = asyncio.run(service.process_natural_language_query(
+            "rent is 25k, due on 5th", self.invoice, ["payment_terms.amount", "payment_terms.due_days"], []
+        ))
+        self.assertEqual(result["corrections"], {"payment_terms.amount": "25000", "payment_terms.due_days": "5"})
+        self.assertIn("due on 5th", model.generate_content.call_args[0][0])
+
+    def test_preview_and_apply_share_one_llm_call(self):
+        model = _llm_returning({"services.0.description": "Website maintenance"})
+        service = NaturalLanguageCorrectionService(model=model)
+        query = "amount is $950, it covers our website maintenance work"
+
+        preview = asyncio.run(service.preview_corrections(query, self.invoice, user_id="user-1", workflow_id="wf-1"))
+        self.assertEqual(preview["extracted_fields"]["services.0.description"], "Website maintenance")
+        prompt = model.generate_content.call_args[0][0]
+        self.assertIn("website maintenance work", prompt)
+        self.assertIn("payment_terms.amount: 950", prompt)
+
+        applied = asyncio.run(service.process_natural_language_query(
+            query, self.invoice, ["payment_terms.amount", "services.0.description"], [],
+            session_token=preview["session_token"], user_id="user-1", workflow_id="wf-1"
+        ))
+        self.assertEqual(applied["corrections"], {
+            "payment_terms.amount": "950", "services.0.description": "Website maintenance"
+        })
+        self.assertEqual(applied["extraction_method"], "local+llm")
+        self.assertEqual(model.generate_content.call_count, 1)
+
+        # A different query, user or workflow under the same token starts over
+        asyncio.run(service.process_natural_language_query(
+            "it is for cleaning", self.invoice, ["services.0.description"], [],
+            session_token=preview["session_token"], user_id="user-1", workflow_id="wf-1"
+        ))
+        self.assertEqual(model.generate_content.call_count, 2)
+        for user_id, workflow_id in (("user-2", "wf-1"), ("user-1", "wf-2"), (None, None)):
+            other = asyncio.run(service.process_natural_language_query(
+                query, self.invoice, ["services.0.description"], [],
+                session_token=preview["session_token"], user_id=user_id, workflow_id=workflow_id
+            ))
+            self.assertNotEqual(other["session_token"], preview["session_token"])
+        self.assertEqual(model.generate_content.call_count, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
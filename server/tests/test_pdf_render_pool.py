@@ -0,0 +1,143 @@
+import asyncio
+import io
+import os
+import threading
+import time
+import unittest
+import zipfile
+
+from services.pdf_render_pool import (
+    PDFRenderPool,
+    PDFRenderQueueFull,
+    PDFRenderTimeout,
+    map_ordered,
+    stream_zip,
+)
+
+
+def fake_render(html):
+    """Stands in for WeasyPrint: 'sleep:<seconds>' blocks the worker like a long layout"""
+    if html.startswith("sleep:"):
+        time.sleep(float(html.split(":", 1)[1]))
+    return f"%PDF {os.getpid()} {html}".encode()
+
+
+class TestPDFRenderPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = PDFRenderPool(max_workers=2, max_queue=1, timeout=10,
+                                  render_fn=fake_render, initializer=None)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_renders_off_the_event_loop_in_worker_processes(self):
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticking = asyncio.create_task(ticker())
+            pdfs = await asyncio.gather(self.pool.render("sleep:0.3"), self.pool.render("sleep:0.3"))
+            ticking.cancel()
+            return pdfs, ticks
+
+        self.pool.warm_up()
+        pdfs, ticks = asyncio.run(run())
+        self.assertTrue(all(pdf.endswith(b"sleep:0.3") for pdf in pdfs))
+        self.assertNotIn(str(os.getpid()).encode(), pdfs[0].split()[1])
+        # The event loop kept running while both workers were busy
+        self.assertGreater(ticks, 10)
+        self.assertEqual(self.pool.stats["rendered"], 2)
+
+    def test_bounded_queue_rejects_overflow(self):
+        async def run():
+            jobs = [asyncio.ensure_future(self.pool.render("sleep:0.5")) for _ in range(self.pool.capacity)]
+            await asyncio.sleep(0)
+            with self.assertRaises(PDFRenderQueueFull):
+                await self.pool.render("one too many")
+            await asyncio.gather(*jobs)
+            return await self.pool.render("after the burst")
+
+        self.assertTrue(asyncio.run(run()).endswith(b"after the burst"))
+        self.assertEqual(self.pool.stats["rejected"], 1)
+        self.assertEqual(self.pool.in_flight, 0)
+
+    def test_timeout_restarts_the_pool(self):
+        async def run():
+            with self.assertRaises(PDFRenderTimeout):
+                await self.pool.render("sleep:30", timeout=0.5)
+            return await self.pool.render("next job")
+
+        started = time.monotonic()
+        self.assertTrue(asyncio.run(run()).endswith(b"next job"))
+        self.assertLess(time.monotonic() - started, 15)
+        self.assertEqual((self.pool.stats["timeouts"], self.pool.stats["restarts"]), (1, 1))
+
+    def test_queued_time_does_not_count_against_the_timeout(self):
+        pool = PDFRenderPool(max_workers=1, max_queue=2, timeout=1.5, render_fn=fake_render, initializer=None)
+
+        async def run():
+            return await asyncio.gather(*(pool.render("sleep:1") for _ in range(2)))
+
+        try:
+            pdfs = asyncio.run(run())
+        finally:
+            pool.shutdown()
+        self.assertEqual(len(pdfs), 2)
+        self.assertEqual(pool.stats["timeouts"], 0)
+
+    def test_in_process_mode_warms_up_on_a_thread(self):
+        ready = threading.Event()
+        pool = PDFRenderPool(max_workers=0, max_queue=1, timeout=10, render_fn=fake_render, initializer=ready.set)
+        pool.warm_up()
+        self.assertTrue(ready.wait(5))
+        self.assertTrue(asyncio.run(pool.render("in process")).endswith(b"in process"))
+
+
+class TestBulkStreaming(unittest.TestCase):
+
+    def test_map_ordered_keeps_order_and_bounds_the_window(self):
+        running, peak = 0, 0
+
+        async def render(number):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01 * (5 - number % 5))
+            running -= 1
+            if number == 7:
+                raise ValueError("bad invoice")
+            return f"pdf-{number}"
+
+        async def run():
+            return [(item, result) async for item, result in map_ordered(range(20), render, window=4)]
+
+        results = asyncio.run(run())
+        self.assertEqual([item for item, _ in results], list(range(20)))
+        self.assertIsInstance(results[7][1], ValueError)
+        self.assertEqual(results[8][1], "pdf-8")
+        self.assertLessEqual(peak, 4)
+
+    def test_zip_entries_stream_as_they_arrive(self):
+        async def entries():
+            for name in ("invoice-1.pdf", "invoice-2.pdf", "invoice-1.pdf"):
+                yield name, b"%PDF " + name.encode()
+
+        async def run():
+            return [chunk async for chunk in stream_zip(entries())]
+
+        chunks = asyncio.run(run())
+        # One chunk per entry plus the central directory
+        self.assertEqual(len(chunks), 4)
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+            self.assertEqual(archive.namelist(), ["invoice-1.pdf", "invoice-2.pdf", "invoice-1-2.pdf"])
+            self.assertEqual(archive.read("invoice-1-2.pdf"), b"%PDF invoice-1.pdf")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from services.render_cache import GCSArtifactStore, LocalArtifactStore, RenderCache, etag_for, etag_matches, render_key
+
+
+class TestRenderKeys(unittest.TestCase):
+
+    def test_keys_are_content_addressed(self):
+        data = {"client": {"name": "Acme", "email": "billing@acme.com"}, "amount": 2500}
+        reordered = {"amount": 2500, "client": {"email": "billing@acme.com", "name": "Acme"}}
+        self.assertEqual(render_key("pdf", "modern:ab12", data), render_key("pdf", "modern:ab12", reordered))
+        self.assertNotEqual(render_key("pdf", "modern:ab12", data), render_key("html", "modern:ab12", data))
+        self.assertNotEqual(render_key("pdf", "modern:ab12", data), render_key("pdf", "modern:cd34", data))
+        self.assertNotEqual(render_key("pdf", "modern:ab12", data), render_key("pdf", "modern:ab12", {**data, "amount": 2501}))
+
+        etag = etag_for(render_key("pdf", "modern:ab12", data))
+        self.assertTrue(etag_matches(etag, etag))
+        self.assertTrue(etag_matches(f'"other", W/{etag}', etag))
+        self.assertTrue(etag_matches("*", etag))
+        self.assertFalse(etag_matches('"other"', etag))
+        self.assertFalse(etag_matches(None, etag))
+
+
+class TestRenderCache(unittest.TestCase):
+
+    def test_concurrent_misses_render_once(self):
+        cache = RenderCache(store=None, memory_bytes=1024)
+        renders = 0
+
+        async def render():
+            nonlocal renders
+            renders += 1
+            await asyncio.sleep(0.05)
+            return b"%PDF invoice"
+
+        async def run():
+            first = await asyncio.gather(*(cache.get_or_render("k1", render) for _ in range(5)))
+            return first, await cache.get_or_render("k1", render)
+
+        first, again = asyncio.run(run())
+        self.assertEqual(set(first), {b"%PDF invoice"})
+        self.assertEqual(again, b"%PDF invoice")
+        self.assertEqual(renders, 1)
+        self.assertEqual((cache.stats["misses"], cache.stats["hits"]), (1, 5))
+
+    def test_disk_store_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = LocalArtifactStore(Path(directory), max_bytes=30)
+            store.put("a", b"x" * 10)
+            store.put("b", b"y" * 10)
+            store.put("c", b"z" * 10)
+            self.assertEqual(store.get("a"), b"x" * 10)
+
+            store.put("d", b"w" * 10)
+            self.assertIsNone(store.get("b"))
+            self.assertEqual(sorted(os.listdir(directory)), ["a", "c", "d"])
+
+            # A restarted process keeps the size limit and the recency order (from mtimes)
+            for age, name in enumerate(["c", "a", "d"], start=1):
+                os.utime(os.path.join(directory, name), ns=(age * 10**9, age * 10**9))
+            reopened = LocalArtifactStore(Path(directory), max_bytes=20)
+            self.assertEqual(sorted(os.listdir(directory)), ["a", "d"])
+            self.assertEqual(reopened.get("d"), b"w" * 10)
+
+    def test_gcs_store_errors_reach_the_cache(self):
+        uploaded = {}
+
+        class Blob:
+            def __init__(self, name):
+                self.name = name
+
+            def upload_from_string(self, content, content_type=None):
+                if self.name.endswith("broken"):
+                    raise PermissionError("bucket is read-only")
+                uploaded[self.name] = content
+
+        cache = RenderCache(store=GCSArtifactStore(SimpleNamespace(bucket=SimpleNamespace(blob=Blob))), memory_bytes=1024)
+        asyncio.run(cache.put("k1", b"%PDF"))
+        asyncio.run(cache.put("broken", b"%PDF"))
+
+        self.assertEqual(uploaded, {"render-cache/k1": b"%PDF"})
+        self.assertEqual(cache.stats["store_errors"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
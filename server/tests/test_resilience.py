@@ -0,0 +1,191 @@
+import unittest
+import asyncio
+import threading
+import time
+
+from utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    RetryPolicy,
+    call_with_resilience,
+    call_with_resilience_async,
+    get_breaker_states,
+    is_transient_error,
+    reset_breakers,
+    retries_exhausted,
+)
+
+
+class ServiceUnavailable(Exception):
+    """Stand-in for google.api_core.exceptions.ServiceUnavailable"""
+
+
+class HTTPException(Exception):
+    """Stand-in for FastAPI's HTTPException wrapper"""
+
+    def __init__(self, status_code, detail=""):
+        super().__init__(detail)
+        self.status_code = status_code
+
+
+def _fast_policy(max_attempts=3):
+    return RetryPolicy(max_attempts=max_attempts, base_delay=0.0, max_delay=0.0)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_half_opens_and_closes(self):
+        breaker = CircuitBreaker("gemini", failure_threshold=2, recovery_timeout=0.05)
+
+        for _ in range(2):
+            breaker.before_call()
+            breaker.record_failure(ServiceUnavailable("503"))
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.state, CircuitState.HALF_OPEN)
+        breaker.before_call()
+        # Only one trial call is allowed while half-open
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_success()
+
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+        self.assertEqual(breaker.snapshot()["total_rejections"], 2)
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker("pinecone", failure_threshold=1, recovery_timeout=0.01)
+        breaker.record_failure(ServiceUnavailable())
+        time.sleep(0.02)
+        breaker.before_call()
+        breaker.record_failure(ServiceUnavailable())
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+
+
+class TestRetries(unittest.TestCase):
+
+    def setUp(self):
+        reset_breakers()
+
+    def test_retries_transient_errors(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise ServiceUnavailable("try again")
+            return "ok"
+
+        self.assertEqual(call_with_resilience("gcs", flaky, policy=_fast_policy()), "ok")
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(get_breaker_states()["gcs"]["state"], "closed")
+
+    def test_does_not_retry_caller_errors(self):
+        calls = []
+
+        def bad_request():
+            calls.append(1)
+            raise ValueError("invalid filter")
+
+        with self.assertRaises(ValueError):
+            call_with_resilience("pinecone", bad_request, policy=_fast_policy())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(get_breaker_states()["pinecone"]["total_failures"], 0)
+
+    def test_async_retry(self):
+        calls = []
+
+        async def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise ConnectionError("reset by peer")
+            return 42
+
+        result = asyncio.run(call_with_resilience_async("embedding", flaky, policy=_fast_policy()))
+        self.assertEqual(result, 42)
+        self.assertEqual(len(calls), 2)
+
+    def test_async_runs_blocking_calls_off_the_loop(self):
+        loop_thread = threading.get_ident()
+        threads = []
+
+        def blocking_query():
+            threads.append(threading.get_ident())
+            if len(threads) == 1:
+                time.sleep(0.5)
+                return "slow"
+            return "fast"
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.005)
+
+            task = asyncio.ensure_future(ticker())
+            result = await call_with_resilience_async("pinecone", blocking_query, policy=_fast_policy(),
+                                                      hedge_after=0.02)
+            task.cancel()
+            return result, ticks
+
+        result, ticks = asyncio.run(run())
+        self.assertEqual(result, "fast")
+        self.assertNotIn(loop_thread, threads)
+        # The event loop kept running while the calls were in flight
+        self.assertGreater(ticks, 1)
+
+    def test_exhausted_errors_are_marked(self):
+        def down():
+            raise ServiceUnavailable("still down")
+
+        with self.assertRaises(ServiceUnavailable) as raised:
+            call_with_resilience("gcs", down, policy=_fast_policy(2))
+        try:
+            raise HTTPException(500, "Failed to upload file") from raised.exception
+        except HTTPException as wrapped:
+            self.assertTrue(retries_exhausted(wrapped))
+        self.assertFalse(retries_exhausted(ServiceUnavailable("fresh")))
+
+    def test_hedged_read_returns_fast_response(self):
+        release = threading.Event()
+        calls = []
+
+        def query():
+            calls.append(1)
+            if len(calls) == 1:
+                # First request stalls until the test finishes
+                release.wait(2)
+                return "slow"
+            return "fast"
+
+        try:
+            result = call_with_resilience("pinecone", query, policy=_fast_policy(), hedge_after=0.02)
+        finally:
+            release.set()
+        self.assertEqual(result, "fast")
+
+
+class TestTransientClassification(unittest.TestCase):
+
+    def test_wrapped_errors(self):
+        try:
+            try:
+                raise ServiceUnavailable("backend down")
+            except ServiceUnavailable as e:
+                raise HTTPException(500, "Failed to upload file") from e
+        except HTTPException as wrapped:
+            self.assertTrue(is_transient_error(wrapped))
+
+        self.assertFalse(is_transient_error(HTTPException(500, "bad template")))
+        self.assertTrue(is_transient_error(type("ApiError", (Exception,), {"status": 429})()))
+        self.assertFalse(is_transient_error(KeyError("client")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from adk_agents.adk_integration_service import ADKIntegrationService
+from adk_agents.workflow_state import WorkflowState
+from services.review_queue_service import FileReviewQueueStore, ReviewQueueService
+import services.review_queue_service as review_queue_module
+
+
+def _paused_state(workflow_id, user_id="user-1", fields=("client.email", "payment_terms.amount")):
+    return {
+        "workflow_id": workflow_id,
+        "user_id": user_id,
+        "contract_name": f"{workflow_id}.pdf",
+        "processing_status": "PAUSED_FOR_HUMAN_INPUT",
+        "awaiting_human_input": True,
+        "required_field_updates": [
+            {"field_name": name, "field_type": "missing", "current_value": None, "description": f"{name} is required"}
+            for name in fields
+        ],
+    }
+
+
+class _FakeWorkflow:
+    """Resumes by answering the fields; a workflow stays paused while any field is still missing"""
+
+    def __init__(self):
+        self.resumed = []
+
+    async def resume_workflow(self, workflow_state, human_input_data=None):
+        self.resumed.append((workflow_state["workflow_id"], dict(human_input_data["field_values"])))
+        if workflow_state["workflow_id"] == "wf-broken":
+            workflow_state["required_field_updates"] = []
+            raise RuntimeError("agent failed")
+        asked = {field["field_name"] for field in workflow_state.get("required_field_updates", [])}
+        remaining = asked - set(human_input_data["field_values"])
+        workflow_state["required_field_updates"] = [{"field_name": name} for name in sorted(remaining)]
+        workflow_state["processing_status"] = "PAUSED_FOR_HUMAN_INPUT" if remaining else "completed"
+        return workflow_state
+
+
+class TestReviewQueueService(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = FileReviewQueueStore(self.directory.name)
+        self.resumed = []
+
+        async def resumer(workflow_id, field_values, user_notes):
+            self.resumed.append((workflow_id, field_values))
+            if workflow_id == "wf-broken":
+                raise RuntimeError("agent failed")
+            return {"workflow_id": workflow_id, "processing_status": "completed"}
+
+        self.queue = ReviewQueueService(store=self.store, resumer=resumer)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_grouping_across_workflows(self):
+        asyncio.run(self.queue.hibernate(_paused_state("wf-1")))
+        asyncio.run(self.queue.hibernate(_paused_state("wf-2", fields=("client.email", "start_date"))))
+        asyncio.run(self.queue.hibernate(_paused_state("wf-3", user_id="user-2")))
+
+        queue = asyncio.run(self.queue.get_queue(user_id="user-1"))
+        self.assertEqual(queue["pending_count"], 4)
+        self.assertEqual(queue["workflow_count"], 2)
+        first = queue["groups"][0]
+        self.assertEqual((first["key"], first["count"], first["workflow_ids"]), ("client.email", 2, ["wf-1", "wf-2"]))
+
+        by_type = asyncio.run(self.queue.get_queue(group_by="field_type"))
+        self.assertEqual({group["key"]: group["count"] for group in by_type["groups"]},
+                         {"email": 3, "amount": 2, "date": 1})
+        with self.assertRaises(ValueError):
+            asyncio.run(self.queue.get_queue(group_by="severity"))
+
+    def test_bulk_answers_resume_many_workflows(self):
+        for workflow_id in ("wf-1", "wf-2", "wf-broken"):
+            asyncio.run(self.queue.hibernate(_paused_state(workflow_id)))
+        asyncio.run(self.queue.hibernate(_paused_state("wf-other", user_id="user-2")))
+
+        report = asyncio.run(self.queue.submit_bulk_answers([
+            {"field_name": "client.email", "value": "billing@acme.com"},
+            {"item_id": "wf-1:payment_terms.amount", "value": 1200},
+            {"item_id": "wf-missing:client.name", "value": "x"},
+        ], user_id="user-1"))
+
+        self.assertEqual(report["workflows"], 3)
+        self.assertEqual(report["resumed"], 2)
+        self.assertEqual(report["failed"], 1)
+        self.assertEqual(len(report["rejected"]), 1)
+        self.assertEqual(dict(self.resumed)["wf-1"], {"client.email": "billing@acme.com", "payment_terms.amount": 1200})
+        # Another user's request for the same field is untouched
+        self.assertNotIn("wf-other", dict(self.resumed))
+
+    def test_claim_is_exclusive(self):
+        asyncio.run(self.queue.hibernate(_paused_state("wf-1")))
+        self.assertIsNotNone(asyncio.run(self.queue.load("wf-1")))
+        self.assertEqual(asyncio.run(self.queue.claim("wf-1"))["state"]["workflow_id"], "wf-1")
+        self.assertIsNone(asyncio.run(self.queue.claim("wf-1")))
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_snapshot_keeps_types_history_and_contract_bytes(self):
+        contract = b"%PDF-1.7 contract"
+        state = WorkflowState(_paused_state("wf-1"))
+        state["contract_file"] = contract
+        state.record_invoice_data({"amount": Decimal("1200.50"), "start_date": date(2025, 1, 1)}, "contract_processing_agent", "t1")
+        state.record_invoice_data({"amount": Decimal("1300.00"), "start_date": date(2025, 1, 1)}, "correction_agent", "t2")
+        asyncio.run(self.queue.hibernate(state, {"contract_file": contract, "user_id": "user-1"}))
+
+        # The contract is stored once, outside the JSON snapshot
+        blob_files = [name for name in os.listdir(self.directory.name) if name.endswith(".blob")]
+        self.assertEqual(len(blob_files), 1)
+        with open(os.path.join(self.directory.name, "wf-1.json"), "rb") as f:
+            self.assertNotIn(b"%PDF", f.read())
+
+        record = asyncio.run(self.queue.claim("wf-1"))
+        restored = record["state"]
+        self.assertIsInstance(restored, WorkflowState)
+        self.assertEqual(restored["contract_file"], contract)
+        self.assertEqual(record["request"]["contract_file"], contract)
+        self.assertEqual(restored["current_invoice_data"], {"amount": Decimal("1300.00"), "start_date": date(2025, 1, 1)})
+        self.assertEqual(restored["invoice_data_history"][0]["data"]["amount"], Decimal("1200.50"))
+        self.assertEqual(restored["data_version"], 2)
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_answers_only_resume_the_callers_workflows(self):
+        asyncio.run(self.queue.hibernate(_paused_state("wf-1")))
+        asyncio.run(self.queue.hibernate(_paused_state("wf-other", user_id="user-2")))
+
+        report = asyncio.run(self.queue.resume_workflows(
+            {"wf-1": {"client.email": "a@b.com"}, "wf-other": {"client.email": "a@b.com"}}, user_id="user-1"
+        ))
+        self.assertEqual(report["resumed"], 1)
+        self.assertEqual([workflow_id for workflow_id, _ in self.resumed], ["wf-1"])
+        self.assertFalse({result["workflow_id"]: result for result in report["results"]}["wf-other"]["success"])
+
+
+class TestWorkflowHibernation(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.workflow = _FakeWorkflow()
+        self.adk_service = ADKIntegrationService()
+        self.adk_service.hibernate_paused = True
+        self.adk_service._adk_workflow = self.workflow
+        queue = ReviewQueueService(store=FileReviewQueueStore(self.directory.name),
+                                   resumer=self.adk_service.resume_from_review)
+        self._previous = review_queue_module._review_queue_service
+        review_queue_module._review_queue_service = queue
+        self.queue = queue
+
+    def tearDown(self):
+        review_queue_module._review_queue_service = self._previous
+        self.directory.cleanup()
+
+    def test_paused_workflows_leave_memory_and_resume_from_storage(self):
+        for workflow_id in ("wf-1", "wf-2"):
+            self.adk_service.register_workflow(_paused_state(workflow_id), {"user_id": "user-1"})
+            self.assertTrue(asyncio.run(self.adk_service.hibernate_if_paused(workflow_id)))
+        self.assertEqual(self.adk_service.active_workflows, {})
+
+        # Status reads come from storage without waking the workflow
+        state = asyncio.run(self.adk_service.get_workflow_state("wf-1"))
+        self.assertEqual(state["processing_status"], "PAUSED_FOR_HUMAN_INPUT")
+        self.assertEqual(self.adk_service.active_workflows, {})
+
+        report = asyncio.run(self.queue.submit_bulk_answers([
+            {"field_name": "client.email", "value": "billing@acme.com"},
+            {"item_id": "wf-1:payment_terms.amount", "value": 1200},
+        ], user_id="user-1"))
+
+        self.assertEqual(report["resumed"], 1)
+        self.assertEqual(report["still_pending"], 1)
+        self.assertEqual(sorted(workflow_id for workflow_id, _ in self.workflow.resumed), ["wf-1", "wf-2"])
+        # wf-1 finished and stays in memory; wf-2 still needs the amount and is hibernated again
+        self.assertEqual(self.adk_service.active_workflows["wf-1"]["state"]["processing_status"], "completed")
+        self.assertNotIn("wf-2", self.adk_service.active_workflows)
+        queue = asyncio.run(self.queue.get_queue(user_id="user-1"))
+        self.assertEqual([(group["key"], group["workflow_ids"]) for group in queue["groups"]],
+                         [("payment_terms.amount", ["wf-2"])])
+
+    def test_failed_resume_returns_the_workflow_to_the_queue(self):
+        self.adk_service.register_workflow(_paused_state("wf-broken"), {"user_id": "user-1"})
+        self.assertTrue(asyncio.run(self.adk_service.hibernate_if_paused("wf-broken")))
+
+        report = asyncio.run(self.queue.submit_bulk_answers(
+            [{"field_name": "client.email", "value": "billing@acme.com"}], user_id="user-1"
+        ))
+
+        self.assertEqual(report["failed"], 1)
+        self.assertNotIn("wf-broken", self.adk_service.active_workflows)
+        # Stored as it was before the resume, with every field request still queued
+        record = asyncio.run(self.queue.load("wf-broken"))
+        self.assertEqual(record["state"]["processing_status"], "PAUSED_FOR_HUMAN_INPUT")
+        self.assertTrue(record["state"]["awaiting_human_input"])
+        queue = asyncio.run(self.queue.get_queue(user_id="user-1"))
+        self.assertEqual(queue["pending_count"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
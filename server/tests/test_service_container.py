@@ -0,0 +1,81 @@
+import unittest
+import sys
+import types
+
+from utils.service_container import ServiceContainer, LazyService
+
+
+class _Service:
+    instances = 0
+
+    def __init__(self):
+        _Service.instances += 1
+        self.value = 42
+
+    def ping(self):
+        return "pong"
+
+
+class TestServiceContainer(unittest.TestCase):
+
+    def setUp(self):
+        _Service.instances = 0
+        self.container = ServiceContainer()
+
+    def test_lazy_resolution(self):
+        self.container.register("svc", _Service)
+        proxy = self.container.lazy("svc")
+
+        self.assertIsInstance(proxy, LazyService)
+        self.assertEqual(_Service.instances, 0)
+        self.assertFalse(self.container.is_resolved("svc"))
+
+        self.assertEqual(proxy.ping(), "pong")
+        self.assertEqual(proxy.value, 42)
+        self.assertIs(self.container.resolve("svc"), self.container.resolve("svc"))
+        self.assertEqual(_Service.instances, 1)
+        self.assertTrue(self.container.status()["svc"]["initialized"])
+
+    def test_import_path_factory_is_not_imported_on_register(self):
+        module = types.ModuleType("_lazy_test_module")
+        module.factory = _Service
+        self.container.register("from_path", "_lazy_test_module:factory")
+        sys.modules["_lazy_test_module"] = module
+        try:
+            self.assertEqual(_Service.instances, 0)
+            self.assertEqual(self.container.resolve("from_path").value, 42)
+        finally:
+            del sys.modules["_lazy_test_module"]
+
+    def test_optional_service_missing_dependency(self):
+        def factory():
+            raise ImportError("No module named 'weasyprint'")
+
+        self.container.register("pdf", factory, optional=True)
+        self.assertIsNone(self.container.resolve("pdf"))
+        self.assertFalse(self.container.status()["pdf"]["available"])
+        with self.assertRaises(RuntimeError):
+            self.container.lazy("pdf").generate_invoice_pdf
+
+        self.container.register("required", factory)
+        with self.assertRaises(ImportError):
+            self.container.resolve("required")
+
+    def test_warm_up_in_background(self):
+        def broken():
+            raise ConnectionError("pinecone unreachable")
+
+        self.container.register("svc", _Service)
+        self.container.register("broken", broken)
+
+        thread = self.container.warm_up()
+        thread.join(5)
+
+        status = self.container.status()
+        self.assertTrue(status["svc"]["initialized"])
+        self.assertFalse(status["broken"]["initialized"])
+        self.assertIn("unreachable", status["broken"]["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils.html_sanitizer import HTMLSanitizer
+from utils.template_engine import CompiledTemplate, TemplateEngine
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates" / "invoices"
+
+
+class TestCompiledTemplate(unittest.TestCase):
+
+    def test_single_pass_render_with_escaping(self):
+        template = CompiledTemplate("<h1>{{CLIENT_NAME}}</h1>{{CLIENT_NAME}}<table>{{SERVICE_ITEMS}}</table>{{NOTES}}")
+        html = template.render(
+            {"CLIENT_NAME": "<b>{{SERVICE_ITEMS}}</b> & Co", "SERVICE_ITEMS": "<tr><td>x</td></tr>"},
+            raw={"SERVICE_ITEMS"},
+        )
+        self.assertEqual(
+            html,
+            "<h1>&lt;b&gt;{{SERVICE_ITEMS}}&lt;/b&gt; &amp; Co</h1>&lt;b&gt;{{SERVICE_ITEMS}}&lt;/b&gt; &amp; Co"
+            "<table><tr><td>x</td></tr></table>{{NOTES}}",
+        )
+        self.assertEqual(template.placeholders, {"CLIENT_NAME", "SERVICE_ITEMS", "NOTES"})
+        self.assertEqual(CompiledTemplate("no slots").render({"X": 1}), "no slots")
+
+    def test_files_are_recompiled_only_when_changed(self):
+        engine = TemplateEngine()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "invoice.html")
+            Path(path).write_text("<p>{{INVOICE_NUMBER}}</p>")
+            first = engine.load(path)
+            self.assertIs(engine.load(path), first)
+
+            Path(path).write_text("<p>No. {{INVOICE_NUMBER}}</p>")
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+            second = engine.load(path)
+            self.assertIsNot(second, first)
+            self.assertEqual(second.render({"INVOICE_NUMBER": "INV-1"}), "<p>No. INV-1</p>")
+
+        self.assertIs(engine.compile("<p>{{STATUS}}</p>"), engine.compile("<p>{{STATUS}}</p>"))
+
+
+class TestInjectDataSafely(unittest.TestCase):
+
+    def test_matches_the_replace_loop_on_real_templates(self):
+        data = {
+            "client": {"name": "Acme <Corp>", "address": "1 Main St"},
+            "service_provider": {"name": "Provider & Sons", "email": "billing@provider.com"},
+            "payment_terms": {"amount": 2500, "frequency": "monthly"},
+            "services": [{"description": "Consulting <b>", "quantity": 2, "unit_price": 75, "total_amount": 150}],
+        }
+
+        def replace_loop(template):
+            rendered = template
+            for placeholder, value in HTMLSanitizer._create_safe_data_dict(data).items():
+                rendered = rendered.replace(f"{{{{{placeholder}}}}}", value)
+            return rendered.replace("{{SERVICE_ITEMS}}", HTMLSanitizer._generate_service_items_html(data))
+
+        for path in sorted(TEMPLATES_DIR.glob("*.html"))[:10]:
+            source = path.read_text(encoding="utf-8")
+            self.assertEqual(HTMLSanitizer.inject_data_safely(source, data), replace_loop(source), path.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
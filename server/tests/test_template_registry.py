@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from services.template_registry import TemplateRegistry, parse_invoice_template_metadata
+
+
+class TestTemplateRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.directory.name)
+        self._write("modern -invoice -template-138e88e9.html", "<p>{{PROVIDER_NAME}}</p>")
+        self._write("professional -invoice-a6b10ca4.html", "<p>professional {{CLIENT_NAME}}</p>")
+        self._write("notes.md", "not a template")
+        self.registry = TemplateRegistry(self.root, metadata_parser=parse_invoice_template_metadata,
+                                         refresh_interval=60)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, name, content, bump=0):
+        path = self.root / name
+        path.write_text(content)
+        if bump:
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump))
+
+    def test_lookup_and_listing_from_memory(self):
+        self.assertEqual([entry.id for entry in self.registry.list()],
+                         ["modern -invoice -template-138e88e9", "professional -invoice-a6b10ca4"])
+        self.assertEqual(self.registry.get("138e88e9").metadata["type"], "Business Invoice Template")
+        self.assertEqual(self.registry.get("professional -invoice-a6b10ca4").metadata["type"],
+                         "Professional Invoice Template")
+        self.assertIsNone(self.registry.get("missing"))
+
+        with patch.object(Path, "read_text", side_effect=AssertionError("read")), \
+                patch("os.scandir", side_effect=AssertionError("scan")):
+            self.assertEqual(self.registry.get_content("a6b10ca4"), "<p>professional {{CLIENT_NAME}}</p>")
+            self.assertEqual(len(self.registry.list()), 2)
+
+    def test_incremental_refresh(self):
+        first = self.registry.get("138e88e9")
+        self._write("modern -invoice -template-138e88e9.html", "<p>{{CLIENT_NAME}} v2</p>", bump=1_000_000)
+        self._write("modern -blue -invoice -template-00c1010e.html", "<p>{{STATUS}}</p>")
+        (self.root / "professional -invoice-a6b10ca4.html").unlink()
+
+        # Within the refresh interval the index is served as is
+        self.assertIs(self.registry.get("138e88e9"), first)
+
+        with patch.object(Path, "read_text", autospec=True, side_effect=Path.read_text) as read:
+            self.registry.refresh(force=True)
+        self.assertEqual(sorted(path.name for path, *_ in (call.args for call in read.call_args_list)),
+                         ["modern -blue -invoice -template-00c1010e.html", "modern -invoice -template-138e88e9.html"])
+        self.assertEqual(self.registry.get_content("138e88e9"), "<p>{{CLIENT_NAME}} v2</p>")
+        self.assertIsNone(self.registry.get("a6b10ca4"))
+        self.assertEqual(len(self.registry), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from services.template_registry import TemplateRegistry, extract_invoice_template_features
+from services.template_selection import TemplateSelector
+
+HEAD = "<p>{{INVOICE_NUMBER}} {{CLIENT_NAME}} {{PROVIDER_NAME}}</p>"
+SUMMARY_TABLE = "<table><thead><tr><th>Description</th><th>Amount</th></tr></thead><tbody>{{SERVICE_ITEMS}}</tbody></table>"
+DETAILED_TABLE = (
+    "<table><thead><tr><th>Item</th><th>Qty</th><th>Rate</th><th>Total</th></tr></thead>"
+    "<tbody>{{SERVICE_ITEMS}}</tbody></table>"
+)
+
+
+class TestTemplateSelection(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.directory.name)
+        self._write("modern -invoice-11111111.html", HEAD + SUMMARY_TABLE)
+        self._write("simple -detailed -invoice-22222222.html", HEAD + DETAILED_TABLE)
+        self._write("clean -invoice-33333333.html", "<p>{{CLIENT_NAME}}</p>")
+        self.registry = TemplateRegistry(self.root, feature_extractor=extract_invoice_template_features,
+                                         refresh_interval=60)
+        self.selector = TemplateSelector(self.registry)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, name, content):
+        (self.root / name).write_text(content)
+
+    def test_features_are_extracted_when_indexed(self):
+        features = self.registry.get("22222222").features
+        self.assertEqual((features.line_item_columns, features.style), (4, "simple"))
+        self.assertTrue(features.detailed_line_items)
+        self.assertIn("SERVICE_ITEMS", features.placeholders)
+        self.assertEqual(self.registry.get("11111111").features.line_item_columns, 2)
+        self.assertEqual(self.registry.get("33333333").features.line_item_columns, 0)
+
+    def test_selection_by_profile_and_cached_decisions(self):
+        summary = {"services": [{"description": "Retainer", "total_amount": 900}]}
+        detailed = {"contract_type": "rental_lease", "services": [{"description": "Rent"}, {"description": "Water"}]}
+
+        self.assertEqual(self.selector.select(summary).id, "modern -invoice-11111111")
+        self.assertEqual(self.selector.select(detailed).id, "simple -detailed -invoice-22222222")
+        # Style decides only between templates of the right layout
+        self.assertEqual(self.selector.select(summary, style="simple").id, "modern -invoice-11111111")
+        self.assertEqual(self.selector.select(style="simple").id, "simple -detailed -invoice-22222222")
+        # Templates without the required placeholders are never picked
+        self.assertEqual(self.selector.select(summary, style="clean").id, "modern -invoice-11111111")
+
+        # The first decision for a user, contract type and layout sticks, without touching template files
+        self.assertEqual(self.selector.select(detailed, user_id="user-1").id, "simple -detailed -invoice-22222222")
+        with patch.object(Path, "read_text", side_effect=AssertionError("read")):
+            self.assertEqual(self.selector.select(detailed, user_id="user-1").id, "simple -detailed -invoice-22222222")
+            # A summary invoice of the same contract type still gets a summary layout
+            self.assertEqual(self.selector.select(summary, user_id="user-1", contract_type="rental_lease").id,
+                             "modern -invoice-11111111")
+            self.assertEqual(self.selector.select(summary, user_id="user-1").id, "modern -invoice-11111111")
+
+        # A changed template set is re-ranked and forgets earlier decisions
+        os.remove(self.root / "simple -detailed -invoice-22222222.html")
+        self.registry.refresh(force=True)
+        self.assertEqual(self.selector.select(detailed, user_id="user-1").id, "modern -invoice-11111111")
+
+
+if __name__ == "__main__":
+    unittest.main()
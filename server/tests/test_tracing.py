@@ -0,0 +1,102 @@
+import unittest
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from utils.tracing import Tracer, OTLPFileExporter, SpanKind, _percentile
+
+
+class TestTracer(unittest.TestCase):
+    """Span trees, latency percentiles and OTLP file export"""
+
+    def setUp(self):
+        self.tmp = tempfile.NamedTemporaryFile(suffix=".jsonl", delete=False)
+        self.tmp.close()
+        self.tracer = Tracer(exporter=OTLPFileExporter(self.tmp.name))
+
+    def tearDown(self):
+        os.unlink(self.tmp.name)
+
+    def _run_workflow(self, workflow_id, fail_dependency=False):
+        async def agent():
+            with self.tracer.span("validation", SpanKind.AGENT):
+                with self.tracer.span("pinecone", attributes={"operation": "query"}):
+                    await asyncio.sleep(0)
+                with self.tracer.span("gemini"):
+                    if fail_dependency:
+                        raise RuntimeError("quota exceeded")
+
+        async def workflow():
+            with self.tracer.workflow_span(workflow_id):
+                try:
+                    await agent()
+                except RuntimeError:
+                    pass
+
+        asyncio.run(workflow())
+
+    def test_span_tree_nesting(self):
+        self._run_workflow("wf-1")
+
+        tree = self.tracer.get_trace_tree("wf-1")
+
+        self.assertEqual(tree["span_count"], 4)
+        root = tree["roots"][0]
+        self.assertEqual(root["kind"], "workflow")
+        agent = root["children"][0]
+        self.assertEqual(agent["name"], "validation")
+        self.assertEqual([child["name"] for child in agent["children"]], ["pinecone", "gemini"])
+        self.assertIsNone(self.tracer.get_trace_tree("unknown"))
+
+    def test_errors_and_resume_share_trace(self):
+        self._run_workflow("wf-2", fail_dependency=True)
+        with self.tracer.workflow_span("wf-2", "workflow_resume"):
+            pass
+
+        tree = self.tracer.get_trace_tree("wf-2")
+        self.assertEqual(len(tree["roots"]), 2)
+        gemini = tree["roots"][0]["children"][0]["children"][1]
+        self.assertEqual(gemini["status"], "error")
+        self.assertIn("quota exceeded", gemini["error"])
+
+    def test_latency_summary(self):
+        for _ in range(3):
+            self._run_workflow("wf-3")
+        # Dependency calls outside a workflow only feed the statistics
+        with self.tracer.span("gcs"):
+            pass
+
+        summary = self.tracer.latency_summary()
+        self.assertEqual(summary["agents"]["validation"]["count"], 3)
+        self.assertEqual(summary["dependencies"]["pinecone"]["count"], 3)
+        self.assertEqual(summary["dependencies"]["gcs"]["count"], 1)
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            self.assertIn(key, summary["dependencies"]["gemini"])
+
+        time.sleep(0.01)
+        self.assertEqual(self.tracer.latency_summary(window_seconds=0.001)["agents"], {})
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(_percentile(values, 50), 50)
+        self.assertEqual(_percentile(values, 95), 95)
+        self.assertEqual(_percentile(values, 99), 99)
+        self.assertEqual(_percentile([], 99), 0.0)
+
+    def test_otlp_export(self):
+        self._run_workflow("wf-4")
+
+        with open(self.tmp.name) as handle:
+            documents = [json.loads(line) for line in handle]
+
+        self.assertEqual(len(documents), 1)
+        spans = documents[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        self.assertEqual(len(spans), 4)
+        self.assertTrue(all(span["traceId"] == spans[0]["traceId"] for span in spans))
+        self.assertTrue(all(int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"]) for span in spans))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import copy
+import json
+import unittest
+from decimal import Decimal
+
+from pydantic import ValidationError
+
+from schemas.unified_invoice_schemas import UnifiedInvoiceData, UnifiedParty
+
+
+def _raw_invoice(**overrides):
+    data = {
+        "invoice_number": "INV-001",
+        "invoice_date": "2024-01-01",
+        "contract_title": "Office Lease",
+        "contract_type": "rental_lease",
+        "client": {"name": "Acme Corp", "email": "billing@acme.com", "address": "1 Main St"},
+        "service_provider": {"name": "Property Co", "email": "rent@property.co"},
+        "payment_terms": {"amount": "2500.00", "currency": "usd", "frequency": "Monthly", "due_days": 30},
+        "services": [{"description": "Rent", "quantity": 1, "unit_price": "2500", "total_amount": "2500"}],
+        "invoice_frequency": "monthly",
+        "start_date": "2024-01-01",
+    }
+    data.update(overrides)
+    return data
+
+
+class TestTrustedConstruction(unittest.TestCase):
+
+    def setUp(self):
+        self.validated = UnifiedInvoiceData(**_raw_invoice())
+        self.dump = self.validated.model_dump()
+
+    def test_trusted_matches_validated(self):
+        trusted = UnifiedInvoiceData.from_trusted(self.dump)
+        self.assertEqual(trusted.model_dump(), self.dump)
+        self.assertEqual(trusted.to_legacy_contract_invoice_data(), self.validated.to_legacy_contract_invoice_data())
+        self.assertEqual(trusted.to_correction_agent_format(), self.validated.to_correction_agent_format())
+        self.assertEqual(trusted.to_database_format(), self.validated.to_database_format())
+        self.assertEqual(trusted.to_legacy_contract_invoice_data()["contract_type"], "rental_lease")
+
+    def test_unvalidated_values_go_through_validators(self):
+        raw = copy.deepcopy(self.dump)
+        raw["payment_terms"]["amount"] = "1200.50"
+        raw["payment_terms"]["currency"] = "eur"
+        rebuilt = UnifiedInvoiceData.from_trusted(raw)
+        self.assertEqual(rebuilt.payment_terms.amount, Decimal("1200.50"))
+        self.assertEqual(rebuilt.payment_terms.currency, "EUR")
+
+        raw["client"]["email"] = "not-an-email"
+        with self.assertRaises(ValidationError):
+            UnifiedInvoiceData.from_trusted(raw)
+
+        # A JSON round trip turns Decimals and datetimes into strings
+        rebuilt = UnifiedInvoiceData.from_trusted(json.loads(self.validated.model_dump_json()))
+        self.assertIsInstance(rebuilt.payment_terms.amount, Decimal)
+
+
+class TestCachedViews(unittest.TestCase):
+
+    def setUp(self):
+        self.invoice = UnifiedInvoiceData(**_raw_invoice())
+
+    def test_views_are_cached_copies(self):
+        view = self.invoice.to_database_format()
+        view["parties"]["client"]["name"] = "Mutated"
+        self.assertEqual(self.invoice.to_database_format()["parties"]["client"]["name"], "Acme Corp")
+        self.assertIn("to_database_format", self.invoice._views)
+
+    def test_assignments_invalidate_views(self):
+        self.invoice.model_dump()
+        self.invoice.to_legacy_contract_invoice_data()
+
+        self.invoice.contract_title = "New Lease"
+        self.assertEqual(self.invoice.to_legacy_contract_invoice_data()["contract_title"], "New Lease")
+
+        self.invoice.client.name = "Renamed"
+        self.assertEqual(self.invoice.model_dump()["client"]["name"], "Renamed")
+
+        self.invoice.service_provider = UnifiedParty(name="Other Co", role="service_provider")
+        self.invoice.model_dump()
+        self.invoice.service_provider.name = "Other Co 2"
+        self.assertEqual(self.invoice.model_dump()["service_provider"]["name"], "Other Co 2")
+
+        self.invoice.services[0].description = "Parking"
+        self.assertEqual(self.invoice.to_correction_agent_format()["services_and_items"][0]["description"], "Parking")
+
+    def test_copies_do_not_share_views(self):
+        self.invoice.model_dump()
+        copied = self.invoice.model_copy(update={"contract_title": "Copy"})
+        self.assertEqual(copied.model_dump()["contract_title"], "Copy")
+        self.assertEqual(self.invoice.model_dump()["contract_title"], "Office Lease")
+
+        deep = copy.deepcopy(self.invoice)
+        deep.client.name = "Deep"
+        self.assertEqual(deep.model_dump()["client"]["name"], "Deep")
+        self.assertEqual(self.invoice.model_dump()["client"]["name"], "Acme Corp")
+
+
+if __name__ == "__main__":
+    unittest.main()
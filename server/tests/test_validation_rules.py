@@ -0,0 +1,184 @@
+import copy
+import unittest
+from unittest import mock
+
+from services.validation_service import (
+    InvoiceDataValidationService,
+    ValidationSeverity,
+)
+
+
+def _invoice(**overrides):
+    data = {
+        "invoice_number": "INV-001",
+        "invoice_date": "2024-01-01",
+        "contract_title": "Office Lease",
+        "contract_type": "rental_lease",
+        "start_date": "2024-01-01",
+        "end_date": "2024-12-31",
+        "client": {"name": "Acme Corp", "email": "billing@acme.com"},
+        "service_provider": {"name": "Property Co", "email": "rent@property.co"},
+        "payment_terms": {"amount": 2500.0, "currency": "USD", "frequency": "monthly", "due_days": 30},
+        "invoice_frequency": "monthly",
+    }
+    data.update(overrides)
+    return data
+
+
+class _Dumped:
+    """Stand-in for UnifiedInvoiceData - only ``model_dump`` is used"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def model_dump(self):
+        return self.data
+
+
+def _issue_keys(issues):
+    return [(issue.field_name, issue.issue_type, issue.severity, issue.suggested_value) for issue in issues]
+
+
+class TestCompiledRuleSet(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service = InvoiceDataValidationService()
+
+    def test_valid_invoice_has_no_field_issues(self):
+        issues, missing, score = self.service.compiled_rules.evaluate(_invoice())
+        self.assertEqual(issues, [])
+        self.assertEqual(missing, [])
+        self.assertEqual(score, 1.0)
+
+    def test_field_checks(self):
+        data = _invoice(
+            client={"name": "", "email": "not-an-email"},
+            payment_terms={"amount": -5, "currency": "USD", "frequency": "monthy", "due_days": "soon"},
+            start_date="not a date",
+        )
+        issues, missing, score = self.service.compiled_rules.evaluate(data)
+        keys = {key[:2]: key for key in _issue_keys(issues)}
+
+        self.assertEqual(missing, ["client.name"])
+        self.assertEqual(keys[("client.email", "invalid_format")][2], ValidationSeverity.WARNING)
+        self.assertEqual(keys[("payment_terms.amount", "value_too_low")][2], ValidationSeverity.WARNING)
+        self.assertEqual(keys[("payment_terms.frequency", "invalid_value")][3], "monthly")
+        self.assertIn(("payment_terms.due_days", "invalid_type"), keys)
+        self.assertIn(("start_date", "invalid_date_format"), keys)
+        self.assertLess(score, 0.6)
+
+    def test_close_allowed_values_do_not_need_human_input(self):
+        rules = {rule.field_path: rule for rule in self.service.compiled_rules.rules}
+
+        issue = rules["payment_terms.frequency"].check("quarterley")
+        self.assertEqual(issue.suggested_value, "quarterly")
+        self.assertFalse(issue.requires_human_input)
+        self.assertEqual(issue.suggestions[0]["value"], "quarterly")
+
+        issue = rules["payment_terms.currency"].check("Rupees")
+        self.assertTrue(issue.requires_human_input)
+        self.assertEqual(issue.severity, ValidationSeverity.ERROR)
+
+    def test_lenient_rules_skip_strict_format_checks(self):
+        data = _invoice(client={"name": "Acme Corp", "email": "billing@acme"}, start_date="   ")
+        strict, _, _ = self.service.compiled_rules.evaluate(data)
+        lenient, _, _ = self.service.compiled_lenient_rules.evaluate(data)
+
+        self.assertEqual(sorted(issue.field_name for issue in strict), ["client.email", "start_date"])
+        self.assertEqual(lenient, [])
+
+    def test_evaluate_many_matches_evaluate(self):
+        invoices = [
+            _invoice(),
+            _invoice(payment_terms={"amount": 0, "currency": "usd", "frequency": "monthy"}),
+            _invoice(payment_terms={"amount": 0, "currency": "usd", "frequency": "monthy"}),
+            _invoice(client={"name": "Acme Corp", "email": "x@"}, invoice_date=None),
+        ]
+        batched = self.service.compiled_rules.evaluate_many(invoices)
+        for data, (issues, missing, score) in zip(invoices, batched):
+            expected_issues, expected_missing, expected_score = self.service.compiled_rules.evaluate(data)
+            self.assertEqual(_issue_keys(issues), _issue_keys(expected_issues))
+            self.assertEqual(missing, expected_missing)
+            self.assertAlmostEqual(score, expected_score)
+
+        # Memoized issues are copied so per-invoice edits don't leak across invoices
+        first = [issue for issue in batched[1][0] if issue.field_name == "payment_terms.frequency"][0]
+        second = [issue for issue in batched[2][0] if issue.field_name == "payment_terms.frequency"][0]
+        self.assertIsNot(first, second)
+
+    def test_batch_matches_single_validation(self):
+        invoices = [_invoice(), _invoice(client={"name": "Property Co"}), _invoice(payment_terms=None)]
+        results = self.service.validate_unified_invoice_batch(invoices, "user-1")
+        self.assertEqual(len(results), 3)
+        for data, result in zip(invoices, results):
+            single = self.service.validate_unified_invoice_data(_Dumped(data), "user-1", "contract")
+            self.assertEqual(_issue_keys(result.issues), _issue_keys(single.issues))
+            self.assertEqual(result.confidence_score, single.confidence_score)
+        self.assertTrue(results[0].is_valid)
+        self.assertIn("duplicate_entity", [issue.issue_type for issue in results[1].issues])
+        self.assertFalse(results[2].is_valid)
+        self.assertTrue(results[2].human_input_required)
+
+
+class TestIncrementalRevalidation(unittest.TestCase):
+
+    def setUp(self):
+        self.service = InvoiceDataValidationService()
+
+    def _corrected(self, data, corrections):
+        corrected = copy.deepcopy(data)
+        for path, value in corrections.items():
+            parent, _, key = path.partition(".")
+            corrected[parent][key] = value
+        return corrected
+
+    def test_matches_full_validation_after_corrections(self):
+        data = _invoice(
+            client={"name": "", "email": "bad"},
+            payment_terms={"amount": 2500.0, "currency": "XYZ", "frequency": "monthy", "due_days": 30},
+        )
+        first = self.service.validate_unified_invoice_data(_Dumped(data), "user-1", "contract")
+        self.assertTrue(first.human_input_required)
+
+        for corrections in ({"client.name": "Property Co"}, {"payment_terms.currency": "USD"},
+                            {"payment_terms.amount": 90000.0, "client.email": "a@b.com"}):
+            corrected = self._corrected(data, corrections)
+            incremental = self.service.revalidate_changed_fields(
+                _Dumped(corrected), "user-1", "contract", list(corrections), first.rule_snapshot)
+            full = self.service.validate_unified_invoice_data(_Dumped(corrected), "user-1", "contract")
+            self.assertEqual(_issue_keys(incremental.issues), _issue_keys(full.issues))
+            self.assertEqual(incremental.missing_required_fields, full.missing_required_fields)
+            self.assertAlmostEqual(incremental.validation_score, full.validation_score)
+            self.assertEqual(incremental.confidence_score, full.confidence_score)
+            self.assertEqual(incremental.human_input_required, full.human_input_required)
+
+    def test_only_dependent_rules_run(self):
+        first = self.service.validate_unified_invoice_data(_Dumped(_invoice()), "user-1", "contract")
+        corrected = self._corrected(_invoice(), {"payment_terms.currency": "EUR"})
+        rule_set = self.service.compiled_rules
+        with mock.patch.object(rule_set, "outcome", wraps=rule_set.outcome) as outcome, \
+                mock.patch.object(self.service, "_check_distinct_parties", return_value=[]) as distinct:
+            result = self.service.revalidate_changed_fields(
+                _Dumped(corrected), "user-1", "contract", ["payment_terms.currency"], first.rule_snapshot)
+        self.assertEqual([call.args[0].field_path for call in outcome.call_args_list], ["payment_terms.currency"])
+        distinct.assert_not_called()
+        self.assertTrue(result.is_valid)
+
+    def test_unlisted_value_changes_and_stale_snapshots(self):
+        first = self.service.validate_unified_invoice_data(_Dumped(_invoice()), "user-1", "contract")
+        # A field changed without being reported is still re-checked
+        corrected = self._corrected(_invoice(), {"client.name": ""})
+        result = self.service.revalidate_changed_fields(_Dumped(corrected), "user-1", "contract", [], first.rule_snapshot)
+        self.assertEqual(result.missing_required_fields, ["client.name"])
+
+        # Snapshots from other rule definitions fall back to a full validation
+        self.service.required_fields["client.name"]["validation_rules"]["min_length"] = 3
+        self.service._compile_rules()
+        with mock.patch.object(self.service, "validate_unified_invoice_data", wraps=self.service.validate_unified_invoice_data) as full:
+            self.service.revalidate_changed_fields(_Dumped(_invoice()), "user-1", "contract", [], first.rule_snapshot)
+        full.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
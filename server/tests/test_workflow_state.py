@@ -0,0 +1,154 @@
+import json
+import unittest
+import pickle
+
+from fastapi.encoders import jsonable_encoder
+
+from adk_agents.workflow_state import (
+    WorkflowState,
+    InvoiceVersionHistory,
+    diff_invoice_data,
+    apply_invoice_delta,
+    json_default,
+)
+
+
+def _invoice(amount, client="Acme Corp"):
+    return {
+        "client": {"name": client, "email": "billing@acme.test"},
+        "payment_terms": {"amount": amount, "currency": "INR", "frequency": "monthly"},
+        "metadata": {"workflow_id": "wf-1"},
+    }
+
+
+class TestInvoiceDeltas(unittest.TestCase):
+    """Delta encoding used by the invoice version history"""
+
+    def test_roundtrip(self):
+        old = _invoice(1000)
+        new = _invoice(1200, client="Acme Ltd")
+        new["notes"] = "late fee applies"
+        del new["metadata"]
+
+        delta = diff_invoice_data(old, new)
+
+        self.assertEqual(apply_invoice_delta(old, delta), new)
+        self.assertEqual(set(delta), {"client", "payment_terms", "notes", "metadata"})
+
+    def test_unchanged_values_are_shared(self):
+        old = _invoice(1000)
+        new = dict(old)
+        new["payment_terms"] = dict(old["payment_terms"], amount=1500)
+
+        rebuilt = apply_invoice_delta(old, diff_invoice_data(old, new))
+
+        self.assertIs(rebuilt["client"], old["client"])
+        self.assertEqual(rebuilt["payment_terms"]["amount"], 1500)
+
+
+class TestInvoiceVersionHistory(unittest.TestCase):
+
+    def test_materializes_every_version(self):
+        versions = [_invoice(1000 + i * 100) for i in range(20)]
+        history = InvoiceVersionHistory(keyframe_interval=4)
+        for i, data in enumerate(versions):
+            history.append({"data": data, "version": i, "source_agent": f"agent_{i}"})
+
+        self.assertEqual(len(history), 20)
+        for i, data in enumerate(versions):
+            self.assertEqual(history[i]["data"], data)
+            self.assertEqual(history[i]["version"], i)
+        self.assertEqual(history[-1]["data"], versions[-1])
+        self.assertEqual([entry["version"] for entry in history], list(range(20)))
+
+    def test_accepts_legacy_list(self):
+        entries = [{"data": _invoice(1), "version": 0}, {"data": _invoice(2), "version": 1}]
+        history = InvoiceVersionHistory(entries)
+        self.assertEqual(history.to_list()[1]["data"], entries[1]["data"])
+
+
+class TestWorkflowState(unittest.TestCase):
+
+    def _state(self):
+        return WorkflowState({
+            "workflow_id": "wf-1",
+            "user_id": "user-1",
+            "contract_name": "Lease",
+            "current_invoice_data": None,
+            "data_version": 0,
+            "invoice_data_history": [],
+            "unified_invoice_data": None,
+            "invoice_data": None,
+            "processing_status": "pending",
+        })
+
+    def test_dict_interface(self):
+        state = self._state()
+        state["custom_flag"] = True
+
+        self.assertEqual(state["workflow_id"], "wf-1")
+        self.assertTrue(state.get("custom_flag"))
+        self.assertIsNone(state.get("missing"))
+        self.assertIn("custom_flag", state)
+        self.assertNotIn("missing", state)
+        self.assertEqual(len(state), len(list(state)))
+
+        state.update(state)
+        state.setdefault("errors", []).append({"error": "x"})
+        self.assertEqual(state["errors"], [{"error": "x"}])
+
+        del state["custom_flag"]
+        self.assertNotIn("custom_flag", state)
+
+    def test_record_invoice_data_versions_and_views(self):
+        state = self._state()
+        first, second = _invoice(1000), _invoice(2000)
+
+        state.record_invoice_data(first, "contract_processing_agent", "t1")
+        state.record_invoice_data(second, "correction_agent", "t2")
+
+        self.assertEqual(state["data_version"], 2)
+        self.assertEqual(len(state["invoice_data_history"]), 1)
+        self.assertEqual(state["invoice_data_history"][0]["data"], first)
+        self.assertEqual(state["invoice_data"], second)
+
+        # Legacy keys are separate copies, and in-place edits never reach archived versions
+        state["unified_invoice_data"]["notes"] = "edited"
+        state["current_invoice_data"]["payment_terms"]["amount"] = 1
+        state.record_invoice_data(_invoice(3000), "ui_generation_agent", "t3")
+        self.assertNotIn("notes", state["current_invoice_data"])
+        self.assertEqual(state["invoice_data_history"][1]["data"]["payment_terms"]["amount"], 1)
+        second["payment_terms"]["amount"] = 2
+        self.assertEqual(state["invoice_data_history"][1]["data"]["payment_terms"]["amount"], 1)
+        self.assertEqual(state["invoice_data_history"][0]["data"], first)
+        self.assertEqual(state["unified_invoice_data"], _invoice(3000))
+
+        # Explicit assignment detaches a legacy view
+        state["invoice_data"] = {"invoice_response": {}}
+        self.assertEqual(state["invoice_data"], {"invoice_response": {}})
+        self.assertEqual(state["unified_invoice_data"], _invoice(3000))
+
+    def test_copy_and_serialization(self):
+        state = self._state()
+        state.record_invoice_data(_invoice(1000), "contract_processing_agent", "t1")
+        state.record_invoice_data(_invoice(1100), "validation_agent", "t2")
+
+        clone = state.copy()
+        clone["processing_status"] = "success"
+        self.assertEqual(state["processing_status"], "pending")
+
+        exported = state.to_dict()
+        self.assertIsInstance(exported["invoice_data_history"], list)
+        self.assertEqual(exported["unified_invoice_data"], _invoice(1100))
+        self.assertNotIn("invoice_data_history", state.to_dict(include_history=False))
+
+        self.assertEqual(json.loads(json.dumps(state, default=json_default)), json.loads(json.dumps(exported)))
+        self.assertEqual(jsonable_encoder({"state": state})["state"]["invoice_data_history"][0]["data"], _invoice(1000))
+
+        restored = pickle.loads(pickle.dumps(state))
+        self.assertEqual(restored.to_dict(), exported)
+        self.assertEqual(WorkflowState.from_dict(exported)["invoice_data_history"][0]["data"], _invoice(1000))
+
+
+if __name__ == "__main__":
+    unittest.main()
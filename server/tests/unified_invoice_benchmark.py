@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+UnifiedInvoiceData Conversion Benchmark
+
+Measures conversions per second for the ways agents move invoices between
+dicts, models and derived formats:
+
+- construction with full validation, from raw extraction output and from a
+  ``model_dump()`` held in workflow state
+- ``UnifiedInvoiceData.from_trusted`` on the same dump
+- ``model_dump``, ``to_legacy_contract_invoice_data``, ``to_correction_agent_format``
+  and ``to_database_format``, both rebuilt every call ("cold", as before
+  caching) and served from the per-instance view cache
+
+Invoices are realistic extraction results (two parties with emails, payment
+terms, several line items). Results are printed as JSON:
+
+    python tests/unified_invoice_benchmark.py --invoices 2000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from schemas.unified_invoice_schemas import UnifiedInvoiceData  # noqa: E402
+
+VIEWS = ("model_dump", "to_legacy_contract_invoice_data", "to_correction_agent_format", "to_database_format")
+
+
+def build_raw_invoices(count, seed=11):
+    rnd = random.Random(seed)
+    invoices = []
+    for index in range(count):
+        items = rnd.randint(1, 8)
+        unit_price = rnd.choice(["250.00", "1200", "99.5", "4500.75"])
+        invoices.append({
+            "invoice_number": f"INV-{index:06d}",
+            "invoice_date": "2024-03-01",
+            "due_date": "2024-03-31",
+            "contract_title": f"Service Agreement {index % 300}",
+            "contract_type": rnd.choice(["service_agreement", "rental_lease", "consulting", "maintenance"]),
+            "client": {
+                "name": f"Client {index % 1000} Ltd",
+                "email": f"accounts{index % 1000}@client{index % 97}.com",
+                "address": f"{index % 200} Market Street",
+                "phone": "+1 555 0100",
+            },
+            "service_provider": {
+                "name": f"Provider {index % 40} LLC",
+                "email": f"billing@provider{index % 40}.com",
+                "tax_id": f"TAX-{index % 40:04d}",
+            },
+            "start_date": "2024-01-01",
+            "end_date": "2024-12-31",
+            "payment_terms": {
+                "amount": unit_price,
+                "currency": rnd.choice(["USD", "usd", "EUR", "GBP"]),
+                "frequency": rnd.choice(["monthly", "Monthly", "quarterly"]),
+                "due_days": rnd.choice([15, 30]),
+                "late_fee": rnd.choice([None, "25.00"]),
+            },
+            "services": [
+                {"description": f"Service line {line}", "quantity": 1, "unit_price": unit_price, "total_amount": unit_price}
+                for line in range(items)
+            ],
+            "invoice_frequency": "monthly",
+            "notes": "Generated from contract",
+        })
+    return invoices
+
+
+def measure(label, fn, items):
+    started = time.perf_counter()
+    for item in items:
+        fn(item)
+    seconds = time.perf_counter() - started
+    return {"mode": label, "seconds": round(seconds, 3), "conversions_per_second": round(len(items) / seconds, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure UnifiedInvoiceData conversion throughput")
+    parser.add_argument("--invoices", type=int, default=2000, help="Number of synthetic invoices")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    raw = build_raw_invoices(args.invoices)
+    models = [UnifiedInvoiceData(**data) for data in raw]
+    dumps = [model.model_dump() for model in models]
+
+    results = [
+        measure("validate_raw", lambda data: UnifiedInvoiceData(**data), raw),
+        measure("validate_dump", lambda data: UnifiedInvoiceData(**data), dumps),
+        measure("from_trusted", UnifiedInvoiceData.from_trusted, dumps),
+    ]
+
+    def cold(view):
+        def convert(model):
+            model.invalidate_views()
+            return getattr(model, view)()
+        return convert
+
+    for view in VIEWS:
+        results.append(measure(f"{view}_cold", cold(view), models))
+        results.append(measure(f"{view}_cached", lambda model, view=view: getattr(model, view)(), models))
+
+    print(json.dumps({"invoices": args.invoices, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Cross-workflow request batching
+
+When many ADK workflows run side by side (batch onboarding of a contract
+portfolio) each one embeds its own chunks and queries, and each one calls
+Gemini on its own. ``MicroBatcher`` coalesces concurrent embedding requests
+from different worker threads into a single Vertex AI call, and
+``ConcurrencyGate`` caps how many Gemini calls the whole batch keeps in flight
+so a large portfolio does not trip the per-project quota.
+
+Both only apply to calls made inside a ``shared_batching()`` block. The block
+is scoped with a context variable, so it covers the batch's own asyncio tasks
+and the worker threads they start with ``asyncio.to_thread``, while an
+interactive workflow running at the same time keeps calling the SDKs directly
+with no added latency. Their waits block the calling thread, so calls made
+on an event loop thread always bypass them.
+"""
+
+import asyncio
+import contextvars
+import os
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+_in_shared_batch: contextvars.ContextVar[bool] = contextvars.ContextVar("in_shared_batch", default=False)
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class _PendingRequest:
+    __slots__ = ("items", "done", "result", "error")
+
+    def __init__(self, items: Sequence[Any]):
+        self.items = items
+        self.done = threading.Event()
+        self.result: Optional[List[Any]] = None
+        self.error: Optional[BaseException] = None
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent list-in/list-out calls into shared batch calls
+
+    The first caller to arrive becomes the leader: it waits up to ``max_wait``
+    seconds (or until ``max_batch_size`` items are queued), takes everything that
+    arrived in the meantime, calls ``batch_fn`` once per ``max_batch_size`` slice
+    and hands each caller its own slice of the results. Followers just wait.
+    """
+
+    def __init__(self, name: str, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 250, max_wait: float = 0.05):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._full = threading.Event()
+        self._queue: List[_PendingRequest] = []
+        self._queued_items = 0
+        self._leader_active = False
+        self._active = 0
+        self._requests = 0
+        self._items = 0
+        self._batches = 0
+
+    @property
+    def active(self) -> bool:
+        """Whether calls from the current context are coalesced"""
+        return (self._active > 0 or _in_shared_batch.get()) and not _on_event_loop()
+
+    def activate(self) -> None:
+        """Coalesce calls from every context (standalone use; batches use ``shared_batching()``)"""
+        with self._lock:
+            self._active += 1
+
+    def deactivate(self) -> None:
+        with self._lock:
+            self._active = max(0, self._active - 1)
+
+    def submit(self, items: Sequence[Any]) -> List[Any]:
+        """Process ``items`` (possibly together with other callers' items) and return their results"""
+        if not self.active:
+            return self.batch_fn(list(items))
+
+        request = _PendingRequest(items)
+        with self._lock:
+            self._queue.append(request)
+            self._queued_items += len(items)
+            self._requests += 1
+            is_leader = not self._leader_active
+            if is_leader:
+                self._leader_active = True
+            if self._queued_items >= self.max_batch_size:
+                self._full.set()
+
+        if is_leader:
+            self._full.wait(self.max_wait)
+            with self._lock:
+                taken, self._queue = self._queue, []
+                self._queued_items = 0
+                self._leader_active = False
+                self._full.clear()
+            self._run(taken)
+
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _run(self, requests: List[_PendingRequest]) -> None:
+        flat: List[Any] = [item for request in requests for item in request.items]
+        try:
+            results: List[Any] = []
+            for start in range(0, len(flat), self.max_batch_size):
+                results.extend(self.batch_fn(flat[start:start + self.max_batch_size]))
+                with self._lock:
+                    self._batches += 1
+            with self._lock:
+                self._items += len(flat)
+            if len(requests) > 1:
+                logger.info(f"📦 {self.name}: coalesced {len(requests)} requests ({len(flat)} items)")
+            offset = 0
+            for request in requests:
+                request.result = results[offset:offset + len(request.items)]
+                offset += len(request.items)
+        except BaseException as e:
+            for request in requests:
+                request.error = e
+        finally:
+            for request in requests:
+                request.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "items": self._items,
+                "batches": self._batches,
+                "avg_items_per_batch": round(self._items / self._batches, 2) if self._batches else 0.0,
+            }
+
+
+class ConcurrencyGate:
+    """Bound the number of in-flight calls to a dependency while a batch is running"""
+
+    def __init__(self, name: str, max_concurrency: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._in_flight = 0
+        self._calls = 0
+        self._waited_seconds = 0.0
+
+    @property
+    def active(self) -> bool:
+        """Whether calls from the current context are gated"""
+        return (self._active > 0 or _in_shared_batch.get()) and not _on_event_loop()
+
+    def activate(self) -> None:
+        """Gate calls from every context (standalone use; batches use ``shared_batching()``)"""
+        with self._lock:
+            self._active += 1
+
+    def deactivate(self) -> None:
+        with self._lock:
+            self._active = max(0, self._active - 1)
+
+    @contextmanager
+    def slot(self):
+        if not self.active:
+            yield
+            return
+        started = time.monotonic()
+        with self._semaphore:
+            with self._lock:
+                self._in_flight += 1
+                self._calls += 1
+                self._waited_seconds += time.monotonic() - started
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "calls": self._calls,
+                "avg_wait_ms": round(self._waited_seconds / self._calls * 1000, 2) if self._calls else 0.0,
+            }
+
+
+_embedding_batcher: Optional[MicroBatcher] = None
+_llm_gate: Optional[ConcurrencyGate] = None
+_init_lock = threading.Lock()
+
+
+def get_embedding_batcher() -> MicroBatcher:
+    """Shared batcher for Vertex AI text embeddings (250 inputs per request limit)"""
+    global _embedding_batcher
+    with _init_lock:
+        if _embedding_batcher is None:
+            from models.llm.embedding import get_embedding_service
+
+            def embed_batch(texts: List[str]) -> List[List[float]]:
+                return get_embedding_service().embed_batch(texts)
+
+            _embedding_batcher = MicroBatcher(
+                "embedding",
+                embed_batch,
+                max_batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "250")),
+                max_wait=float(os.getenv("EMBEDDING_BATCH_WAIT_SECONDS", "0.05")),
+            )
+        return _embedding_batcher
+
+
+def get_llm_gate() -> ConcurrencyGate:
+    """Shared cap on concurrent Gemini calls during batch processing"""
+    global _llm_gate
+    with _init_lock:
+        if _llm_gate is None:
+            _llm_gate = ConcurrencyGate("gemini", int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")))
+        return _llm_gate
+
+
+@contextmanager
+def shared_batching():
+    """
+    Enable embedding coalescing and the Gemini concurrency cap for calls made
+    in the current context (and tasks and threads started from it) until the
+    block exits
+    """
+    get_embedding_batcher()
+    get_llm_gate()
+    token = _in_shared_batch.set(True)
+    try:
+        yield
+    finally:
+        _in_shared_batch.reset(token)
+
+
+def batching_stats() -> Dict[str, Any]:
+    """Stats for batch progress reporting"""
+    return {
+        "embedding": _embedding_batcher.stats() if _embedding_batcher else None,
+        "gemini": _llm_gate.stats() if _llm_gate else None,
+    }
@@ -0,0 +1,164 @@
+"""
+Fuzzy matching of free-text values against small allowed-value vocabularies
+
+LLM extraction often returns near-misses for enum-like fields ("montly",
+"Bi-Annual", "usd "). ``FuzzyMatchIndex`` is built once per allowed-value set
+and answers top-k suggestions with a similarity score in [0, 1]:
+
+- values are normalized (case, whitespace, ``-`` and ``_`` separators)
+  so formatting differences are exact matches
+- candidates come from a BK-tree keyed on Levenshtein distance, so only
+  values within the search radius are compared (the tree relies on the
+  triangle inequality, which is why transpositions are not given a
+  discount)
+- results are memoized per query, since messy values repeat across invoices
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+_SEPARATORS_RE = re.compile(r"[\s\-_]+")
+
+
+def normalize(value: str) -> str:
+    """Case- and separator-insensitive form used for matching"""
+    return _SEPARATORS_RE.sub("", value.strip().lower())
+
+
+def edit_distance(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """
+    Levenshtein distance between ``a`` and ``b``
+
+    With ``max_distance`` the result is capped at ``max_distance + 1`` and the
+    computation stops as soon as that cap is certain.
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+    if not b:
+        return len(a) if max_distance is None else min(len(a), max_distance + 1)
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j, char_b in enumerate(b, 1):
+            cost = 0 if char_a == char_b else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if max_distance is not None and row_min > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1] if max_distance is None else min(previous[-1], max_distance + 1)
+
+
+def similarity(a: str, b: str) -> float:
+    """Normalized edit similarity: 1.0 for equal values after ``normalize``, 0.0 for nothing in common"""
+    a, b = normalize(a), normalize(b)
+    longest = max(len(a), len(b))
+    if not longest:
+        return 1.0
+    return 1.0 - edit_distance(a, b) / longest
+
+
+class BKTree:
+    """Burkhard-Keller tree over ``edit_distance`` for radius queries"""
+
+    __slots__ = ("_root",)
+
+    def __init__(self, words: Sequence[str] = ()):
+        # Node: (word, {distance: child node})
+        self._root: Optional[Tuple[str, Dict[int, tuple]]] = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        if self._root is None:
+            self._root = (word, {})
+            return
+        node = self._root
+        while True:
+            distance = edit_distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, query: str, max_distance: int) -> List[Tuple[int, str]]:
+        """Every word within ``max_distance`` of ``query`` as (distance, word), closest first"""
+        if self._root is None:
+            return []
+        matches = []
+        pending = [self._root]
+        while pending:
+            word, children = pending.pop()
+            distance = edit_distance(query, word)
+            if distance <= max_distance:
+                matches.append((distance, word))
+            low, high = distance - max_distance, distance + max_distance
+            pending.extend(child for edge, child in children.items() if low <= edge <= high)
+        matches.sort()
+        return matches
+
+
+class FuzzyMatchIndex:
+    """
+    Top-k fuzzy lookup over one allowed-value set
+
+    Args:
+        values: Allowed values; suggestions are returned in their original spelling
+        cache_size: Memoized distinct queries
+    """
+
+    def __init__(self, values: Sequence[str], cache_size: int = 1024):
+        self.values = list(values)
+        self._originals: Dict[str, str] = {}
+        for value in self.values:
+            self._originals.setdefault(normalize(value), value)
+        self._tree = BKTree(list(self._originals))
+        self.suggest = lru_cache(maxsize=cache_size)(self._suggest)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __contains__(self, value: str) -> bool:
+        return normalize(value) in self._originals
+
+    def _suggest(self, query: str, k: int = 3, min_score: float = 0.0) -> Tuple[Tuple[str, float], ...]:
+        """
+        Up to ``k`` (allowed value, score) pairs with score >= ``min_score``, best first
+
+        Score is ``1 - distance / max(len(query), len(value))`` on normalized
+        values; ties keep the order of the allowed values.
+        """
+        key = normalize(query)
+        if not self._originals:
+            return ()
+        if key in self._originals:
+            return ((self._originals[key], 1.0),)
+
+        # The longest allowed value bounds the distance that can still reach min_score
+        longest = max(len(key), max(len(value) for value in self._originals))
+        radius = max(1, int(longest * (1.0 - min_score)))
+        scored = []
+        for distance, value in self._tree.search(key, radius):
+            score = 1.0 - distance / max(len(key), len(value), 1)
+            if score >= min_score:
+                scored.append((value, score))
+        order = {value: position for position, value in enumerate(self._originals)}
+        scored.sort(key=lambda item: (-item[1], order[item[0]]))
+        return tuple((self._originals[value], round(score, 4)) for value, score in scored[:k])
+
+    def best(self, query: str) -> Tuple[Optional[str], float]:
+        """Single best (allowed value, score), or (None, 0.0) for an empty index"""
+        matches = self.suggest(query, 1)
+        return matches[0] if matches else (None, 0.0)
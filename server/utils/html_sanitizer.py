@@ -1,10 +1,87 @@
+"""
+HTML template sanitizer
+
+Templates are sanitized in a single pass over a tokenizer: each tag, text
+run, comment and declaration is visited once, and the tag/attribute
+allowlist, the removal of scripts, event handlers and dangerous URLs or CSS,
+placeholder validation and the structure checks of ``TemplateValidator`` all
+happen during that pass. Results are memoized by template text, so an
+unchanged template (as served by the template registry) is scanned once,
+however often it is previewed, rendered or validated.
+
+``scripts/sanitizer_benchmark.py`` compares it with the previous
+multi-regex pipeline.
+"""
+
 import re
 import html
-from typing import Dict, Any, List
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, FrozenSet, List, Tuple
 import logging
 
+from utils.line_items import DETAILED_COLUMNS, EMPTY_ROWS, render_line_items
+from utils.template_engine import PLACEHOLDER_RE, get_template_engine
+
 logger = logging.getLogger(__name__)
 
+# Memoized template scans (distinct template texts)
+TEMPLATE_SCAN_CACHE_SIZE = 256
+
+# One token per match: comment, declaration, processing instruction, end tag or start tag
+_TOKEN_RE = re.compile(
+    r'<!--.*?(?:-->|\Z)'
+    r'|<![^>]*>'
+    r'|<\?[^>]*>'
+    r'|</([a-zA-Z][a-zA-Z0-9:-]*)[^>]*>'
+    r'|<([a-zA-Z][a-zA-Z0-9:-]*)((?:[\s/](?:[^>"\']|"[^"]*"|\'[^\']*\')*)?)>',
+    re.DOTALL,
+)
+_ATTR_RE = re.compile(r'([^\s"\'>/=]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+)))?')
+
+# Dangerous CSS that could be used for attacks (style attributes and <style> blocks)
+_DANGEROUS_CSS_RE = re.compile(
+    r'expression\s*\(|javascript:|vbscript:|@import|behavior\s*:|-moz-binding|-webkit-binding|binding\s*:',
+    re.IGNORECASE,
+)
+_URL_NOISE_RE = re.compile(r'[\s\x00-\x1f]+')
+_DANGEROUS_URL_SCHEMES = ('javascript:', 'vbscript:', 'data:text/html')
+
+# Disallowed elements removed together with their content
+_DROPPED_ELEMENTS = frozenset({
+    'script', 'iframe', 'object', 'embed', 'applet', 'frame', 'frameset', 'noscript',
+    'noembed', 'noframes', 'template', 'svg', 'math', 'form', 'button', 'select', 'textarea',
+})
+# ... of which these hold raw text, so an unclosed one runs to the end of the document
+_RAW_TEXT_ELEMENTS = frozenset({
+    'script', 'iframe', 'noscript', 'noembed', 'noframes', 'textarea', 'xmp',
+})
+# Elements whose presence makes a template unsafe (rather than just not allowed)
+_DANGEROUS_ELEMENTS = frozenset({
+    'script', 'iframe', 'object', 'embed', 'applet', 'frame', 'frameset', 'base',
+})
+
+
+@lru_cache(maxsize=64)
+def _closing_tag_re(name: str) -> "re.Pattern":
+    return re.compile(rf'</{re.escape(name)}\s*>', re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class TemplateScan:
+    """Outcome of one sanitizing pass over a template"""
+    html: str
+    placeholders: FrozenSet[str]
+    unexpected_placeholders: FrozenSet[str]
+    removed: Tuple[str, ...]
+    dangerous: Tuple[str, ...]
+    structure_errors: Tuple[str, ...]
+
+    @property
+    def safe(self) -> bool:
+        return not self.dangerous
+
+
 class HTMLSanitizer:
     """Utility class for sanitizing HTML templates and preventing XSS attacks"""
     
@@ -12,13 +89,17 @@ class HTMLSanitizer:
     ALLOWED_TAGS = {
         'html', 'head', 'title', 'meta', 'style', 'body',
         'div', 'span', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
-        'table', 'thead', 'tbody', 'tr', 'th', 'td',
-        'ul', 'ol', 'li', 'br', 'hr', 'strong', 'b', 'em', 'i',
+        'table', 'thead', 'tbody', 'tfoot', 'tr', 'th', 'td', 'caption',
+        'ul', 'ol', 'li', 'br', 'hr', 'strong', 'b', 'em', 'i', 'small',
+        'address', 'header', 'footer', 'section',
         'img', 'a'
     }
     
-    # Allowed attributes for specific tags
+    # Allowed attributes for specific tags (tags not listed take no attributes)
     ALLOWED_ATTRIBUTES = {
+        'html': ['lang'],
+        'body': ['class', 'style'],
+        'style': ['type', 'media'],
         'div': ['class', 'id', 'style'],
         'span': ['class', 'id', 'style'],
         'p': ['class', 'id', 'style'],
@@ -26,30 +107,35 @@ class HTMLSanitizer:
         'h3': ['class', 'id', 'style'], 'h4': ['class', 'id', 'style'],
         'h5': ['class', 'id', 'style'], 'h6': ['class', 'id', 'style'],
         'table': ['class', 'id', 'style'], 'thead': ['class', 'id', 'style'],
-        'tbody': ['class', 'id', 'style'], 'tr': ['class', 'id', 'style'],
-        'th': ['class', 'id', 'style'], 'td': ['class', 'id', 'style'],
+        'tbody': ['class', 'id', 'style'], 'tfoot': ['class', 'id', 'style'],
+        'tr': ['class', 'id', 'style'],
+        'th': ['class', 'id', 'style', 'colspan', 'rowspan'],
+        'td': ['class', 'id', 'style', 'colspan', 'rowspan'],
+        'caption': ['class', 'style'],
         'ul': ['class', 'id', 'style'], 'ol': ['class', 'id', 'style'],
         'li': ['class', 'id', 'style'],
+        'small': ['class', 'style'],
+        'address': ['class', 'style'], 'header': ['class', 'id', 'style'],
+        'footer': ['class', 'id', 'style'], 'section': ['class', 'id', 'style'],
         'img': ['src', 'alt', 'class', 'style', 'width', 'height'],
         'a': ['href', 'class', 'style'],
         'meta': ['charset', 'name', 'content']
     }
     
-    # Dangerous patterns that should be removed
-    DANGEROUS_PATTERNS = [
-        r'javascript:',
-        r'data:text/html',
-        r'vbscript:',
-        r'on\w+\s*=',  # Event handlers like onclick, onload, etc.
-        r'<script[^>]*>.*?</script>',
-        r'<iframe[^>]*>.*?</iframe>',
-        r'<object[^>]*>.*?</object>',
-        r'<embed[^>]*>.*?</embed>',
-        r'<form[^>]*>.*?</form>',
-        r'<input[^>]*>',
-        r'<button[^>]*>.*?</button>',
-        r'<link[^>]*>'
-    ]
+    # Placeholders filled with HTML fragments built (and escaped) by this class
+    RAW_PLACEHOLDERS = frozenset({'SERVICE_ITEMS'})
+    
+    # Placeholders filled by inject_data_safely
+    EXPECTED_PLACEHOLDERS = frozenset({
+        'PROVIDER_NAME', 'CLIENT_NAME', 'INVOICE_NUMBER', 'INVOICE_DATE',
+        'DUE_DATE', 'TOTAL_AMOUNT', 'SERVICE_ITEMS', 'PAYMENT_TERMS',
+        'PROVIDER_ADDRESS', 'CLIENT_ADDRESS', 'STATUS', 'PROVIDER_EMAIL',
+        'CLIENT_EMAIL', 'PROVIDER_PHONE', 'CLIENT_PHONE', 'SUBTOTAL',
+        'TAX_AMOUNT', 'DISCOUNT', 'NOTES'
+    })
+    
+    # Placeholders every template must contain
+    REQUIRED_PLACEHOLDERS = ('INVOICE_NUMBER', 'CLIENT_NAME', 'PROVIDER_NAME')
     
     @staticmethod
     def sanitize_html_template(html_content: str) -> str:
@@ -63,69 +149,12 @@ class HTMLSanitizer:
             Sanitized HTML content safe for rendering
         """
         try:
-            # Remove dangerous patterns
-            sanitized = html_content
-            for pattern in HTMLSanitizer.DANGEROUS_PATTERNS:
-                sanitized = re.sub(pattern, '', sanitized, flags=re.IGNORECASE | re.DOTALL)
-            
-            # Remove dangerous attributes from inline styles
-            sanitized = HTMLSanitizer._sanitize_inline_styles(sanitized)
-            
-            # Validate placeholders (ensure they follow expected format)
-            sanitized = HTMLSanitizer._validate_placeholders(sanitized)
-            
-            logger.info("HTML template sanitized successfully")
-            return sanitized
+            return scan_template(html_content).html
             
         except Exception as e:
             logger.error(f"Error sanitizing HTML template: {str(e)}")
             raise ValueError(f"Failed to sanitize HTML template: {str(e)}")
     
-    @staticmethod
-    def _sanitize_inline_styles(html_content: str) -> str:
-        """Remove dangerous CSS properties from inline styles"""
-        
-        # Dangerous CSS properties that could be used for attacks
-        dangerous_css = [
-            r'expression\s*\(',
-            r'javascript:',
-            r'@import',
-            r'behavior\s*:',
-            r'-moz-binding',
-            r'-webkit-binding',
-            r'binding\s*:'
-        ]
-        
-        sanitized = html_content
-        for pattern in dangerous_css:
-            sanitized = re.sub(pattern, '', sanitized, flags=re.IGNORECASE)
-        
-        return sanitized
-    
-    @staticmethod
-    def _validate_placeholders(html_content: str) -> str:
-        """Validate that placeholders follow the expected {{PLACEHOLDER}} format"""
-        
-        # Find all placeholders
-        placeholder_pattern = r'\{\{([A-Z_]+)\}\}'
-        placeholders = re.findall(placeholder_pattern, html_content)
-        
-        # List of expected placeholders
-        expected_placeholders = {
-            'PROVIDER_NAME', 'CLIENT_NAME', 'INVOICE_NUMBER', 'INVOICE_DATE',
-            'DUE_DATE', 'TOTAL_AMOUNT', 'SERVICE_ITEMS', 'PAYMENT_TERMS',
-            'PROVIDER_ADDRESS', 'CLIENT_ADDRESS', 'STATUS', 'PROVIDER_EMAIL',
-            'CLIENT_EMAIL', 'PROVIDER_PHONE', 'CLIENT_PHONE', 'SUBTOTAL',
-            'TAX_AMOUNT', 'DISCOUNT', 'NOTES'
-        }
-        
-        # Log unexpected placeholders (for debugging)
-        unexpected = set(placeholders) - expected_placeholders
-        if unexpected:
-            logger.warning(f"Unexpected placeholders found: {unexpected}")
-        
-        return html_content
-    
     @staticmethod
     def inject_data_safely(template_content: str, invoice_data: Dict[str, Any]) -> str:
         """
@@ -139,22 +168,16 @@ class HTMLSanitizer:
             HTML with data injected and escaped for safety
         """
         try:
-            # Create safe data dictionary with escaped values
-            safe_data = HTMLSanitizer._create_safe_data_dict(invoice_data)
+            template = get_template_engine().compile(template_content)
             
-            # Replace placeholders with escaped data
-            rendered_html = template_content
+            # Values are escaped by the template as they are written
+            data = HTMLSanitizer._create_data_dict(invoice_data)
             
-            for placeholder, value in safe_data.items():
-                pattern = f'{{{{{placeholder}}}}}'
-                rendered_html = rendered_html.replace(pattern, str(value))
+            # Service item rows are built (and escaped) here, so they go in as raw HTML
+            if 'SERVICE_ITEMS' in template.placeholders:
+                data['SERVICE_ITEMS'] = HTMLSanitizer._generate_service_items_html(invoice_data)
             
-            # Handle service items table rows specially
-            if '{{SERVICE_ITEMS}}' in rendered_html:
-                service_items_html = HTMLSanitizer._generate_service_items_html(invoice_data)
-                rendered_html = rendered_html.replace('{{SERVICE_ITEMS}}', service_items_html)
-            
-            return rendered_html
+            return template.render(data, raw=HTMLSanitizer.RAW_PLACEHOLDERS)
             
         except Exception as e:
             logger.error(f"Error injecting data into template: {str(e)}")
@@ -163,9 +186,17 @@ class HTMLSanitizer:
     @staticmethod
     def _create_safe_data_dict(invoice_data: Dict[str, Any]) -> Dict[str, str]:
         """Create a dictionary of safely escaped data for template injection"""
+        return {
+            placeholder: html.escape(value)
+            for placeholder, value in HTMLSanitizer._create_data_dict(invoice_data).items()
+        }
+    
+    @staticmethod
+    def _create_data_dict(invoice_data: Dict[str, Any]) -> Dict[str, str]:
+        """Create the (unescaped) placeholder values for template injection"""
         
         def safe_get(data: Dict[str, Any], key_path: str, default: str = "") -> str:
-            """Safely get nested dictionary value and escape it"""
+            """Safely get nested dictionary value as text"""
             keys = key_path.split('.')
             current = data
             
@@ -173,11 +204,11 @@ class HTMLSanitizer:
                 if isinstance(current, dict) and key in current:
                     current = current[key]
                 else:
-                    return html.escape(str(default))
+                    return str(default)
             
-            return html.escape(str(current) if current is not None else default)
+            return str(current) if current is not None else default
         
-        # Extract and escape all data
+        # Extract all data
         safe_data = {
             'PROVIDER_NAME': safe_get(invoice_data, 'service_provider.name', 'Service Provider'),
             'CLIENT_NAME': safe_get(invoice_data, 'client.name', 'Client Name'),
@@ -199,7 +230,7 @@ class HTMLSanitizer:
         # Calculate totals if service data exists
         if 'services' in invoice_data and isinstance(invoice_data['services'], list):
             subtotal = sum(float(service.get('total_amount', 0)) for service in invoice_data['services'])
-            safe_data['SUBTOTAL'] = html.escape(f"{subtotal:.2f}")
+            safe_data['SUBTOTAL'] = f"{subtotal:.2f}"
             safe_data['TAX_AMOUNT'] = "0.00"  # Default, can be calculated
             safe_data['DISCOUNT'] = "0.00"   # Default
         
@@ -210,25 +241,15 @@ class HTMLSanitizer:
         """Generate safe HTML for service items table rows"""
         
         if 'services' not in invoice_data or not isinstance(invoice_data['services'], list):
-            return '<tr><td colspan="4">No services listed</td></tr>'
+            return EMPTY_ROWS[DETAILED_COLUMNS]
         
-        rows_html = ""
-        for service in invoice_data['services']:
-            description = html.escape(str(service.get('description', 'Service')))
-            quantity = html.escape(str(service.get('quantity', 1)))
-            unit_price = html.escape(f"{float(service.get('unit_price', 0)):.2f}")
-            total = html.escape(f"{float(service.get('total_amount', 0)):.2f}")
-            
-            rows_html += f"""
-            <tr>
-                <td>{description}</td>
-                <td>{quantity}</td>
-                <td>${unit_price}</td>
-                <td>${total}</td>
-            </tr>
-            """
-        
-        return rows_html.strip()
+        payment_terms = invoice_data.get('payment_terms') or {}
+        return render_line_items(
+            invoice_data['services'],
+            currency=payment_terms.get('currency'),
+            locale=invoice_data.get('locale'),
+        )
+
 
 class TemplateValidator:
     """Validator for HTML invoice templates"""
@@ -241,41 +262,236 @@ class TemplateValidator:
         Returns:
             List of validation errors (empty if valid)
         """
+        return list(scan_template(html_content).structure_errors)
+    
+    @staticmethod
+    def is_template_safe(html_content: str) -> bool:
+        """Quick check if template is safe for rendering (no scripts, handlers or script URLs)"""
+        return scan_template(html_content).safe
+
+
+def _clean_css(css: str) -> str:
+    """Remove dangerous CSS; a substring check settles the common case of there being none"""
+    lowered = css.lower()
+    if not any(marker in lowered for marker in _DANGEROUS_CSS_MARKERS):
+        return css
+    # Removing one match can join its surroundings into another ("expexpression(ression(")
+    while True:
+        cleaned = _DANGEROUS_CSS_RE.sub('', css)
+        if cleaned == css:
+            return css
+        css = cleaned
+
+
+_DANGEROUS_CSS_MARKERS = ('expression', 'javascript:', 'vbscript:', '@import', 'behavior', 'binding')
+
+
+@lru_cache(maxsize=4096)
+def _sanitize_start_tag(name: str, attributes: str, original: str) -> Tuple[str, Tuple[str, ...], Tuple[str, ...], FrozenSet[str], bool]:
+    """
+    Allowed start tag with its attributes filtered, memoized since templates
+    repeat the same tags; returns (tag, dangerous, removed, placeholders, external resource)
+    """
+    if not attributes.strip(' /'):
+        return original, (), (), frozenset(), False
+    
+    allowed = HTMLSanitizer.ALLOWED_ATTRIBUTES.get(name, ())
+    kept, dangerous, removed, placeholders = [], [], [], set()
+    external = False
+    for match in _ATTR_RE.finditer(attributes):
+        attribute = match.group(1).lower()
+        value = next((group for group in match.group(2, 3, 4) if group is not None), None)
+        if attribute.startswith('on'):
+            dangerous.append(f'{attribute} handler on <{name}>')
+            continue
+        if attribute not in allowed:
+            removed.append(f'{name}[{attribute}]')
+            continue
+        if value is None:
+            kept.append(attribute)
+            continue
+        
+        decoded = html.unescape(value)
+        if attribute in ('href', 'src'):
+            url = _URL_NOISE_RE.sub('', decoded).lower()
+            if url.startswith(_DANGEROUS_URL_SCHEMES):
+                dangerous.append(f'{url.split(":", 1)[0]} URL in <{name}>')
+                continue
+            if attribute == 'src' and url.startswith(('http:', 'https:', '//')):
+                external = True
+        elif attribute == 'style':
+            cleaned = _clean_css(decoded)
+            if cleaned != decoded:
+                dangerous.append(f'dangerous CSS on <{name}>')
+                decoded = cleaned
+        if '{{' in decoded:
+            placeholders.update(PLACEHOLDER_RE.findall(decoded))
+        kept.append(f'{attribute}="{html.escape(decoded, quote=True)}"')
+    
+    # Tags that lost nothing are passed through as written
+    if dangerous or removed:
+        self_closing = ' /' if attributes.rstrip().endswith('/') else ''
+        tag = '<' + ' '.join([name] + kept) + self_closing + '>'
+    else:
+        tag = original
+    return tag, tuple(dangerous), tuple(removed), frozenset(placeholders), external
+
+
+class _TemplateScanner:
+    """One sanitizing pass over a template; use ``scan_template``"""
+    
+    def __init__(self, content: str):
+        self.content = content
+        self.out: List[str] = []
+        self.placeholders = set()
+        self.removed: List[str] = []
+        self.dangerous: List[str] = []
+        self.seen = set()
+        self.doctype = False
+        self.external_resources = False
+    
+    def run(self) -> TemplateScan:
+        content = self.content
+        out = self.out
+        seen = self.seen
+        search = _TOKEN_RE.search
+        allowed_tags = HTMLSanitizer.ALLOWED_TAGS
+        # The DOCTYPE has to be the first token
+        first_token = len(content) - len(content.lstrip())
+        pos = 0
+        while True:
+            match = search(content, pos)
+            if match is None:
+                if pos < len(content):
+                    self._text(content[pos:])
+                break
+            start = match.start()
+            if start > pos:
+                self._text(content[pos:start])
+            pos = match.end()
+            end_name, start_name, attributes = match.groups()
+            
+            if start_name is not None:
+                name = start_name.lower()
+                if name not in allowed_tags:
+                    pos = self._drop(name, pos)
+                    continue
+                seen.add(name)
+                tag, dangerous, removed, placeholders, external = _sanitize_start_tag(
+                    name, attributes or '', match.group(0)
+                )
+                out.append(tag)
+                if dangerous:
+                    self.dangerous.extend(dangerous)
+                if removed:
+                    self.removed.extend(removed)
+                if placeholders:
+                    self.placeholders.update(placeholders)
+                if external:
+                    self.external_resources = True
+                if name == 'style':
+                    pos = self._style(pos)
+            elif end_name is not None:
+                name = end_name.lower()
+                if name in allowed_tags:
+                    seen.add('/' + name)
+                    out.append(match.group(0))
+            else:
+                token = match.group(0)
+                if token[:9].lower() == '<!doctype':
+                    out.append(token)
+                    if start == first_token and token.startswith('<!DOCTYPE html>'):
+                        self.doctype = True
+                # Comments, other declarations and processing instructions are dropped
+        
+        unexpected = frozenset(self.placeholders - HTMLSanitizer.EXPECTED_PLACEHOLDERS)
+        if unexpected:
+            logger.warning(f"Unexpected placeholders found: {set(unexpected)}")
+        if self.removed or self.dangerous:
+            logger.info(f"HTML template sanitized ({len(self.removed) + len(self.dangerous)} items removed)")
+        return TemplateScan(
+            html=''.join(out),
+            placeholders=frozenset(self.placeholders),
+            unexpected_placeholders=unexpected,
+            removed=tuple(self.removed),
+            dangerous=tuple(self.dangerous),
+            structure_errors=tuple(self._structure_errors()),
+        )
+    
+    def _text(self, text: str) -> None:
+        if '{{' in text:
+            self.placeholders.update(PLACEHOLDER_RE.findall(text))
+        # A stray '<' is text; escaping it keeps removed tags from joining up into new ones
+        if '<' in text:
+            text = text.replace('<', '&lt;')
+        self.out.append(text)
+    
+    def _drop(self, name: str, pos: int) -> int:
+        """Drop a disallowed start tag (and the content of dropped elements); returns where scanning resumes"""
+        self.seen.add(name)
+        self.removed.append(f'<{name}>')
+        if name in _DANGEROUS_ELEMENTS:
+            self.dangerous.append(f'<{name}>')
+        if name in _DROPPED_ELEMENTS:
+            closing = _closing_tag_re(name).search(self.content, pos)
+            if closing:
+                return closing.end()
+            if name in _RAW_TEXT_ELEMENTS:
+                return len(self.content)
+        return pos
+    
+    def _style(self, pos: int) -> int:
+        """Emit the raw CSS of a <style> block up to its closing tag"""
+        closing = _closing_tag_re('style').search(self.content, pos)
+        css = self.content[pos:closing.start() if closing else len(self.content)]
+        cleaned = _clean_css(css)
+        if cleaned != css:
+            self.dangerous.append('dangerous CSS in <style>')
+        self.out.append(cleaned)
+        self.out.append('</style>')
+        self.seen.add('/style')
+        return closing.end() if closing else len(self.content)
+    
+    def _structure_errors(self) -> List[str]:
         errors = []
         
         # Check for required DOCTYPE
-        if not html_content.strip().startswith('<!DOCTYPE html>'):
+        if not self.doctype:
             errors.append("Missing DOCTYPE declaration")
         
         # Check for basic HTML structure
-        if '<html>' not in html_content or '</html>' not in html_content:
+        if not {'html', '/html'} <= self.seen:
             errors.append("Missing HTML tags")
         
-        if '<head>' not in html_content or '</head>' not in html_content:
+        if not {'head', '/head'} <= self.seen:
             errors.append("Missing HEAD section")
         
-        if '<body>' not in html_content or '</body>' not in html_content:
+        if not {'body', '/body'} <= self.seen:
             errors.append("Missing BODY section")
         
         # Check for embedded styles (no external resources allowed)
-        if '<link' in html_content.lower():
+        if 'link' in self.seen:
             errors.append("External stylesheets not allowed - use embedded CSS only")
         
-        if 'src=' in html_content and 'http' in html_content:
+        if self.external_resources:
             errors.append("External resources not allowed")
         
         # Check for required placeholders
-        required_placeholders = ['{{INVOICE_NUMBER}}', '{{CLIENT_NAME}}', '{{PROVIDER_NAME}}']
-        for placeholder in required_placeholders:
-            if placeholder not in html_content:
-                errors.append(f"Missing required placeholder: {placeholder}")
+        for placeholder in HTMLSanitizer.REQUIRED_PLACEHOLDERS:
+            if placeholder not in self.placeholders:
+                errors.append(f"Missing required placeholder: {{{{{placeholder}}}}}")
         
         return errors
+
+
+@lru_cache(maxsize=TEMPLATE_SCAN_CACHE_SIZE)
+def scan_template(html_content: str) -> TemplateScan:
+    """
+    Sanitize and validate a template in one pass (memoized by template text)
     
-    @staticmethod
-    def is_template_safe(html_content: str) -> bool:
-        """Quick check if template is safe for rendering"""
-        dangerous_patterns = ['<script', 'javascript:', 'on=', 'onerror', 'onclick']
-        content_lower = html_content.lower()
-        
-        return not any(pattern in content_lower for pattern in dangerous_patterns)
\ No newline at end of file
+    Disallowed tags are dropped - with their content for scripts, frames,
+    embedded objects and forms - as are attributes outside the allowlist,
+    event handlers, ``javascript:``/``vbscript:``/``data:text/html`` URLs,
+    dangerous CSS and comments.
+    """
+    return _TemplateScanner(html_content).run()
@@ -0,0 +1,219 @@
+"""
+Service line-item table rows
+
+Invoices for utility-heavy leases carry hundreds of line items and monthly
+statements thousands. Rows are rendered from a compiled row template and
+joined once, so a table renders in time linear in its number of rows, and
+amounts go through a currency formatter that is built once per (currency,
+locale) pair instead of re-deriving the format on every row.
+
+Long tables can be split into pages of ``rows_per_page`` rows for PDF
+output: the first row of every page after the first carries the
+``page-break-before`` class of the PDF print stylesheet, which also repeats
+the table header on each page.
+"""
+
+import html
+import logging
+import os
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
+from typing import Any, Iterable, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCALE = os.getenv("INVOICE_LOCALE", "en_US")
+
+# Rows per PDF page; 0 leaves page breaks to the renderer
+DEFAULT_ROWS_PER_PAGE = int(os.getenv("PDF_LINE_ITEMS_PER_PAGE", "0"))
+
+# Currency code: (symbol, minor unit digits)
+CURRENCY_FORMATS = {
+    "USD": ("$", 2),
+    "EUR": ("€", 2),
+    "GBP": ("£", 2),
+    "INR": ("₹", 2),
+    "CAD": ("CA$", 2),
+    "AUD": ("A$", 2),
+    "JPY": ("¥", 0),
+}
+
+# Locale: (group separator, decimal separator, symbol after the amount, Indian digit grouping)
+LOCALE_FORMATS = {
+    "en_US": (",", ".", False, False),
+    "en_GB": (",", ".", False, False),
+    "en_CA": (",", ".", False, False),
+    "en_AU": (",", ".", False, False),
+    "en_IN": (",", ".", False, True),
+    "ja_JP": (",", ".", False, False),
+    "de_DE": (".", ",", True, False),
+    "es_ES": (".", ",", True, False),
+    "it_IT": (".", ",", True, False),
+    "nl_NL": (".", ",", True, False),
+    "fr_FR": ("\u202f", ",", True, False),
+}
+
+# Locales by language, for regions without an entry of their own
+_LANGUAGE_LOCALES = {locale.split("_")[0]: locale for locale in reversed(list(LOCALE_FORMATS))}
+
+DETAILED_COLUMNS = "detailed"
+SUMMARY_COLUMNS = "summary"
+
+# Row templates, compiled once into bound format methods. Fields, escaped beforehand:
+# 0 row class, 1 description, 2 quantity, 3 unit price, 4 total
+ROW_TEMPLATES = {
+    DETAILED_COLUMNS: "<tr{0}><td>{1}</td><td>{2}</td><td>{3}</td><td>{4}</td></tr>",
+    SUMMARY_COLUMNS: "<tr{0}><td>{1}</td><td>{4}</td></tr>",
+}
+_PAGE_BREAK_CLASS = ' class="page-break-before"'
+
+EMPTY_ROWS = {
+    DETAILED_COLUMNS: '<tr><td colspan="4">No services listed</td></tr>',
+    SUMMARY_COLUMNS: '<tr><td colspan="2">No services listed</td></tr>',
+}
+
+
+def to_decimal(value: Any) -> Decimal:
+    """Amount as a Decimal; missing or unparseable amounts count as zero"""
+    if isinstance(value, Decimal):
+        return value
+    if value is None or value == "":
+        return Decimal(0)
+    try:
+        return Decimal(str(value).replace(",", ""))
+    except InvalidOperation:
+        logger.debug(f"Unparseable amount {value!r} rendered as zero")
+        return Decimal(0)
+
+
+def _resolve_locale(locale: Optional[str]) -> str:
+    locale = (locale or DEFAULT_LOCALE).replace("-", "_")
+    if locale in LOCALE_FORMATS:
+        return locale
+    return _LANGUAGE_LOCALES.get(locale.split("_")[0], "en_US")
+
+
+class CurrencyFormatter:
+    """Formats amounts of one currency for one locale (the output is HTML-safe)"""
+
+    __slots__ = ("currency", "locale", "_quantum", "_spec", "_translation", "_prefix", "_suffix", "_indian", "_format")
+
+    def __init__(self, currency: str, locale: str):
+        self.currency = currency
+        self.locale = locale
+        symbol, digits = CURRENCY_FORMATS.get(currency, (f"{html.escape(currency)} ", 2))
+        group, decimal, symbol_after, indian = LOCALE_FORMATS[locale]
+
+        self._quantum = Decimal(1).scaleb(-digits)
+        self._spec = f",.{digits}f"
+        self._translation = str.maketrans({",": group, ".": decimal}) if (group, decimal) != (",", ".") else None
+        self._prefix = "" if symbol_after else symbol
+        self._suffix = f"\u00a0{symbol.strip()}" if symbol_after else ""
+        self._indian = indian
+        if self._translation is None and not indian:
+            # The whole format compiles to one format string
+            self._format = f"{self._prefix}{{:{self._spec}}}{self._suffix}".format
+        else:
+            self._format = self._format_localized
+
+    def __call__(self, amount: Any) -> str:
+        # Floats are formatted as they are; Decimal rounding is for exact (string/Decimal) amounts
+        if type(amount) is not float and type(amount) is not int:
+            amount = to_decimal(amount).quantize(self._quantum, rounding=ROUND_HALF_UP)
+        if amount < 0:
+            return "-" + self._format(-amount)
+        return self._format(amount)
+
+    def _format_localized(self, value: Any) -> str:
+        text = format(value, self._spec)
+        if self._indian:
+            text = self._indian_grouping(text)
+        if self._translation is not None:
+            text = text.translate(self._translation)
+        return f"{self._prefix}{text}{self._suffix}"
+
+    @staticmethod
+    def _indian_grouping(text: str) -> str:
+        """Regroup ``1,234,567.00`` as ``12,34,567.00`` (thousands, then lakhs and crores)"""
+        integer, _, fraction = text.partition(".")
+        integer = integer.replace(",", "")
+        if len(integer) > 3:
+            head, tail = integer[:-3], integer[-3:]
+            groups = []
+            while len(head) > 2:
+                groups.append(head[-2:])
+                head = head[:-2]
+            integer = ",".join([head] + groups[::-1] + [tail])
+        return f"{integer}.{fraction}" if fraction else integer
+
+
+@lru_cache(maxsize=64)
+def get_currency_formatter(currency: Optional[str] = None, locale: Optional[str] = None) -> CurrencyFormatter:
+    """Cached formatter for a currency code (USD by default) and locale (``INVOICE_LOCALE`` by default)"""
+    currency = (currency or "USD").upper()
+    return CurrencyFormatter(currency, _resolve_locale(locale))
+
+
+def format_quantity(quantity: Any) -> str:
+    """Quantities without a fraction are shown as whole numbers"""
+    if quantity is None or quantity == "":
+        return "1"
+    if isinstance(quantity, float) and quantity.is_integer():
+        return str(int(quantity))
+    return str(quantity)
+
+
+class LineItemTable:
+    """Renders service line items as table rows"""
+
+    def __init__(self, columns: str = DETAILED_COLUMNS, formatter: Optional[CurrencyFormatter] = None):
+        if columns not in ROW_TEMPLATES:
+            raise ValueError(f"Unknown line item columns: {columns}")
+        self.columns = columns
+        self.row_template = ROW_TEMPLATES[columns]
+        self.formatter = formatter or get_currency_formatter()
+
+    def render(self, items: Optional[Iterable[Mapping[str, Any]]], rows_per_page: Optional[int] = None) -> str:
+        """
+        Table rows for ``items``, one line per row
+
+        Args:
+            items: Line items with description, quantity, unit_price and total_amount
+            rows_per_page: Start a new PDF page every this many rows
+                (``PDF_LINE_ITEMS_PER_PAGE`` by default; 0 disables)
+        """
+        rows_per_page = DEFAULT_ROWS_PER_PAGE if rows_per_page is None else rows_per_page
+        format_row = self.row_template.format
+        money = self.formatter
+        escape = html.escape
+        rows: List[str] = []
+        for index, item in enumerate(items or ()):
+            get = item.get
+            quantity = get("quantity", 1)
+            unit_price = get("unit_price")
+            total = get("total_amount")
+            if total is None and unit_price is not None:
+                total = to_decimal(1 if quantity is None or quantity == "" else quantity) * to_decimal(unit_price)
+            rows.append(format_row(
+                _PAGE_BREAK_CLASS if rows_per_page and index and index % rows_per_page == 0 else "",
+                escape(str(get("description") or "Service")),
+                str(quantity) if type(quantity) is int else escape(format_quantity(quantity)),
+                # Formatted amounts are HTML-safe as they are
+                money(unit_price),
+                money(total),
+            ))
+        if not rows:
+            return EMPTY_ROWS[self.columns]
+        return "\n".join(rows)
+
+
+def render_line_items(
+    items: Optional[Iterable[Mapping[str, Any]]],
+    currency: Optional[str] = None,
+    locale: Optional[str] = None,
+    columns: str = DETAILED_COLUMNS,
+    rows_per_page: Optional[int] = None,
+) -> str:
+    """Table rows for ``items`` in ``currency``, formatted for ``locale``"""
+    table = LineItemTable(columns, get_currency_formatter(currency, locale))
+    return table.render(items, rows_per_page=rows_per_page)
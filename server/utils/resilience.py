@@ -0,0 +1,410 @@
+"""
+Resilience helpers for external dependencies
+
+Per-dependency circuit breakers, jittered exponential retries and hedged
+requests for idempotent reads. Used around Vertex AI (Gemini, embeddings),
+Pinecone and GCS calls so that transient blips are absorbed close to the call
+site instead of failing the whole ADK workflow.
+
+Breaker state for every dependency is available through ``get_breaker_states``
+and is reported by ``/adk/workflow/health``.
+"""
+
+import asyncio
+import contextvars
+import inspect
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from enum import Enum
+from functools import wraps
+from typing import Dict, Any, Optional, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the dependency's breaker is open"""
+
+    def __init__(self, dependency: str, retry_after: float):
+        super().__init__(f"Circuit breaker for '{dependency}' is open; retry in {retry_after:.1f}s")
+        self.dependency = dependency
+        self.retry_after = retry_after
+
+
+# Exception class names (from google.api_core, pinecone, httpx, urllib3...) treated as transient
+_TRANSIENT_ERROR_NAMES = {
+    "ServiceUnavailable", "DeadlineExceeded", "TooManyRequests", "ResourceExhausted",
+    "InternalServerError", "BadGateway", "GatewayTimeout", "Aborted", "RetryError",
+    "ConnectTimeout", "ReadTimeout", "ConnectError", "RemoteProtocolError",
+    "ProtocolError", "MaxRetryError", "NewConnectionError", "ServerError",
+}
+_TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+_PERMANENT_ERROR_NAMES = {"OAuthExpiredError", "PermissionDenied", "Unauthenticated", "NotFound", "InvalidArgument"}
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Decide whether an error is worth retrying
+
+    Walks the ``__cause__``/``__context__`` chain because services in this code
+    base wrap SDK errors in ``HTTPException(status_code=500)``.
+    """
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        name = type(current).__name__
+        if name in _PERMANENT_ERROR_NAMES:
+            return False
+        if isinstance(current, CircuitOpenError):
+            return True
+        if isinstance(current, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+            return True
+        if name in _TRANSIENT_ERROR_NAMES:
+            return True
+        # FastAPI HTTPException(500) is this code base's generic wrapper, not a dependency status
+        if name != "HTTPException":
+            status = getattr(current, "status_code", None) or getattr(current, "status", None) or getattr(current, "code", None)
+            if isinstance(status, int) and status in _TRANSIENT_STATUS_CODES:
+                return True
+        current = current.__cause__ or current.__context__
+    return False
+
+
+class CircuitBreaker:
+    """
+    Classic three-state circuit breaker
+
+    CLOSED counts consecutive failures; after ``failure_threshold`` it opens and
+    rejects calls for ``recovery_timeout`` seconds, then lets a limited number of
+    trial calls through (HALF_OPEN). A successful trial closes it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._total_calls = 0
+        self._total_failures = 0
+        self._total_rejections = 0
+        self._last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = CircuitState.HALF_OPEN
+            self._half_open_in_flight = 0
+        return self._state
+
+    def before_call(self) -> None:
+        """Reserve a call slot or raise ``CircuitOpenError``"""
+        with self._lock:
+            state = self._current_state()
+            if state == CircuitState.OPEN or (
+                state == CircuitState.HALF_OPEN and self._half_open_in_flight >= self.half_open_max_calls
+            ):
+                self._total_rejections += 1
+                retry_after = max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+                raise CircuitOpenError(self.name, retry_after)
+            if state == CircuitState.HALF_OPEN:
+                self._half_open_in_flight += 1
+            self._total_calls += 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                logger.info(f"✅ Circuit breaker '{self.name}' closed after successful trial call")
+            self._state = CircuitState.CLOSED
+            self._consecutive_failures = 0
+            self._half_open_in_flight = 0
+
+    def record_failure(self, error: BaseException) -> None:
+        with self._lock:
+            self._total_failures += 1
+            self._consecutive_failures += 1
+            self._last_error = f"{type(error).__name__}: {error}"
+            if self._state == CircuitState.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != CircuitState.OPEN:
+                    logger.warning(f"⚠️ Circuit breaker '{self.name}' opened after {self._consecutive_failures} failures")
+                self._state = CircuitState.OPEN
+                self._opened_at = time.monotonic()
+                self._half_open_in_flight = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            return {
+                "state": state.value,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "recovery_timeout_seconds": self.recovery_timeout,
+                "total_calls": self._total_calls,
+                "total_failures": self._total_failures,
+                "total_rejections": self._total_rejections,
+                "last_error": self._last_error,
+            }
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 retry_on: Callable[[BaseException], bool] = is_transient_error):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+
+    def delay_for(self, attempt: int) -> float:
+        """Sleep before retry number ``attempt`` (1-based): uniform in [0, min(max, base * 2^(attempt-1))]"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_circuit_breaker(dependency: str, **kwargs) -> CircuitBreaker:
+    """Get (or create) the process-wide breaker for a dependency"""
+    with _breakers_lock:
+        breaker = _breakers.get(dependency)
+        if breaker is None:
+            breaker = _breakers[dependency] = CircuitBreaker(dependency, **kwargs)
+        return breaker
+
+
+def get_breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every dependency breaker, for health endpoints"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    if _hedge_executor is None:
+        _hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+    return _hedge_executor
+
+
+def _hedged_call(func: Callable, args: Tuple, kwargs: Dict[str, Any], hedge_after: float):
+    """
+    Run an idempotent call; if it has not finished after ``hedge_after`` seconds,
+    issue a second identical request and return whichever succeeds first
+    """
+    executor = _get_hedge_executor()
+    # Each request runs in its own copy of the caller's context so tracing spans nest correctly
+    primary = executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+    done, _ = wait([primary], timeout=hedge_after)
+    if done:
+        return primary.result()
+
+    logger.info(f"🔀 Hedging slow call to {getattr(func, '__qualname__', func)} after {hedge_after:.2f}s")
+    pending = {primary, executor.submit(contextvars.copy_context().run, func, *args, **kwargs)}
+    last_error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            last_error = future.exception()
+    raise last_error
+
+
+def call_with_resilience(dependency: str, func: Callable, *args, policy: Optional[RetryPolicy] = None,
+                         hedge_after: Optional[float] = None, **kwargs):
+    """
+    Synchronous call guarded by the dependency's breaker, retries and optional hedging
+
+    Backoff sleeps and hedging block the calling thread; async code should use
+    ``call_with_resilience_async`` or run the blocking call with ``asyncio.to_thread``.
+    """
+    policy = policy or RetryPolicy()
+    breaker = get_circuit_breaker(dependency)
+    for attempt in range(1, policy.max_attempts + 1):
+        try:
+            breaker.before_call()
+        except CircuitOpenError as e:
+            if attempt == policy.max_attempts:
+                _mark_retries_exhausted(e)
+                raise
+            time.sleep(policy.delay_for(attempt))
+            continue
+        try:
+            result = _hedged_call(func, args, kwargs, hedge_after) if hedge_after else func(*args, **kwargs)
+        except Exception as e:
+            transient = policy.retry_on(e)
+            if transient:
+                breaker.record_failure(e)
+            else:
+                # Caller errors say nothing about the dependency's health
+                breaker.record_success()
+            if not transient:
+                raise
+            if attempt == policy.max_attempts:
+                _mark_retries_exhausted(e)
+                raise
+            delay = policy.delay_for(attempt)
+            logger.warning(f"🔁 {dependency} call failed ({type(e).__name__}: {e}); retry {attempt}/{policy.max_attempts - 1} in {delay:.2f}s")
+            time.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
+
+
+async def _hedged_call_async(func: Callable, args: Tuple, kwargs: Dict[str, Any], hedge_after: float):
+    """``_hedged_call`` for coroutine functions and for sync calls run in worker threads"""
+    def start():
+        return asyncio.ensure_future(_call_async(func, args, kwargs))
+
+    primary = start()
+    done, _ = await asyncio.wait([primary], timeout=hedge_after)
+    if done:
+        return primary.result()
+
+    logger.info(f"🔀 Hedging slow call to {getattr(func, '__qualname__', func)} after {hedge_after:.2f}s")
+    pending = {primary, start()}
+    last_error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+    finally:
+        for task in pending:
+            task.cancel()
+    raise last_error
+
+
+async def _call_async(func: Callable, args: Tuple, kwargs: Dict[str, Any]):
+    if inspect.iscoroutinefunction(func):
+        return await func(*args, **kwargs)
+    # Blocking SDK calls run in a worker thread (with the caller's context) so the event loop keeps going
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+
+def _mark_retries_exhausted(error: BaseException) -> None:
+    try:
+        error.retries_exhausted = True
+    except AttributeError:
+        pass
+
+
+def retries_exhausted(error: BaseException) -> bool:
+    """
+    True if ``error`` (or an error it wraps) is what a resilient call raised after
+    using up its retries or finding the breaker open
+
+    Callers further up, like the ADK agents' own re-runs, should not retry these
+    again: the attempts would multiply.
+    """
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if getattr(current, "retries_exhausted", False):
+            return True
+        current = current.__cause__ or current.__context__
+    return False
+
+
+async def call_with_resilience_async(dependency: str, func: Callable, *args, policy: Optional[RetryPolicy] = None,
+                                     hedge_after: Optional[float] = None, **kwargs):
+    """
+    Async counterpart of ``call_with_resilience``
+
+    ``func`` may be a coroutine function or a blocking callable; blocking calls
+    run in a worker thread and backoff sleeps never block the event loop, so
+    this is the form to use on async paths.
+    """
+    policy = policy or RetryPolicy()
+    breaker = get_circuit_breaker(dependency)
+    for attempt in range(1, policy.max_attempts + 1):
+        try:
+            breaker.before_call()
+        except CircuitOpenError as e:
+            if attempt == policy.max_attempts:
+                _mark_retries_exhausted(e)
+                raise
+            await asyncio.sleep(policy.delay_for(attempt))
+            continue
+        try:
+            if hedge_after:
+                result = await _hedged_call_async(func, args, kwargs, hedge_after)
+            else:
+                result = await _call_async(func, args, kwargs)
+        except Exception as e:
+            transient = policy.retry_on(e)
+            if transient:
+                breaker.record_failure(e)
+            else:
+                breaker.record_success()
+            if not transient:
+                raise
+            if attempt == policy.max_attempts:
+                _mark_retries_exhausted(e)
+                raise
+            delay = policy.delay_for(attempt)
+            logger.warning(f"🔁 {dependency} call failed ({type(e).__name__}: {e}); retry {attempt}/{policy.max_attempts - 1} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
+
+
+def resilient(dependency: str, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+              hedge_after: Optional[float] = None):
+    """
+    Decorator form of ``call_with_resilience``
+
+    Args:
+        dependency: Breaker name shared by every call to the same external service
+        max_attempts: Total attempts including the first call
+        base_delay: Initial backoff in seconds (doubles per attempt, full jitter)
+        max_delay: Backoff cap in seconds
+        hedge_after: For idempotent reads only - seconds before a duplicate request is issued
+    """
+    policy = RetryPolicy(max_attempts=max_attempts, base_delay=base_delay, max_delay=max_delay)
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await call_with_resilience_async(dependency, func, *args, policy=policy,
+                                                        hedge_after=hedge_after, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return call_with_resilience(dependency, func, *args, policy=policy, hedge_after=hedge_after, **kwargs)
+        return wrapper
+    return decorator
+
+
+def reset_breakers() -> None:
+    """Forget all breaker state (tests and admin tooling)"""
+    with _breakers_lock:
+        _breakers.clear()
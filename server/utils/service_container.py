@@ -0,0 +1,195 @@
+"""
+Lazy service container
+
+Routers used to build their services at import time (``adk_service =
+get_adk_integration_service()``), which constructed every ADK agent, the
+Vertex AI models and the Pinecone client while ``main.lifespan`` imported the
+routes - before the first request could be served. Services are now registered
+here by import path and only constructed on first use. ``lazy_service`` gives
+routers a stand-in object that resolves on first attribute access, and
+``warm_up`` can resolve services on a background thread after startup.
+"""
+
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+_UNRESOLVED = object()
+
+
+class _ServiceEntry:
+    __slots__ = ("name", "factory", "optional", "instance", "init_seconds", "error", "lock")
+
+    def __init__(self, name: str, factory: Union[str, Callable[[], Any]], optional: bool):
+        self.name = name
+        self.factory = factory
+        self.optional = optional
+        self.instance = _UNRESOLVED
+        self.init_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self.lock = threading.Lock()
+
+
+def _load_factory(factory: Union[str, Callable[[], Any]]) -> Callable[[], Any]:
+    """Turn ``"package.module:callable"`` into the callable (importing the module only now)"""
+    if callable(factory):
+        return factory
+    module_name, _, attribute = factory.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class ServiceContainer:
+    """
+    Registry of lazily constructed services
+
+    Factories are either callables or ``"module:callable"`` strings, so
+    registering a service does not import its module.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _ServiceEntry] = {}
+        self._warmup_thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, factory: Union[str, Callable[[], Any]], optional: bool = False) -> None:
+        """
+        Register a service factory
+
+        Args:
+            name: Service name used by ``resolve``/``lazy``
+            factory: Callable or ``"module:callable"`` import path returning the instance
+            optional: Resolve to None (once, permanently) if the factory raises ImportError
+        """
+        self._entries[name] = _ServiceEntry(name, factory, optional)
+
+    def resolve(self, name: str) -> Any:
+        """Return the service instance, constructing it on first use"""
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"Service '{name}' is not registered")
+        if entry.instance is not _UNRESOLVED:
+            return entry.instance
+        with entry.lock:
+            if entry.instance is _UNRESOLVED:
+                started = time.perf_counter()
+                try:
+                    entry.instance = _load_factory(entry.factory)()
+                except ImportError as e:
+                    if not entry.optional:
+                        raise
+                    logger.warning(f"⚠️ Optional service '{name}' unavailable: {str(e)}")
+                    entry.instance = None
+                    entry.error = str(e)
+                entry.init_seconds = time.perf_counter() - started
+                logger.info(f"🧩 Service '{name}' initialized in {entry.init_seconds * 1000:.0f}ms")
+        return entry.instance
+
+    def is_resolved(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry.instance is not _UNRESOLVED
+
+    def lazy(self, name: str) -> "LazyService":
+        """Stand-in object that resolves ``name`` on first attribute access"""
+        return LazyService(self, name)
+
+    def warm_up(self, names: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Resolve services ahead of the first request
+
+        Failures are logged and left for the first real request to surface.
+
+        Args:
+            names: Services to resolve (defaults to every registered service)
+            background: Run on a daemon thread instead of blocking the caller
+        """
+        targets = list(names) if names is not None else list(self._entries)
+
+        def run():
+            started = time.perf_counter()
+            for name in targets:
+                try:
+                    self.resolve(name)
+                except Exception as e:
+                    self._entries[name].error = str(e)
+                    logger.warning(f"⚠️ Warm-up of service '{name}' failed: {str(e)}")
+            logger.info(f"🔥 Service warm-up finished in {time.perf_counter() - started:.2f}s ({len(targets)} services)")
+
+        if not background:
+            run()
+            return None
+        self._warmup_thread = threading.Thread(target=run, name="service-warmup", daemon=True)
+        self._warmup_thread.start()
+        return self._warmup_thread
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Initialization state and timing per service"""
+        return {
+            name: {
+                "initialized": entry.instance is not _UNRESOLVED,
+                "available": entry.instance is not None,
+                "init_ms": round(entry.init_seconds * 1000, 1) if entry.init_seconds is not None else None,
+                "error": entry.error,
+            }
+            for name, entry in self._entries.items()
+        }
+
+
+class LazyService:
+    """Proxy that forwards attribute access to a container service, resolving it on first use"""
+
+    __slots__ = ("_container", "_name")
+
+    def __init__(self, container: ServiceContainer, name: str):
+        object.__setattr__(self, "_container", container)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, attribute: str) -> Any:
+        instance = self._container.resolve(self._name)
+        if instance is None:
+            raise RuntimeError(f"Service '{self._name}' is not available")
+        return getattr(instance, attribute)
+
+    def __setattr__(self, attribute: str, value: Any) -> None:
+        setattr(self._container.resolve(self._name), attribute, value)
+
+    def __repr__(self) -> str:
+        state = "resolved" if self._container.is_resolved(self._name) else "unresolved"
+        return f"<LazyService {self._name} ({state})>"
+
+
+def _register_default_services(container: ServiceContainer) -> None:
+    # Ordered roughly by first use, which is also the warm-up order
+    container.register("embedding", "models.llm.embedding:get_embedding_service")
+    container.register("pinecone", "services.pinecone_service:get_pinecone_service")
+    container.register("contract_rag", "services.contract_rag_service:get_contract_rag_service")
+    container.register("contract_processor", "services.contract_processor:get_contract_processor")
+    container.register("validation", "services.validation_service:get_validation_service")
+    container.register("bulk_validation", "services.bulk_validation_service:get_bulk_validation_service")
+    container.register("adk_integration", "adk_agents.adk_integration_service:get_adk_integration_service")
+    container.register("adk_workflow", lambda: container.resolve("adk_integration").adk_workflow.warm_up())
+    container.register("batch_workflow", "adk_agents.batch_workflow_service:get_batch_workflow_service")
+    container.register("review_queue", "services.review_queue_service:get_review_queue_service")
+    container.register("orchestrator_controller", "controller.orchestrator_controller:get_orchestrator_controller")
+    container.register("pdf", "services.pdf_service:PDFService", optional=True)
+
+
+_container: Optional[ServiceContainer] = None
+_container_lock = threading.Lock()
+
+
+def get_container() -> ServiceContainer:
+    """Get the process-wide service container"""
+    global _container
+    with _container_lock:
+        if _container is None:
+            _container = ServiceContainer()
+            _register_default_services(_container)
+        return _container
+
+
+def lazy_service(name: str) -> LazyService:
+    """Shorthand for ``get_container().lazy(name)``"""
+    return get_container().lazy(name)
@@ -0,0 +1,128 @@
+"""
+Compiled invoice templates
+
+Invoice templates under ``templates/invoices`` use ``{{PLACEHOLDER}}`` slots.
+Filling them with one ``str.replace`` per variable copies the whole document
+once per variable and re-scans it every time; it also expands placeholders
+that appear inside injected values. Here a template is parsed once into
+alternating static segments and slots, and rendering is a single pass:
+
+- values are HTML-escaped as they are written, except for slots the caller
+  marks as ``raw`` (pre-built fragments such as ``SERVICE_ITEMS``)
+- each distinct slot is converted and escaped once per render, however often
+  it appears in the template
+- slots without a value keep their ``{{PLACEHOLDER}}`` text, as before
+
+Compiled templates are cached by file path and modification time, so an
+edited template is picked up on the next render, and by source text for
+templates that come from elsewhere (database, sanitized content).
+"""
+
+import html
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_RE = re.compile(r"\{\{([A-Z_]+)\}\}")
+
+
+class CompiledTemplate:
+    """A template parsed into static segments and named slots"""
+
+    __slots__ = ("name", "_segments", "_slots", "placeholders")
+
+    def __init__(self, source: str, name: Optional[str] = None):
+        parts = PLACEHOLDER_RE.split(source)
+        self.name = name
+        # split() alternates text and captured slot names, starting and ending with text
+        self._segments: Tuple[str, ...] = tuple(parts[0::2])
+        self._slots: Tuple[str, ...] = tuple(parts[1::2])
+        self.placeholders = frozenset(self._slots)
+
+    def render(self, values: Mapping[str, Any], raw: Iterable[str] = (), escape: bool = True) -> str:
+        """
+        Fill the slots from ``values`` in one pass
+
+        Args:
+            values: Slot name to value; values are converted with ``str()``
+            raw: Slot names whose values are trusted HTML and written unescaped
+            escape: Set to False when every value is already escaped
+        """
+        raw = raw if isinstance(raw, (set, frozenset)) else frozenset(raw)
+        rendered: Dict[str, str] = {}
+        for name in self.placeholders:
+            if name in values:
+                text = str(values[name])
+                rendered[name] = html.escape(text) if escape and name not in raw else text
+            else:
+                rendered[name] = "{{" + name + "}}"
+
+        segments = self._segments
+        out = [segments[0]]
+        for index, name in enumerate(self._slots, 1):
+            out.append(rendered[name])
+            out.append(segments[index])
+        return "".join(out)
+
+
+class TemplateEngine:
+    """Compiles templates once and keeps them until their file changes"""
+
+    def __init__(self, max_sources: Optional[int] = None):
+        self.max_sources = max_sources or int(os.getenv("TEMPLATE_SOURCE_CACHE_SIZE", "128"))
+        self._by_path: Dict[str, Tuple[Tuple[int, int], CompiledTemplate]] = {}
+        self._by_source: "OrderedDict[str, CompiledTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, path: Union[str, os.PathLike]) -> CompiledTemplate:
+        """Compiled template for a file, re-read only when its mtime or size changed"""
+        path = os.fspath(path)
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._by_path.get(path)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        with open(path, "r", encoding="utf-8") as handle:
+            compiled = CompiledTemplate(handle.read(), name=os.path.basename(path))
+        with self._lock:
+            self._by_path[path] = (version, compiled)
+        logger.debug(f"🧩 Compiled template {compiled.name} ({len(compiled.placeholders)} placeholders)")
+        return compiled
+
+    def compile(self, source: str, name: Optional[str] = None) -> CompiledTemplate:
+        """Compiled template for source text, memoized on the text itself"""
+        with self._lock:
+            compiled = self._by_source.get(source)
+            if compiled is not None:
+                self._by_source.move_to_end(source)
+                return compiled
+        compiled = CompiledTemplate(source, name=name)
+        with self._lock:
+            self._by_source[source] = compiled
+            while len(self._by_source) > self.max_sources:
+                self._by_source.popitem(last=False)
+        return compiled
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_path.clear()
+            self._by_source.clear()
+
+
+# Singleton engine instance
+_template_engine = None
+
+
+def get_template_engine() -> TemplateEngine:
+    """Get singleton template engine instance"""
+    global _template_engine
+    if _template_engine is None:
+        _template_engine = TemplateEngine()
+    return _template_engine
@@ -0,0 +1,359 @@
+"""
+Workflow tracing for the ADK invoice pipeline
+
+Lightweight span tracer that records nested spans across ADK agents and the
+external services they call (PDF parsing, embeddings, Pinecone, Gemini, DB,
+GCS). Spans are kept in memory per trace for the span-tree API, aggregated into
+sliding-window latency percentiles, and optionally exported to a local file in
+OpenTelemetry OTLP/JSON format (one ``resourceSpans`` document per line).
+
+Configuration (environment):
+    TRACE_EXPORT_PATH     - file to append OTLP/JSON lines to (export disabled if unset)
+    TRACE_WINDOW_SECONDS  - sliding window for latency percentiles (default 900)
+    TRACE_MAX_TRACES      - number of recent traces kept in memory (default 500)
+"""
+
+import os
+import json
+import math
+import time
+import uuid
+import inspect
+import logging
+import threading
+import contextvars
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from enum import Enum
+from functools import wraps
+from typing import Dict, Any, List, Optional, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class SpanKind(str, Enum):
+    WORKFLOW = "workflow"
+    AGENT = "agent"
+    DEPENDENCY = "dependency"
+
+
+class Span:
+    """A single timed operation inside a trace"""
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name", "kind", "attributes",
+        "start_ns", "end_ns", "status", "error",
+    )
+
+    def __init__(self, trace_id: str, name: str, kind: SpanKind, parent_id: Optional[str] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind.value,
+            "attributes": self.attributes,
+            "start_time_ns": self.start_ns,
+            "end_time_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPFileExporter:
+    """Append finished spans to a local file as OTLP/JSON ``resourceSpans`` lines"""
+
+    _KIND_MAP = {SpanKind.WORKFLOW: 1, SpanKind.AGENT: 1, SpanKind.DEPENDENCY: 3}  # INTERNAL / CLIENT
+
+    def __init__(self, path: str, service_name: str = "smart-invoice-scheduler"):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        if not spans:
+            return
+        document = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [self._to_otlp(span) for span in spans],
+                }],
+            }]
+        }
+        line = json.dumps(document, default=str)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to export spans to {self.path}: {e}")
+
+    def _to_otlp(self, span: Span) -> Dict[str, Any]:
+        attributes = [{"key": "span.kind", "value": {"stringValue": span.kind.value}}]
+        attributes.extend({"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items())
+        return {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "parentSpanId": span.parent_id or "",
+            "name": span.name,
+            "kind": self._KIND_MAP.get(span.kind, 1),
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns or span.start_ns),
+            "attributes": attributes,
+            "status": {"code": 2, "message": span.error} if span.status == "error" else {"code": 1},
+        }
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class _TraceRecord:
+    __slots__ = ("spans", "exported", "workflow_id")
+
+    def __init__(self, workflow_id: Optional[str]):
+        self.spans: List[Span] = []
+        self.exported = 0
+        self.workflow_id = workflow_id
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """In-process tracer with span trees, sliding-window latency stats and optional file export"""
+
+    def __init__(self, exporter: Optional[OTLPFileExporter] = None, window_seconds: float = 900.0,
+                 max_traces: int = 500, max_samples_per_key: int = 5000):
+        self.exporter = exporter
+        self.window_seconds = window_seconds
+        self.max_traces = max_traces
+        self._traces: "OrderedDict[str, _TraceRecord]" = OrderedDict()
+        self._workflow_traces: Dict[str, str] = {}
+        self._samples: Dict[tuple, deque] = defaultdict(lambda: deque(maxlen=max_samples_per_key))
+        self._lock = threading.Lock()
+
+    # --- Span lifecycle ---
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def trace_id_for_workflow(self, workflow_id: str) -> str:
+        """Stable trace id for a workflow so resumed runs land in the same trace"""
+        with self._lock:
+            trace_id = self._workflow_traces.get(workflow_id)
+            if trace_id is None:
+                trace_id = uuid.uuid4().hex
+                self._workflow_traces[workflow_id] = trace_id
+            return trace_id
+
+    @contextmanager
+    def span(self, name: str, kind: SpanKind = SpanKind.DEPENDENCY,
+             attributes: Optional[Dict[str, Any]] = None, trace_id: Optional[str] = None,
+             workflow_id: Optional[str] = None) -> Iterator[Span]:
+        """Open a span nested under the current one (or a new root)"""
+        parent = _current_span.get()
+        if trace_id is None:
+            trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        parent_id = parent.span_id if parent and parent.trace_id == trace_id else None
+
+        span = Span(trace_id, name, kind, parent_id=parent_id, attributes=attributes)
+        # Stand-alone dependency calls (outside any workflow) only feed latency stats
+        tracked = kind != SpanKind.DEPENDENCY or (parent is not None and parent.trace_id in self._traces)
+        if tracked:
+            self._register(span, workflow_id)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Async generators may be finalized from another context
+                _current_span.set(parent)
+            self._finish(span, tracked)
+
+    @contextmanager
+    def workflow_span(self, workflow_id: Optional[str], name: str = "workflow",
+                      attributes: Optional[Dict[str, Any]] = None) -> Iterator[Span]:
+        """Root span for a workflow run; resumes of the same workflow share its trace"""
+        trace_id = self.trace_id_for_workflow(workflow_id) if workflow_id else uuid.uuid4().hex
+        span_attributes = {"workflow.id": workflow_id or "", **(attributes or {})}
+        token = _current_span.set(None)
+        try:
+            with self.span(name, SpanKind.WORKFLOW, span_attributes, trace_id=trace_id,
+                           workflow_id=workflow_id) as span:
+                yield span
+        finally:
+            _current_span.reset(token)
+
+    def _register(self, span: Span, workflow_id: Optional[str]) -> None:
+        with self._lock:
+            record = self._traces.get(span.trace_id)
+            if record is None:
+                record = self._traces[span.trace_id] = _TraceRecord(workflow_id)
+                while len(self._traces) > self.max_traces:
+                    evicted_id, evicted = self._traces.popitem(last=False)
+                    if evicted.workflow_id:
+                        self._workflow_traces.pop(evicted.workflow_id, None)
+            else:
+                self._traces.move_to_end(span.trace_id)
+            record.spans.append(span)
+
+    def _finish(self, span: Span, tracked: bool = True) -> None:
+        pending: List[Span] = []
+        with self._lock:
+            if span.kind in (SpanKind.AGENT, SpanKind.DEPENDENCY):
+                self._samples[(span.kind.value, span.name)].append((time.time(), span.duration_ms))
+            record = self._traces.get(span.trace_id) if tracked else None
+            if span.parent_id is None and record is not None and self.exporter is not None:
+                pending = [s for s in record.spans[record.exported:] if s.end_ns is not None]
+                record.exported = len(record.spans)
+        if pending:
+            self.exporter.export(pending)
+
+    # --- Query API ---
+
+    def get_trace_tree(self, workflow_or_trace_id: str) -> Optional[Dict[str, Any]]:
+        """Return the span tree for a workflow id (or raw trace id)"""
+        with self._lock:
+            trace_id = self._workflow_traces.get(workflow_or_trace_id, workflow_or_trace_id)
+            record = self._traces.get(trace_id)
+            if record is None:
+                return None
+            spans = list(record.spans)
+
+        nodes = {span.span_id: {**span.to_dict(), "children": []} for span in spans}
+        roots = []
+        for span in spans:
+            node = nodes[span.span_id]
+            parent = nodes.get(span.parent_id) if span.parent_id else None
+            (parent["children"] if parent else roots).append(node)
+
+        return {
+            "trace_id": trace_id,
+            "workflow_id": record.workflow_id,
+            "span_count": len(spans),
+            "roots": roots,
+        }
+
+    def latency_summary(self, window_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """p50/p95/p99 per agent and per external dependency over the sliding window"""
+        window = window_seconds or self.window_seconds
+        cutoff = time.time() - window
+        summary: Dict[str, Dict[str, Any]] = {SpanKind.AGENT.value: {}, SpanKind.DEPENDENCY.value: {}}
+
+        with self._lock:
+            samples = {key: list(values) for key, values in self._samples.items()}
+
+        for (kind, name), values in samples.items():
+            durations = sorted(duration for ts, duration in values if ts >= cutoff and duration is not None)
+            if not durations:
+                continue
+            summary[kind][name] = {
+                "count": len(durations),
+                "p50_ms": round(_percentile(durations, 50), 3),
+                "p95_ms": round(_percentile(durations, 95), 3),
+                "p99_ms": round(_percentile(durations, 99), 3),
+                "max_ms": round(durations[-1], 3),
+                "avg_ms": round(sum(durations) / len(durations), 3),
+            }
+
+        return {
+            "window_seconds": window,
+            "agents": summary[SpanKind.AGENT.value],
+            "dependencies": summary[SpanKind.DEPENDENCY.value],
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._traces.clear()
+            self._workflow_traces.clear()
+            self._samples.clear()
+
+
+def trace_dependency(dependency: str, operation: Optional[str] = None):
+    """
+    Decorator that records a DEPENDENCY span around a sync or async call
+
+    Args:
+        dependency: External dependency name used for latency grouping (e.g. "pinecone")
+        operation: Optional operation label stored as a span attribute
+    """
+    def decorator(func):
+        op_name = operation or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with get_tracer().span(dependency, SpanKind.DEPENDENCY, {"operation": op_name}):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_tracer().span(dependency, SpanKind.DEPENDENCY, {"operation": op_name}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """Get singleton tracer instance."""
+    global _tracer
+    if _tracer is None:
+        export_path = os.getenv("TRACE_EXPORT_PATH")
+        _tracer = Tracer(
+            exporter=OTLPFileExporter(export_path) if export_path else None,
+            window_seconds=float(os.getenv("TRACE_WINDOW_SECONDS", "900")),
+            max_traces=int(os.getenv("TRACE_MAX_TRACES", "500")),
+        )
+    return _tracer
@@ -0,0 +1,122 @@
+"""
+Typed JSON encoding for persisted snapshots
+
+``json.dumps(value, default=str)`` turns every ``Decimal``, date and byte
+string into a plain string, so a snapshot read back no longer has the types
+it was written with. ``TypedJSONCodec`` encodes those values as small tagged
+objects (``{"__type__": "decimal", "value": "1200.50"}``) and decodes them
+back to the original types:
+
+- ``Decimal``, ``datetime``, ``date``, ``time`` and ``UUID``
+- ``set``, ``frozenset`` and ``tuple``
+- dicts with non-string keys, or with a ``__type__`` key of their own
+- ``bytes``: stored by reference in a ``blobs`` dict (``sha256 -> bytes``)
+  that the caller persists next to the snapshot, so large payloads such as
+  contract PDFs are kept once, outside the JSON document
+
+Pydantic models are stored as their ``model_dump()``; enums as their value.
+Subclasses add types of their own through ``encode_object`` and
+``decode_tagged``.
+"""
+
+import hashlib
+import logging
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+TYPE_KEY = "__type__"
+
+
+class TypedJSONCodec:
+    """Encode values to JSON-compatible data and back, keeping their types"""
+
+    def __init__(self, blobs: Optional[Dict[str, bytes]] = None):
+        # Byte strings by sha256; filled while encoding, read while decoding
+        self.blobs = blobs if blobs is not None else {}
+
+    # --- Encoding ---
+
+    def encode(self, value: Any) -> Any:
+        if value is None or type(value) in (str, int, float, bool):
+            return value
+        if isinstance(value, dict):
+            if all(type(key) is str for key in value) and TYPE_KEY not in value:
+                return {key: self.encode(item) for key, item in value.items()}
+            return self._tagged("dict", [[self.encode(key), self.encode(item)] for key, item in value.items()])
+        if isinstance(value, list):
+            return [self.encode(item) for item in value]
+        if isinstance(value, Enum):
+            return self.encode(value.value)
+        if isinstance(value, (str, int, float)):
+            # Other str/int/float subclasses
+            return value
+        if isinstance(value, Decimal):
+            return self._tagged("decimal", str(value))
+        if isinstance(value, datetime):
+            return self._tagged("datetime", value.isoformat())
+        if isinstance(value, date):
+            return self._tagged("date", value.isoformat())
+        if isinstance(value, time):
+            return self._tagged("time", value.isoformat())
+        if isinstance(value, uuid.UUID):
+            return self._tagged("uuid", str(value))
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            data = bytes(value)
+            ref = hashlib.sha256(data).hexdigest()
+            self.blobs[ref] = data
+            return self._tagged("blob", ref)
+        if isinstance(value, tuple):
+            return self._tagged("tuple", [self.encode(item) for item in value])
+        if isinstance(value, (set, frozenset)):
+            return self._tagged("set", [self.encode(item) for item in value])
+        if hasattr(value, "model_dump"):
+            return self.encode(value.model_dump())
+        return self.encode_object(value)
+
+    def encode_object(self, value: Any) -> Any:
+        """Types the codec does not know; stored as their string form"""
+        logger.warning(f"⚠️ Snapshot stores {type(value).__name__} value as a string")
+        return str(value)
+
+    @staticmethod
+    def _tagged(tag: str, payload: Any) -> Dict[str, Any]:
+        return {TYPE_KEY: tag, "value": payload}
+
+    # --- Decoding ---
+
+    def decode(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return [self.decode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if TYPE_KEY not in value:
+            return {key: self.decode(item) for key, item in value.items()}
+        return self.decode_tagged(value[TYPE_KEY], value.get("value"))
+
+    def decode_tagged(self, tag: str, payload: Any) -> Any:
+        if tag == "decimal":
+            return Decimal(payload)
+        if tag == "datetime":
+            return datetime.fromisoformat(payload)
+        if tag == "date":
+            return date.fromisoformat(payload)
+        if tag == "time":
+            return time.fromisoformat(payload)
+        if tag == "uuid":
+            return uuid.UUID(payload)
+        if tag == "blob":
+            if payload not in self.blobs:
+                raise ValueError(f"Snapshot references missing blob {payload}")
+            return self.blobs[payload]
+        if tag == "tuple":
+            return tuple(self.decode(item) for item in payload)
+        if tag == "set":
+            return {self.decode(item) for item in payload}
+        if tag == "dict":
+            return {self.decode(key): self.decode(item) for key, item in payload}
+        raise ValueError(f"Unknown snapshot value type: {tag}")